@@ -1,5 +1,7 @@
+import json
+import time
 import requests
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, Optional
 
 
 class APIClient:
@@ -10,14 +12,19 @@ class APIClient:
         self.api_key = api_key
         self.session = requests.Session()
     
-    def _request(self, method: str, endpoint: str, params: Optional[Dict] = None,
-                 data: Optional[Dict] = None, json_data: Optional[Dict] = None) -> Dict[str, Any]:
-        url = f"{self.base_url}{endpoint}"
+    def _get_headers(self) -> Dict[str, str]:
         headers = {}
         
         # 添加 API key 到请求头
         if self.api_key:
             headers['X-API-Key'] = self.api_key
+        return headers
+    
+    def _request(self, method: str, endpoint: str, params: Optional[Dict] = None,
+                 data: Optional[Dict] = None, json_data: Optional[Dict] = None,
+                 timeout: Optional[float] = None) -> Dict[str, Any]:
+        url = f"{self.base_url}{endpoint}"
+        headers = self._get_headers()
         
         for attempt in range(self.retry_count):
             try:
@@ -28,7 +35,7 @@ class APIClient:
                     data=data,
                     json=json_data,
                     headers=headers,
-                    timeout=self.timeout
+                    timeout=timeout or self.timeout
                 )
                 response.raise_for_status()
                 return response.json()
@@ -42,8 +49,44 @@ class APIClient:
     def get(self, endpoint: str, params: Optional[Dict] = None) -> Dict[str, Any]:
         return self._request('GET', endpoint, params=params)
     
-    def post(self, endpoint: str, data: Optional[Dict] = None, json_data: Optional[Dict] = None) -> Dict[str, Any]:
-        return self._request('POST', endpoint, data=data, json_data=json_data)
+    def post(self, endpoint: str, data: Optional[Dict] = None, json_data: Optional[Dict] = None,
+             timeout: Optional[float] = None) -> Dict[str, Any]:
+        return self._request('POST', endpoint, data=data, json_data=json_data, timeout=timeout)
+    
+    def post_stream(self, endpoint: str, json_data: Optional[Dict] = None) -> Iterator[Dict[str, Any]]:
+        """发起POST请求并逐行读取 NDJSON 响应（每行一个JSON对象），服务端每返回一行就产生一个结果
+        
+        不重试（请求不是幂等的）；请求失败或连接中断时产生一个包含 error 的字典后结束
+        """
+        url = f"{self.base_url}{endpoint}"
+        try:
+            with self.session.post(
+                url,
+                json=json_data,
+                headers=self._get_headers(),
+                timeout=self.timeout,
+                stream=True
+            ) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if line:
+                        yield json.loads(line)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            yield {'error': str(e)}
+    
+    def wait_for_job(self, job_id: int, timeout: float = 300, interval: float = 1.0) -> Dict[str, Any]:
+        """轮询后台任务直到执行结束（成功、失败或取消），返回任务信息
+        
+        超时或查询失败时返回包含 error 的字典
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get(f'/api/jobs/{job_id}')
+            if 'error' in job or job.get('status') in ('succeeded', 'failed', 'cancelled'):
+                return job
+            if time.monotonic() >= deadline:
+                return {'error': f'等待后台任务 {job_id} 超时'}
+            time.sleep(interval)
     
     def put(self, endpoint: str, data: Optional[Dict] = None, json_data: Optional[Dict] = None) -> Dict[str, Any]:
         return self._request('PUT', endpoint, data=data, json_data=json_data)
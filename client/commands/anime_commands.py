@@ -9,6 +9,19 @@ from rich.table import Table
 class AnimeCommands:
     """动画相关命令实现"""
     
+    # 停止检查原因的显示名称
+    STOP_REASONS = {
+        'episodes_complete': '已获取全部集数',
+        'idle': '长时间没有更新',
+        'status_completed': '已标记完结'
+    }
+    
+    # 季度番组目录中放送日的显示名称
+    DAY_NAMES = ['星期日', '星期一', '星期二', '星期三', '星期四', '星期五', '星期六']
+    
+    # 获取季度番组目录的超时时间（秒），需要解析该季度的全部番组页面
+    SEASON_CATALOG_TIMEOUT = 600
+    
     def __init__(self, api_client, console, config):
         self.api_client = api_client
         self.console = console
@@ -171,6 +184,11 @@ class AnimeCommands:
             table.add_row("封面URL", anime.get('cover_url', 'N/A') or 'N/A')
             table.add_row("状态", anime.get('status', 'N/A'))
             table.add_row("总集数", str(anime.get('total_episodes', 'N/A')))
+            if anime.get('polling_stopped_at'):
+                table.add_row(
+                    "停止检查",
+                    f"{anime['polling_stopped_at']} ({self.STOP_REASONS.get(anime.get('polling_stop_reason'), anime.get('polling_stop_reason'))})"
+                )
             table.add_row("创建时间", anime.get('created_at', 'N/A'))
             table.add_row("更新时间", anime.get('updated_at', 'N/A'))
             
@@ -211,8 +229,10 @@ class AnimeCommands:
     def smart_add(self, args):
         """智能添加动画（从链接自动解析）"""
         parser = argparse.ArgumentParser(prog='anime smart-add', add_help=False)
-        parser.add_argument('--url', required=True, help='动画网站链接')
-        parser.add_argument('--auto-add-rss', action='store_true', help='是否自动解析RSS源')
+        parser.add_argument('--url', help='动画网站链接')
+        parser.add_argument('--file', help='批量添加：链接列表文件（每行一个链接，# 开头的行为注释）')
+        parser.add_argument('--auto-add-rss', action='store_true', help='是否自动解析RSS源（批量添加时添加全部RSS源）')
+        parser.add_argument('--concurrency', type=int, help='批量添加时的最大并发解析数（默认使用服务端配置）')
         parser.add_argument('-h', '--help', action='store_true', help='显示帮助')
         
         try:
@@ -221,6 +241,14 @@ class AnimeCommands:
                 parser.print_help()
                 return
             
+            if parsed.file:
+                self._smart_add_batch(parsed.file, parsed.auto_add_rss, parsed.concurrency)
+                return
+            
+            if not parsed.url:
+                self._print_error("请指定 --url 或 --file")
+                return
+            
             self.console.print(f"正在解析链接: {parsed.url}")
             
             # 步骤1: 智能解析动画
@@ -316,7 +344,21 @@ class AnimeCommands:
                 self._print_error(f"添加失败: {add_response['error']}")
                 return
             
-            anime = add_response.get('anime', {})
+            if add_response.get('job_id'):
+                # 服务端在后台任务队列中添加，等待执行结束
+                job = self.api_client.wait_for_job(add_response['job_id'])
+                if 'error' in job:
+                    self._print_error(f"添加失败: {job['error']}")
+                    return
+                if job.get('status') != 'succeeded':
+                    self._print_error(f"添加失败: {job.get('error') or job.get('status')}")
+                    return
+                add_response = job.get('result') or {}
+                if not add_response.get('success'):
+                    self._print_error(f"添加失败: {add_response.get('message', '')}")
+                    return
+            
+            anime = add_response.get('anime') or {}
             self._print_success(f"动画添加成功: {anime.get('title', 'N/A')}")
             self.console.print(f"ID: {anime.get('id', 'N/A')}")
             
@@ -333,6 +375,169 @@ class AnimeCommands:
         except Exception as e:
             self._print_error(f"参数错误: {e}")
     
+    def _smart_add_batch(self, file_path: str, auto_add_rss: bool, concurrency: Optional[int]):
+        """从链接列表文件批量智能添加动画（不交互，结果按完成顺序显示）"""
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                urls = [
+                    line.strip() for line in f
+                    if line.strip() and not line.strip().startswith('#')
+                ]
+        except OSError as e:
+            self._print_error(f"读取链接列表失败: {e}")
+            return
+        
+        if not urls:
+            self._print_error("链接列表为空")
+            return
+        
+        self._run_smart_add_batch(urls, auto_add_rss, concurrency)
+    
+    def _run_smart_add_batch(self, urls: List[str], auto_add_rss: bool, concurrency: Optional[int]):
+        """调用批量智能添加接口，按完成顺序显示每个链接的结果"""
+        self.console.print(f"正在批量添加 {len(urls)} 个链接...")
+        if not auto_add_rss:
+            self._print_info("未指定 --auto-add-rss，只添加动画，不添加RSS源")
+        
+        data = {'urls': urls, 'auto_add_rss': auto_add_rss}
+        if concurrency:
+            data['max_concurrency'] = concurrency
+        
+        succeeded = 0
+        failed = []
+        finished = 0
+        for result in self.api_client.post_stream('/api/anime/smart-add/batch', json_data=data):
+            if 'error' in result:
+                self._print_error(f"批量添加失败: {result['error']}")
+                break
+            
+            finished += 1
+            progress = f"[{finished}/{len(urls)}]"
+            if result.get('success'):
+                succeeded += 1
+                anime = result.get('anime') or {}
+                self._print_success(
+                    f"{progress} {anime.get('title', 'N/A')} (ID: {anime.get('id', 'N/A')})，"
+                    f"RSS源 {len(result.get('rss_sources') or [])} 个"
+                )
+            else:
+                failed.append(result)
+                self._print_error(f"{progress} {result.get('url')}: {result.get('message')}")
+        
+        self.console.print(f"\n完成: 成功 {succeeded} 个，失败 {len(failed)} 个，未完成 {len(urls) - finished} 个")
+        if failed:
+            table = Table(title="添加失败的链接")
+            table.add_column("序号", style="cyan", width=4)
+            table.add_column("URL", style="magenta")
+            table.add_column("原因", style="red")
+            for result in sorted(failed, key=lambda item: item.get('index', 0)):
+                table.add_row(str(result.get('index', 0) + 1), result.get('url', ''), result.get('message') or '')
+            self.console.print(table)
+    
+    def season(self, args):
+        """查看季度番组目录，并可批量添加其中的番组"""
+        parser = argparse.ArgumentParser(prog='anime season', add_help=False)
+        parser.add_argument('--year', type=int, help='年份')
+        parser.add_argument('--season', help='季度（春、夏、秋、冬）')
+        parser.add_argument('--url', help='季度番组列表页面链接（代替 --year 和 --season）')
+        parser.add_argument('--refresh', action='store_true', help='忽略缓存重新解析')
+        parser.add_argument('--add', help='批量添加目录中的番组（序号，如 1,2 或 1-3，all 为全部）')
+        parser.add_argument('--auto-add-rss', action='store_true', help='批量添加时添加全部RSS源')
+        parser.add_argument('--concurrency', type=int, help='批量添加时的最大并发解析数（默认使用服务端配置）')
+        parser.add_argument('-h', '--help', action='store_true', help='显示帮助')
+        
+        try:
+            parsed = parser.parse_args(shlex.split(args))
+            if parsed.help:
+                parser.print_help()
+                return
+            
+            if not parsed.url and (parsed.year is None or not parsed.season):
+                self._print_error("请指定 --url，或同时指定 --year 和 --season")
+                return
+            
+            data = {'refresh': parsed.refresh}
+            if parsed.url:
+                data['url'] = parsed.url
+            else:
+                data['year'] = parsed.year
+                data['season'] = parsed.season
+            
+            self.console.print("正在获取季度番组目录...")
+            response = self.api_client.post(
+                '/api/smart-parser/season-catalog',
+                json_data=data,
+                timeout=self.SEASON_CATALOG_TIMEOUT
+            )
+            
+            if 'error' in response:
+                self._print_error(f"获取季度番组目录失败: {response['error']}")
+                return
+            
+            items = response.get('items', [])
+            self._print_success(
+                f"从 {response.get('site_name', 'Unknown')} 获取到 {response.get('total', 0)} 个番组，"
+                f"解析成功 {response.get('parsed', 0)} 个"
+            )
+            
+            table = Table(title="季度番组目录")
+            table.add_column("ID", style="cyan", width=4)
+            table.add_column("番组ID", style="blue", width=8)
+            table.add_column("标题", style="magenta")
+            table.add_column("放送", style="yellow", width=8)
+            table.add_column("RSS源", style="green")
+            
+            for idx, item in enumerate(items, 1):
+                day_of_week = item.get('day_of_week')
+                day_name = self.DAY_NAMES[day_of_week] if day_of_week in range(7) else '其他'
+                anime = item.get('anime')
+                rss_info = str(len(anime.get('rss_sources') or [])) if anime else f"解析失败: {item.get('error')}"
+                table.add_row(str(idx), item.get('bangumi_id', ''), item.get('title', ''), day_name, rss_info)
+            
+            self.console.print(table)
+            
+            if not parsed.add:
+                return
+            
+            if parsed.add.strip().lower() == 'all':
+                indices = list(range(1, len(items) + 1))
+            else:
+                indices = self._parse_indices(parsed.add)
+                if not all(1 <= idx <= len(items) for idx in indices):
+                    self._print_error(f"请输入 1-{len(items)} 之间的数字或范围")
+                    return
+            
+            selected = [items[idx - 1] for idx in indices]
+            skipped = [item for item in selected if not item.get('anime')]
+            if skipped:
+                self._print_warning(f"跳过 {len(skipped)} 个解析失败的番组: {', '.join(item.get('title', '') for item in skipped)}")
+            urls = [item['url'] for item in selected if item.get('anime')]
+            if not urls:
+                self._print_error("没有可添加的番组")
+                return
+            
+            self._run_smart_add_batch(urls, parsed.auto_add_rss, parsed.concurrency)
+            
+        except SystemExit:
+            pass
+        except Exception as e:
+            self._print_error(f"参数错误: {e}")
+    
+    @staticmethod
+    def _parse_indices(text: str) -> List[int]:
+        """解析序号列表（如 1,2 或 1-3），返回去重排序后的序号"""
+        indices = []
+        for part in text.split(','):
+            part = part.strip()
+            if '-' in part:
+                # 范围选择，如 1-3
+                start, end = part.split('-')
+                indices.extend(range(int(start.strip()), int(end.strip()) + 1))
+            else:
+                # 单个选择
+                indices.append(int(part))
+        return sorted(set(indices))
+    
     def _prompt_select_anime(self, max_index: int) -> Optional[int]:
         """提示用户选择动画"""
         while True:
@@ -365,25 +570,9 @@ class AnimeCommands:
                     return []
                 
                 # 解析用户输入
-                indices = []
-                parts = user_input.split(',')
-                
-                for part in parts:
-                    part = part.strip()
-                    if '-' in part:
-                        # 范围选择，如 1-3
-                        start, end = part.split('-')
-                        start = int(start.strip())
-                        end = int(end.strip())
-                        indices.extend(range(start, end + 1))
-                    else:
-                        # 单个选择
-                        indices.append(int(part))
+                indices = self._parse_indices(user_input)
                 
                 # 验证索引
-                indices = list(set(indices))  # 去重
-                indices.sort()
-                
                 if all(1 <= idx <= max_index for idx in indices):
                     return indices
                 else:
@@ -394,6 +583,31 @@ class AnimeCommands:
                 self._print_info("\n已取消RSS源添加")
                 return []
     
+    def resume(self, args):
+        """恢复已完结动画的RSS源检查"""
+        parser = argparse.ArgumentParser(prog='anime resume', add_help=False)
+        parser.add_argument('--id', type=int, required=True, help='动画ID')
+        parser.add_argument('-h', '--help', action='store_true', help='显示帮助')
+        
+        try:
+            parsed = parser.parse_args(shlex.split(args))
+            if parsed.help:
+                parser.print_help()
+                return
+            
+            response = self.api_client.post(f'/api/scheduler/lifecycle/{parsed.id}/resume')
+            
+            if 'error' in response:
+                self._print_error(f"恢复检查失败: {response['error']}")
+                return
+            
+            self._print_success(response.get('message', '已恢复检查'))
+            
+        except SystemExit:
+            pass
+        except Exception as e:
+            self._print_error(f"参数错误: {e}")
+    
     def help(self):
         """显示 anime 命令的帮助信息"""
         help_text = """
@@ -406,6 +620,8 @@ class AnimeCommands:
   list        列出所有动画
   show        显示动画详情
   smart-add   智能添加动画（从链接自动解析）
+  season      查看季度番组目录并批量添加
+  resume      恢复已完结动画的RSS源检查
 
 使用 'anime <子命令> --help' 查看子命令的详细帮助
         """
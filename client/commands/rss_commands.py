@@ -256,6 +256,7 @@ class RSSCommands:
         parser = argparse.ArgumentParser(prog='rss check', add_help=False)
         parser.add_argument('--id', type=int, required=True, help='RSS源ID')
         parser.add_argument('--auto-download', action='store_true', help='是否自动下载新链接')
+        parser.add_argument('--background', action='store_true', help='在服务端后台任务队列中检查并等待结果')
         parser.add_argument('-h', '--help', action='store_true', help='显示帮助')
         
         try:
@@ -266,17 +267,31 @@ class RSSCommands:
             
             self.console.print(f"正在检查RSS源 (ID: {parsed.id})...")
             
-            # 调用API检查RSS源
-            response = self.api_client.post(f'/api/rss-sources/{parsed.id}/check', json_data={
-                'auto_download': parsed.auto_download
-            })
+            # 调用API检查RSS源（参数为查询参数）
+            query = f"auto_download={str(parsed.auto_download).lower()}"
+            if parsed.background:
+                query += "&background=true"
+            response = self.api_client.post(f'/api/rss-sources/{parsed.id}/check?{query}')
             
             if 'error' in response:
                 self._print_error(f"检查RSS源失败: {response['error']}")
                 return
             
             result = response
-            new_links = result.get('new_links', 0)
+            if result.get('job_id'):
+                # 服务端在后台任务队列中执行检查，等待执行结束
+                job = self.api_client.wait_for_job(result['job_id'])
+                if 'error' in job:
+                    self._print_error(f"检查RSS源失败: {job['error']}")
+                    return
+                if job.get('status') != 'succeeded':
+                    self._print_error(f"检查RSS源失败: {job.get('error') or job.get('status')}")
+                    return
+                result = job.get('result') or {}
+                if not result.get('success', True):
+                    self._print_error(f"检查RSS源失败: {result.get('message', '')}")
+                    return
+            new_links = result.get('new_links_count', 0)
             downloaded = result.get('downloaded', 0)
             
             self._print_success(f"检查完成: 发现 {new_links} 个新链接")
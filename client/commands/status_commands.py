@@ -99,6 +99,7 @@ class StatusCommands:
     def scheduler(self, args):
         """查看调度器状态"""
         parser = argparse.ArgumentParser(prog='status scheduler', add_help=False)
+        parser.add_argument('--hours', type=int, default=24, help='统计最近多少小时的检查指标（默认24）')
         parser.add_argument('-h', '--help', action='store_true', help='显示帮助')
         
         try:
@@ -136,31 +137,115 @@ class StatusCommands:
             
             self.console.print(status_panel)
             
-            # 显示任务列表
+            # 显示任务列表（jobs 为 {job_id: 任务信息}）
             if jobs:
                 table = Table(title=f"调度任务 ({len(jobs)} 个)")
-                table.add_column("ID", style="cyan", width=6)
-                table.add_column("名称", style="magenta")
+                table.add_column("任务ID", style="cyan")
+                table.add_column("RSS源", style="magenta", width=8)
                 table.add_column("状态", style="yellow", width=8)
-                table.add_column("下次执行", style="green", width=19)
+                table.add_column("间隔", style="green", width=10)
+                table.add_column("连续失败", style="red", width=8)
+                table.add_column("退避至", style="dim")
                 
-                for job in jobs:
+                for job_id, info in jobs.items():
+                    rss_source_id = info.get('rss_source_id')
+                    backoff_until = info.get('backoff_until')
+                    if info.get('paused'):
+                        job_status = "已暂停"
+                    elif backoff_until:
+                        job_status = "退避中"
+                    else:
+                        job_status = "运行中"
                     table.add_row(
-                        str(job.get('id', 'N/A')),
-                        job.get('name', 'N/A'),
-                        job.get('status', 'N/A'),
-                        job.get('next_run_time', 'N/A')[:19] if job.get('next_run_time') else 'N/A'
+                        job_id,
+                        str(rss_source_id) if rss_source_id is not None else "全部",
+                        job_status,
+                        f"{info.get('interval', 'N/A')} 秒",
+                        str(info.get('consecutive_failures') or 0),
+                        backoff_until[:19].replace('T', ' ') if backoff_until else "-"
                     )
                 
                 self.console.print(table)
             else:
                 self._print_info("当前没有调度任务")
             
+            self._print_scheduler_metrics(parsed.hours)
+            
         except SystemExit:
             pass
         except Exception as e:
             self._print_error(f"参数错误: {e}")
     
+    def _print_scheduler_metrics(self, hours: int):
+        """显示各RSS源的检查指标"""
+        response = self.api_client.get('/api/scheduler/metrics', params={'hours': hours})
+        
+        if 'error' in response:
+            self._print_error(f"获取检查指标失败: {response['error']}")
+            return
+        
+        sources = response.get('sources', [])
+        if not sources:
+            self._print_info(f"最近 {hours} 小时没有检查记录")
+            return
+        
+        def fmt_seconds(value):
+            return f"{value:.2f}s" if value is not None else "N/A"
+        
+        table = Table(title=f"检查指标（最近 {hours} 小时，共 {response.get('total_runs', 0)} 次）")
+        table.add_column("RSS源", style="cyan")
+        table.add_column("次数", style="green", justify="right")
+        table.add_column("失败率", style="red", justify="right")
+        table.add_column("未变化", style="blue", justify="right")
+        table.add_column("P50", style="yellow", justify="right")
+        table.add_column("P90", style="yellow", justify="right")
+        table.add_column("P99", style="yellow", justify="right")
+        table.add_column("限速等待", style="blue", justify="right")
+        table.add_column("流量", style="magenta", justify="right")
+        table.add_column("新链接", style="green", justify="right")
+        table.add_column("最近错误", style="red")
+        
+        for source in sources:
+            name = source.get('name') or 'N/A'
+            last_error = source.get('last_error') or ''
+            table.add_row(
+                f"{source.get('rss_source_id')} {name}",
+                str(source.get('runs', 0)),
+                f"{source.get('failure_rate', 0) * 100:.0f}%",
+                str(source.get('not_modified', 0)),
+                fmt_seconds(source.get('duration_p50')),
+                fmt_seconds(source.get('duration_p90')),
+                fmt_seconds(source.get('duration_p99')),
+                fmt_seconds(source.get('rate_limit_wait_total')),
+                f"{source.get('bytes_transferred', 0) / 1024:.1f} KB",
+                str(source.get('new_links_count', 0)),
+                last_error[:40]
+            )
+        
+        self.console.print(table)
+        
+        rate_limits = response.get('rate_limits') or {}
+        if rate_limits:
+            table = Table(title="按主机限速")
+            table.add_column("主机", style="cyan")
+            table.add_column("速率", style="green", justify="right")
+            table.add_column("并发", style="green", justify="right")
+            table.add_column("请求数", style="yellow", justify="right")
+            table.add_column("等待次数", style="yellow", justify="right")
+            table.add_column("总等待", style="blue", justify="right")
+            table.add_column("最长等待", style="blue", justify="right")
+            for host, stats in rate_limits.items():
+                table.add_row(
+                    host,
+                    f"{stats.get('requests_per_second', 0):g}/s",
+                    f"{stats.get('in_flight', 0)}/{stats.get('max_in_flight', 0)}",
+                    str(stats.get('requests', 0)),
+                    str(stats.get('waited_requests', 0)),
+                    fmt_seconds(stats.get('total_wait')),
+                    fmt_seconds(stats.get('max_wait'))
+                )
+            self.console.print(table)
+    
     def summary(self, args):
         """查看系统摘要"""
         parser = argparse.ArgumentParser(prog='status summary', add_help=False)
@@ -90,9 +90,11 @@ class AnimeLoaderCLI(cmd2.Cmd):
           list        列出所有动画
           show        显示动画详情
           smart-add   智能添加动画（从链接自动解析）
+          season      查看季度番组目录并批量添加
+          resume      恢复已完结动画的RSS源检查
         """
         if not args:
-            self._print_info("请指定子命令: add, list, show, smart-add")
+            self._print_info("请指定子命令: add, list, show, smart-add, season, resume")
             self._print_info("使用 'anime --help' 查看详细帮助")
             return
 
@@ -109,11 +111,15 @@ class AnimeLoaderCLI(cmd2.Cmd):
             self.anime_commands.show(subcommand_args)
         elif subcommand == 'smart-add':
             self.anime_commands.smart_add(subcommand_args)
+        elif subcommand == 'season':
+            self.anime_commands.season(subcommand_args)
+        elif subcommand == 'resume':
+            self.anime_commands.resume(subcommand_args)
         elif subcommand in ['--help', '-h', 'help']:
             self.anime_commands.help()
         else:
             self._print_error(f"未知的子命令: {subcommand}")
-            self._print_info("可用子命令: add, list, show, smart-add")
+            self._print_info("可用子命令: add, list, show, smart-add, season, resume")
     
     
     
@@ -61,6 +61,132 @@ def main():
         "调度服务测试"
     ))
     
+    # RSS条件请求测试（不需要服务端，离线）
+    results.append(run_command(
+        f"{venv_python} tests/test_rss_conditional_get.py",
+        "RSS条件请求测试"
+    ))
+    
+    # RSS增量解析测试（不需要服务端，离线）
+    results.append(run_command(
+        f"{venv_python} tests/test_rss_incremental.py",
+        "RSS增量解析测试"
+    ))
+    
+    # 调度任务持久化测试（不需要服务端，离线）
+    results.append(run_command(
+        f"{venv_python} tests/test_scheduler_persistence.py",
+        "调度任务持久化测试"
+    ))
+    
+    # 检查运行记录测试（不需要服务端，离线）
+    results.append(run_command(
+        f"{venv_python} tests/test_scheduler_runs.py",
+        "检查运行记录测试"
+    ))
+    
+    # 检查失败退避与主机熔断测试（不需要服务端，离线）
+    results.append(run_command(
+        f"{venv_python} tests/test_scheduler_backoff.py",
+        "检查失败退避与主机熔断测试"
+    ))
+    
+    # 按主机限速测试（不需要服务端，离线）
+    results.append(run_command(
+        f"{venv_python} tests/test_rate_limiter.py",
+        "按主机限速测试"
+    ))
+    
+    # 自适应检查间隔测试（不需要服务端，离线）
+    results.append(run_command(
+        f"{venv_python} tests/test_adaptive_polling.py",
+        "自适应检查间隔测试"
+    ))
+    
+    # 动画生命周期测试（不需要服务端，离线）
+    results.append(run_command(
+        f"{venv_python} tests/test_anime_lifecycle.py",
+        "动画生命周期测试"
+    ))
+    
+    # RSS合并抓取测试（不需要服务端，离线）
+    results.append(run_command(
+        f"{venv_python} tests/test_rss_coalescing.py",
+        "RSS合并抓取测试"
+    ))
+    
+    # 聚合RSS源测试（不需要服务端，离线）
+    results.append(run_command(
+        f"{venv_python} tests/test_aggregate_feed.py",
+        "聚合RSS源测试"
+    ))
+    
+    # 后台任务队列测试（不需要服务端，离线）
+    results.append(run_command(
+        f"{venv_python} tests/test_job_queue.py",
+        "后台任务队列测试"
+    ))
+    
+    # 标题解析测试（不需要服务端，离线）
+    results.append(run_command(
+        f"{venv_python} tests/test_title_parser.py",
+        "标题解析测试"
+    ))
+    
+    # 发布标题解析测试（不需要服务端，离线）
+    results.append(run_command(
+        f"{venv_python} tests/test_release_parser.py",
+        "发布标题解析测试"
+    ))
+    
+    # 蜜柑计划RSS流式解析测试（不需要服务端，离线）
+    results.append(run_command(
+        f"{venv_python} tests/test_mikan_feed.py",
+        "蜜柑计划RSS流式解析测试"
+    ))
+    
+    # 解析器注册表测试（不需要服务端，离线）
+    results.append(run_command(
+        f"{venv_python} tests/test_parser_registry.py",
+        "解析器注册表测试"
+    ))
+    
+    # HTTP客户端测试（不需要服务端，离线）
+    results.append(run_command(
+        f"{venv_python} tests/test_http_client.py",
+        "HTTP客户端测试"
+    ))
+    
+    # HTTP磁盘缓存测试（不需要服务端，离线）
+    results.append(run_command(
+        f"{venv_python} tests/test_http_cache.py",
+        "HTTP磁盘缓存测试"
+    ))
+    
+    # 智能解析结果缓存测试（不需要服务端，离线）
+    results.append(run_command(
+        f"{venv_python} tests/test_parse_cache.py",
+        "智能解析结果缓存测试"
+    ))
+    
+    # 蜜柑计划番组页面解析测试（不需要服务端，离线）
+    results.append(run_command(
+        f"{venv_python} tests/test_mikan_page.py",
+        "蜜柑计划番组页面解析测试"
+    ))
+    
+    # 批量智能添加测试（不需要服务端，离线）
+    results.append(run_command(
+        f"{venv_python} tests/test_smart_add_batch.py",
+        "批量智能添加测试"
+    ))
+    
+    # 季度番组目录测试（不需要服务端，离线）
+    results.append(run_command(
+        f"{venv_python} tests/test_season_catalog.py",
+        "季度番组目录测试"
+    ))
+    
     # 需要服务端的测试（使用隔离环境，自动启动和停止）
     # 测试6: 服务端API测试
     results.append(run_command(
@@ -98,6 +224,27 @@ def main():
         "下载器服务测试",
         "下载服务测试",
         "调度服务测试",
+        "RSS条件请求测试",
+        "RSS增量解析测试",
+        "调度任务持久化测试",
+        "检查运行记录测试",
+        "检查失败退避与主机熔断测试",
+        "按主机限速测试",
+        "自适应检查间隔测试",
+        "动画生命周期测试",
+        "RSS合并抓取测试",
+        "聚合RSS源测试",
+        "后台任务队列测试",
+        "标题解析测试",
+        "发布标题解析测试",
+        "蜜柑计划RSS流式解析测试",
+        "解析器注册表测试",
+        "HTTP客户端测试",
+        "HTTP磁盘缓存测试",
+        "智能解析结果缓存测试",
+        "蜜柑计划番组页面解析测试",
+        "批量智能添加测试",
+        "季度番组目录测试",
         "服务端API测试",
         "智能添加测试",
         "客户端API认证测试",
@@ -11,6 +11,8 @@ from .link_extra import router as link_extra_router
 from .downloader import router as downloader_router
 from .download import router as download_router
 from .scheduler import router as scheduler_router
+from .aggregate_feed import router as aggregate_feed_router
+from .background_job import router as background_job_router
 from .smart_parser import router as smart_parser_router
 from .health import router as health_router
 
@@ -29,6 +31,8 @@ def create_api_router() -> APIRouter:
     router.include_router(downloader_router)
     router.include_router(download_router)
     router.include_router(scheduler_router)
+    router.include_router(aggregate_feed_router)
+    router.include_router(background_job_router)
     router.include_router(smart_parser_router)
     router.include_router(health_router)
     
@@ -0,0 +1,225 @@
+"""
+聚合RSS源相关API路由
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from server.database import get_db
+from server.models.aggregate_feed import AggregateFeed
+from server.services.aggregate_feed_service import AggregateFeedService
+from server.services.scheduler_service import SchedulerService
+from server.api.routes.scheduler import get_scheduler_service
+from server.api.schemas import (
+    AggregateFeedCreate,
+    AggregateFeedUpdate,
+    AggregateFeedResponse,
+    AggregateFeedListResponse,
+    AggregateFeedCheckResponse,
+    MessageResponse
+)
+from server.api.auth import verify_api_key
+
+
+# 在路由器级别添加认证依赖
+router = APIRouter(
+    prefix="/aggregate-feeds",
+    tags=["聚合RSS源"],
+    dependencies=[Depends(verify_api_key)]
+)
+
+
+def get_aggregate_feed_service(db: Session = Depends(get_db)) -> AggregateFeedService:
+    """获取聚合RSS源服务实例"""
+    return AggregateFeedService(db)
+
+
+def to_response(feed: AggregateFeed, service: AggregateFeedService) -> AggregateFeedResponse:
+    """转换为响应模型（未匹配的条目以JSON保存）"""
+    return AggregateFeedResponse(
+        id=feed.id,
+        name=feed.name,
+        url=feed.url,
+        is_active=feed.is_active,
+        rss_source_ids=feed.rss_source_ids,
+        last_checked_at=feed.last_checked_at,
+        last_unmatched_count=feed.last_unmatched_count,
+        last_unmatched=service.get_unmatched(feed),
+        created_at=feed.created_at,
+        updated_at=feed.updated_at
+    )
+
+
+def get_feed_or_404(feed_id: int, service: AggregateFeedService) -> AggregateFeed:
+    """获取聚合RSS源，不存在时返回404"""
+    feed = service.get_feed(feed_id)
+    if not feed:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"聚合RSS源ID {feed_id} 不存在"
+        )
+    return feed
+
+
+@router.get(
+    "",
+    response_model=AggregateFeedListResponse,
+    summary="获取所有聚合RSS源",
+    description="获取聚合RSS源列表"
+)
+def get_aggregate_feeds(
+    is_active: bool | None = Query(None, description="是否激活"),
+    service: AggregateFeedService = Depends(get_aggregate_feed_service)
+):
+    """获取所有聚合RSS源"""
+    feeds = service.get_feeds(is_active=is_active)
+    return AggregateFeedListResponse(
+        total=len(feeds),
+        items=[to_response(feed, service) for feed in feeds]
+    )
+
+
+@router.get(
+    "/{feed_id}",
+    response_model=AggregateFeedResponse,
+    summary="获取单个聚合RSS源",
+    description="获取聚合RSS源详情，包括绑定的RSS源和上次检查未匹配的条目"
+)
+def get_aggregate_feed(
+    feed_id: int,
+    service: AggregateFeedService = Depends(get_aggregate_feed_service)
+):
+    """获取单个聚合RSS源"""
+    return to_response(get_feed_or_404(feed_id, service), service)
+
+
+@router.post(
+    "",
+    response_model=AggregateFeedResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="创建聚合RSS源",
+    description="创建聚合RSS源，并让指定的RSS源改由它更新"
+)
+def create_aggregate_feed(
+    feed_data: AggregateFeedCreate,
+    service: AggregateFeedService = Depends(get_aggregate_feed_service)
+):
+    """创建聚合RSS源"""
+    feed = service.create_feed(
+        name=feed_data.name,
+        url=feed_data.url,
+        is_active=feed_data.is_active
+    )
+    for rss_source_id in feed_data.rss_source_ids:
+        if not service.bind_source(feed.id, rss_source_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"RSS源ID {rss_source_id} 不存在"
+            )
+    return to_response(service.get_feed(feed.id), service)
+
+
+@router.put(
+    "/{feed_id}",
+    response_model=AggregateFeedResponse,
+    summary="更新聚合RSS源",
+    description="更新聚合RSS源信息"
+)
+def update_aggregate_feed(
+    feed_id: int,
+    feed_data: AggregateFeedUpdate,
+    service: AggregateFeedService = Depends(get_aggregate_feed_service)
+):
+    """更新聚合RSS源"""
+    feed = service.update_feed(
+        feed_id,
+        name=feed_data.name,
+        url=feed_data.url,
+        is_active=feed_data.is_active
+    )
+    if not feed:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"聚合RSS源ID {feed_id} 不存在"
+        )
+    return to_response(feed, service)
+
+
+@router.delete(
+    "/{feed_id}",
+    response_model=MessageResponse,
+    summary="删除聚合RSS源",
+    description="删除聚合RSS源，绑定的RSS源恢复为单独检查"
+)
+def delete_aggregate_feed(
+    feed_id: int,
+    service: AggregateFeedService = Depends(get_aggregate_feed_service)
+):
+    """删除聚合RSS源"""
+    if not service.delete_feed(feed_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"聚合RSS源ID {feed_id} 不存在"
+        )
+    return MessageResponse(message=f"聚合RSS源ID {feed_id} 已删除")
+
+
+@router.post(
+    "/{feed_id}/sources/{rss_source_id}",
+    response_model=AggregateFeedResponse,
+    summary="绑定RSS源",
+    description="让RSS源改由聚合RSS源更新，全量检查时不再单独抓取"
+)
+def bind_rss_source(
+    feed_id: int,
+    rss_source_id: int,
+    service: AggregateFeedService = Depends(get_aggregate_feed_service)
+):
+    """绑定RSS源"""
+    get_feed_or_404(feed_id, service)
+    if not service.bind_source(feed_id, rss_source_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"RSS源ID {rss_source_id} 不存在"
+        )
+    return to_response(service.get_feed(feed_id), service)
+
+
+@router.delete(
+    "/{feed_id}/sources/{rss_source_id}",
+    response_model=MessageResponse,
+    summary="解除绑定RSS源",
+    description="RSS源恢复为单独检查"
+)
+def unbind_rss_source(
+    feed_id: int,
+    rss_source_id: int,
+    service: AggregateFeedService = Depends(get_aggregate_feed_service)
+):
+    """解除绑定RSS源"""
+    if not service.unbind_source(feed_id, rss_source_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"RSS源ID {rss_source_id} 未绑定到聚合RSS源ID {feed_id}"
+        )
+    return MessageResponse(message=f"RSS源ID {rss_source_id} 已解除绑定")
+
+
+@router.post(
+    "/{feed_id}/check",
+    response_model=AggregateFeedCheckResponse,
+    summary="手动检查聚合RSS源",
+    description="抓取聚合RSS源并把条目分发到绑定的RSS源，返回未匹配的条目"
+)
+def check_aggregate_feed(
+    feed_id: int,
+    auto_download: bool = Query(False, description="是否自动下载新链接"),
+    scheduler_service: SchedulerService = Depends(get_scheduler_service)
+):
+    """手动检查聚合RSS源"""
+    result = scheduler_service.check_aggregate_feed(feed_id, auto_download=auto_download)
+    if result.get('not_found'):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=result['message']
+        )
+    return AggregateFeedCheckResponse(**result)
@@ -3,6 +3,7 @@
 """
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from server.database import get_db
@@ -19,9 +20,12 @@ from server.services.smart_parser_service import SmartParserService
 from server.api.schemas.smart_parser import (
     SmartParseAnimeRequest,
     SmartParseAnimeResponse,
-    SmartAddAnimeRequest
+    SmartAddAnimeRequest,
+    SmartAddBatchRequest,
+    SmartAddBatchResult
 )
 from server.api.schemas.anime import AnimeResponse as AnimeResponseSchema
+from server.api.routes.background_job import get_job_worker_service
 from server.api.auth import verify_api_key
 
 
@@ -175,7 +179,7 @@ def smart_parse_anime(
 ):
     """智能解析动画信息"""
     try:
-        results = smart_parser_service.parse_anime(request.url)
+        results = smart_parser_service.parse_anime(request.url, refresh=request.refresh)
         site_name = smart_parser_service.get_site_name_from_url(request.url)
         
         return SmartParseAnimeResponse(
@@ -193,14 +197,35 @@ def smart_parse_anime(
     "/smart-add",
     response_model=SmartAddAnimeResponse,
     summary="智能添加动画",
-    description="从动画网站链接智能解析并添加动画，支持连锁解析RSS源"
+    description="从动画网站链接智能解析并添加动画，支持连锁解析RSS源；后台任务队列已启动时默认加入队列并立即返回任务ID"
 )
 def smart_add_anime(
     request: SmartAddAnimeRequest,
+    background: Optional[bool] = Query(
+        None,
+        description="是否在后台执行（通过 /api/jobs/{job_id} 查询结果），默认在后台任务队列已启动时后台执行"
+    ),
     db: Session = Depends(get_db),
     smart_parser_service: SmartParserService = Depends(get_smart_parser_service)
 ):
     """智能添加动画（支持连锁解析RSS）"""
+    job_worker_service = get_job_worker_service()
+    if background is None:
+        background = job_worker_service is not None
+    if background:
+        # 解析页面需要访问网络，由后台工作线程执行，不占用请求线程
+        job_id = job_worker_service.enqueue(
+            SmartParserService.JOB_TYPE_SMART_ADD,
+            request.model_dump(),
+            priority=SmartParserService.PRIORITY_SMART_ADD
+        ) if job_worker_service is not None else None
+        if job_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="后台任务队列未启动"
+            )
+        return SmartAddAnimeResponse(job_id=job_id)
+
     try:
         # 调用智能解析服务的智能添加方法
         result = smart_parser_service.parse_anime_with_rss(
@@ -219,4 +244,29 @@ def smart_add_anime(
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"智能添加失败: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.post(
+    "/smart-add/batch",
+    response_class=StreamingResponse,
+    summary="批量智能添加动画",
+    description="并发解析多个动画网站链接并添加动画和RSS源，按完成顺序逐行返回每个链接的结果（NDJSON）"
+)
+def smart_add_anime_batch(
+    request: SmartAddBatchRequest,
+    smart_parser_service: SmartParserService = Depends(get_smart_parser_service)
+):
+    """批量智能添加动画（每个动画一个事务，结果按完成顺序流式返回）"""
+    def stream_results():
+        for result in smart_parser_service.smart_add_batch(
+            urls=request.urls,
+            auto_add_rss=request.auto_add_rss,
+            refresh=request.refresh,
+            max_concurrency=request.max_concurrency
+        ):
+            if result['anime'] is not None:
+                result['anime'] = AnimeResponseSchema.model_validate(result['anime'])
+            yield SmartAddBatchResult(**result).model_dump_json() + "\n"
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
@@ -0,0 +1,157 @@
+"""
+后台任务相关API路由
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from server.database import get_db
+from server.models.background_job import BackgroundJob
+from server.services.job_queue_service import JobQueueService
+from server.services.job_worker_service import JobWorkerService
+from server.api.schemas import (
+    BackgroundJobResponse,
+    BackgroundJobListResponse
+)
+from server.api.auth import verify_api_key
+
+
+# 在路由器级别添加认证依赖
+router = APIRouter(
+    prefix="/jobs",
+    tags=["后台任务"],
+    dependencies=[Depends(verify_api_key)]
+)
+
+
+# 全局工作线程服务实例（需要在应用启动时设置），重试任务后用于唤醒工作线程
+_job_worker_service: JobWorkerService | None = None
+
+
+def set_job_worker_service(service: JobWorkerService | None):
+    """设置全局工作线程服务实例"""
+    global _job_worker_service
+    _job_worker_service = service
+
+
+def get_job_worker_service() -> JobWorkerService | None:
+    """获取全局工作线程服务实例，后台任务队列未启动时返回None"""
+    return _job_worker_service
+
+
+def get_job_queue_service(db: Session = Depends(get_db)) -> JobQueueService:
+    """获取后台任务队列服务实例"""
+    return JobQueueService(db)
+
+
+def to_response(job: BackgroundJob) -> BackgroundJobResponse:
+    """转换为响应模型（参数和结果以JSON保存）"""
+    return BackgroundJobResponse(
+        id=job.id,
+        job_type=job.job_type,
+        status=job.status,
+        priority=job.priority,
+        payload=JobQueueService.get_payload(job),
+        result=JobQueueService.get_result(job),
+        error=job.error,
+        attempts=job.attempts,
+        max_attempts=job.max_attempts,
+        dedup_key=job.dedup_key,
+        locked_by=job.locked_by,
+        run_after=job.run_after,
+        lease_expires_at=job.lease_expires_at,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at
+    )
+
+
+def get_job_or_404(job_id: int, service: JobQueueService) -> BackgroundJob:
+    """获取后台任务，不存在时返回404"""
+    job = service.get_job(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"后台任务ID {job_id} 不存在"
+        )
+    return job
+
+
+@router.get(
+    "",
+    response_model=BackgroundJobListResponse,
+    summary="获取后台任务列表",
+    description="按状态和类型筛选后台任务（按ID倒序），并返回各状态的任务数量"
+)
+def get_background_jobs(
+    job_status: str | None = Query(None, alias="status", description="任务状态 (pending, running, succeeded, failed, cancelled)"),
+    job_type: str | None = Query(None, description="任务类型 (rss_check, download_start, download_sync)"),
+    skip: int = Query(0, ge=0, description="跳过的记录数"),
+    limit: int = Query(50, ge=1, le=500, description="返回的记录数"),
+    service: JobQueueService = Depends(get_job_queue_service)
+):
+    """获取后台任务列表"""
+    jobs = service.get_jobs(status=job_status, job_type=job_type, skip=skip, limit=limit)
+    return BackgroundJobListResponse(
+        total=service.count_jobs(status=job_status, job_type=job_type),
+        counts=service.count_by_status(),
+        items=[to_response(job) for job in jobs],
+        skip=skip,
+        limit=limit
+    )
+
+
+@router.get(
+    "/{job_id}",
+    response_model=BackgroundJobResponse,
+    summary="获取单个后台任务",
+    description="获取后台任务的状态、执行次数和结果"
+)
+def get_background_job(
+    job_id: int,
+    service: JobQueueService = Depends(get_job_queue_service)
+):
+    """获取单个后台任务"""
+    return to_response(get_job_or_404(job_id, service))
+
+
+@router.post(
+    "/{job_id}/cancel",
+    response_model=BackgroundJobResponse,
+    summary="取消后台任务",
+    description="取消等待中的后台任务，执行中的任务不能取消"
+)
+def cancel_background_job(
+    job_id: int,
+    service: JobQueueService = Depends(get_job_queue_service)
+):
+    """取消后台任务"""
+    job = get_job_or_404(job_id, service)
+    if job.status != 'pending':
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"后台任务ID {job_id} 状态为 {job.status}，只能取消等待中的任务"
+        )
+    return to_response(service.cancel_job(job_id))
+
+
+@router.post(
+    "/{job_id}/retry",
+    response_model=BackgroundJobResponse,
+    summary="重试后台任务",
+    description="重新执行失败或已取消的后台任务，执行次数清零"
+)
+def retry_background_job(
+    job_id: int,
+    service: JobQueueService = Depends(get_job_queue_service)
+):
+    """重试后台任务"""
+    job = get_job_or_404(job_id, service)
+    if job.status not in ('failed', 'cancelled'):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"后台任务ID {job_id} 状态为 {job.status}，只能重试失败或已取消的任务"
+        )
+    job = service.retry_job(job_id)
+    if _job_worker_service is not None:
+        _job_worker_service.wake()
+    return to_response(job)
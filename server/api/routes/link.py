@@ -9,9 +9,11 @@ from server.database import get_db
 from server.services.link_service import LinkService
 from server.api.schemas import (
     LinkCreate,
+    LinkBatchCreate,
     LinkUpdate,
     LinkResponse,
     LinkListResponse,
+    LinkBatchCreateResponse,
     MessageResponse
 )
 from server.api.auth import verify_api_key
@@ -34,30 +36,41 @@ def get_link_service(db: Session = Depends(get_db)) -> LinkService:
     "",
     response_model=LinkListResponse,
     summary="获取链接列表",
-    description="获取所有链接，支持过滤"
+    description="获取所有链接，支持按链接类型、下载状态以及字幕组、分辨率、视频编码、字幕语言过滤"
 )
 def get_links(
     page: int = Query(1, ge=1, description="页码（从1开始）"),
     size: int = Query(20, ge=1, le=100, description="每页记录数"),
     link_type: Optional[str] = Query(None, description="链接类型"),
     is_downloaded: Optional[bool] = Query(None, description="是否已下载"),
+    subgroup: Optional[str] = Query(None, description="字幕组"),
+    resolution: Optional[str] = Query(None, description="分辨率 (1080p, 720p, etc.)"),
+    video_codec: Optional[str] = Query(None, description="视频编码 (hevc, avc, av1)"),
+    subtitle_language: Optional[str] = Query(None, description="字幕语言 (chs, cht, chs_cht, eng)，chs/cht 包含简繁双语"),
     link_service: LinkService = Depends(get_link_service)
 ):
     """获取链接列表"""
+    release_filters = {
+        "subgroup": subgroup,
+        "resolution": resolution,
+        "video_codec": video_codec,
+        "subtitle_language": subtitle_language
+    }
     total = link_service.count_links(
         link_type=link_type,
-        is_downloaded=is_downloaded
+        is_downloaded=is_downloaded,
+        **release_filters
     )
+    # 页码换算为跳过的记录数
+    skip = (page - 1) * size
     links = link_service.get_all_links(
-        page=page,
-        size=size,
+        skip=skip,
+        limit=size,
         link_type=link_type,
-        is_downloaded=is_downloaded
+        is_downloaded=is_downloaded,
+        **release_filters
     )
     
-    # 计算skip用于响应
-    skip = (page - 1) * size
-    
     return LinkListResponse(
         total=total,
         items=[LinkResponse.model_validate(link) for link in links],
@@ -104,11 +117,47 @@ def create_link(
         episode_title=link_data.episode_title,
         link_type=link_data.link_type,
         url=link_data.url,
-        file_size=link_data.file_size
+        file_size=link_data.file_size,
+        subgroup=link_data.subgroup,
+        resolution=link_data.resolution,
+        video_codec=link_data.video_codec,
+        subtitle_language=link_data.subtitle_language,
+        version=link_data.version
     )
+    if not link:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"RSS源 {link_data.rss_source_id} 中已存在相同URL的链接"
+        )
     return LinkResponse.model_validate(link)
 
 
+@router.post(
+    "/batch",
+    response_model=LinkBatchCreateResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="批量创建链接",
+    description="在一个事务中批量创建链接，RSS源中已存在的URL会被忽略"
+)
+def create_links_batch(
+    batch_data: LinkBatchCreate,
+    link_service: LinkService = Depends(get_link_service)
+):
+    """批量创建链接"""
+    link_ids = link_service.add_links_bulk(
+        batch_data.rss_source_id,
+        [link.model_dump() for link in batch_data.links]
+    )
+    created_ids = [link_id for link_id in link_ids if link_id is not None]
+    links = link_service.get_links_by_ids(created_ids)
+    return LinkBatchCreateResponse(
+        total=len(link_ids),
+        created=len(created_ids),
+        skipped=len(link_ids) - len(created_ids),
+        items=[LinkResponse.model_validate(link) for link in links]
+    )
+
+
 @router.put(
     "/{link_id}",
     response_model=LinkResponse,
@@ -60,22 +60,34 @@ def get_rss_source_links(
     rss_source_id: int,
     is_downloaded: Optional[bool] = Query(None, description="是否已下载"),
     link_type: Optional[str] = Query(None, description="链接类型"),
+    subgroup: Optional[str] = Query(None, description="字幕组"),
+    resolution: Optional[str] = Query(None, description="分辨率 (1080p, 720p, etc.)"),
+    video_codec: Optional[str] = Query(None, description="视频编码 (hevc, avc, av1)"),
+    subtitle_language: Optional[str] = Query(None, description="字幕语言 (chs, cht, chs_cht, eng)，chs/cht 包含简繁双语"),
     skip: int = Query(0, ge=0, description="跳过的记录数"),
     limit: int = Query(100, ge=1, le=1000, description="返回的记录数"),
     link_service: LinkService = Depends(get_link_service)
 ):
     """获取RSS源的所有链接"""
+    release_filters = {
+        "subgroup": subgroup,
+        "resolution": resolution,
+        "video_codec": video_codec,
+        "subtitle_language": subtitle_language
+    }
     total = link_service.count_links(
         rss_source_id=rss_source_id,
         is_downloaded=is_downloaded,
-        link_type=link_type
+        link_type=link_type,
+        **release_filters
     )
     links = link_service.get_links(
         rss_source_id=rss_source_id,
         is_downloaded=is_downloaded,
         link_type=link_type,
         skip=skip,
-        limit=limit
+        limit=limit,
+        **release_filters
     )
     
     return LinkListResponse(
@@ -90,13 +102,29 @@ def get_rss_source_links(
     "/{rss_source_id}/check",
     response_model=RSSCheckResponse,
     summary="手动检查RSS源新链接",
-    description="手动检查RSS源的新链接"
+    description="手动检查RSS源的新链接并返回检查结果；background=true 时加入后台任务队列并立即返回任务ID"
 )
 def check_rss_source(
     rss_source_id: int,
     auto_download: bool = Query(False, description="是否自动下载新链接"),
+    background: bool = Query(False, description="是否在后台执行（通过 /api/jobs/{job_id} 查询结果）"),
     scheduler_service: SchedulerService = Depends(get_scheduler_service)
 ):
     """手动检查RSS源新链接"""
+    if background:
+        job_id = scheduler_service.enqueue_check(rss_source_id, auto_download=auto_download)
+        if job_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="后台任务队列未启动"
+            )
+        return RSSCheckResponse(
+            success=True,
+            message=f"已加入后台任务队列，任务ID {job_id}",
+            rss_source_id=rss_source_id,
+            new_links_count=0,
+            new_links=[],
+            job_id=job_id
+        )
     result = scheduler_service.check_rss_source(rss_source_id, auto_download=auto_download)
     return RSSCheckResponse(**result)
\ No newline at end of file
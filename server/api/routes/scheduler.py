@@ -1,18 +1,27 @@
 """
 调度服务相关API路由
 """
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
 from server.database import get_db
 from server.services.scheduler_service import SchedulerService
+from server.services.scheduler_run_service import SchedulerRunService
 from server.api.schemas import (
     SchedulerJobCreate,
+    SchedulerJobResponse,
     SchedulerJobsResponse,
     MessageResponse,
-    RSSCheckResponse
+    RSSCheckResponse,
+    RSSCheckAllResponse,
+    SchedulerRunResponse,
+    SchedulerMetricsResponse,
+    LifecyclePassResponse,
+    ResumePollingResponse
 )
 from server.api.auth import verify_api_key
+from server.utils.rate_limiter import get_rate_limiter
 
 
 # 在路由器级别添加认证依赖
@@ -54,7 +63,27 @@ def get_scheduler_jobs(
 ):
     """获取所有调度任务"""
     jobs = scheduler_service.get_jobs()
-    return SchedulerJobsResponse(jobs=jobs)
+    return SchedulerJobsResponse(jobs=jobs, is_running=scheduler_service.is_running)
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=SchedulerJobResponse,
+    summary="获取调度任务状态",
+    description="获取调度任务的下次运行时间、连续失败次数、退避时间和所在主机的熔断状态"
+)
+def get_scheduler_job(
+    job_id: str,
+    scheduler_service: SchedulerService = Depends(get_scheduler_service)
+):
+    """获取调度任务状态"""
+    job_status = scheduler_service.get_job_status(job_id)
+    if job_status is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"调度任务 {job_id} 不存在"
+        )
+    return SchedulerJobResponse(**job_status)
 
 
 @router.post(
@@ -148,6 +177,103 @@ def resume_scheduler_job(
     )
 
 
+@router.post(
+    "/check-all",
+    response_model=RSSCheckAllResponse,
+    summary="检查所有RSS源",
+    description="并发检查所有激活的RSS源，返回本轮检查的汇总信息"
+)
+def check_all_rss_sources(
+    auto_download: bool = Query(False, description="是否自动下载新链接"),
+    scheduler_service: SchedulerService = Depends(get_scheduler_service)
+):
+    """检查所有RSS源"""
+    result = scheduler_service.check_all_rss_sources(auto_download=auto_download)
+    if not result.get('success') and 'total_sources' not in result:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=result.get('message', '全量检查失败')
+        )
+    return RSSCheckAllResponse(**result)
+
+
+@router.post(
+    "/lifecycle",
+    response_model=LifecyclePassResponse,
+    summary="检查已完结的动画",
+    description="立即执行一次生命周期检查：已获取全部集数、RSS源长时间没有新链接或状态为 completed 的动画"
+                "标记为已完结，并停用其RSS源或放慢检查"
+)
+def run_lifecycle_pass(
+    scheduler_service: SchedulerService = Depends(get_scheduler_service)
+):
+    """检查已完结的动画"""
+    result = scheduler_service.run_lifecycle_pass()
+    if not result.get('success'):
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=result.get('message', '生命周期检查失败')
+        )
+    return LifecyclePassResponse(**result)
+
+
+@router.post(
+    "/lifecycle/{anime_id}/resume",
+    response_model=ResumePollingResponse,
+    summary="恢复动画的RSS源检查",
+    description="恢复被生命周期检查停止的RSS源检查，动画状态改回 ongoing，恢复的RSS源立即检查一次"
+)
+def resume_anime_polling(
+    anime_id: int,
+    scheduler_service: SchedulerService = Depends(get_scheduler_service)
+):
+    """恢复动画的RSS源检查"""
+    result = scheduler_service.resume_anime_polling(anime_id)
+    if result.get('not_found'):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=result['message']
+        )
+    if not result.get('success'):
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=result.get('message', '恢复检查失败')
+        )
+    return ResumePollingResponse(**result)
+
+
+@router.get(
+    "/metrics",
+    response_model=SchedulerMetricsResponse,
+    summary="获取检查指标",
+    description="按RSS源汇总最近一段时间的检查次数、失败率、耗时和限速等待百分位数，以及各主机的限速统计"
+)
+def get_scheduler_metrics(
+    hours: int = Query(24, ge=1, le=24 * 90, description="统计最近多少小时"),
+    rss_source_id: Optional[int] = Query(None, description="只统计指定RSS源"),
+    db: Session = Depends(get_db)
+):
+    """获取检查指标"""
+    metrics = SchedulerRunService(db).get_metrics(hours=hours, rss_source_id=rss_source_id)
+    return SchedulerMetricsResponse(**metrics, rate_limits=get_rate_limiter().get_stats())
+
+
+@router.get(
+    "/runs",
+    response_model=List[SchedulerRunResponse],
+    summary="获取检查运行记录",
+    description="获取最近的检查运行记录，按开始时间倒序"
+)
+def get_scheduler_runs(
+    rss_source_id: Optional[int] = Query(None, description="RSS源ID"),
+    limit: int = Query(50, ge=1, le=1000, description="返回的记录数"),
+    db: Session = Depends(get_db)
+):
+    """获取检查运行记录"""
+    runs = SchedulerRunService(db).get_runs(rss_source_id=rss_source_id, limit=limit)
+    return [SchedulerRunResponse.model_validate(run) for run in runs]
+
+
 @router.post(
     "/start",
     response_model=MessageResponse,
@@ -4,9 +4,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 
 from server.services.smart_parser_service import SmartParserService
+from server.services.season_catalog_service import SeasonCatalogService
 from server.api.schemas.smart_parser import (
     SmartParseAnimeRequest,
-    SmartParseAnimeResponse
+    SmartParseAnimeResponse,
+    SeasonCatalogRequest,
+    SeasonCatalogResponse
 )
 from server.api.schemas.common import MessageResponse
 from server.api.auth import verify_api_key
@@ -25,6 +28,13 @@ def get_smart_parser_service() -> SmartParserService:
     return SmartParserService()
 
 
+def get_season_catalog_service(
+    smart_parser_service: SmartParserService = Depends(get_smart_parser_service)
+) -> SeasonCatalogService:
+    """获取季度番组目录服务实例"""
+    return SeasonCatalogService(smart_parser_service)
+
+
 @router.get(
     "/sites",
     response_model=MessageResponse,
@@ -54,7 +64,7 @@ def parse_anime_link(
 ):
     """解析动画链接"""
     try:
-        results = smart_parser_service.parse_anime(request.url)
+        results = smart_parser_service.parse_anime(request.url, refresh=request.refresh)
         site_name = smart_parser_service.get_site_name_from_url(request.url)
         
         return SmartParseAnimeResponse(
@@ -65,4 +75,30 @@ def parse_anime_link(
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"解析失败: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.post(
+    "/season-catalog",
+    response_model=SeasonCatalogResponse,
+    summary="获取季度番组目录",
+    description="解析季度番组列表并并发解析各番组页面，返回可用于批量智能添加的番组目录（结果缓存）"
+)
+def get_season_catalog(
+    request: SeasonCatalogRequest,
+    season_catalog_service: SeasonCatalogService = Depends(get_season_catalog_service)
+):
+    """获取季度番组目录"""
+    try:
+        url = request.url
+        if not url:
+            if request.year is None or not request.season:
+                raise ValueError("请指定 url，或同时指定 year 和 season")
+            url = season_catalog_service.get_season_url(request.year, request.season)
+        
+        return SeasonCatalogResponse(**season_catalog_service.get_catalog(url, refresh=request.refresh))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"获取季度番组目录失败: {str(e)}"
+        )
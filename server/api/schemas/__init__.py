@@ -19,9 +19,11 @@ from .rss import (
 from .link import (
     LinkBase,
     LinkCreate,
+    LinkBatchCreate,
     LinkUpdate,
     LinkResponse,
-    LinkListResponse
+    LinkListResponse,
+    LinkBatchCreateResponse
 )
 from .downloader import (
     DownloaderBase,
@@ -43,14 +45,37 @@ from .scheduler import (
     SchedulerJobCreate,
     SchedulerJobResponse,
     SchedulerJobsResponse,
-    RSSCheckResponse
+    RSSCheckResponse,
+    RSSCheckAllResponse,
+    SchedulerRunResponse,
+    SchedulerSourceMetrics,
+    SchedulerMetricsResponse,
+    LifecyclePassResponse,
+    ResumePollingResponse
+)
+from .aggregate_feed import (
+    AggregateFeedBase,
+    AggregateFeedCreate,
+    AggregateFeedUpdate,
+    AggregateFeedResponse,
+    AggregateFeedListResponse,
+    AggregateFeedCheckResponse
+)
+from .background_job import (
+    BackgroundJobResponse,
+    BackgroundJobListResponse
 )
 from .smart_parser import (
     SmartParseAnimeRequest,
     SmartParseAnimeResult,
     SmartParseAnimeResponse,
     SmartAddAnimeRequest,
-    SmartAddAnimeResponse
+    SmartAddAnimeResponse,
+    SmartAddBatchRequest,
+    SmartAddBatchResult,
+    SeasonCatalogRequest,
+    SeasonCatalogItem,
+    SeasonCatalogResponse
 )
 
 __all__ = [
@@ -72,9 +97,11 @@ __all__ = [
     # Link
     "LinkBase",
     "LinkCreate",
+    "LinkBatchCreate",
     "LinkUpdate",
     "LinkResponse",
     "LinkListResponse",
+    "LinkBatchCreateResponse",
     # Downloader
     "DownloaderBase",
     "DownloaderCreate",
@@ -94,10 +121,31 @@ __all__ = [
     "SchedulerJobResponse",
     "SchedulerJobsResponse",
     "RSSCheckResponse",
+    "RSSCheckAllResponse",
+    "SchedulerRunResponse",
+    "SchedulerSourceMetrics",
+    "SchedulerMetricsResponse",
+    "LifecyclePassResponse",
+    "ResumePollingResponse",
+    # Aggregate Feed
+    "AggregateFeedBase",
+    "AggregateFeedCreate",
+    "AggregateFeedUpdate",
+    "AggregateFeedResponse",
+    "AggregateFeedListResponse",
+    "AggregateFeedCheckResponse",
+    # Background Job
+    "BackgroundJobResponse",
+    "BackgroundJobListResponse",
     # Smart Parser
     "SmartParseAnimeRequest",
     "SmartParseAnimeResult",
     "SmartParseAnimeResponse",
     "SmartAddAnimeRequest",
     "SmartAddAnimeResponse",
+    "SmartAddBatchRequest",
+    "SmartAddBatchResult",
+    "SeasonCatalogRequest",
+    "SeasonCatalogItem",
+    "SeasonCatalogResponse",
 ]
\ No newline at end of file
@@ -0,0 +1,56 @@
+"""
+聚合RSS源相关模型
+"""
+from typing import Any, Dict, List
+from datetime import datetime
+from pydantic import BaseModel, Field, ConfigDict
+
+
+class AggregateFeedBase(BaseModel):
+    """聚合RSS源基础模型"""
+    name: str = Field(..., description="聚合RSS源名称", min_length=1, max_length=255)
+    url: str = Field(..., description="聚合RSS订阅链接（如蜜柑计划 MyBangumi RSS）", min_length=1, max_length=500)
+    is_active: bool = Field(default=True, description="是否激活")
+
+
+class AggregateFeedCreate(AggregateFeedBase):
+    """创建聚合RSS源请求模型"""
+    rss_source_ids: List[int] = Field(default_factory=list, description="改由该聚合RSS源更新的RSS源ID")
+
+
+class AggregateFeedUpdate(BaseModel):
+    """更新聚合RSS源请求模型"""
+    name: str | None = Field(None, description="聚合RSS源名称", min_length=1, max_length=255)
+    url: str | None = Field(None, description="聚合RSS订阅链接", min_length=1, max_length=500)
+    is_active: bool | None = Field(None, description="是否激活")
+
+
+class AggregateFeedResponse(AggregateFeedBase):
+    """聚合RSS源响应模型"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    rss_source_ids: List[int] = Field(default_factory=list)
+    last_checked_at: datetime | None = None
+    last_unmatched_count: int = 0
+    last_unmatched: List[str] = Field(default_factory=list, description="上次检查未匹配到RSS源的条目标题")
+    created_at: datetime
+    updated_at: datetime
+
+
+class AggregateFeedListResponse(BaseModel):
+    """聚合RSS源列表响应模型"""
+    total: int
+    items: List[AggregateFeedResponse]
+
+
+class AggregateFeedCheckResponse(BaseModel):
+    """聚合RSS源检查响应模型"""
+    success: bool
+    message: str
+    feed_id: int | None = None
+    not_modified: bool = False
+    new_links_count: int = 0
+    sources: List[Dict[str, Any]] = Field(default_factory=list)
+    unmatched_count: int = 0
+    unmatched: List[str] = Field(default_factory=list)
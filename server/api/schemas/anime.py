@@ -36,6 +36,9 @@ class AnimeResponse(AnimeBase):
     model_config = ConfigDict(from_attributes=True)
     
     id: int
+    polling_stopped_at: datetime | None = None
+    polling_stop_reason: str | None = None
+    polling_resumed_at: datetime | None = None
     created_at: datetime
     updated_at: datetime
 
@@ -0,0 +1,35 @@
+"""
+后台任务相关模型
+"""
+from typing import Any, Dict, List
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+
+class BackgroundJobResponse(BaseModel):
+    """后台任务响应模型"""
+    id: int
+    job_type: str
+    status: str
+    priority: int
+    payload: Dict[str, Any] = Field(default_factory=dict, description="任务参数")
+    result: Dict[str, Any] | None = Field(None, description="执行结果")
+    error: str | None = Field(None, description="最近一次失败的错误信息")
+    attempts: int
+    max_attempts: int
+    dedup_key: str | None = None
+    locked_by: str | None = None
+    run_after: datetime
+    lease_expires_at: datetime | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+
+class BackgroundJobListResponse(BaseModel):
+    """后台任务列表响应模型"""
+    total: int
+    counts: Dict[str, int] = Field(default_factory=dict, description="各状态的任务数量")
+    items: List[BackgroundJobResponse]
+    skip: int
+    limit: int
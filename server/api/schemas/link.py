@@ -13,6 +13,11 @@ class LinkBase(BaseModel):
     link_type: str = Field(default="magnet", description="链接类型 (magnet, ed2k, http, etc.)")
     url: str = Field(..., description="链接地址", min_length=1)
     file_size: int | None = Field(None, description="文件大小 (bytes)")
+    subgroup: str | None = Field(None, description="字幕组", max_length=100)
+    resolution: str | None = Field(None, description="分辨率 (1080p, 720p, etc.)", max_length=20)
+    video_codec: str | None = Field(None, description="视频编码 (hevc, avc, av1)", max_length=20)
+    subtitle_language: str | None = Field(None, description="字幕语言 (chs, cht, chs_cht, eng)", max_length=20)
+    version: int | None = Field(None, description="版本号（如 03v2 为2）")
 
 
 class LinkCreate(LinkBase):
@@ -20,6 +25,12 @@ class LinkCreate(LinkBase):
     rss_source_id: int = Field(..., description="RSS源ID")
 
 
+class LinkBatchCreate(BaseModel):
+    """批量创建链接请求模型"""
+    rss_source_id: int = Field(..., description="RSS源ID")
+    links: List[LinkBase] = Field(..., description="链接列表", min_length=1)
+
+
 class LinkUpdate(BaseModel):
     """更新链接请求模型"""
     is_available: bool | None = Field(None, description="链接是否可用")
@@ -45,4 +56,12 @@ class LinkListResponse(BaseModel):
     total: int
     items: List[LinkResponse]
     skip: int
-    limit: int
\ No newline at end of file
+    limit: int
+
+
+class LinkBatchCreateResponse(BaseModel):
+    """批量创建链接响应模型"""
+    total: int = Field(..., description="提交的链接数")
+    created: int = Field(..., description="新建的链接数")
+    skipped: int = Field(..., description="已存在而被忽略的链接数")
+    items: List[LinkResponse] = Field(default_factory=list, description="新建的链接")
@@ -35,7 +35,10 @@ class RSSSourceResponse(RSSSourceBase):
     
     id: int
     anime_id: int
+    auto_deactivated: bool = False
+    aggregate_feed_id: int | None = None
     last_checked_at: datetime | None = None
+    check_interval: int | None = None
     created_at: datetime
     updated_at: datetime
 
@@ -1,8 +1,9 @@
 """
 调度服务相关模型
 """
-from typing import Dict, Any
-from pydantic import BaseModel, Field
+from typing import Dict, Any, List
+from datetime import datetime
+from pydantic import BaseModel, Field, ConfigDict
 
 
 class SchedulerJobCreate(BaseModel):
@@ -18,11 +19,13 @@ class SchedulerJobResponse(BaseModel):
     name: str
     next_run_time: str | None
     info: Dict[str, Any]
+    circuit_breaker: Dict[str, Any] | None = None
 
 
 class SchedulerJobsResponse(BaseModel):
     """调度任务列表响应模型"""
     jobs: Dict[str, Dict[str, Any]]
+    is_running: bool = False
 
 
 class RSSCheckResponse(BaseModel):
@@ -32,4 +35,89 @@ class RSSCheckResponse(BaseModel):
     rss_source_id: int
     new_links_count: int
     new_links: list[Dict[str, Any]]
-    checked_at: str
\ No newline at end of file
+    checked_at: str | None = None
+    job_id: int | None = Field(None, description="后台检查时的后台任务ID")
+
+
+class RSSCheckAllResponse(BaseModel):
+    """全量RSS检查响应模型"""
+    success: bool
+    message: str
+    started_at: str | None = None
+    finished_at: str | None = None
+    duration: float | None = None
+    total_sources: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    new_links_count: int = 0
+    distinct_feeds: int = 0
+    coalesced: int = 0
+    results: list[Dict[str, Any]] = Field(default_factory=list)
+    aggregate_feeds: list[Dict[str, Any]] = Field(default_factory=list)
+
+
+class SchedulerRunResponse(BaseModel):
+    """检查运行记录响应模型"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    rss_source_id: int
+    trigger: str
+    started_at: datetime
+    finished_at: datetime
+    duration: float | None = None
+    fetch_duration: float | None = None
+    write_duration: float | None = None
+    rate_limit_wait: float | None = None
+    bytes_transferred: int
+    entries_parsed: int
+    new_links_count: int
+    not_modified: bool
+    success: bool
+    error: str | None = None
+
+
+class SchedulerSourceMetrics(BaseModel):
+    """单个RSS源的检查指标"""
+    rss_source_id: int
+    name: str | None = None
+    runs: int
+    failures: int
+    failure_rate: float
+    not_modified: int
+    duration_p50: float | None = None
+    duration_p90: float | None = None
+    duration_p99: float | None = None
+    fetch_p50: float | None = None
+    fetch_p90: float | None = None
+    rate_limit_wait_p50: float | None = None
+    rate_limit_wait_p90: float | None = None
+    rate_limit_wait_total: float = 0.0
+    bytes_transferred: int
+    entries_parsed: int
+    new_links_count: int
+    last_run_at: str | None = None
+    last_error: str | None = None
+
+
+class SchedulerMetricsResponse(BaseModel):
+    """检查指标响应模型"""
+    since: str
+    hours: int
+    total_runs: int
+    sources: List[SchedulerSourceMetrics] = Field(default_factory=list)
+    rate_limits: Dict[str, Dict[str, Any]] = Field(default_factory=dict, description="各主机的限速统计")
+
+
+class LifecyclePassResponse(BaseModel):
+    """生命周期检查响应模型"""
+    success: bool
+    message: str
+    stopped: List[Dict[str, Any]] = Field(default_factory=list, description="本次停止检查的动画")
+
+
+class ResumePollingResponse(BaseModel):
+    """恢复动画检查响应模型"""
+    success: bool
+    message: str
+    rss_source_ids: List[int] = Field(default_factory=list, description="恢复检查的RSS源ID")
@@ -8,6 +8,7 @@ from pydantic import BaseModel, Field
 class SmartParseAnimeRequest(BaseModel):
     """智能解析动画请求模型"""
     url: str = Field(..., description="动画网站链接")
+    refresh: bool = Field(default=False, description="是否忽略缓存重新解析")
 
 
 class SmartParseAnimeResult(BaseModel):
@@ -48,8 +49,61 @@ if TYPE_CHECKING:
 
 class SmartAddAnimeResponse(BaseModel):
     """智能添加动画响应模型"""
-    anime: Any  # 运行时使用 Any，类型检查时使用 AnimeResponse
+    anime: Any = None  # 运行时使用 Any，类型检查时使用 AnimeResponse；在后台执行时为空
     rss_sources: List[Dict[str, Any]] | None = Field(
         default_factory=list,
         description="添加的RSS源信息"
-    )
\ No newline at end of file
+    )
+    job_id: int | None = Field(None, description="在后台执行时的后台任务ID，通过 /api/jobs/{job_id} 查询结果")
+
+
+class SmartAddBatchRequest(BaseModel):
+    """批量智能添加动画请求模型"""
+    urls: List[str] = Field(..., min_length=1, max_length=200, description="动画网站链接列表")
+    auto_add_rss: bool = Field(default=True, description="是否添加解析到的全部RSS源")
+    refresh: bool = Field(default=False, description="是否忽略缓存重新解析")
+    max_concurrency: int | None = Field(
+        None,
+        ge=1,
+        le=16,
+        description="最大并发解析数（为空时使用配置 smart_parser.batch_concurrency）"
+    )
+
+
+class SmartAddBatchResult(BaseModel):
+    """批量智能添加中单个链接的结果（响应为每行一个结果的 NDJSON，按完成顺序返回）"""
+    index: int = Field(..., description="链接在请求列表中的位置（从0开始）")
+    url: str = Field(..., description="动画网站链接")
+    success: bool = Field(..., description="是否添加成功")
+    message: str | None = Field(None, description="失败原因")
+    anime: Any = Field(None, description="创建的动画（失败时为空）")
+    rss_sources: List[Dict[str, Any]] = Field(default_factory=list, description="添加的RSS源信息")
+
+
+
+class SeasonCatalogRequest(BaseModel):
+    """季度番组目录请求模型（指定 url，或同时指定 year 和 season）"""
+    url: str | None = Field(None, description="季度番组列表页面链接")
+    year: int | None = Field(None, ge=2000, le=2100, description="年份")
+    season: str | None = Field(None, description="季度（春、夏、秋、冬）")
+    refresh: bool = Field(default=False, description="是否忽略缓存重新解析")
+
+
+class SeasonCatalogItem(BaseModel):
+    """季度番组目录中的番组"""
+    bangumi_id: str = Field(..., description="番组ID")
+    title: str = Field(..., description="番组标题")
+    url: str = Field(..., description="番组页面链接（可用于批量智能添加）")
+    cover_url: str | None = Field(None, description="封面URL")
+    day_of_week: int | None = Field(None, description="放送日（0-6 为星期日到星期六，其余为剧场版、OVA等）")
+    anime: SmartParseAnimeResult | None = Field(None, description="番组页面解析出的动画信息")
+    error: str | None = Field(None, description="番组页面解析失败的原因")
+
+
+class SeasonCatalogResponse(BaseModel):
+    """季度番组目录响应模型"""
+    url: str = Field(..., description="季度番组列表页面链接")
+    site_name: str = Field(..., description="网站名称")
+    total: int = Field(..., description="番组数")
+    parsed: int = Field(..., description="番组页面解析成功的番组数")
+    items: List[SeasonCatalogItem] = Field(..., description="番组列表")
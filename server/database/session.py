@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker, Session
 import os
 
@@ -65,6 +65,123 @@ def init_database():
     from server.models import Base
     engine = get_engine()
     Base.metadata.create_all(bind=engine)
+    dedupe_active_background_jobs(engine)
+    migrate_database(engine, Base.metadata)
+    migrate_rss_source_check_interval(engine)
+    backfill_link_url_hashes(engine)
+
+
+def migrate_database(engine, metadata):
+    """
+    为已存在的表补齐新增的列和索引
+
+    create_all 只会创建缺失的表，旧版本数据库中已存在的表需要在这里补齐新增字段。
+    新增字段必须可为空或带有 server_default。
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+
+    with engine.begin() as conn:
+        for table in metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+
+            existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                ddl = f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'
+                if column.server_default is not None:
+                    default = column.server_default.arg
+                    if isinstance(default, str):
+                        default = "'" + default.replace("'", "''") + "'"
+                    else:
+                        default = default.text
+                    ddl += f' DEFAULT {default}'
+                conn.execute(text(ddl))
+
+    # 列补齐后再创建缺失的索引
+    for table in metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
+def backfill_link_url_hashes(engine):
+    """
+    为旧版本数据库中的链接补齐 url_hash
+
+    同一RSS源下已存在重复URL时只为最早的一条写入哈希，其余保持为空，
+    避免违反 (rss_source_id, url_hash) 唯一索引。
+    """
+    from server.models.link import hash_url
+
+    with engine.begin() as conn:
+        pending = conn.execute(text(
+            "SELECT id, rss_source_id, url FROM links WHERE url_hash IS NULL ORDER BY id"
+        )).fetchall()
+        if not pending:
+            return
+
+        seen = {tuple(row) for row in conn.execute(text(
+            "SELECT rss_source_id, url_hash FROM links WHERE url_hash IS NOT NULL"
+        ))}
+        updates = []
+        for row in pending:
+            key = (row.rss_source_id, hash_url(row.url))
+            if key in seen:
+                continue
+            seen.add(key)
+            updates.append({'id': row.id, 'url_hash': key[1]})
+
+        if updates:
+            conn.execute(text("UPDATE links SET url_hash = :url_hash WHERE id = :id"), updates)
+
+def migrate_rss_source_check_interval(engine):
+    """
+    迁移旧版本数据库中的 rss_sources.check_interval 列
+
+    检查间隔已改存在 scheduler_jobs.interval 中，RSSSource.check_interval 为读取调度任务的属性。
+    有该列且还没有调度任务的RSS源按该列创建调度任务，然后删除该列。
+    """
+    inspector = inspect(engine)
+    if 'rss_sources' not in inspector.get_table_names():
+        return
+    if 'check_interval' not in {column['name'] for column in inspector.get_columns('rss_sources')}:
+        return
+
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO scheduler_jobs "
+            "(rss_source_id, interval, auto_download, is_paused, consecutive_failures, created_at, updated_at) "
+            "SELECT id, check_interval, auto_download, 0, 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP "
+            "FROM rss_sources "
+            "WHERE check_interval IS NOT NULL "
+            "AND id NOT IN (SELECT rss_source_id FROM scheduler_jobs)"
+        ))
+        conn.execute(text("ALTER TABLE rss_sources DROP COLUMN check_interval"))
+
+
+def dedupe_active_background_jobs(engine):
+    """
+    在创建去重键的部分唯一索引之前，取消旧版本数据库中去重键重复的未结束任务
+
+    每个去重键保留最早的一条，并删除旧版本的普通索引 idx_background_job_dedup_key。
+    """
+    if 'background_jobs' not in inspect(engine).get_table_names():
+        return
+
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX IF EXISTS idx_background_job_dedup_key"))
+        conn.execute(text(
+            "UPDATE background_jobs SET status = 'cancelled', finished_at = CURRENT_TIMESTAMP, "
+            "error = '去重键重复，迁移时取消' "
+            "WHERE status IN ('pending', 'running') AND dedup_key IS NOT NULL "
+            "AND id NOT IN ("
+            "SELECT MIN(id) FROM background_jobs "
+            "WHERE status IN ('pending', 'running') AND dedup_key IS NOT NULL "
+            "GROUP BY dedup_key)"
+        ))
 
 
 # 导出函数供外部使用
@@ -73,4 +190,8 @@ __all__ = [
     'get_session_local',
     'get_db',
     'init_database',
+    'migrate_database',
+    'dedupe_active_background_jobs',
+    'migrate_rss_source_check_interval',
+    'backfill_link_url_hashes',
 ]
\ No newline at end of file
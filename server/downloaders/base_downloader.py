@@ -3,6 +3,8 @@ from typing import Dict, Any, Tuple
 
 
 class BaseDownloader(ABC):
+    """下载器基类，通过HTTP接口（如 aria2 的 JSON-RPC）通信的下载器使用 server.utils.http_client.get_http_client() 发送请求"""
+
     @abstractmethod
     def connect(self, config: Dict[str, Any]) -> bool:
         """连接到下载器"""
@@ -10,8 +10,11 @@ from server.utils import setup_logger, config, init_config
 from server.api import create_api_router
 from server.api.routes.scheduler import set_scheduler_service
 from server.api.routes.rss_extra import set_scheduler_service as set_rss_extra_scheduler_service
+from server.api.routes.background_job import set_job_worker_service
 from server.api.schemas import *
 from server.services.scheduler_service import SchedulerService
+from server.services.job_worker_service import JobWorkerService
+from server.services.smart_parser_service import SmartParserService
 
 
 def parse_args():
@@ -40,6 +43,8 @@ class AnimeLoaderServer:
         )
         self.running = False
         self.app = None
+        self.scheduler_service = None
+        self.job_worker_service = None
         
         # 注册信号处理
         signal.signal(signal.SIGINT, self._signal_handler)
@@ -111,8 +116,46 @@ class AnimeLoaderServer:
             if scheduler_enabled:
                 from server.database import get_db
                 self.scheduler_service = SchedulerService(get_db)
+
+                # 后台任务队列：定时检查、自动下载、下载状态同步、手动检查和智能添加由工作线程执行
+                self.job_worker_service = JobWorkerService(get_db)
+                self.scheduler_service.attach_job_queue(self.job_worker_service)
+                self.job_worker_service.register_handler(
+                    SmartParserService.JOB_TYPE_SMART_ADD,
+                    SmartParserService().handle_smart_add_job
+                )
+
                 self.scheduler_service.start_scheduler()
+                self.logger.info(f"Restored {len(self.scheduler_service.get_jobs())} RSS check jobs")
+
+                # 定期全量检查所有激活的RSS源
+                check_all_interval = self.config.get('scheduler.check_all_interval', 0) if self.config else 0
+                if check_all_interval:
+                    self.scheduler_service.add_check_all_job(interval=check_all_interval)
+                
+                # 定期检查聚合RSS源，绑定的RSS源由聚合RSS源更新，不再单独抓取
+                aggregate_interval = self.config.get('aggregate_feed.check_interval', 1800) if self.config else 1800
+                if aggregate_interval:
+                    self.scheduler_service.add_aggregate_feed_job(interval=aggregate_interval)
+
+                # 定期停止已完结动画的RSS源检查
+                if self.config.get('lifecycle.enabled', True) if self.config else True:
+                    lifecycle_interval = self.config.get('lifecycle.check_interval', 86400) if self.config else 86400
+                    self.scheduler_service.add_lifecycle_job(interval=lifecycle_interval)
+
+                # 定期同步下载状态
+                sync_interval = self.config.get('job_queue.sync_interval', 300) if self.config else 300
+                if sync_interval:
+                    self.scheduler_service.add_download_sync_job(interval=sync_interval)
                 
+                # 调度器恢复任务后再启动工作线程，上次未完成的定时检查才能找到对应的任务
+                self.job_worker_service.start()
+                set_job_worker_service(self.job_worker_service)
+                self.logger.info(
+                    f"Job queue started with {self.job_worker_service.workers} shared workers, "
+                    f"dedicated pools {self.job_worker_service.pools}"
+                )
+
                 # 设置调度服务实例到路由模块
                 set_scheduler_service(self.scheduler_service)
                 set_rss_extra_scheduler_service(self.scheduler_service)
@@ -120,6 +163,7 @@ class AnimeLoaderServer:
                 self.logger.info("Scheduler initialized and started")
             else:
                 self.scheduler_service = None
+                self.job_worker_service = None
                 self.logger.info("Scheduler is disabled")
             
             # TODO: 初始化下载器管理器
@@ -176,6 +220,11 @@ class AnimeLoaderServer:
             self.logger.info("Stopping AnimeLoader server...")
             self.running = False
             
+            # 先停止后台任务工作线程，未完成的任务在下次启动时继续执行
+            if self.job_worker_service:
+                self.job_worker_service.stop()
+                self.logger.info("Job queue stopped")
+
             # 停止调度器
             if self.scheduler_service:
                 self.scheduler_service.stop_scheduler()
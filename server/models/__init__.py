@@ -4,6 +4,11 @@ from server.models.link import Link
 from server.models.downloader import Downloader
 from server.models.download import DownloadTask
 from server.models.api_key import APIKey
+from server.models.scheduler_job import SchedulerJob
+from server.models.scheduler_run import SchedulerRun
+from server.models.aggregate_feed import AggregateFeed
+from server.models.background_job import BackgroundJob
+from server.models.smart_parse_result import SmartParseResult
 
 __all__ = [
     'Base',
@@ -13,4 +18,9 @@ __all__ = [
     'Downloader',
     'DownloadTask',
     'APIKey',
+    'SchedulerJob',
+    'SchedulerRun',
+    'AggregateFeed',
+    'BackgroundJob',
+    'SmartParseResult',
 ]
\ No newline at end of file
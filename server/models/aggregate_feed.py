@@ -0,0 +1,36 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Index
+from sqlalchemy.orm import relationship
+from server.models.anime import Base
+
+
+class AggregateFeed(Base):
+    """聚合RSS源（如蜜柑计划“我的番组”），一次抓取后按索引把条目分发到各RSS源"""
+    __tablename__ = 'aggregate_feeds'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(255), nullable=False)
+    url = Column(String(500), nullable=False)
+    is_active = Column(Boolean, default=True, nullable=False)
+    last_checked_at = Column(DateTime, nullable=True)
+    etag = Column(String(255), nullable=True)  # 上次抓取的 ETag
+    last_modified = Column(String(64), nullable=True)  # 上次抓取的 Last-Modified
+    content_hash = Column(String(64), nullable=True)  # 上次抓取内容的 SHA-256
+    last_unmatched = Column(Text, nullable=True)  # 上次检查未匹配到RSS源的条目标题（JSON列表）
+    last_unmatched_count = Column(Integer, default=0, server_default='0', nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    rss_sources = relationship("RSSSource", back_populates="aggregate_feed")
+
+    __table_args__ = (
+        Index('idx_aggregate_feed_is_active', 'is_active'),
+    )
+
+    @property
+    def rss_source_ids(self):
+        """由该聚合RSS源更新的RSS源ID"""
+        return sorted(source.id for source in self.rss_sources)
+
+    def __repr__(self):
+        return f"<AggregateFeed(id={self.id}, name='{self.name}', url='{self.url}')>"
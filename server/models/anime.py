@@ -15,6 +15,9 @@ class Anime(Base):
     cover_url = Column(String(500), nullable=True)
     status = Column(String(50), nullable=False, default='ongoing')
     total_episodes = Column(Integer, nullable=True)
+    polling_stopped_at = Column(DateTime, nullable=True)  # 生命周期检查停止检查RSS源的时间
+    polling_stop_reason = Column(String(50), nullable=True)  # 停止原因 (episodes_complete, idle, status_completed)
+    polling_resumed_at = Column(DateTime, nullable=True)  # 手动恢复检查的时间
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
@@ -0,0 +1,41 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index, text
+from server.models.anime import Base
+
+
+class BackgroundJob(Base):
+    """后台任务队列，由工作线程从表中原子领取执行，进程重启后未完成的任务继续执行"""
+    __tablename__ = 'background_jobs'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_type = Column(String(50), nullable=False)  # 任务类型 (rss_check, download_start, download_sync)
+    payload = Column(Text, nullable=True)  # 任务参数（JSON）
+    status = Column(String(20), nullable=False, default='pending')  # pending, running, succeeded, failed, cancelled
+    priority = Column(Integer, nullable=False, default=0, server_default='0')  # 数值越大越先执行
+    dedup_key = Column(String(255), nullable=True)  # 相同 key 的未完成任务只保留一个（部分唯一索引保证）
+    attempts = Column(Integer, nullable=False, default=0, server_default='0')  # 已领取次数
+    max_attempts = Column(Integer, nullable=False, default=3, server_default='3')
+    run_after = Column(DateTime, nullable=False, default=datetime.utcnow)  # 不早于该时间执行（重试退避）
+    locked_by = Column(String(100), nullable=True)  # 领取任务的工作线程
+    lease_expires_at = Column(DateTime, nullable=True)  # 租约到期时间，过期未完成的任务可被重新领取
+    result = Column(Text, nullable=True)  # 执行结果（JSON）
+    error = Column(Text, nullable=True)  # 最近一次失败的错误信息
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index('idx_background_job_claim', 'status', 'priority', 'run_after'),
+        # 只在未结束的任务中唯一，入队时由 INSERT ... ON CONFLICT DO NOTHING 原子去重
+        Index(
+            'idx_background_job_active_dedup_key',
+            'dedup_key',
+            unique=True,
+            sqlite_where=text("status IN ('pending', 'running')")
+        ),
+        Index('idx_background_job_lease', 'status', 'lease_expires_at'),
+    )
+
+    def __repr__(self):
+        return f"<BackgroundJob(id={self.id}, job_type='{self.job_type}', status='{self.status}')>"
@@ -1,9 +1,19 @@
+import hashlib
 from datetime import datetime
 from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from server.models.anime import Base
 
 
+def hash_url(url: str) -> str:
+    """计算链接URL的哈希，用于唯一索引去重"""
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+
+def _default_url_hash(context) -> str:
+    return hash_url(context.get_current_parameters()['url'])
+
+
 class Link(Base):
     __tablename__ = 'links'
 
@@ -13,11 +23,18 @@ class Link(Base):
     episode_title = Column(String(255), nullable=True)
     link_type = Column(String(50), nullable=False)
     url = Column(Text, nullable=False)
+    url_hash = Column(String(64), nullable=True, default=_default_url_hash)  # URL的SHA-256，旧库中重复的历史链接为空
     file_size = Column(Integer, nullable=True)
     publish_date = Column(DateTime, nullable=True)
     is_downloaded = Column(Boolean, default=False, nullable=False)
     is_available = Column(Boolean, default=True, nullable=False)
     meta_data = Column(Text, nullable=True)
+    # 从发布标题解析的字段（server/utils/release_parser.py），无法识别时为空
+    subgroup = Column(String(100), nullable=True)           # 字幕组
+    resolution = Column(String(20), nullable=True)          # 分辨率 (1080p, 720p, etc.)
+    video_codec = Column(String(20), nullable=True)         # 视频编码 (hevc, avc, av1)
+    subtitle_language = Column(String(20), nullable=True)   # 字幕语言 (chs, cht, chs_cht, eng)
+    version = Column(Integer, nullable=True)                # 版本号（如 03v2 为2）
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
@@ -30,6 +47,11 @@ class Link(Base):
         Index('idx_link_is_downloaded', 'is_downloaded'),
         Index('idx_link_is_available', 'is_available'),
         Index('idx_link_publish_date', 'publish_date'),
+        Index('idx_link_source_url_hash', 'rss_source_id', 'url_hash', unique=True),
+        Index('idx_link_subgroup', 'subgroup'),
+        Index('idx_link_resolution', 'resolution'),
+        Index('idx_link_subtitle_language', 'subtitle_language'),
+        Index('idx_link_release', 'rss_source_id', 'episode_number', 'subgroup', 'resolution'),
     )
 
     def __repr__(self):
@@ -13,18 +13,32 @@ class RSSSource(Base):
     url = Column(String(500), nullable=False)
     quality = Column(String(50), nullable=True)
     is_active = Column(Boolean, default=True, nullable=False)
+    auto_deactivated = Column(Boolean, default=False, server_default='0', nullable=False)  # 是否由生命周期检查停用
     auto_download = Column(Boolean, default=False, nullable=False)
     last_checked_at = Column(DateTime, nullable=True)
+    etag = Column(String(255), nullable=True)  # 上次抓取的 ETag
+    last_modified = Column(String(64), nullable=True)  # 上次抓取的 Last-Modified
+    content_hash = Column(String(64), nullable=True)  # 上次抓取内容的 SHA-256
+    last_entry_id = Column(String(512), nullable=True)  # 上次解析到的最新条目 GUID/URL，用于增量解析
+    aggregate_feed_id = Column(Integer, ForeignKey('aggregate_feeds.id'), nullable=True)  # 由哪个聚合RSS源更新
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
     anime = relationship("Anime", backref="rss_sources")
+    aggregate_feed = relationship("AggregateFeed", back_populates="rss_sources")
     links = relationship("Link", back_populates="rss_source", cascade="all, delete-orphan")
+    scheduler_job = relationship("SchedulerJob", back_populates="rss_source", uselist=False, cascade="all, delete-orphan")
 
     __table_args__ = (
         Index('idx_rss_source_anime_id', 'anime_id'),
         Index('idx_rss_source_is_active', 'is_active'),
+        Index('idx_rss_source_aggregate_feed_id', 'aggregate_feed_id'),
     )
 
+    @property
+    def check_interval(self):
+        """定时检查间隔（秒），未加入调度时为None"""
+        return self.scheduler_job.interval if self.scheduler_job else None
+
     def __repr__(self):
         return f"<RSSSource(id={self.id}, name='{self.name}', url='{self.url}')>"
\ No newline at end of file
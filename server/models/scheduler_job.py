@@ -0,0 +1,27 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, Boolean, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from server.models.anime import Base
+
+
+class SchedulerJob(Base):
+    __tablename__ = 'scheduler_jobs'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    rss_source_id = Column(Integer, ForeignKey('rss_sources.id'), nullable=False, unique=True)
+    interval = Column(Integer, nullable=False)  # 检查间隔（秒）
+    auto_download = Column(Boolean, default=False, nullable=False)
+    is_paused = Column(Boolean, default=False, nullable=False)
+    consecutive_failures = Column(Integer, default=0, server_default='0', nullable=False)  # 连续失败次数
+    backoff_until = Column(DateTime, nullable=True)  # 失败退避结束时间
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    rss_source = relationship("RSSSource", back_populates="scheduler_job")
+
+    __table_args__ = (
+        Index('idx_scheduler_job_is_paused', 'is_paused'),
+    )
+
+    def __repr__(self):
+        return f"<SchedulerJob(id={self.id}, rss_source_id={self.rss_source_id}, interval={self.interval})>"
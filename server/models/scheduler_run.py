@@ -0,0 +1,31 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, ForeignKey, Text, Index
+from server.models.anime import Base
+
+
+class SchedulerRun(Base):
+    __tablename__ = 'scheduler_runs'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    rss_source_id = Column(Integer, ForeignKey('rss_sources.id'), nullable=False)
+    trigger = Column(String(20), nullable=False)  # 触发方式 (scheduled, sweep, manual)
+    started_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime, nullable=False)
+    duration = Column(Float, nullable=True)  # 总耗时（秒）
+    fetch_duration = Column(Float, nullable=True)  # 抓取解析耗时（秒）
+    write_duration = Column(Float, nullable=True)  # 写入数据库耗时（秒）
+    rate_limit_wait = Column(Float, nullable=True)  # 抓取前在按主机限速器中等待的秒数（包含在 fetch_duration 中）
+    bytes_transferred = Column(Integer, default=0, nullable=False)
+    entries_parsed = Column(Integer, default=0, nullable=False)
+    new_links_count = Column(Integer, default=0, nullable=False)
+    not_modified = Column(Boolean, default=False, nullable=False)
+    success = Column(Boolean, nullable=False)
+    error = Column(Text, nullable=True)
+
+    __table_args__ = (
+        Index('idx_scheduler_run_source_started', 'rss_source_id', 'started_at'),
+        Index('idx_scheduler_run_started_at', 'started_at'),
+    )
+
+    def __repr__(self):
+        return f"<SchedulerRun(id={self.id}, rss_source_id={self.rss_source_id}, success={self.success})>"
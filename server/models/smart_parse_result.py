@@ -0,0 +1,21 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index
+from server.models.anime import Base
+
+
+class SmartParseResult(Base):
+    """智能解析结果缓存，按规范化的页面URL保存解析出的动画信息，服务重启后仍可复用"""
+    __tablename__ = 'smart_parse_results'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    url = Column(String(1000), nullable=False, unique=True)  # 规范化的页面URL
+    site_name = Column(String(100), nullable=True)
+    results = Column(Text, nullable=False)  # 解析出的动画信息列表（JSON）
+    parsed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index('idx_smart_parse_result_parsed_at', 'parsed_at'),
+    )
+
+    def __repr__(self):
+        return f"<SmartParseResult(id={self.id}, url='{self.url}')>"
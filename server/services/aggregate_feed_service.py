@@ -0,0 +1,337 @@
+"""
+聚合RSS源服务模块
+管理聚合RSS源（如蜜柑计划“我的番组”），并按标题/bangumiId索引把条目分发到各RSS源
+"""
+import json
+import re
+import unicodedata
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+from sqlalchemy.orm import Session
+
+from server.models.aggregate_feed import AggregateFeed
+from server.models.rss_source import RSSSource
+
+
+# 条目中可能出现的 bangumiId（番组页链接或番组RSS地址）
+BANGUMI_ID_PATTERN = re.compile(r'(?:bangumiId=|/Home/Bangumi/)(\d+)', re.IGNORECASE)
+# 条目标题开头的字幕组标签，如 [LoliHouse]、【喵萌奶茶屋】
+SUBGROUP_PATTERN = re.compile(r'^\s*[\[【]([^\]】]+)[\]】]')
+# 标题索引的最短长度，过短的标题容易误匹配
+MIN_TITLE_LENGTH = 2
+
+
+def normalize_title(title: Optional[str]) -> str:
+    """规范化标题：全角转半角、忽略大小写，去掉空白和标点"""
+    if not title:
+        return ''
+    title = unicodedata.normalize('NFKC', title).casefold()
+    return re.sub(r'[\W_]+', '', title)
+
+
+def extract_bangumi_id(text: Optional[str]) -> Optional[str]:
+    """从URL或文本中提取蜜柑计划的 bangumiId"""
+    if not text:
+        return None
+    match = BANGUMI_ID_PATTERN.search(text)
+    return match.group(1) if match else None
+
+
+def extract_subgroup(title: Optional[str]) -> Optional[str]:
+    """提取条目标题开头的字幕组标签（已规范化）"""
+    match = SUBGROUP_PATTERN.match(title or '')
+    return normalize_title(match.group(1)) if match else None
+
+
+class AggregateFeedIndex:
+    """聚合RSS源的路由索引
+
+    从绑定的RSS源预先计算 bangumiId -> 动画、规范化标题 -> 动画两张表，
+    以及每部动画下按字幕组区分的RSS源。条目先按 bangumiId、再按标题中包含的动画标题
+    确定动画，然后按标题开头的字幕组标签选择RSS源，没有对应字幕组时使用不限字幕组的RSS源。
+    """
+
+    def __init__(self):
+        self._bangumi: Dict[str, int] = {}
+        self._titles: Dict[str, set] = defaultdict(set)
+        # 动画ID -> [(规范化的字幕组名，不限字幕组时为None, RSS源ID)]
+        self._sources: Dict[int, List[Tuple[Optional[str], int]]] = defaultdict(list)
+        self._distinctive: Optional[set] = None
+
+    def add_source(self, rss_source: RSSSource):
+        """把RSS源加入索引"""
+        anime = rss_source.anime
+        self._distinctive = None
+        query = parse_qs(urlparse(rss_source.url).query)
+        bangumi_id = extract_bangumi_id(rss_source.url)
+        if bangumi_id:
+            self._bangumi[bangumi_id] = anime.id
+        for title in (anime.title, anime.title_en):
+            key = normalize_title(title)
+            if len(key) >= MIN_TITLE_LENGTH:
+                self._titles[key].add(anime.id)
+        # 按字幕组订阅的RSS源（智能添加时以字幕组名命名）
+        subgroup = normalize_title(rss_source.name) if query.get('subgroupid') else None
+        self._sources[anime.id].append((subgroup or None, rss_source.id))
+
+    def __len__(self) -> int:
+        return sum(len(sources) for sources in self._sources.values())
+
+    def match_anime(self, link_info: Dict[str, Any]) -> Optional[int]:
+        """确定条目所属的动画，匹配不到或有歧义时返回None"""
+        for field in ('entry_description', 'url'):
+            bangumi_id = extract_bangumi_id(link_info.get(field))
+            if bangumi_id and bangumi_id in self._bangumi:
+                return self._bangumi[bangumi_id]
+
+        entry_title = normalize_title(link_info.get('entry_title') or link_info.get('episode_title'))
+        if not entry_title:
+            return None
+        matched: Dict[int, List[str]] = defaultdict(list)
+        for key, anime_ids in self._titles.items():
+            if key in entry_title:
+                for anime_id in anime_ids:
+                    matched[anime_id].append(key)
+        if len(matched) <= 1:
+            return next(iter(matched), None)
+
+        # 优先匹配到只属于一部动画的标题（不被其他动画的标题包含）的动画，
+        # 如条目同时包含“黄金神威”和“黄金神威 最终章”时归入后者
+        distinctive = self._get_distinctive_keys()
+        winners = [
+            anime_id for anime_id, keys in matched.items()
+            if any(key in distinctive for key in keys)
+        ]
+        if not winners:
+            # 都是共用的标题时，选匹配到的标题覆盖其他候选的动画
+            winners = [
+                anime_id for anime_id, keys in matched.items()
+                if all(
+                    any(other_key in key for key in keys)
+                    for other_id, other_keys in matched.items() if other_id != anime_id
+                    for other_key in other_keys
+                )
+            ]
+        if len(winners) != 1:
+            return None
+        return winners[0]
+
+    def _get_distinctive_keys(self) -> set:
+        """预先计算只属于一部动画、且不被其他动画的标题包含的标题"""
+        if self._distinctive is None:
+            self._distinctive = {
+                key for key, anime_ids in self._titles.items()
+                if len(anime_ids) == 1 and all(
+                    other_ids <= anime_ids
+                    for other_key, other_ids in self._titles.items()
+                    if other_key != key and key in other_key
+                )
+            }
+        return self._distinctive
+
+    def match(self, link_info: Dict[str, Any]) -> Optional[int]:
+        """
+        确定条目应写入的RSS源
+
+        Args:
+            link_info: RSS解析器解析出的链接信息
+
+        Returns:
+            RSS源ID，匹配不到时返回None
+        """
+        anime_id = self.match_anime(link_info)
+        if anime_id is None:
+            return None
+
+        subgroup = extract_subgroup(link_info.get('entry_title'))
+        fallback = None
+        for source_subgroup, rss_source_id in self._sources[anime_id]:
+            if source_subgroup is None:
+                if fallback is None:
+                    fallback = rss_source_id
+            elif subgroup and (source_subgroup in subgroup or subgroup in source_subgroup):
+                return rss_source_id
+        return fallback
+
+    def route(self, links: List[Dict[str, Any]]) -> Tuple[Dict[int, List[Dict[str, Any]]], List[Dict[str, Any]]]:
+        """
+        把链接分发到各RSS源
+
+        Args:
+            links: RSS解析器解析出的链接
+
+        Returns:
+            (RSS源ID -> 链接列表, 未匹配的链接)
+        """
+        routed: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+        unmatched = []
+        for link_info in links:
+            rss_source_id = self.match(link_info)
+            if rss_source_id is None:
+                unmatched.append(link_info)
+            else:
+                routed[rss_source_id].append(link_info)
+        return dict(routed), unmatched
+
+
+class AggregateFeedService:
+    """聚合RSS源服务类"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create_feed(self, name: str, url: str, is_active: bool = True) -> AggregateFeed:
+        """创建聚合RSS源"""
+        feed = AggregateFeed(name=name, url=url, is_active=is_active)
+        self.db.add(feed)
+        self.db.commit()
+        self.db.refresh(feed)
+        return feed
+
+    def get_feed(self, feed_id: int) -> Optional[AggregateFeed]:
+        """获取单个聚合RSS源"""
+        return self.db.query(AggregateFeed).filter(AggregateFeed.id == feed_id).first()
+
+    def get_feeds(self, is_active: Optional[bool] = None) -> List[AggregateFeed]:
+        """获取聚合RSS源列表"""
+        query = self.db.query(AggregateFeed)
+        if is_active is not None:
+            query = query.filter(AggregateFeed.is_active == is_active)
+        return query.order_by(AggregateFeed.id).all()
+
+    def update_feed(
+        self,
+        feed_id: int,
+        name: Optional[str] = None,
+        url: Optional[str] = None,
+        is_active: Optional[bool] = None
+    ) -> Optional[AggregateFeed]:
+        """更新聚合RSS源"""
+        feed = self.get_feed(feed_id)
+        if not feed:
+            return None
+        if name is not None:
+            feed.name = name
+        if url is not None and url != feed.url:
+            feed.url = url
+            self._reset_validators(feed)
+        if is_active is not None:
+            feed.is_active = is_active
+        self.db.commit()
+        self.db.refresh(feed)
+        return feed
+
+    def delete_feed(self, feed_id: int) -> bool:
+        """删除聚合RSS源，绑定的RSS源恢复为单独检查"""
+        feed = self.get_feed(feed_id)
+        if not feed:
+            return False
+        for rss_source in feed.rss_sources:
+            rss_source.aggregate_feed_id = None
+        self.db.delete(feed)
+        self.db.commit()
+        return True
+
+    def bind_source(self, feed_id: int, rss_source_id: int) -> Optional[RSSSource]:
+        """
+        让RSS源改由聚合RSS源更新
+
+        绑定后清除聚合RSS源的校验信息，下次检查即使内容未变化也会重新分发，已有条目也能写入新绑定的RSS源
+
+        Returns:
+            RSS源，聚合RSS源或RSS源不存在时返回None
+        """
+        feed = self.get_feed(feed_id)
+        rss_source = self.db.query(RSSSource).filter(RSSSource.id == rss_source_id).first()
+        if not feed or not rss_source:
+            return None
+        if rss_source.aggregate_feed_id != feed.id:
+            rss_source.aggregate_feed_id = feed.id
+            self._reset_validators(feed)
+        self.db.commit()
+        self.db.refresh(rss_source)
+        return rss_source
+
+    def unbind_source(self, feed_id: int, rss_source_id: int) -> bool:
+        """解除RSS源与聚合RSS源的绑定"""
+        rss_source = self.db.query(RSSSource).filter(
+            RSSSource.id == rss_source_id,
+            RSSSource.aggregate_feed_id == feed_id
+        ).first()
+        if not rss_source:
+            return False
+        rss_source.aggregate_feed_id = None
+        self.db.commit()
+        return True
+
+    def get_covered_source_ids(self) -> set:
+        """获取由激活的聚合RSS源更新的RSS源ID，全量检查时不再单独抓取"""
+        rows = self.db.query(RSSSource.id).join(
+            AggregateFeed, RSSSource.aggregate_feed_id == AggregateFeed.id
+        ).filter(AggregateFeed.is_active == True).all()
+        return {row[0] for row in rows}
+
+    def is_source_covered(self, rss_source_id: int) -> bool:
+        """RSS源是否由激活的聚合RSS源更新，是则定时检查不再单独抓取"""
+        row = self.db.query(RSSSource.id).join(
+            AggregateFeed, RSSSource.aggregate_feed_id == AggregateFeed.id
+        ).filter(
+            RSSSource.id == rss_source_id,
+            AggregateFeed.is_active == True
+        ).first()
+        return row is not None
+
+    def build_index(self, feed_id: int) -> AggregateFeedIndex:
+        """为聚合RSS源绑定的激活RSS源构建路由索引"""
+        index = AggregateFeedIndex()
+        rss_sources = self.db.query(RSSSource).filter(
+            RSSSource.aggregate_feed_id == feed_id,
+            RSSSource.is_active == True
+        ).order_by(RSSSource.id).all()
+        for rss_source in rss_sources:
+            index.add_source(rss_source)
+        return index
+
+    def record_check(
+        self,
+        feed_id: int,
+        validators: Optional[Dict[str, Optional[str]]] = None,
+        unmatched: Optional[List[str]] = None
+    ):
+        """
+        记录一次检查的结果
+
+        Args:
+            feed_id: 聚合RSS源ID
+            validators: 本次抓取的缓存校验信息
+            unmatched: 未匹配到RSS源的条目标题，为None时（内容未变化）保留上次的记录
+        """
+        feed = self.get_feed(feed_id)
+        if not feed:
+            return
+        feed.last_checked_at = datetime.utcnow()
+        if validators:
+            feed.etag = validators.get('etag')
+            feed.last_modified = validators.get('last_modified')
+            feed.content_hash = validators.get('content_hash')
+        if unmatched is not None:
+            feed.last_unmatched = json.dumps(unmatched, ensure_ascii=False)
+            feed.last_unmatched_count = len(unmatched)
+        self.db.commit()
+
+    def get_unmatched(self, feed: AggregateFeed) -> List[str]:
+        """获取上次检查未匹配的条目标题"""
+        if not feed.last_unmatched:
+            return []
+        try:
+            return json.loads(feed.last_unmatched)
+        except ValueError:
+            return []
+
+    def _reset_validators(self, feed: AggregateFeed):
+        """清除缓存校验信息"""
+        feed.etag = None
+        feed.last_modified = None
+        feed.content_hash = None
@@ -2,11 +2,12 @@
 动画服务模块
 提供动画相关的业务逻辑
 """
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import or_, and_
 
 from server.models.anime import Anime
+from server.models.rss_source import RSSSource
 
 
 class AnimeService:
@@ -38,6 +39,55 @@ class AnimeService:
         self.db.refresh(anime)
         return anime
     
+    def create_anime_with_rss_sources(
+        self,
+        anime_info: Dict[str, Any],
+        rss_sources_info: List[Dict[str, Any]]
+    ) -> Tuple[Anime, List[RSSSource]]:
+        """
+        在同一事务中创建动画及其RSS源，任一记录失败时全部回滚
+
+        Args:
+            anime_info: 动画信息，键与 create_anime 的参数相同
+            rss_sources_info: RSS源信息列表（name、url、quality、auto_download）
+
+        Returns:
+            (动画, RSS源列表)
+        """
+        try:
+            anime = Anime(
+                title=anime_info.get('title', ''),
+                title_en=anime_info.get('title_en'),
+                description=anime_info.get('description'),
+                cover_url=anime_info.get('cover_url'),
+                status=anime_info.get('status') or 'ongoing',
+                total_episodes=anime_info.get('total_episodes')
+            )
+            self.db.add(anime)
+            self.db.flush()
+
+            rss_sources = [
+                RSSSource(
+                    anime_id=anime.id,
+                    name=rss_info.get('name', ''),
+                    url=rss_info.get('url'),
+                    quality=rss_info.get('quality'),
+                    is_active=True,
+                    auto_download=rss_info.get('auto_download', True)
+                )
+                for rss_info in rss_sources_info
+            ]
+            self.db.add_all(rss_sources)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        self.db.refresh(anime)
+        for rss_source in rss_sources:
+            self.db.refresh(rss_source)
+        return anime, rss_sources
+    
     def get_anime(self, anime_id: int) -> Optional[Anime]:
         """获取单个动画"""
         return self.db.query(Anime).filter(Anime.id == anime_id).first()
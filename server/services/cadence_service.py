@@ -0,0 +1,148 @@
+"""
+更新规律服务模块
+根据RSS源历史链接的发布时间推算更新周期和下一次预计更新时间，用于调整检查间隔
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy.orm import Session
+
+from server.models.link import Link
+
+
+def estimate_cadence(
+    publish_dates: List[datetime],
+    now: datetime,
+    window: float = 3600,
+    min_releases: int = 3,
+    cluster_gap: float = 43200,
+    max_deviation: float = 0.2
+) -> Optional[Dict[str, Any]]:
+    """
+    根据发布时间推算更新周期
+
+    同一集通常有多个字幕组、多个画质的链接，间隔小于 cluster_gap 的发布时间视为同一次更新，
+    取其中最早的时间。更新间隔的中位数作为周期，间隔偏离周期过多时认为没有规律。
+
+    Args:
+        publish_dates: 链接的发布时间（UTC）
+        now: 当前时间（UTC）
+        window: 预计更新时间前后的检查窗口（秒）
+        min_releases: 推算周期所需的最少更新次数
+        cluster_gap: 视为同一次更新的最大间隔（秒）
+        max_deviation: 允许的间隔偏差（间隔与周期之差的中位数 / 周期）
+
+    Returns:
+        更新规律，没有规律时返回None：
+            - period: 更新周期（秒）
+            - releases: 识别出的更新次数
+            - last_release: 最近一次更新时间
+            - next_release: 下一次预计更新时间（窗口尚未结束的最早一次）
+            - overdue_since: 上一次预计更新未出现时，其窗口结束的时间，否则为None
+    """
+    dates = sorted(date for date in publish_dates if date is not None)
+    releases: List[datetime] = []
+    previous = None
+    for date in dates:
+        if previous is None or (date - previous).total_seconds() > cluster_gap:
+            releases.append(date)
+        previous = date
+    if len(releases) < max(2, min_releases):
+        return None
+
+    # 只使用最近的几次更新，季度之间的长间隔不影响当前周期
+    recent = releases[-9:]
+    intervals = sorted(
+        (later - earlier).total_seconds()
+        for earlier, later in zip(recent, recent[1:])
+    )
+    period = intervals[len(intervals) // 2]
+    if period <= cluster_gap:
+        return None
+    deviations = sorted(abs(interval - period) for interval in intervals)
+    if deviations[len(deviations) // 2] > period * max_deviation:
+        return None
+
+    last_release = releases[-1]
+    elapsed = (now - last_release).total_seconds()
+    # 最早一个窗口尚未结束的预计更新时间
+    slot = max(1, int((elapsed - window) // period) + 1)
+    while (last_release + timedelta(seconds=slot * period) - now).total_seconds() + window <= 0:
+        slot += 1
+    next_release = last_release + timedelta(seconds=slot * period)
+    overdue_since = None
+    if slot > 1:
+        overdue_since = last_release + timedelta(seconds=(slot - 1) * period + window)
+    return {
+        "period": period,
+        "releases": len(releases),
+        "last_release": last_release,
+        "next_release": next_release,
+        "overdue_since": overdue_since
+    }
+
+
+def compute_poll_interval(
+    cadence: Dict[str, Any],
+    now: datetime,
+    min_interval: float,
+    max_interval: float,
+    window: float = 3600
+) -> float:
+    """
+    根据更新规律计算距离下一次检查的秒数
+
+    预计更新时间前后 window 秒内按 min_interval 检查；窗口之外等到下一个窗口开始，
+    但不超过 max_interval。上一次预计的更新没有出现时，检查间隔随延迟时间逐步拉长，
+    延迟的更新也能较快发现。
+
+    Args:
+        cadence: estimate_cadence 的返回值
+        now: 当前时间（UTC）
+        min_interval: 最短检查间隔（秒）
+        max_interval: 最长检查间隔（秒）
+        window: 预计更新时间前后的检查窗口（秒）
+
+    Returns:
+        距离下一次检查的秒数
+    """
+    window_start = (cadence["next_release"] - now).total_seconds() - window
+    if window_start <= 0:
+        return min_interval
+    delay = window_start
+    if cadence.get("overdue_since") is not None:
+        overdue = (now - cadence["overdue_since"]).total_seconds()
+        delay = min(delay, max(overdue, min_interval))
+    return min(max(delay, min_interval), max_interval)
+
+
+class CadenceService:
+    """更新规律服务类"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_publish_dates(self, rss_source_id: int, limit: int = 200) -> List[datetime]:
+        """获取RSS源最近链接的发布时间"""
+        rows = self.db.query(Link.publish_date).filter(
+            Link.rss_source_id == rss_source_id,
+            Link.publish_date.isnot(None)
+        ).order_by(Link.publish_date.desc()).limit(limit).all()
+        return [row[0] for row in rows]
+
+    def get_cadence(self, rss_source_id: int, now: Optional[datetime] = None, **kwargs) -> Optional[Dict[str, Any]]:
+        """
+        推算RSS源的更新规律
+
+        Args:
+            rss_source_id: RSS源ID
+            now: 当前时间（UTC），默认为现在
+            **kwargs: 传给 estimate_cadence 的参数
+
+        Returns:
+            更新规律，没有规律时返回None
+        """
+        return estimate_cadence(
+            self.get_publish_dates(rss_source_id),
+            now or datetime.utcnow(),
+            **kwargs
+        )
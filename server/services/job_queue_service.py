@@ -0,0 +1,410 @@
+"""
+后台任务队列服务模块
+以 background_jobs 表作为持久化队列：入队、原子领取、租约续期、失败重试和历史清理
+"""
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy import func, select, text, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from server.models.background_job import BackgroundJob
+
+
+# 未结束的任务状态，dedup_key 只在这些状态中去重
+ACTIVE_STATUSES = ('pending', 'running')
+# 已结束的任务状态
+FINISHED_STATUSES = ('succeeded', 'failed', 'cancelled')
+# 去重键部分唯一索引的条件，需与 BackgroundJob 的索引定义一致
+ACTIVE_DEDUP_WHERE = text("status IN ('pending', 'running')")
+
+
+class JobQueueService:
+    """后台任务队列服务类
+
+    领取任务用一条 UPDATE ... WHERE id = (SELECT ...) RETURNING 语句完成，
+    挑选和标记在同一个写事务中，多个工作线程（或进程）不会领取到同一个任务。
+    领取时写入租约到期时间，执行中的任务由工作线程定期续期；进程退出后租约过期的任务
+    会在下一次领取时放回队列，用完执行次数的任务标记为失败。
+    去重键在未结束的任务中有部分唯一索引，入队用 INSERT ... ON CONFLICT DO NOTHING 一步完成，
+    定时器线程和接口同时入队也不会产生重复的任务。
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def enqueue(
+        self,
+        job_type: str,
+        payload: Optional[Dict[str, Any]] = None,
+        priority: int = 0,
+        max_attempts: int = 3,
+        run_after: Optional[datetime] = None,
+        dedup_key: Optional[str] = None
+    ) -> BackgroundJob:
+        """
+        添加任务
+
+        Args:
+            job_type: 任务类型
+            payload: 任务参数（需可JSON序列化）
+            priority: 优先级，数值越大越先执行
+            max_attempts: 最多执行次数
+            run_after: 不早于该时间执行，为None时立即可执行
+            dedup_key: 去重键，已有相同键的未结束任务时直接返回该任务
+
+        Returns:
+            新建或已存在的任务
+        """
+        now = datetime.utcnow()
+        stmt = sqlite_insert(BackgroundJob).values(
+            job_type=job_type,
+            payload=json.dumps(payload or {}, ensure_ascii=False),
+            status='pending',
+            priority=priority,
+            attempts=0,
+            max_attempts=max(1, max_attempts),
+            run_after=run_after or now,
+            dedup_key=dedup_key,
+            created_at=now,
+            updated_at=now
+        ).on_conflict_do_nothing(
+            index_elements=['dedup_key'],
+            index_where=ACTIVE_DEDUP_WHERE
+        ).returning(BackgroundJob.id)
+
+        # 已有的未结束任务可能在插入和查询之间结束，此时重新插入
+        for _ in range(3):
+            try:
+                job_id = self.db.execute(stmt).scalar_one_or_none()
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+            if job_id is not None:
+                return self.get_job(job_id)
+            existing = self._get_active_by_dedup_key(dedup_key)
+            if existing:
+                return existing
+        raise RuntimeError(f"去重键 {dedup_key} 的任务入队冲突")
+
+    def _get_active_by_dedup_key(self, dedup_key: str) -> Optional[BackgroundJob]:
+        """获取去重键相同的未结束任务"""
+        return self.db.query(BackgroundJob).filter(
+            BackgroundJob.dedup_key == dedup_key,
+            BackgroundJob.status.in_(ACTIVE_STATUSES)
+        ).first()
+
+    def claim(
+        self,
+        worker_id: str,
+        lease_seconds: int,
+        job_types: Optional[List[str]] = None,
+        now: Optional[datetime] = None
+    ) -> Optional[BackgroundJob]:
+        """
+        原子领取一个可执行的任务
+
+        按优先级从高到低、同优先级按入队顺序领取，领取后执行次数加一
+
+        Args:
+            worker_id: 工作线程标识
+            lease_seconds: 租约时长（秒）
+            job_types: 只领取这些类型的任务，为None时不限
+            now: 当前时间（测试用）
+
+        Returns:
+            领取到的任务，队列为空时返回None
+        """
+        now = now or datetime.utcnow()
+        self.reap_expired(now)
+
+        candidate = select(BackgroundJob.id).where(
+            BackgroundJob.status == 'pending',
+            BackgroundJob.run_after <= now
+        )
+        if job_types:
+            candidate = candidate.where(BackgroundJob.job_type.in_(job_types))
+        candidate = candidate.order_by(
+            BackgroundJob.priority.desc(),
+            BackgroundJob.id
+        ).limit(1).scalar_subquery()
+
+        stmt = update(BackgroundJob).where(
+            BackgroundJob.id == candidate,
+            BackgroundJob.status == 'pending'
+        ).values(
+            status='running',
+            locked_by=worker_id,
+            lease_expires_at=now + timedelta(seconds=lease_seconds),
+            attempts=BackgroundJob.attempts + 1,
+            started_at=now,
+            updated_at=now
+        ).returning(BackgroundJob.id).execution_options(synchronize_session=False)
+
+        try:
+            job_id = self.db.execute(stmt).scalar()
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        if job_id is None:
+            return None
+        return self.get_job(job_id)
+
+    def reap_expired(self, now: Optional[datetime] = None) -> int:
+        """
+        处理租约过期的任务：还有执行次数的放回队列，否则标记为失败
+
+        Returns:
+            处理的任务数量
+        """
+        now = now or datetime.utcnow()
+        expired = (
+            BackgroundJob.status == 'running',
+            BackgroundJob.lease_expires_at < now
+        )
+        failed = self.db.query(BackgroundJob).filter(
+            *expired,
+            BackgroundJob.attempts >= BackgroundJob.max_attempts
+        ).update({
+            BackgroundJob.status: 'failed',
+            BackgroundJob.error: '任务租约过期，已达到最多执行次数',
+            BackgroundJob.locked_by: None,
+            BackgroundJob.lease_expires_at: None,
+            BackgroundJob.finished_at: now,
+            BackgroundJob.updated_at: now
+        }, synchronize_session=False)
+        requeued = self.db.query(BackgroundJob).filter(*expired).update({
+            BackgroundJob.status: 'pending',
+            BackgroundJob.error: '任务租约过期，重新排队',
+            BackgroundJob.locked_by: None,
+            BackgroundJob.lease_expires_at: None,
+            BackgroundJob.updated_at: now
+        }, synchronize_session=False)
+        self.db.commit()
+        return failed + requeued
+
+    def release_running(self, owner_prefix: str, exclude_prefix: Optional[str] = None) -> int:
+        """
+        把指定前缀的工作线程领取的任务放回队列（进程重启时回收上次未完成的任务）
+
+        Args:
+            owner_prefix: 工作线程标识前缀
+            exclude_prefix: 不回收该前缀的工作线程领取的任务（当前进程）
+
+        Returns:
+            放回队列的任务数量
+        """
+        query = self.db.query(BackgroundJob).filter(
+            BackgroundJob.status == 'running',
+            BackgroundJob.locked_by.like(f"{owner_prefix}%")
+        )
+        if exclude_prefix:
+            query = query.filter(~BackgroundJob.locked_by.like(f"{exclude_prefix}%"))
+        released = query.update({
+            BackgroundJob.status: 'pending',
+            BackgroundJob.error: '进程重启，重新排队',
+            BackgroundJob.locked_by: None,
+            BackgroundJob.lease_expires_at: None,
+            BackgroundJob.updated_at: datetime.utcnow()
+        }, synchronize_session=False)
+        self.db.commit()
+        return released
+
+    def heartbeat(self, job_id: int, worker_id: str, lease_seconds: int) -> bool:
+        """
+        续期任务租约
+
+        Returns:
+            是否成功，任务已不属于该工作线程时返回False
+        """
+        now = datetime.utcnow()
+        renewed = self.db.query(BackgroundJob).filter(
+            BackgroundJob.id == job_id,
+            BackgroundJob.status == 'running',
+            BackgroundJob.locked_by == worker_id
+        ).update({
+            BackgroundJob.lease_expires_at: now + timedelta(seconds=lease_seconds),
+            BackgroundJob.updated_at: now
+        }, synchronize_session=False)
+        self.db.commit()
+        return renewed > 0
+
+    def complete(self, job_id: int, worker_id: str, result: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        标记任务执行成功
+
+        Returns:
+            是否成功，任务已不属于该工作线程（租约过期被重新领取）时返回False
+        """
+        now = datetime.utcnow()
+        updated = self.db.query(BackgroundJob).filter(
+            BackgroundJob.id == job_id,
+            BackgroundJob.status == 'running',
+            BackgroundJob.locked_by == worker_id
+        ).update({
+            BackgroundJob.status: 'succeeded',
+            BackgroundJob.result: json.dumps(result, ensure_ascii=False, default=str) if result is not None else None,
+            BackgroundJob.error: None,
+            BackgroundJob.locked_by: None,
+            BackgroundJob.lease_expires_at: None,
+            BackgroundJob.finished_at: now,
+            BackgroundJob.updated_at: now
+        }, synchronize_session=False)
+        self.db.commit()
+        return updated > 0
+
+    def fail(
+        self,
+        job_id: int,
+        worker_id: str,
+        error: str,
+        retry_delay: int = 60,
+        retry: bool = True
+    ) -> Optional[str]:
+        """
+        记录任务执行失败
+
+        还有执行次数时按 retry_delay * 2^(已执行次数-1) 秒退避后重新排队，否则标记为失败
+
+        Args:
+            job_id: 任务ID
+            worker_id: 工作线程标识
+            error: 错误信息
+            retry_delay: 初始重试等待时间（秒）
+            retry: 是否允许重试
+
+        Returns:
+            任务的新状态，任务已不属于该工作线程时返回None
+        """
+        job = self.db.query(BackgroundJob).filter(
+            BackgroundJob.id == job_id,
+            BackgroundJob.status == 'running',
+            BackgroundJob.locked_by == worker_id
+        ).first()
+        if not job:
+            return None
+
+        now = datetime.utcnow()
+        job.error = error
+        job.locked_by = None
+        job.lease_expires_at = None
+        if retry and job.attempts < job.max_attempts:
+            job.status = 'pending'
+            job.run_after = now + timedelta(seconds=retry_delay * 2 ** max(0, job.attempts - 1))
+        else:
+            job.status = 'failed'
+            job.finished_at = now
+        self.db.commit()
+        return job.status
+
+    def get_job(self, job_id: int) -> Optional[BackgroundJob]:
+        """获取单个任务"""
+        return self.db.query(BackgroundJob).filter(BackgroundJob.id == job_id).first()
+
+    def get_jobs(
+        self,
+        status: Optional[str] = None,
+        job_type: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 50
+    ) -> List[BackgroundJob]:
+        """获取任务列表（按ID倒序）"""
+        query = self.db.query(BackgroundJob)
+        if status:
+            query = query.filter(BackgroundJob.status == status)
+        if job_type:
+            query = query.filter(BackgroundJob.job_type == job_type)
+        return query.order_by(BackgroundJob.id.desc()).offset(skip).limit(limit).all()
+
+    def count_jobs(self, status: Optional[str] = None, job_type: Optional[str] = None) -> int:
+        """统计任务数量"""
+        query = self.db.query(BackgroundJob)
+        if status:
+            query = query.filter(BackgroundJob.status == status)
+        if job_type:
+            query = query.filter(BackgroundJob.job_type == job_type)
+        return query.count()
+
+    def count_by_status(self) -> Dict[str, int]:
+        """按状态统计任务数量"""
+        counts = {status: 0 for status in ACTIVE_STATUSES + FINISHED_STATUSES}
+        rows = self.db.query(BackgroundJob.status, func.count(BackgroundJob.id)).group_by(
+            BackgroundJob.status
+        ).all()
+        for status, count in rows:
+            counts[status] = count
+        return counts
+
+    def cancel_job(self, job_id: int) -> Optional[BackgroundJob]:
+        """
+        取消等待中的任务
+
+        Returns:
+            任务，不存在时返回None；执行中或已结束的任务保持不变
+        """
+        job = self.get_job(job_id)
+        if not job:
+            return None
+        if job.status == 'pending':
+            job.status = 'cancelled'
+            job.finished_at = datetime.utcnow()
+            self.db.commit()
+            self.db.refresh(job)
+        return job
+
+    def retry_job(self, job_id: int) -> Optional[BackgroundJob]:
+        """
+        重新执行失败或已取消的任务（执行次数清零）
+
+        Returns:
+            任务，不存在时返回None；其他状态的任务保持不变；
+            已有去重键相同的未结束任务时不重新排队，返回该任务
+        """
+        job = self.get_job(job_id)
+        if not job:
+            return None
+        if job.status in ('failed', 'cancelled'):
+            if job.dedup_key:
+                existing = self._get_active_by_dedup_key(job.dedup_key)
+                if existing:
+                    return existing
+            job.status = 'pending'
+            job.attempts = 0
+            job.run_after = datetime.utcnow()
+            job.finished_at = None
+            self.db.commit()
+            self.db.refresh(job)
+        return job
+
+    def prune(self, retention_days: int) -> int:
+        """删除超过保留天数的已结束任务，返回删除数量"""
+        cutoff = datetime.utcnow() - timedelta(days=retention_days)
+        deleted = self.db.query(BackgroundJob).filter(
+            BackgroundJob.status.in_(FINISHED_STATUSES),
+            BackgroundJob.finished_at < cutoff
+        ).delete(synchronize_session=False)
+        self.db.commit()
+        return deleted
+
+    @staticmethod
+    def get_payload(job: BackgroundJob) -> Dict[str, Any]:
+        """解析任务参数"""
+        return JobQueueService._loads(job.payload) or {}
+
+    @staticmethod
+    def get_result(job: BackgroundJob) -> Optional[Dict[str, Any]]:
+        """解析任务执行结果"""
+        return JobQueueService._loads(job.result)
+
+    @staticmethod
+    def _loads(value: Optional[str]) -> Optional[Dict[str, Any]]:
+        """解析JSON字段，无法解析时返回None"""
+        if not value:
+            return None
+        try:
+            return json.loads(value)
+        except ValueError:
+            return None
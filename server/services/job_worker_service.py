@@ -0,0 +1,321 @@
+"""
+后台任务工作线程模块
+多个工作线程从持久化队列中领取任务并调用对应的处理函数，执行期间定期续期租约
+"""
+import os
+import socket
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from server.services.job_queue_service import JobQueueService
+from server.utils.config import get_config_value
+
+
+class JobWorkerService:
+    """后台任务工作线程服务类
+
+    处理函数按任务类型注册，接收任务参数并返回可JSON序列化的结果；抛出异常时任务按退避时间重试。
+    注册时指定线程数（或配置 job_queue.pools）的任务类型由单独的工作线程执行，
+    其余任务类型共用 workers 个工作线程，耗时的任务不会占满其他类型的线程。
+    入队时唤醒对应的空闲工作线程，队列为空时每 poll_interval 秒检查一次（重试任务到期、其他进程入队）。
+    """
+
+    def __init__(
+        self,
+        db_factory,
+        workers: Optional[int] = None,
+        lease_seconds: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        retry_delay: Optional[int] = None
+    ):
+        """
+        初始化工作线程服务
+
+        Args:
+            db_factory: 数据库会话工厂函数
+            workers: 共用的工作线程数（未单独配置线程的任务类型）
+            lease_seconds: 任务租约时长（秒）
+            poll_interval: 队列为空时的轮询间隔（秒）
+            retry_delay: 失败重试的初始等待时间（秒）
+        """
+        self.db_factory = db_factory
+        self.workers = max(1, int(workers if workers is not None else get_config_value('job_queue.workers', 2)))
+        self.lease_seconds = max(1, int(
+            lease_seconds if lease_seconds is not None else get_config_value('job_queue.lease_seconds', 300)
+        ))
+        self.poll_interval = max(0.01, float(
+            poll_interval if poll_interval is not None else get_config_value('job_queue.poll_interval', 1.0)
+        ))
+        self.retry_delay = max(0, int(
+            retry_delay if retry_delay is not None else get_config_value('job_queue.retry_delay', 60)
+        ))
+        self.max_attempts = max(1, int(get_config_value('job_queue.max_attempts', 3)))
+        self.history_days = max(1, int(get_config_value('job_queue.history_days', 7)))
+
+        # 工作线程标识为 主机名:进程号:序号，重启后据此回收上次进程领取的任务
+        self.host_prefix = f"{socket.gethostname()}:"
+        self.worker_prefix = f"{self.host_prefix}{os.getpid()}:"
+
+        self.handlers: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+        # 单独配置线程数的任务类型 {job_type: 线程数}
+        self.pools: Dict[str, int] = {}
+        self._pool_overrides = get_config_value('job_queue.pools', None) or {}
+        self.is_running = False
+        self._threads = []
+        # 各线程池的唤醒条件和待处理的唤醒次数，共用线程池的键为None
+        self._wakeups: Dict[Optional[str], threading.Condition] = {None: threading.Condition()}
+        self._pending_wakeups: Dict[Optional[str], int] = {None: 0}
+        self._stopped = threading.Event()
+        self._in_flight: Dict[int, str] = {}  # 执行中的任务 {job_id: worker_id}
+        self._in_flight_lock = threading.Lock()
+        # 同一进程内的领取串行执行，避免多个线程同时等待 SQLite 写锁
+        self._claim_lock = threading.Lock()
+
+    def register_handler(
+        self,
+        job_type: str,
+        handler: Callable[[Dict[str, Any]], Any],
+        workers: Optional[int] = None
+    ):
+        """
+        注册任务处理函数（需在 start 之前注册）
+
+        Args:
+            job_type: 任务类型
+            handler: 处理函数，接收任务参数，返回执行结果
+            workers: 该类型任务单独使用的工作线程数，为空时使用共用的工作线程；
+                配置 job_queue.pools.<job_type> 时以配置为准
+        """
+        self.handlers[job_type] = handler
+        workers = self._pool_overrides.get(job_type, workers)
+        if workers is not None and int(workers) > 0:
+            self.pools[job_type] = int(workers)
+            self._wakeups.setdefault(job_type, threading.Condition())
+            self._pending_wakeups.setdefault(job_type, 0)
+        else:
+            self.pools.pop(job_type, None)
+
+    def enqueue(
+        self,
+        job_type: str,
+        payload: Optional[Dict[str, Any]] = None,
+        priority: int = 0,
+        max_attempts: Optional[int] = None,
+        run_after: Optional[datetime] = None,
+        dedup_key: Optional[str] = None
+    ) -> Optional[int]:
+        """
+        添加任务并唤醒工作线程
+
+        Returns:
+            任务ID，入队失败返回None
+        """
+        db = next(self.db_factory())
+        try:
+            job = JobQueueService(db).enqueue(
+                job_type,
+                payload,
+                priority=priority,
+                max_attempts=max_attempts or self.max_attempts,
+                run_after=run_after,
+                dedup_key=dedup_key
+            )
+            job_id = job.id
+        except Exception as e:
+            db.rollback()
+            print(f"添加后台任务失败: {e}")
+            return None
+        finally:
+            db.close()
+        self.wake(job_type)
+        return job_id
+
+    def wake(self, job_type: Optional[str] = None):
+        """
+        唤醒一个空闲的工作线程
+
+        Args:
+            job_type: 任务类型，唤醒执行该类型的线程；为空时每个线程池各唤醒一个
+        """
+        if job_type is None:
+            pools = list(self._wakeups)
+        else:
+            pools = [job_type if job_type in self.pools else None]
+        for pool in pools:
+            wakeup = self._wakeups[pool]
+            with wakeup:
+                self._pending_wakeups[pool] += 1
+                wakeup.notify()
+
+    def start(self) -> bool:
+        """启动工作线程，并回收本机上次进程未完成的任务"""
+        if self.is_running:
+            return True
+
+        db = next(self.db_factory())
+        try:
+            released = JobQueueService(db).release_running(self.host_prefix, exclude_prefix=self.worker_prefix)
+            JobQueueService(db).prune(self.history_days)
+            if released:
+                print(f"回收上次未完成的后台任务 {released} 个")
+        except Exception as e:
+            db.rollback()
+            print(f"回收后台任务失败: {e}")
+        finally:
+            db.close()
+
+        self.is_running = True
+        self._stopped.clear()
+        self._threads = [
+            threading.Thread(
+                target=self._worker_loop,
+                args=(f"{self.worker_prefix}{index}", None),
+                name=f"job-worker-{index}",
+                daemon=True
+            )
+            for index in range(self.workers)
+        ]
+        for job_type, count in self.pools.items():
+            self._threads.extend(
+                threading.Thread(
+                    target=self._worker_loop,
+                    args=(f"{self.worker_prefix}{job_type}-{index}", job_type),
+                    name=f"job-worker-{job_type}-{index}",
+                    daemon=True
+                )
+                for index in range(count)
+            )
+        self._threads.append(threading.Thread(target=self._heartbeat_loop, name="job-heartbeat", daemon=True))
+        for thread in self._threads:
+            thread.start()
+        return True
+
+    def stop(self, timeout: float = 5.0) -> bool:
+        """停止工作线程，执行中的任务等待至多 timeout 秒，未完成的任务在下次启动时回收"""
+        if not self.is_running:
+            return True
+        self.is_running = False
+        self._stopped.set()
+        for wakeup in self._wakeups.values():
+            with wakeup:
+                wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取工作线程和队列的统计信息"""
+        db = next(self.db_factory())
+        try:
+            counts = JobQueueService(db).count_by_status()
+        finally:
+            db.close()
+        with self._in_flight_lock:
+            in_flight = len(self._in_flight)
+        return {
+            "is_running": self.is_running,
+            "workers": self.workers,
+            "pools": dict(self.pools),
+            "in_flight": in_flight,
+            "counts": counts
+        }
+
+    def run_pending(self, worker_id: Optional[str] = None) -> int:
+        """
+        在当前线程中执行所有可执行的任务（测试和命令行用）
+
+        Returns:
+            执行的任务数量
+        """
+        worker_id = worker_id or f"{self.worker_prefix}inline"
+        executed = 0
+        while self._run_next(worker_id):
+            executed += 1
+        return executed
+
+    def _worker_loop(self, worker_id: str, pool: Optional[str]):
+        """工作线程主循环，pool 为单独线程池的任务类型，为None时执行共用线程池的任务"""
+        wakeup = self._wakeups[pool]
+        while self.is_running:
+            try:
+                ran = self._run_next(worker_id, self._pool_job_types(pool))
+            except Exception as e:
+                print(f"领取后台任务失败: {e}")
+                ran = False
+            if ran:
+                continue
+            with wakeup:
+                if self._pending_wakeups[pool] == 0 and self.is_running:
+                    wakeup.wait(self.poll_interval)
+                self._pending_wakeups[pool] = max(0, self._pending_wakeups[pool] - 1)
+
+    def _pool_job_types(self, pool: Optional[str]) -> List[str]:
+        """线程池执行的任务类型"""
+        if pool is not None:
+            return [pool]
+        return [job_type for job_type in self.handlers if job_type not in self.pools]
+
+    def _run_next(self, worker_id: str, job_types: Optional[List[str]] = None) -> bool:
+        """领取并执行一个任务，队列为空时返回False；job_types 为空时领取所有已注册类型的任务"""
+        job_types = list(self.handlers) if job_types is None else job_types
+        if not job_types:
+            return False
+        db = next(self.db_factory())
+        try:
+            with self._claim_lock:
+                job = JobQueueService(db).claim(worker_id, self.lease_seconds, job_types=job_types)
+            if job is None:
+                return False
+            job_id = job.id
+            job_type = job.job_type
+            payload = JobQueueService.get_payload(job)
+        finally:
+            db.close()
+
+        with self._in_flight_lock:
+            self._in_flight[job_id] = worker_id
+        try:
+            result = self.handlers[job_type](payload)
+            error = None
+        except Exception as e:
+            result = None
+            error = f"{type(e).__name__}: {e}"
+        finally:
+            with self._in_flight_lock:
+                self._in_flight.pop(job_id, None)
+
+        db = next(self.db_factory())
+        try:
+            queue = JobQueueService(db)
+            if error is None:
+                queue.complete(job_id, worker_id, result)
+            else:
+                print(f"后台任务 {job_id} ({job_type}) 执行失败: {error}")
+                queue.fail(job_id, worker_id, error, retry_delay=self.retry_delay)
+        except Exception as e:
+            db.rollback()
+            print(f"保存后台任务 {job_id} 结果失败: {e}")
+        finally:
+            db.close()
+        return True
+
+    def _heartbeat_loop(self):
+        """定期续期执行中任务的租约"""
+        interval = max(0.05, self.lease_seconds / 3)
+        while not self._stopped.wait(interval):
+            with self._in_flight_lock:
+                in_flight = list(self._in_flight.items())
+            if not in_flight:
+                continue
+            db = next(self.db_factory())
+            try:
+                queue = JobQueueService(db)
+                for job_id, worker_id in in_flight:
+                    queue.heartbeat(job_id, worker_id, self.lease_seconds)
+            except Exception as e:
+                db.rollback()
+                print(f"续期后台任务租约失败: {e}")
+            finally:
+                db.close()
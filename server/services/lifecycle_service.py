@@ -0,0 +1,156 @@
+"""
+动画生命周期服务模块
+识别已完结的动画并停止检查其RSS源，支持手动恢复
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from server.models.anime import Anime
+from server.models.link import Link
+from server.models.rss_source import RSSSource
+
+
+class LifecycleService:
+    """动画生命周期服务类"""
+
+    # 停止检查的原因
+    REASON_EPISODES_COMPLETE = "episodes_complete"  # 已获取全部集数
+    REASON_IDLE = "idle"  # RSS源长时间没有新链接
+    REASON_STATUS_COMPLETED = "status_completed"  # 动画状态被手动设为已完结
+
+    # 停止检查的方式
+    ACTION_DEACTIVATE = "deactivate"  # 停用RSS源
+    ACTION_SLOW = "slow"  # 保留RSS源，按较长的间隔检查
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_stop_reason(self, anime: Anime, now: datetime, idle_days: int) -> Optional[str]:
+        """
+        判断动画是否应停止检查RSS源
+
+        - 动画状态已是 completed
+        - 未手动恢复过，且RSS源链接覆盖了第1集到第 total_episodes 集
+        - 所有RSS源超过 idle_days 天没有新链接（从创建RSS源或手动恢复时开始计算）
+
+        Args:
+            anime: 动画
+            now: 当前时间（UTC）
+            idle_days: 判定为长时间没有更新的天数，<=0 表示不按空闲判定
+
+        Returns:
+            停止原因，不需要停止时返回None
+        """
+        if anime.status == 'completed':
+            return self.REASON_STATUS_COMPLETED
+
+        source_ids = [source.id for source in anime.rss_sources]
+        if not source_ids:
+            return None
+
+        # 手动恢复后不再按集数判定，避免刚恢复就再次停止
+        if anime.total_episodes and anime.polling_resumed_at is None:
+            episodes = self.db.query(func.count(func.distinct(Link.episode_number))).filter(
+                Link.rss_source_id.in_(source_ids),
+                Link.episode_number.between(1, anime.total_episodes)
+            ).scalar()
+            if episodes >= anime.total_episodes:
+                return self.REASON_EPISODES_COMPLETE
+
+        if idle_days > 0:
+            last_link_at = self.db.query(func.max(Link.created_at)).filter(
+                Link.rss_source_id.in_(source_ids)
+            ).scalar()
+            activity = [last_link_at, anime.polling_resumed_at] + [source.created_at for source in anime.rss_sources]
+            last_activity = max(value for value in activity if value is not None)
+            if now - last_activity > timedelta(days=idle_days):
+                return self.REASON_IDLE
+
+        return None
+
+    def run_pass(
+        self,
+        idle_days: int = 30,
+        action: str = ACTION_DEACTIVATE,
+        now: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        检查所有仍在检查RSS源的动画，停止已完结动画的检查
+
+        Args:
+            idle_days: 判定为长时间没有更新的天数
+            action: 停止方式 (deactivate: 停用RSS源, slow: 按较长的间隔检查)
+            now: 当前时间（UTC），默认为现在
+
+        Returns:
+            本次停止检查的动画列表，每项包含 anime_id、title、reason、rss_source_ids
+        """
+        now = now or datetime.utcnow()
+        animes = self.db.query(Anime).join(RSSSource, RSSSource.anime_id == Anime.id).filter(
+            Anime.polling_stopped_at.is_(None),
+            RSSSource.is_active.is_(True)
+        ).distinct().all()
+
+        stopped = []
+        for anime in animes:
+            reason = self.get_stop_reason(anime, now, idle_days)
+            if reason is None:
+                continue
+            rss_source_ids = self._stop(anime, reason, action, now)
+            stopped.append({
+                "anime_id": anime.id,
+                "title": anime.title,
+                "reason": reason,
+                "rss_source_ids": rss_source_ids
+            })
+        self.db.commit()
+        return stopped
+
+    def _stop(self, anime: Anime, reason: str, action: str, now: datetime) -> List[int]:
+        """标记动画已完结并停止检查，返回受影响的激活RSS源ID"""
+        anime.status = 'completed'
+        anime.polling_stopped_at = now
+        anime.polling_stop_reason = reason
+        rss_source_ids = []
+        for source in anime.rss_sources:
+            if not source.is_active:
+                continue
+            rss_source_ids.append(source.id)
+            if action == self.ACTION_DEACTIVATE:
+                source.is_active = False
+                source.auto_deactivated = True
+        return rss_source_ids
+
+    def resume_polling(self, anime_id: int, now: Optional[datetime] = None) -> Optional[List[int]]:
+        """
+        手动恢复动画的RSS源检查
+
+        恢复被生命周期检查停用的RSS源，动画状态改回 ongoing
+
+        Args:
+            anime_id: 动画ID
+            now: 当前时间（UTC），默认为现在
+
+        Returns:
+            恢复检查的RSS源ID列表，动画不存在时返回None
+        """
+        anime = self.db.query(Anime).filter(Anime.id == anime_id).first()
+        if not anime:
+            return None
+
+        now = now or datetime.utcnow()
+        anime.status = 'ongoing'
+        anime.polling_stopped_at = None
+        anime.polling_stop_reason = None
+        anime.polling_resumed_at = now
+        rss_source_ids = []
+        for source in anime.rss_sources:
+            if source.auto_deactivated:
+                source.is_active = True
+                source.auto_deactivated = False
+            if source.is_active:
+                rss_source_ids.append(source.id)
+        self.db.commit()
+        return rss_source_ids
@@ -2,11 +2,19 @@
 链接服务模块
 提供链接相关的业务逻辑
 """
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import or_, and_, exists, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
-from server.models.link import Link
+from server.models.link import Link, hash_url
+from server.models.download import DownloadTask
+from server.utils.release_parser import LANGUAGE_MATCHES, normalize_resolution
+
+
+# 从发布标题解析并保存在链接上的字段
+RELEASE_FIELDS = ('subgroup', 'resolution', 'video_codec', 'subtitle_language', 'version')
 
 
 class LinkService:
@@ -24,37 +32,134 @@ class LinkService:
         url: str = "",
         file_size: Optional[int] = None,
         publish_date: Optional = None,
-        meta_data: Optional[str] = None
-    ) -> Link:
-        """添加链接"""
-        link = Link(
+        meta_data: Optional[str] = None,
+        subgroup: Optional[str] = None,
+        resolution: Optional[str] = None,
+        video_codec: Optional[str] = None,
+        subtitle_language: Optional[str] = None,
+        version: Optional[int] = None
+    ) -> Optional[Link]:
+        """
+        添加链接
+
+        同一RSS源下URL已存在时由唯一索引忽略插入，返回None
+        """
+        now = datetime.utcnow()
+        stmt = sqlite_insert(Link).values(
             rss_source_id=rss_source_id,
             episode_number=episode_number,
             episode_title=episode_title,
             link_type=link_type,
             url=url,
+            url_hash=hash_url(url),
             file_size=file_size,
             publish_date=publish_date,
             is_downloaded=False,
             is_available=True,
-            meta_data=meta_data
-        )
-        self.db.add(link)
+            meta_data=meta_data,
+            subgroup=subgroup,
+            resolution=normalize_resolution(resolution) or resolution,
+            video_codec=video_codec,
+            subtitle_language=subtitle_language,
+            version=version,
+            created_at=now,
+            updated_at=now
+        ).on_conflict_do_nothing(
+            index_elements=['rss_source_id', 'url_hash']
+        ).returning(Link.id)
+        link_id = self.db.execute(stmt).scalar_one_or_none()
         self.db.commit()
-        self.db.refresh(link)
-        return link
+        if link_id is None:
+            return None
+        return self.get_link(link_id)
+    
+    def add_links_bulk(
+        self,
+        rss_source_id: int,
+        links_info: List[Dict[str, Any]]
+    ) -> List[Optional[int]]:
+        """
+        批量添加链接
+
+        所有链接通过一条 executemany 的 INSERT ... ON CONFLICT DO NOTHING 在同一事务中写入，
+        同一RSS源下已存在（或本批次内重复）的URL被忽略。
+
+        Args:
+            rss_source_id: RSS源ID
+            links_info: 链接信息列表，键与 add_link 的参数相同（RSS解析器附带发布标题解析出的字段）
+
+        Returns:
+            与输入顺序对应的新链接ID列表，被忽略的链接对应None
+        """
+        if not links_info:
+            return []
+
+        now = datetime.utcnow()
+        rows = []
+        row_indexes = []
+        seen_hashes = set()
+        for index, link_info in enumerate(links_info):
+            url = link_info.get('url', '')
+            url_hash = hash_url(url)
+            if url_hash in seen_hashes:
+                continue
+            seen_hashes.add(url_hash)
+            row_indexes.append(index)
+            release = {field: link_info.get(field) for field in RELEASE_FIELDS}
+            release['resolution'] = normalize_resolution(release['resolution']) or release['resolution']
+            rows.append({
+                'rss_source_id': rss_source_id,
+                'episode_number': link_info.get('episode_number'),
+                'episode_title': link_info.get('episode_title'),
+                'link_type': link_info.get('link_type', 'magnet'),
+                'url': url,
+                'url_hash': url_hash,
+                'file_size': link_info.get('file_size'),
+                'publish_date': link_info.get('publish_date'),
+                'is_downloaded': False,
+                'is_available': True,
+                'meta_data': link_info.get('meta_data'),
+                **release,
+                'created_at': now,
+                'updated_at': now
+            })
+
+        stmt = sqlite_insert(Link.__table__).on_conflict_do_nothing(
+            index_elements=['rss_source_id', 'url_hash']
+        ).returning(Link.__table__.c.id, Link.__table__.c.url_hash)
+        try:
+            inserted = {row.url_hash: row.id for row in self.db.execute(stmt, rows)}
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        link_ids: List[Optional[int]] = [None] * len(links_info)
+        for index, row in zip(row_indexes, rows):
+            link_ids[index] = inserted.get(row['url_hash'])
+        return link_ids
     
     def get_link(self, link_id: int) -> Optional[Link]:
         """获取单个链接"""
         return self.db.query(Link).filter(Link.id == link_id).first()
     
+    def get_links_by_ids(self, link_ids: List[int]) -> List[Link]:
+        """按ID批量获取链接，结果按ID升序"""
+        if not link_ids:
+            return []
+        return self.db.query(Link).filter(Link.id.in_(link_ids)).order_by(Link.id).all()
+    
     def get_links(
         self,
         rss_source_id: int,
         is_downloaded: Optional[bool] = None,
         link_type: Optional[str] = None,
-        page: int = 1,
-        size: int = 20
+        skip: int = 0,
+        limit: int = 20,
+        subgroup: Optional[str] = None,
+        resolution: Optional[str] = None,
+        video_codec: Optional[str] = None,
+        subtitle_language: Optional[str] = None
     ) -> List[Link]:
         """获取RSS源的所有链接，支持过滤"""
         query = self.db.query(Link).filter(Link.rss_source_id == rss_source_id)
@@ -67,12 +172,20 @@ class LinkService:
         if link_type is not None:
             query = query.filter(Link.link_type == link_type)
         
-        # 排序：按集数降序
-        query = query.order_by(Link.episode_number.desc())
+        # 字幕组、分辨率等发布信息过滤
+        query = self.filter_release(
+            query,
+            subgroup=subgroup,
+            resolution=resolution,
+            video_codec=video_codec,
+            subtitle_language=subtitle_language
+        )
+        
+        # 排序：按集数降序，集数相同时按ID降序，保证分页结果稳定
+        query = query.order_by(Link.episode_number.desc(), Link.id.desc())
         
-        # 分页：page从1开始，计算offset
-        offset = (page - 1) * size
-        query = query.offset(offset).limit(size)
+        # 分页：跳过 skip 条记录，最多返回 limit 条
+        query = query.offset(skip).limit(limit)
         
         return query.all()
     
@@ -80,7 +193,11 @@ class LinkService:
         self,
         rss_source_id: Optional[int] = None,
         is_downloaded: Optional[bool] = None,
-        link_type: Optional[str] = None
+        link_type: Optional[str] = None,
+        subgroup: Optional[str] = None,
+        resolution: Optional[str] = None,
+        video_codec: Optional[str] = None,
+        subtitle_language: Optional[str] = None
     ) -> int:
         """统计链接数量"""
         query = self.db.query(Link)
@@ -94,8 +211,104 @@ class LinkService:
         if link_type is not None:
             query = query.filter(Link.link_type == link_type)
         
+        query = self.filter_release(
+            query,
+            subgroup=subgroup,
+            resolution=resolution,
+            video_codec=video_codec,
+            subtitle_language=subtitle_language
+        )
         return query.count()
     
+    @staticmethod
+    def filter_release(
+        query,
+        subgroup: Optional[str] = None,
+        resolution: Optional[str] = None,
+        video_codec: Optional[str] = None,
+        subtitle_language: Optional[str] = None
+    ):
+        """
+        按发布标题解析出的字段过滤（均为带索引的列上的条件）
+
+        Args:
+            query: 链接查询
+            subgroup: 字幕组（规范名称）
+            resolution: 分辨率（1080p、1080P、1920x1080 均可）
+            video_codec: 视频编码 (hevc, avc, av1)
+            subtitle_language: 字幕语言，chs / cht 同时匹配简繁双语 (chs_cht)
+
+        Returns:
+            过滤后的查询
+        """
+        if subgroup is not None:
+            query = query.filter(Link.subgroup == subgroup)
+        if resolution is not None:
+            query = query.filter(Link.resolution == (normalize_resolution(resolution) or resolution))
+        if video_codec is not None:
+            query = query.filter(Link.video_codec == video_codec.lower())
+        if subtitle_language is not None:
+            language = subtitle_language.lower()
+            query = query.filter(Link.subtitle_language.in_(LANGUAGE_MATCHES.get(language, (language,))))
+        return query
+    
+    def select_auto_download_links(
+        self,
+        rss_source_id: int,
+        link_ids: List[int],
+        quality: Optional[str] = None
+    ) -> List[Link]:
+        """
+        从新链接中选出需要自动下载的链接
+
+        以下条件都在一条SQL查询中判断：
+        - RSS源设置了画质时，只下载该分辨率的链接（未识别出分辨率的链接不过滤）
+        - 同一集、同一字幕组、同一分辨率的发布视为同一资源（按版本号区分，无版本号视为v1）：
+          本批次中有更高版本时只下载最高版本，同一版本只下载ID最小的一条；
+          该资源已有同版本或更高版本的下载任务时不再下载
+
+        Args:
+            rss_source_id: RSS源ID
+            link_ids: 本次新增的链接ID
+            quality: RSS源的画质设置（default 或无法识别时不过滤）
+
+        Returns:
+            需要下载的链接，按ID升序
+        """
+        if not link_ids:
+            return []
+
+        other = aliased(Link)
+        version = func.coalesce(Link.version, 1)
+        other_version = func.coalesce(other.version, 1)
+        same_release = and_(
+            other.rss_source_id == Link.rss_source_id,
+            other.episode_number == Link.episode_number,
+            other.subgroup.is_not_distinct_from(Link.subgroup),
+            other.resolution.is_not_distinct_from(Link.resolution),
+            other.id != Link.id
+        )
+        superseded_in_batch = exists().where(
+            same_release,
+            other.id.in_(link_ids),
+            or_(other_version > version, and_(other_version == version, other.id < Link.id))
+        )
+        already_queued = exists().where(
+            same_release,
+            other_version >= version,
+            exists().where(DownloadTask.link_id == other.id)
+        )
+
+        query = self.db.query(Link).filter(
+            Link.rss_source_id == rss_source_id,
+            Link.id.in_(link_ids),
+            or_(Link.episode_number.is_(None), and_(~superseded_in_batch, ~already_queued))
+        )
+        resolution = normalize_resolution(quality)
+        if resolution:
+            query = query.filter(or_(Link.resolution == resolution, Link.resolution.is_(None)))
+        return query.order_by(Link.id).all()
+    
     def mark_as_downloaded(self, link_id: int) -> Optional[Link]:
         """标记链接为已下载"""
         link = self.get_link(link_id)
@@ -141,8 +354,8 @@ class LinkService:
         self,
         rss_source_id: int,
         link_type: str,
-        page: int = 1,
-        size: int = 20
+        skip: int = 0,
+        limit: int = 20
     ) -> List[Link]:
         """按链接类型过滤"""
         query = self.db.query(Link).filter(
@@ -152,9 +365,8 @@ class LinkService:
             )
         ).order_by(Link.episode_number.desc())
         
-        # 分页：page从1开始，计算offset
-        offset = (page - 1) * size
-        return query.offset(offset).limit(size).all()
+        # 分页：跳过 skip 条记录，最多返回 limit 条
+        return query.offset(skip).limit(limit).all()
     
     def delete_link(self, link_id: int) -> bool:
         """删除链接"""
@@ -168,10 +380,14 @@ class LinkService:
     
     def get_all_links(
         self,
-        page: int = 1,
-        size: int = 20,
+        skip: int = 0,
+        limit: int = 20,
         link_type: Optional[str] = None,
-        is_downloaded: Optional[bool] = None
+        is_downloaded: Optional[bool] = None,
+        subgroup: Optional[str] = None,
+        resolution: Optional[str] = None,
+        video_codec: Optional[str] = None,
+        subtitle_language: Optional[str] = None
     ) -> List[Link]:
         """获取所有链接（支持全局过滤）"""
         query = self.db.query(Link)
@@ -182,8 +398,15 @@ class LinkService:
         if is_downloaded is not None:
             query = query.filter(Link.is_downloaded == is_downloaded)
         
+        query = self.filter_release(
+            query,
+            subgroup=subgroup,
+            resolution=resolution,
+            video_codec=video_codec,
+            subtitle_language=subtitle_language
+        )
+        
         query = query.order_by(Link.publish_date.desc())
         
-        # 分页：page从1开始，计算offset
-        offset = (page - 1) * size
-        return query.offset(offset).limit(size).all()
\ No newline at end of file
+        # 分页：跳过 skip 条记录，最多返回 limit 条
+        return query.offset(skip).limit(limit).all()
\ No newline at end of file
@@ -0,0 +1,278 @@
+"""
+智能解析结果缓存模块
+按规范化的页面URL缓存解析出的动画信息：进程内LRU + 数据库持久化，带有效期；
+同一URL的并发解析只执行一次，其余调用方等待并共享结果
+"""
+import copy
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from server.database import get_session_local
+from server.models.smart_parse_result import SmartParseResult
+from server.utils.config import get_config_value
+from server.utils.single_flight import SingleFlight
+from server.utils.url import normalize_url
+
+
+class ParseCacheService:
+    """智能解析结果的持久化缓存服务类"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, url: str, max_age: float) -> Optional[Tuple[List[Dict], datetime]]:
+        """
+        获取有效期内的解析结果
+
+        Args:
+            url: 页面URL
+            max_age: 有效期（秒）
+
+        Returns:
+            (解析结果, 解析时间)，没有或已过期时返回None
+        """
+        record = self.db.query(SmartParseResult).filter(
+            SmartParseResult.url == normalize_url(url),
+            SmartParseResult.parsed_at >= datetime.utcnow() - timedelta(seconds=max_age)
+        ).first()
+        if record is None:
+            return None
+        return json.loads(record.results), record.parsed_at
+
+    def save(self, url: str, results: List[Dict], site_name: Optional[str] = None):
+        """
+        保存解析结果（同一URL覆盖旧结果）
+
+        Args:
+            url: 页面URL
+            results: 解析出的动画信息列表
+            site_name: 网站名称
+        """
+        values = {
+            'url': normalize_url(url),
+            'site_name': site_name,
+            'results': json.dumps(results, ensure_ascii=False),
+            'parsed_at': datetime.utcnow()
+        }
+        statement = insert(SmartParseResult).values(**values)
+        self.db.execute(statement.on_conflict_do_update(
+            index_elements=[SmartParseResult.url],
+            set_={key: value for key, value in values.items() if key != 'url'}
+        ))
+        self.db.commit()
+
+    def delete(self, url: str) -> bool:
+        """删除URL的解析结果"""
+        deleted = self.db.query(SmartParseResult).filter(
+            SmartParseResult.url == normalize_url(url)
+        ).delete(synchronize_session=False)
+        self.db.commit()
+        return deleted > 0
+
+    def purge_expired(self, max_age: float) -> int:
+        """
+        删除过期的解析结果
+
+        Args:
+            max_age: 有效期（秒）
+
+        Returns:
+            删除的记录数
+        """
+        deleted = self.db.query(SmartParseResult).filter(
+            SmartParseResult.parsed_at < datetime.utcnow() - timedelta(seconds=max_age)
+        ).delete(synchronize_session=False)
+        self.db.commit()
+        return deleted
+
+
+class SmartParseCache:
+    """
+    智能解析结果缓存
+
+    先查进程内LRU，再查数据库（smart_parse_results），都没有时解析并写入两级缓存。
+    同一URL的并发解析通过 SingleFlight 合并为一次；解析结果为空时不缓存。
+    返回的都是副本，调用方修改结果不影响缓存。
+    """
+
+    def __init__(
+        self,
+        ttl: float = 3600,
+        max_entries: int = 256,
+        session_factory: Optional[Callable[[], Session]] = None
+    ):
+        """
+        初始化解析结果缓存
+
+        Args:
+            ttl: 有效期（秒），0 表示不缓存（仍合并并发解析）
+            max_entries: 进程内缓存的最大条目数
+            session_factory: 数据库会话工厂，为空时只使用进程内缓存
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.session_factory = session_factory
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[str, Tuple[float, List[Dict]]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+
+    def get_or_parse(
+        self,
+        url: str,
+        parse: Callable[[], List[Dict]],
+        site_name: Optional[str] = None,
+        refresh: bool = False
+    ) -> Tuple[List[Dict], bool]:
+        """
+        获取URL的解析结果，没有缓存时调用 parse 解析
+
+        Args:
+            url: 页面URL
+            parse: 解析函数
+            site_name: 网站名称（保存到数据库）
+            refresh: 是否忽略缓存重新解析
+
+        Returns:
+            (解析结果的副本, 是否来自缓存)
+        """
+        key = normalize_url(url)
+        if not refresh and self.ttl > 0:
+            results = self._get(key)
+            if results is not None:
+                return copy.deepcopy(results), True
+
+        def load() -> List[Dict]:
+            results = parse()
+            if results and self.ttl > 0:
+                self._put(key, results)
+                self._save(key, results, site_name)
+            return results
+
+        with self._lock:
+            self.misses += 1
+        results, _ = self._flight.do(key, load)
+        return copy.deepcopy(results), False
+
+    def _get(self, key: str) -> Optional[List[Dict]]:
+        """依次查进程内缓存和数据库"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, results = entry
+                if now - stored_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return results
+                del self._entries[key]
+
+        stored = self._load(key)
+        if stored is None:
+            return None
+        results, parsed_at = stored
+        # 数据库中的结果按原解析时间计算剩余有效期
+        self._put(key, results, stored_at=now - (datetime.utcnow() - parsed_at).total_seconds())
+        with self._lock:
+            self.hits += 1
+        return results
+
+    def _put(self, key: str, results: List[Dict], stored_at: Optional[float] = None):
+        with self._lock:
+            self._entries[key] = (time.time() if stored_at is None else stored_at, results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _load(self, key: str) -> Optional[Tuple[List[Dict], datetime]]:
+        """从数据库读取，数据库不可用时只输出错误"""
+        if self.session_factory is None:
+            return None
+        try:
+            db = self.session_factory()
+            try:
+                return ParseCacheService(db).get(key, self.ttl)
+            finally:
+                db.close()
+        except Exception as e:
+            print(f"读取智能解析缓存失败: {e}")
+            return None
+
+    def _save(self, key: str, results: List[Dict], site_name: Optional[str]):
+        """写入数据库并清理过期的结果，数据库不可用时只输出错误"""
+        if self.session_factory is None:
+            return
+        try:
+            db = self.session_factory()
+            try:
+                parse_cache_service = ParseCacheService(db)
+                parse_cache_service.save(key, results, site_name=site_name)
+                parse_cache_service.purge_expired(self.ttl)
+            finally:
+                db.close()
+        except Exception as e:
+            print(f"保存智能解析缓存失败: {e}")
+
+    def invalidate(self, url: str):
+        """删除URL的缓存（进程内和数据库）"""
+        key = normalize_url(url)
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.session_factory is None:
+            return
+        try:
+            db = self.session_factory()
+            try:
+                ParseCacheService(db).delete(key)
+            finally:
+                db.close()
+        except Exception as e:
+            print(f"删除智能解析缓存失败: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计"""
+        with self._lock:
+            return {
+                'ttl': self.ttl,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+# 全局解析结果缓存，所有 SmartParserService 实例共用（API路由每个请求创建一个服务实例）
+_smart_parse_cache: Optional[SmartParseCache] = None
+_smart_parse_cache_lock = threading.Lock()
+
+
+def get_smart_parse_cache() -> SmartParseCache:
+    """获取全局解析结果缓存，首次调用时根据配置创建"""
+    global _smart_parse_cache
+    with _smart_parse_cache_lock:
+        if _smart_parse_cache is None:
+            session_factory = None
+            if get_config_value('smart_parser.persistent_cache', True):
+                def session_factory():
+                    return get_session_local()()
+            _smart_parse_cache = SmartParseCache(
+                ttl=float(get_config_value('smart_parser.cache_ttl', 3600)),
+                max_entries=int(get_config_value('smart_parser.cache_size', 256)),
+                session_factory=session_factory
+            )
+        return _smart_parse_cache
+
+
+def set_smart_parse_cache(cache: Optional[SmartParseCache]):
+    """替换全局解析结果缓存（为None时下次使用按配置重新创建）"""
+    global _smart_parse_cache
+    with _smart_parse_cache_lock:
+        _smart_parse_cache = cache
@@ -3,7 +3,7 @@ RSS源服务模块
 提供RSS源相关的业务逻辑
 """
 from typing import List, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from server.models.rss_source import RSSSource
 
@@ -42,8 +42,16 @@ class RSSService:
         return self.db.query(RSSSource).filter(RSSSource.id == rss_source_id).first()
     
     def get_rss_sources(self, anime_id: int) -> List[RSSSource]:
-        """获取动画的所有RSS源"""
-        return self.db.query(RSSSource).filter(RSSSource.anime_id == anime_id).all()
+        """获取动画的所有RSS源（一次查询预加载调度任务，返回 check_interval 时不再逐个查询）"""
+        return self.db.query(RSSSource).options(
+            selectinload(RSSSource.scheduler_job)
+        ).filter(RSSSource.anime_id == anime_id).all()
+    
+    def get_active_rss_sources(self) -> List[RSSSource]:
+        """获取所有激活的RSS源（预加载调度任务）"""
+        return self.db.query(RSSSource).options(
+            selectinload(RSSSource.scheduler_job)
+        ).filter(RSSSource.is_active == True).all()
     
     def update_rss_source(
         self,
@@ -64,10 +72,18 @@ class RSSService:
             update_data['name'] = name
         if url is not None:
             update_data['url'] = url
+            if url != rss_source.url:
+                # URL变化后旧的缓存校验信息不再有效
+                update_data['etag'] = None
+                update_data['last_modified'] = None
+                update_data['content_hash'] = None
+                update_data['last_entry_id'] = None
         if quality is not None:
             update_data['quality'] = quality
         if is_active is not None:
             update_data['is_active'] = is_active
+            # 手动修改激活状态后不再由生命周期检查恢复
+            update_data['auto_deactivated'] = False
         if auto_download is not None:
             update_data['auto_download'] = auto_download
         
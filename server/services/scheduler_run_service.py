@@ -0,0 +1,159 @@
+"""
+调度运行记录服务模块
+记录每次RSS检查的耗时、流量和结果，并按RSS源汇总统计
+"""
+import math
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy.orm import Session
+
+from server.models.rss_source import RSSSource
+from server.models.scheduler_run import SchedulerRun
+
+
+def percentile(sorted_values: List[float], p: float) -> Optional[float]:
+    """
+    计算百分位数（最近秩法）
+
+    Args:
+        sorted_values: 已升序排列的数值
+        p: 百分位（0-100）
+
+    Returns:
+        百分位数，没有数据时返回None
+    """
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class SchedulerRunService:
+    """调度运行记录服务类"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record_run(
+        self,
+        rss_source_id: int,
+        trigger: str,
+        started_at: datetime,
+        finished_at: datetime,
+        result: Dict[str, Any]
+    ) -> SchedulerRun:
+        """
+        根据检查结果记录一次运行
+
+        Args:
+            rss_source_id: RSS源ID
+            trigger: 触发方式 (scheduled, sweep, manual)
+            started_at: 开始时间
+            finished_at: 结束时间
+            result: check_rss_source 返回的检查结果
+        """
+        success = bool(result.get("success"))
+        run = SchedulerRun(
+            rss_source_id=rss_source_id,
+            trigger=trigger,
+            started_at=started_at,
+            finished_at=finished_at,
+            duration=result.get("duration"),
+            fetch_duration=result.get("fetch_duration"),
+            write_duration=result.get("write_duration"),
+            rate_limit_wait=result.get("rate_limit_wait"),
+            bytes_transferred=result.get("bytes_transferred") or 0,
+            entries_parsed=result.get("entries_parsed") or 0,
+            new_links_count=result.get("new_links_count") or 0,
+            not_modified=bool(result.get("not_modified")),
+            success=success,
+            error=None if success else result.get("message")
+        )
+        self.db.add(run)
+        self.db.commit()
+        return run
+
+    def get_runs(
+        self,
+        rss_source_id: Optional[int] = None,
+        limit: int = 50
+    ) -> List[SchedulerRun]:
+        """获取最近的运行记录，按开始时间倒序"""
+        query = self.db.query(SchedulerRun)
+        if rss_source_id is not None:
+            query = query.filter(SchedulerRun.rss_source_id == rss_source_id)
+        return query.order_by(SchedulerRun.started_at.desc()).limit(limit).all()
+
+    def get_metrics(
+        self,
+        hours: int = 24,
+        rss_source_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        按RSS源汇总最近一段时间内的运行指标
+
+        Args:
+            hours: 统计最近多少小时的运行
+            rss_source_id: 只统计指定RSS源
+
+        Returns:
+            汇总指标，每个RSS源包含运行次数、失败率和耗时百分位数
+        """
+        since = datetime.utcnow() - timedelta(hours=hours)
+        query = self.db.query(SchedulerRun, RSSSource.name).outerjoin(
+            RSSSource, SchedulerRun.rss_source_id == RSSSource.id
+        ).filter(SchedulerRun.started_at >= since)
+        if rss_source_id is not None:
+            query = query.filter(SchedulerRun.rss_source_id == rss_source_id)
+
+        grouped: Dict[int, Dict[str, Any]] = {}
+        for run, name in query.order_by(SchedulerRun.started_at).all():
+            group = grouped.setdefault(run.rss_source_id, {"name": name, "runs": []})
+            group["runs"].append(run)
+
+        sources = [
+            self._summarize(source_id, group["name"], group["runs"])
+            for source_id, group in sorted(grouped.items())
+        ]
+        return {
+            "since": since.isoformat(),
+            "hours": hours,
+            "total_runs": sum(source["runs"] for source in sources),
+            "sources": sources
+        }
+
+    def _summarize(self, rss_source_id: int, name: Optional[str], runs: List[SchedulerRun]) -> Dict[str, Any]:
+        """汇总单个RSS源的运行记录（runs 按开始时间升序）"""
+        durations = sorted(run.duration for run in runs if run.duration is not None)
+        fetch_durations = sorted(run.fetch_duration for run in runs if run.fetch_duration is not None)
+        rate_limit_waits = sorted(run.rate_limit_wait for run in runs if run.rate_limit_wait is not None)
+        failures = [run for run in runs if not run.success]
+        last_run = runs[-1]
+        return {
+            "rss_source_id": rss_source_id,
+            "name": name,
+            "runs": len(runs),
+            "failures": len(failures),
+            "failure_rate": len(failures) / len(runs),
+            "not_modified": sum(1 for run in runs if run.not_modified),
+            "duration_p50": percentile(durations, 50),
+            "duration_p90": percentile(durations, 90),
+            "duration_p99": percentile(durations, 99),
+            "fetch_p50": percentile(fetch_durations, 50),
+            "fetch_p90": percentile(fetch_durations, 90),
+            "rate_limit_wait_p50": percentile(rate_limit_waits, 50),
+            "rate_limit_wait_p90": percentile(rate_limit_waits, 90),
+            "rate_limit_wait_total": sum(rate_limit_waits),
+            "bytes_transferred": sum(run.bytes_transferred for run in runs),
+            "entries_parsed": sum(run.entries_parsed for run in runs),
+            "new_links_count": sum(run.new_links_count for run in runs),
+            "last_run_at": last_run.started_at.isoformat(),
+            "last_error": failures[-1].error if failures else None
+        }
+
+    def prune_runs(self, retention_days: int) -> int:
+        """删除超过保留天数的运行记录，返回删除数量"""
+        cutoff = datetime.utcnow() - timedelta(days=retention_days)
+        deleted = self.db.query(SchedulerRun).filter(SchedulerRun.started_at < cutoff).delete()
+        self.db.commit()
+        return deleted
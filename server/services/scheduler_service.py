@@ -2,22 +2,63 @@
 调度服务模块
 提供定时任务调度功能
 """
-from typing import Optional, Dict, Any, List
-from datetime import datetime
+import math
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from typing import Optional, Dict, Any, List, Tuple
+from datetime import datetime, timezone
+from urllib.parse import urlparse
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from sqlalchemy.orm import Session
 
+from server.models.anime import Anime
+from server.models.rss_source import RSSSource
+from server.models.scheduler_job import SchedulerJob
 from server.services.rss_service import RSSService
-from server.services.link_service import LinkService
+from server.services.aggregate_feed_service import AggregateFeedService
+from server.services.cadence_service import CadenceService, compute_poll_interval
+from server.services.lifecycle_service import LifecycleService
+from server.services.link_service import LinkService, RELEASE_FIELDS
 from server.services.download_service import DownloadService
 from server.services.downloader_service import DownloaderService
+from server.services.scheduler_run_service import SchedulerRunService
 from server.site_parsers.base_rss_parser import BaseRSSParser
-from server.site_parsers.mikan_rss_parser import MikanRSSParser
+from server.site_parsers.registry import ParserRegistry, DEFAULT_RSS_PARSERS
+from server.utils.config import get_config_value
+from server.utils.timer_heap import TimerHeap
+from server.utils.circuit_breaker import CircuitBreaker
+from server.utils.http_client import is_transport_error
+from server.utils.single_flight import SingleFlight
+from server.utils.url import normalize_url
 
 
 class SchedulerService:
-    """调度服务类"""
+    """调度服务类
+
+    每个RSS源的定时检查由一个最小堆定时器统一管理，只在最早到期的RSS源到期时唤醒，
+    到期的检查提交到有界线程池执行。全量检查任务仍由 APScheduler 按固定间隔触发。
+    接入后台任务队列后，到期的检查、自动下载和下载状态同步改为写入持久化队列，由工作线程执行，
+    进程重启后未完成的任务继续执行。
+    """
+
+    CHECK_ALL_JOB_ID = "rss_check_all"
+    LIFECYCLE_JOB_ID = "anime_lifecycle"
+    DOWNLOAD_SYNC_JOB_ID = "download_sync"
+    AGGREGATE_FEED_JOB_ID = "aggregate_feed_check"
+    # 由 APScheduler 按固定间隔触发的任务
+    PERIODIC_JOB_IDS = (CHECK_ALL_JOB_ID, LIFECYCLE_JOB_ID, DOWNLOAD_SYNC_JOB_ID, AGGREGATE_FEED_JOB_ID)
+
+    # 后台任务类型及优先级（数值越大越先执行）
+    JOB_TYPE_RSS_CHECK = "rss_check"
+    JOB_TYPE_DOWNLOAD_START = "download_start"
+    JOB_TYPE_DOWNLOAD_SYNC = "download_sync"
+    PRIORITY_MANUAL_CHECK = 20
+    PRIORITY_DOWNLOAD_START = 10
+    PRIORITY_SCHEDULED_CHECK = 0
+    PRIORITY_DOWNLOAD_SYNC = -10
     
     def __init__(self, db_factory):
         """
@@ -31,10 +72,54 @@ class SchedulerService:
         self.is_running = False
         self.jobs = {}  # 存储任务信息 {job_id: job_info}
 
-        # 初始化RSS解析器列表
-        self.rss_parsers: List[BaseRSSParser] = [
-            MikanRSSParser(),
-        ]
+        # 全量检查的线程池大小，以及抓取、写入两个阶段的并发上限
+        # SQLite 同一时间只允许一个写事务，写入并发默认为1
+        self.max_workers = max(1, int(get_config_value('scheduler.max_workers', 8)))
+        self.fetch_concurrency = max(1, int(get_config_value('scheduler.fetch_concurrency', 4)))
+        self.write_concurrency = max(1, int(get_config_value('scheduler.write_concurrency', 1)))
+        self._fetch_semaphore = threading.BoundedSemaphore(self.fetch_concurrency)
+        self._write_semaphore = threading.BoundedSemaphore(self.write_concurrency)
+        self._sweep_lock = threading.Lock()
+
+        # RSS源检查任务的定时器堆及执行线程池
+        # jitter_ratio 控制各RSS源检查时间在间隔内错开的比例
+        self.jitter_ratio = min(1.0, max(0.0, float(get_config_value('scheduler.jitter_ratio', 0.5))))
+        self.timer = TimerHeap(self._on_job_due, name="rss-check-timer")
+        # 重启时错过检查时间的任务在该时间窗口（秒）内依次错开执行
+        self.startup_stagger = max(0.0, float(get_config_value('scheduler.startup_stagger', 120)))
+        # 连续失败的RSS源按检查间隔指数退避（不超过 backoff_max 秒），
+        # 同一主机连续失败过多时熔断，暂停该主机下所有RSS源的检查并定期探测
+        self.backoff_max = max(60, int(get_config_value('scheduler.backoff_max', 86400)))
+        self.circuit_breaker = CircuitBreaker(
+            failure_threshold=int(get_config_value('scheduler.circuit_failure_threshold', 5)),
+            recovery_timeout=float(get_config_value('scheduler.circuit_recovery_timeout', 300)),
+            max_recovery_timeout=float(get_config_value('scheduler.circuit_max_recovery_timeout', 3600))
+        )
+        # 根据历史链接的发布时间推算更新周期：预计更新时间前后 adaptive_window 秒内
+        # 按 adaptive_min_interval 检查，其余时间拉长到不超过 adaptive_max_interval
+        self.adaptive_interval = bool(get_config_value('scheduler.adaptive_interval', True))
+        self.adaptive_min_interval = max(60, int(get_config_value('scheduler.adaptive_min_interval', 600)))
+        self.adaptive_max_interval = max(
+            self.adaptive_min_interval,
+            int(get_config_value('scheduler.adaptive_max_interval', 43200))
+        )
+        self.adaptive_window = max(0, int(get_config_value('scheduler.adaptive_window', 3600)))
+        # 已完结动画的处理：deactivate 停用RSS源，slow 按 slow_interval 检查
+        self.lifecycle_action = get_config_value('lifecycle.action', LifecycleService.ACTION_DEACTIVATE)
+        self.lifecycle_idle_days = int(get_config_value('lifecycle.idle_days', 30))
+        self.lifecycle_slow_interval = max(60, int(get_config_value('lifecycle.slow_interval', 86400)))
+        # 检查运行记录的保留天数
+        self.run_history_days = max(1, int(get_config_value('scheduler.run_history_days', 30)))
+        self.check_executor: Optional[ThreadPoolExecutor] = None
+        # 停止调度器时等待执行中的定时检查结束的最长时间（秒）；停止后定时检查不再写入数据库
+        self.stop_timeout = max(0.0, float(get_config_value('scheduler.stop_timeout', 10)))
+        self._check_futures = set()
+        self._stopping = threading.Event()
+        # 后台任务队列（JobWorkerService），未接入时检查和下载在线程池或当前线程中执行
+        self.job_queue = None
+
+        # RSS解析器注册表：按主机名分发，配置 site_parsers.rss 中的解析器在首次使用时导入
+        self.rss_parser_registry = ParserRegistry.from_config('site_parsers.rss', DEFAULT_RSS_PARSERS)
 
     def _get_rss_parser(self, url: str) -> Optional[BaseRSSParser]:
         """
@@ -46,19 +131,79 @@ class SchedulerService:
         Returns:
             对应的解析器，如果没有找到返回None
         """
-        for parser in self.rss_parsers:
-            if parser.can_parse(url):
-                return parser
-        return None
+        return self.rss_parser_registry.get_parser(url)
 
-    def register_rss_parser(self, parser: BaseRSSParser):
+    def register_rss_parser(self, parser: BaseRSSParser, hosts: Optional[List[str]] = None):
         """
         注册新的RSS解析器
 
         Args:
             parser: RSS解析器实例
+            hosts: 解析器负责的主机名，为空时按 can_parse 判断
+        """
+        self.rss_parser_registry.register(parser, hosts)
+
+    def attach_job_queue(self, job_queue):
+        """
+        接入后台任务队列，并注册检查、下载和状态同步的处理函数
+
+        RSS检查使用单独的 max_workers 个工作线程，不与下载、智能添加等任务共用线程
+
+        Args:
+            job_queue: 后台任务工作线程服务（JobWorkerService）
+        """
+        job_queue.register_handler(self.JOB_TYPE_RSS_CHECK, self._handle_check_job, workers=self.max_workers)
+        job_queue.register_handler(self.JOB_TYPE_DOWNLOAD_START, self._handle_download_start_job)
+        job_queue.register_handler(self.JOB_TYPE_DOWNLOAD_SYNC, lambda payload: self.sync_downloads())
+        self.job_queue = job_queue
+
+    def enqueue_check(self, rss_source_id: int, auto_download: bool = False) -> Optional[int]:
+        """
+        把手动检查加入后台任务队列，同一RSS源未执行的手动检查只保留一个
+
+        Returns:
+            后台任务ID，未接入队列或入队失败时返回None
         """
-        self.rss_parsers.append(parser)
+        if self.job_queue is None:
+            return None
+        return self.job_queue.enqueue(
+            self.JOB_TYPE_RSS_CHECK,
+            {"rss_source_id": rss_source_id, "auto_download": auto_download, "trigger": "manual"},
+            priority=self.PRIORITY_MANUAL_CHECK,
+            dedup_key=f"rss_check:{rss_source_id}:manual"
+        )
+
+    def _handle_check_job(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """后台任务：检查RSS源，定时检查执行后安排下一次检查"""
+        rss_source_id = payload["rss_source_id"]
+        if payload.get("trigger") == "scheduled":
+            if not self.is_running:
+                # 调度器未运行时任务信息尚未恢复，抛出异常由队列稍后重试，避免被记为成功
+                raise RuntimeError("调度器未运行")
+            job_id = f"rss_check_{rss_source_id}"
+            info = self.jobs.get(job_id)
+            # 排队期间任务可能已被移除或暂停
+            if info is None or info.get("paused"):
+                return {"success": False, "skipped": True, "message": "检查任务已移除或暂停"}
+            result = self._run_check_job(job_id, info)
+        else:
+            result = self.check_rss_source(rss_source_id, payload.get("auto_download", False))
+        return {
+            key: result.get(key)
+            for key in ("success", "message", "rss_source_id", "new_links_count", "not_modified", "checked_at")
+            if key in result
+        }
+
+    def _handle_download_start_job(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """后台任务：开始下载，下载器出错时抛出异常由队列重试"""
+        db = next(self.db_factory())
+        try:
+            task = DownloadService(db).start_download(payload["task_id"])
+            if task is None:
+                return {"task_id": payload["task_id"], "not_found": True}
+            return {"task_id": task.id, "status": task.status}
+        finally:
+            db.close()
 
     def get_supported_rss_sites(self) -> List[str]:
         """
@@ -67,34 +212,378 @@ class SchedulerService:
         Returns:
             支持的网站名称列表
         """
-        return [parser.get_site_name() for parser in self.rss_parsers]
+        return self.rss_parser_registry.get_site_names()
 
     def start_scheduler(self) -> bool:
-        """启动调度器"""
+        """启动调度器，并从任务表恢复RSS检查任务"""
         if self.is_running:
             return True
         
         try:
             self.scheduler.start()
+            self._stopping.clear()
+            self.check_executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="rss-check"
+            )
+            self.timer.start()
             self.is_running = True
+            self.prune_run_history()
+            self.rebuild_check_jobs()
             return True
         except Exception as e:
             print(f"启动调度器失败: {e}")
             return False
     
     def stop_scheduler(self) -> bool:
-        """停止调度器"""
+        """
+        停止调度器
+
+        取消尚未开始的定时检查，执行中的检查至多等待 stop_timeout 秒；
+        仍未结束的定时检查在写入阶段前放弃，不会在停止后写入数据库
+        """
         if not self.is_running:
             return True
         
         try:
-            self.scheduler.shutdown()
             self.is_running = False
+            self._stopping.set()
+            self.timer.stop()
+            self.scheduler.shutdown()
+            if self.check_executor is not None:
+                self.check_executor.shutdown(wait=False, cancel_futures=True)
+                self.check_executor = None
+            pending = [future for future in list(self._check_futures) if not future.done()]
+            if pending:
+                _, not_done = wait(pending, timeout=self.stop_timeout)
+                if not_done:
+                    print(f"停止调度器时仍有 {len(not_done)} 个检查未结束，将放弃写入")
             self.jobs.clear()
             return True
         except Exception as e:
             print(f"停止调度器失败: {e}")
             return False
+
+    def rebuild_check_jobs(self, now: Optional[float] = None) -> int:
+        """
+        从任务表恢复激活RSS源的定时检查任务
+
+        未错过的任务沿用原来的检查时间点；停机期间错过检查时间的任务
+        在 startup_stagger 秒内依次错开执行，避免重启后同时抓取所有RSS源。
+        由聚合RSS源更新的RSS源不参与错开执行，到期时也不单独抓取
+
+        Args:
+            now: 当前时间戳（测试用）
+
+        Returns:
+            恢复的任务数量
+        """
+        db = next(self.db_factory())
+        try:
+            rows = db.query(SchedulerJob, RSSSource.last_checked_at, Anime.polling_stopped_at).join(
+                RSSSource, SchedulerJob.rss_source_id == RSSSource.id
+            ).join(
+                Anime, RSSSource.anime_id == Anime.id
+            ).filter(RSSSource.is_active == True).all()
+            covered_ids = AggregateFeedService(db).get_covered_source_ids()
+
+            now = time.time() if now is None else now
+            overdue = []
+            for job, last_checked_at, polling_stopped_at in rows:
+                state = {
+                    "consecutive_failures": job.consecutive_failures or 0,
+                    "backoff_until": job.backoff_until,
+                    "slowed": polling_stopped_at is not None
+                }
+                if job.is_paused:
+                    self._schedule_check_job(job.rss_source_id, job.interval, job.auto_download, paused=True, **state)
+                    continue
+                if job.rss_source_id in covered_ids:
+                    # 保留任务，解除绑定或停用聚合RSS源后恢复单独检查
+                    self._schedule_check_job(job.rss_source_id, job.interval, job.auto_download, **state)
+                    continue
+                if job.backoff_until:
+                    # 仍在失败退避期内的任务等到退避结束
+                    backoff_due = job.backoff_until.replace(tzinfo=timezone.utc).timestamp()
+                    if backoff_due > now:
+                        self._schedule_check_job(job.rss_source_id, job.interval, job.auto_download, due=backoff_due, **state)
+                        continue
+                if last_checked_at:
+                    last_checked = last_checked_at.replace(tzinfo=timezone.utc).timestamp()
+                    interval = self._effective_interval(job.interval, state["slowed"])
+                    due = self._next_run_time(job.rss_source_id, interval, last_checked)
+                    if due > now:
+                        self._schedule_check_job(job.rss_source_id, job.interval, job.auto_download, due=due, **state)
+                        continue
+                else:
+                    due = now
+                overdue.append((due, job.rss_source_id, job, state))
+
+            # 错过的任务按原定时间先后依次错开
+            overdue.sort(key=lambda item: (item[0], item[1]))
+            step = self.startup_stagger / len(overdue) if overdue else 0
+            for index, (_, _, job, state) in enumerate(overdue):
+                self._schedule_check_job(
+                    job.rss_source_id,
+                    job.interval,
+                    job.auto_download,
+                    due=now + index * step,
+                    **state
+                )
+            return len(rows)
+        finally:
+            db.close()
+
+    def prune_run_history(self) -> int:
+        """删除超过保留天数的检查运行记录"""
+        db = next(self.db_factory())
+        try:
+            return SchedulerRunService(db).prune_runs(self.run_history_days)
+        except Exception as e:
+            db.rollback()
+            print(f"清理检查运行记录失败: {e}")
+            return 0
+        finally:
+            db.close()
+
+    def _save_job(self, rss_source_id: int, **fields) -> bool:
+        """
+        保存RSS源的任务记录，不存在时创建
+
+        Args:
+            rss_source_id: RSS源ID
+            **fields: 需要更新的字段
+
+        Returns:
+            是否成功，RSS源不存在时返回False
+        """
+        db = next(self.db_factory())
+        try:
+            job = db.query(SchedulerJob).filter(SchedulerJob.rss_source_id == rss_source_id).first()
+            if job is None:
+                if not RSSService(db).get_rss_source(rss_source_id):
+                    print(f"RSS源 {rss_source_id} 不存在，无法保存任务")
+                    return False
+                job = SchedulerJob(rss_source_id=rss_source_id)
+                db.add(job)
+            for key, value in fields.items():
+                setattr(job, key, value)
+            db.commit()
+            return True
+        except Exception as e:
+            db.rollback()
+            print(f"保存检查任务失败: {e}")
+            return False
+        finally:
+            db.close()
+
+    def _delete_job(self, rss_source_id: int):
+        """删除RSS源的任务记录"""
+        db = next(self.db_factory())
+        try:
+            db.query(SchedulerJob).filter(SchedulerJob.rss_source_id == rss_source_id).delete()
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"删除检查任务失败: {e}")
+        finally:
+            db.close()
+
+    def _job_offset(self, rss_source_id: int, interval: int) -> float:
+        """根据RSS源ID计算确定性的相位偏移，使各RSS源的检查时间错开"""
+        fraction = (zlib.crc32(f"rss_check_{rss_source_id}".encode()) % 10000) / 10000
+        return fraction * interval * self.jitter_ratio
+
+    def _next_run_time(self, rss_source_id: int, interval: int, after: float) -> float:
+        """计算 after 之后该RSS源的下一个检查时间点"""
+        offset = self._job_offset(rss_source_id, interval)
+        slots = math.floor((after - offset) / interval) + 1
+        return slots * interval + offset
+
+    def _schedule_check_job(
+        self,
+        rss_source_id: int,
+        interval: int,
+        auto_download: bool,
+        due: Optional[float] = None,
+        paused: bool = False,
+        consecutive_failures: int = 0,
+        backoff_until: Optional[datetime] = None,
+        slowed: bool = False
+    ) -> str:
+        """登记任务信息，未暂停的任务放入定时器堆"""
+        job_id = f"rss_check_{rss_source_id}"
+        self.jobs[job_id] = {
+            "rss_source_id": rss_source_id,
+            "interval": interval,
+            "auto_download": auto_download,
+            "paused": paused,
+            "consecutive_failures": consecutive_failures,
+            "backoff_until": backoff_until,
+            "cadence": None,
+            "slowed": slowed,
+            "created_at": datetime.utcnow()
+        }
+        if paused:
+            self.timer.cancel(job_id)
+            return job_id
+        if due is None:
+            due = self._next_run_time(rss_source_id, interval, time.time())
+        self.timer.schedule(job_id, due)
+        return job_id
+
+    def _on_job_due(self, job_id: str):
+        """
+        定时器回调：将到期的检查任务加入后台任务队列，未接入队列时提交到检查线程池
+
+        同一RSS源排队中的定时检查只保留一个，执行后才安排下一次检查。
+        由聚合RSS源更新的RSS源不单独抓取，直接安排下一次检查
+        """
+        info = self.jobs.get(job_id)
+        if not info or info.get("paused"):
+            return
+        if self._is_covered(info["rss_source_id"]):
+            if self.is_running:
+                self.timer.schedule(job_id, self._next_due(info, None))
+            return
+        if self.job_queue is not None:
+            queued = self.job_queue.enqueue(
+                self.JOB_TYPE_RSS_CHECK,
+                {"rss_source_id": info["rss_source_id"], "trigger": "scheduled"},
+                priority=self.PRIORITY_SCHEDULED_CHECK,
+                dedup_key=f"rss_check:{info['rss_source_id']}:scheduled"
+            )
+            if queued is not None:
+                return
+        executor = self.check_executor
+        if executor is None:
+            return
+        try:
+            future = executor.submit(self._run_check_job, job_id, info)
+        except RuntimeError:
+            # 调度器正在停止，线程池已关闭
+            return
+        self._check_futures.add(future)
+        future.add_done_callback(self._check_futures.discard)
+
+    def _run_check_job(self, job_id: str, info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """执行定时检查，结束后根据检查结果安排下一次检查"""
+        result = None
+        try:
+            # 排队期间RSS源可能已绑定到聚合RSS源
+            if self._is_covered(info["rss_source_id"]):
+                result = {
+                    "success": True,
+                    "skipped": True,
+                    "message": "RSS源由聚合RSS源更新，跳过单独检查",
+                    "rss_source_id": info["rss_source_id"]
+                }
+                return result
+            result = self._check_rss_source(info["rss_source_id"], info["auto_download"])
+            return result
+        finally:
+            # 任务在检查期间可能已被移除、暂停或重新添加
+            if self.is_running and self.jobs.get(job_id) is info and not info.get("paused"):
+                self.timer.schedule(job_id, self._next_due(info, result))
+
+    def _is_covered(self, rss_source_id: int) -> bool:
+        """RSS源是否由激活的聚合RSS源更新，查询失败时按未绑定处理"""
+        db = next(self.db_factory())
+        try:
+            return AggregateFeedService(db).is_source_covered(rss_source_id)
+        except Exception as e:
+            print(f"查询RSS源绑定的聚合RSS源失败: {e}")
+            return False
+        finally:
+            db.close()
+
+    def _next_due(self, info: Dict[str, Any], result: Optional[Dict[str, Any]]) -> float:
+        """
+        计算定时任务的下一次检查时间
+
+        主机熔断时跳到熔断器允许探测之后的检查时间点；处于失败退避期时等到退避结束；
+        能推算出更新规律时按规律计算；否则按检查间隔计算。已完结动画的RSS源按 lifecycle.slow_interval 检查
+        """
+        now = time.time()
+        interval = self._effective_interval(info["interval"], info.get("slowed"))
+        if result and result.get("circuit_open"):
+            return self._next_run_time(info["rss_source_id"], interval, max(now, result["retry_at"]))
+        if info.get("backoff_until"):
+            return max(now, info["backoff_until"].replace(tzinfo=timezone.utc).timestamp())
+        if self.adaptive_interval and not info.get("slowed"):
+            delay = self._adaptive_delay(info)
+            if delay is not None:
+                return now + delay
+        return self._next_run_time(info["rss_source_id"], interval, now)
+
+    def _effective_interval(self, interval: int, slowed: bool) -> int:
+        """获取实际使用的检查间隔，已完结动画的RSS源不短于 lifecycle.slow_interval"""
+        return max(interval, self.lifecycle_slow_interval) if slowed else interval
+
+    def _adaptive_delay(self, info: Dict[str, Any]) -> Optional[float]:
+        """根据RSS源的更新规律计算距离下一次检查的秒数，没有规律时返回None"""
+        db = next(self.db_factory())
+        try:
+            now = datetime.utcnow()
+            cadence = CadenceService(db).get_cadence(info["rss_source_id"], now, window=self.adaptive_window)
+        except Exception as e:
+            print(f"推算RSS源 {info['rss_source_id']} 更新规律失败: {e}")
+            cadence = None
+        finally:
+            db.close()
+
+        if cadence is None:
+            info["cadence"] = None
+            return None
+        delay = compute_poll_interval(
+            cadence,
+            now,
+            self.adaptive_min_interval,
+            self.adaptive_max_interval,
+            self.adaptive_window
+        )
+        info["cadence"] = {
+            "period": cadence["period"],
+            "last_release": cadence["last_release"],
+            "next_release": cadence["next_release"],
+            "poll_interval": delay
+        }
+        return delay
+
+    def _update_failure_state(self, rss_source_id: int, result: Dict[str, Any]):
+        """
+        根据检查结果更新RSS源的连续失败次数和退避时间
+
+        第 n 次连续失败后等待 interval * 2^n 秒（不超过 backoff_max），成功后清零
+        """
+        info = self.jobs.get(f"rss_check_{rss_source_id}")
+        if info is None:
+            return
+        if result.get("success"):
+            if not info.get("consecutive_failures"):
+                return
+            failures = 0
+            backoff_until = None
+        else:
+            failures = info.get("consecutive_failures", 0) + 1
+            delay = max(info["interval"], min(info["interval"] * 2 ** failures, self.backoff_max))
+            backoff_until = datetime.utcfromtimestamp(time.time() + delay)
+        info["consecutive_failures"] = failures
+        info["backoff_until"] = backoff_until
+
+        # 只更新已有的任务记录，检查期间任务可能已被移除
+        db = next(self.db_factory())
+        try:
+            db.query(SchedulerJob).filter(SchedulerJob.rss_source_id == rss_source_id).update({
+                SchedulerJob.consecutive_failures: failures,
+                SchedulerJob.backoff_until: backoff_until
+            })
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"保存检查失败状态失败: {e}")
+        finally:
+            db.close()
     
     def add_check_job(
         self,
@@ -104,6 +593,8 @@ class SchedulerService:
     ) -> Optional[str]:
         """
         添加RSS源检查任务
+
+        任务保存在任务表中，调度器重启后据此恢复
         
         Args:
             rss_source_id: RSS源ID
@@ -117,70 +608,122 @@ class SchedulerService:
             print("调度器未运行，无法添加任务")
             return None
         
-        job_id = f"rss_check_{rss_source_id}"
-        
-        # 如果任务已存在，先移除
-        if job_id in self.jobs:
-            self.remove_check_job(job_id)
-        
-        try:
-            # 添加定时任务
-            self.scheduler.add_job(
-                self._check_rss_source,
-                trigger=IntervalTrigger(seconds=interval),
-                id=job_id,
-                args=[rss_source_id, auto_download],
-                name=f"检查RSS源 {rss_source_id}",
-                replace_existing=True
-            )
-            
-            self.jobs[job_id] = {
-                "rss_source_id": rss_source_id,
-                "interval": interval,
-                "auto_download": auto_download,
-                "created_at": datetime.utcnow()
-            }
-            
-            return job_id
-        except Exception as e:
-            print(f"添加检查任务失败: {e}")
+        if not self._save_job(
+            rss_source_id,
+            interval=interval,
+            auto_download=auto_download,
+            is_paused=False,
+            consecutive_failures=0,
+            backoff_until=None
+        ):
             return None
+        
+        return self._schedule_check_job(rss_source_id, interval, auto_download)
     
     def remove_check_job(self, job_id: str) -> bool:
         """移除检查任务"""
-        try:
-            self.scheduler.remove_job(job_id)
-            if job_id in self.jobs:
-                del self.jobs[job_id]
-            return True
-        except Exception as e:
-            print(f"移除检查任务失败: {e}")
+        if job_id in self.PERIODIC_JOB_IDS:
+            try:
+                self.scheduler.remove_job(job_id)
+                self.jobs.pop(job_id, None)
+                return True
+            except Exception as e:
+                print(f"移除检查任务失败: {e}")
+                return False
+
+        info = self.jobs.pop(job_id, None)
+        if info is None:
+            print(f"移除检查任务失败: 任务 {job_id} 不存在")
             return False
+        self.timer.cancel(job_id)
+        self._delete_job(info["rss_source_id"])
+        return True
     
-    def check_rss_source(self, rss_source_id: int, auto_download: bool = False) -> Dict[str, Any]:
+    def check_rss_source(
+        self,
+        rss_source_id: int,
+        auto_download: bool = False,
+        trigger: str = "manual",
+        shared_feeds: Optional[SingleFlight] = None
+    ) -> Dict[str, Any]:
         """
-        检查RSS源的新链接
+        检查RSS源的新链接，并记录本次运行
+
+        检查分为抓取解析和写入数据库两个阶段，分别受抓取并发数和写入并发数限制
 
         Args:
             rss_source_id: RSS源ID
             auto_download: 是否自动下载新链接
+            trigger: 触发方式 (scheduled, sweep, manual)
+            shared_feeds: 全量检查时共享抓取结果的单飞调用
 
         Returns:
             检查结果
         """
+        started_at = datetime.utcnow()
+        result = self._execute_check(
+            rss_source_id,
+            auto_download,
+            shared_feeds,
+            cancellable=trigger == "scheduled"
+        )
+        # RSS源不存在、主机熔断或调度器已停止时没有实际检查，不记录也不计入失败
+        if not result.get("not_found") and not result.get("circuit_open") and not result.get("cancelled"):
+            self._record_run(rss_source_id, trigger, started_at, result)
+            self._update_failure_state(rss_source_id, result)
+        return result
+
+    def _record_run(
+        self,
+        rss_source_id: int,
+        trigger: str,
+        started_at: datetime,
+        result: Dict[str, Any]
+    ):
+        """记录一次检查的运行指标，记录失败不影响检查结果"""
+        with self._write_semaphore:
+            db = next(self.db_factory())
+            try:
+                SchedulerRunService(db).record_run(
+                    rss_source_id,
+                    trigger,
+                    started_at,
+                    datetime.utcnow(),
+                    result
+                )
+            except Exception as e:
+                db.rollback()
+                print(f"记录检查运行失败: {e}")
+            finally:
+                db.close()
+
+    def _execute_check(
+        self,
+        rss_source_id: int,
+        auto_download: bool,
+        shared_feeds: Optional[SingleFlight] = None,
+        cancellable: bool = False
+    ) -> Dict[str, Any]:
+        """
+        执行一次RSS源检查（抓取解析 + 写入数据库）
+
+        传入 shared_feeds 时，同一规范化地址的RSS源共享一次抓取解析的结果；
+        cancellable 为True（定时检查）时，调度器停止后不再进入写入阶段
+        """
+        started = time.monotonic()
+
+        # 读取RSS源信息，不在抓取期间占用数据库会话
         db = next(self.db_factory())
         try:
             rss_service = RSSService(db)
-            link_service = LinkService(db)
-            download_service = DownloadService(db)
-            downloader_service = DownloaderService(db)
 
             # 获取RSS源
             rss_source = rss_service.get_rss_source(rss_source_id)
             if not rss_source:
                 return {
                     "success": False,
-                    "message": f"RSS源 {rss_source_id} 不存在"
+                    "message": f"RSS源 {rss_source_id} 不存在",
+                    "not_found": True
                 }
 
             # 检查RSS源是否激活
@@ -190,90 +733,187 @@ class SchedulerService:
                     "message": f"RSS源 {rss_source_id} 未激活"
                 }
 
-            # 获取已存在的链接URL
-            existing_links = link_service.get_links(rss_source_id)
-            existing_urls = [link.url for link in existing_links]
+            rss_url = rss_source.url
+            validators = {
+                'etag': rss_source.etag,
+                'last_modified': rss_source.last_modified,
+                'content_hash': rss_source.content_hash
+            }
+            last_entry_id = rss_source.last_entry_id
+        except Exception as e:
+            return {
+                "success": False,
+                "message": f"检查RSS源失败: {str(e)}"
+            }
+        finally:
+            db.close()
 
-            # 根据RSS源URL获取对应的解析器
-            rss_parser = self._get_rss_parser(rss_source.url)
-            if not rss_parser:
-                return {
-                    "success": False,
-                    "message": f"不支持的RSS源: {rss_source.url}"
-                }
+        # 根据RSS源URL获取对应的解析器
+        rss_parser = self._get_rss_parser(rss_url)
+        if not rss_parser:
+            return {
+                "success": False,
+                "message": f"不支持的RSS源: {rss_url}"
+            }
 
-            # 解析RSS源
-            parse_result = rss_parser.parse_rss(rss_source.url, existing_urls)
+        # 主机熔断期间不发起请求
+        host = urlparse(rss_url).hostname or rss_url
+        if not self.circuit_breaker.allow_request(host):
+            return {
+                "success": False,
+                "message": f"主机 {host} 连续失败，已暂停检查",
+                "circuit_open": True,
+                "retry_at": self.circuit_breaker.get_retry_at(host) or time.time()
+            }
 
-            if not parse_result.get('success'):
-                return {
-                    "success": False,
-                    "message": f"RSS解析失败: {parse_result.get('error', '未知错误')}"
-                }
+        # 阶段1：抓取并解析RSS源
+        fetch_started = time.monotonic()
+        coalesced = False
+        if shared_feeds is None:
+            parse_result = self._fetch_feed(rss_parser, rss_url, host, validators, last_entry_id)
+        else:
+            parse_result, coalesced = self._fetch_shared_feed(
+                shared_feeds, rss_parser, rss_url, host, validators
+            )
+        fetch_duration = time.monotonic() - fetch_started
 
-            # 更新最后检查时间
-            rss_source.last_checked_at = datetime.utcnow()
-            db.commit()
+        if not parse_result.get('success'):
+            return {
+                "success": False,
+                "message": f"RSS解析失败: {parse_result.get('error', '未知错误')}",
+                "fetch_duration": fetch_duration,
+                "duration": time.monotonic() - started
+            }
 
-            # 获取新链接
-            new_links_info = parse_result.get('new_links', [])
-            new_links_count = len(new_links_info)
+        if cancellable and self._stopping.is_set():
+            return {
+                "success": False,
+                "message": "调度器已停止，放弃写入",
+                "cancelled": True
+            }
 
-            if new_links_count == 0:
-                return {
-                    "success": True,
-                    "message": "检查完成，未发现新链接",
-                    "rss_source_id": rss_source_id,
-                    "new_links_count": 0,
-                    "new_links": [],
-                    "checked_at": datetime.utcnow().isoformat()
-                }
+        # 阶段2：写入数据库
+        write_started = time.monotonic()
+        with self._write_semaphore:
+            if parse_result.get('not_modified'):
+                # 内容未变化，只记录检查时间和校验信息
+                result = self._mark_not_modified(rss_source_id, parse_result.get('validators'))
+            else:
+                result = self._save_new_links(
+                    rss_source_id,
+                    parse_result.get('links', []),
+                    auto_download,
+                    validators=parse_result.get('validators'),
+                    latest_entry_id=parse_result.get('latest_entry_id')
+                )
+        result["write_duration"] = time.monotonic() - write_started
+        # 释放写入并发后再开始下载，访问下载器不占用写入并发
+        self._start_downloads(result.pop("download_task_ids", []))
+        result["fetch_duration"] = fetch_duration
+        result["duration"] = time.monotonic() - started
+        result["bytes_transferred"] = parse_result.get('bytes_transferred', 0)
+        result["entries_parsed"] = parse_result.get('entries_parsed', 0)
+        result["rate_limit_wait"] = parse_result.get('rate_limit_wait', 0.0)
+        result["coalesced"] = coalesced
+        return result
 
-            # 添加新链接到数据库
-            added_links = []
-            for link_info in new_links_info:
-                link = link_service.add_link(
-                    rss_source_id=rss_source_id,
-                    episode_number=link_info.get('episode_number'),
-                    episode_title=link_info.get('episode_title'),
-                    link_type=link_info.get('link_type', 'magnet'),
-                    url=link_info.get('url', ''),
-                    file_size=link_info.get('file_size'),
-                    publish_date=link_info.get('publish_date'),
-                    meta_data=link_info.get('meta_data')
+    def _fetch_feed(
+        self,
+        rss_parser: BaseRSSParser,
+        rss_url: str,
+        host: str,
+        validators: Dict[str, Optional[str]],
+        last_entry_id: Optional[str]
+    ) -> Dict[str, Any]:
+        """
+        抓取并解析RSS源，受抓取并发数限制
+
+        只有网络传输错误（连接失败、超时、429/5xx）计入主机熔断器；内容格式错误和解析异常
+        说明主机有响应，按成功计入熔断器，只由该RSS源自己的失败退避处理
+        """
+        try:
+            with self._fetch_semaphore:
+                parse_result = rss_parser.parse_rss(
+                    rss_url,
+                    validators=validators,
+                    last_entry_id=last_entry_id
                 )
+        except Exception as e:
+            parse_result = {'success': False, 'error': str(e), 'transport_error': is_transport_error(e)}
 
-                if link:
-                    added_links.append({
-                        "id": link.id,
-                        "episode_number": link.episode_number,
-                        "episode_title": link.episode_title,
-                        "link_type": link.link_type,
-                        "url": link.url,
-                        "file_size": link.file_size
-                    })
+        if parse_result.get('success') or not parse_result.get('transport_error'):
+            self.circuit_breaker.record_success(host)
+        else:
+            self.circuit_breaker.record_failure(host)
+        return parse_result
+
+    def _fetch_shared_feed(
+        self,
+        shared_feeds: SingleFlight,
+        rss_parser: BaseRSSParser,
+        rss_url: str,
+        host: str,
+        validators: Dict[str, Optional[str]]
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        抓取多个RSS源共用的地址，同一轮检查内只抓取解析一次
+
+        共享的抓取不按条目标记截断，解析出全部链接，由各RSS源的唯一索引去重。
+        其他RSS源按自己的内容哈希判断是否有变化；304 只对校验信息相同的RSS源有效，
+        校验信息不同时该RSS源自行抓取
+
+        Returns:
+            (解析结果, 是否复用了其他RSS源的抓取)
+        """
+        def fetch():
+            result = self._fetch_feed(rss_parser, rss_url, host, validators, None)
+            result['request_validators'] = validators
+            return result
+
+        parse_result, coalesced = shared_feeds.do(normalize_url(rss_url), fetch)
+        if not coalesced or not parse_result.get('success'):
+            return parse_result, coalesced
+
+        if parse_result.get('not_modified'):
+            if parse_result.get('request_validators') != validators:
+                return self._fetch_feed(rss_parser, rss_url, host, validators, None), False
+            return dict(parse_result, bytes_transferred=0, rate_limit_wait=0.0), True
 
-                    # 如果启用了自动下载
-                    if auto_download and rss_source.auto_download:
-                        # 获取默认下载器
-                        downloader = downloader_service.get_default_downloader()
-                        if downloader:
-                            # 创建下载任务
-                            task = download_service.create_download_task(
-                                link_id=link.id,
-                                rss_source_id=rss_source_id,
-                                downloader_id=downloader.id
-                            )
-                            if task:
-                                # 开始下载
-                                download_service.start_download(task.id)
+        new_validators = parse_result.get('validators') or {}
+        result = dict(parse_result, bytes_transferred=0, rate_limit_wait=0.0)
+        if validators.get('content_hash') and new_validators.get('content_hash') == validators['content_hash']:
+            result.update(not_modified=True, links=[])
+        return result, True
 
+    def _mark_not_modified(
+        self,
+        rss_source_id: int,
+        validators: Optional[Dict[str, Optional[str]]] = None
+    ) -> Dict[str, Any]:
+        """
+        RSS源内容未变化时只更新最后检查时间和缓存校验信息
+
+        Args:
+            rss_source_id: RSS源ID
+            validators: 本次抓取的缓存校验信息
+
+        Returns:
+            检查结果
+        """
+        db = next(self.db_factory())
+        try:
+            rss_source = RSSService(db).get_rss_source(rss_source_id)
+            if rss_source:
+                rss_source.last_checked_at = datetime.utcnow()
+                self._save_validators(rss_source, validators)
+                db.commit()
             return {
                 "success": True,
-                "message": f"检查完成，发现 {new_links_count} 个新链接",
+                "message": "检查完成，RSS源未更新",
                 "rss_source_id": rss_source_id,
-                "new_links_count": new_links_count,
-                "new_links": added_links,
+                "new_links_count": 0,
+                "new_links": [],
+                "not_modified": True,
                 "checked_at": datetime.utcnow().isoformat()
             }
         except Exception as e:
@@ -284,45 +924,884 @@ class SchedulerService:
             }
         finally:
             db.close()
-    
-    def _check_rss_source(self, rss_source_id: int, auto_download: bool = False):
-        """内部方法：检查RSS源（用于定时任务）"""
-        self.check_rss_source(rss_source_id, auto_download)
-    
-    def get_jobs(self) -> Dict[str, Dict[str, Any]]:
-        """获取所有任务信息"""
-        return self.jobs.copy()
-    
-    def get_job_status(self, job_id: str) -> Optional[Dict[str, Any]]:
-        """获取任务状态"""
-        if job_id not in self.jobs:
-            return None
-        
-        job = self.scheduler.get_job(job_id)
-        if not job:
-            return None
-        
-        return {
-            "job_id": job_id,
-            "name": job.name,
-            "next_run_time": job.next_run_time.isoformat() if job.next_run_time else None,
-            "info": self.jobs[job_id]
-        }
-    
-    def pause_job(self, job_id: str) -> bool:
-        """暂停任务"""
+
+    def _save_new_links(
+        self,
+        rss_source_id: int,
+        links_info: List[Dict[str, Any]],
+        auto_download: bool,
+        validators: Optional[Dict[str, Optional[str]]] = None,
+        latest_entry_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        将解析到的链接写入数据库，并为新链接按需创建下载任务
+
+        已存在的链接由 (rss_source_id, url_hash) 唯一索引忽略，不需要预先加载已有链接。
+        缓存校验信息和最新条目标记在链接全部写入后才保存，写入失败时下次检查会重新解析。
+        这里只创建下载任务，任务ID在结果的 download_task_ids 中返回，
+        由调用方在释放写入并发后调用 _start_downloads 开始下载
+
+        Args:
+            rss_source_id: RSS源ID
+            links_info: RSS源中解析到的链接信息
+            auto_download: 是否自动下载新链接
+            validators: 本次抓取的缓存校验信息
+            latest_entry_id: 本次最新条目的标记
+
+        Returns:
+            检查结果
+        """
+        db = next(self.db_factory())
         try:
-            self.scheduler.pause_job(job_id)
-            return True
+            rss_service = RSSService(db)
+            link_service = LinkService(db)
+            download_service = DownloadService(db)
+            downloader_service = DownloaderService(db)
+
+            rss_source = rss_service.get_rss_source(rss_source_id)
+            if not rss_source:
+                return {
+                    "success": False,
+                    "message": f"RSS源 {rss_source_id} 不存在"
+                }
+
+            # 更新最后检查时间，与新链接在同一事务中提交
+            rss_source.last_checked_at = datetime.utcnow()
+
+            # 批量添加链接到数据库，已存在的链接对应的ID为None
+            link_ids = link_service.add_links_bulk(rss_source_id, links_info)
+            added_links = []
+            for link_id, link_info in zip(link_ids, links_info):
+                if link_id is None:
+                    continue
+                added_links.append({
+                    "id": link_id,
+                    "episode_number": link_info.get('episode_number'),
+                    "episode_title": link_info.get('episode_title'),
+                    "link_type": link_info.get('link_type', 'magnet'),
+                    "url": link_info.get('url', ''),
+                    "file_size": link_info.get('file_size'),
+                    **{field: link_info.get(field) for field in RELEASE_FIELDS}
+                })
+
+            # 如果启用了自动下载
+            download_task_ids = []
+            if added_links and auto_download and rss_source.auto_download:
+                # 获取默认下载器
+                downloader = downloader_service.get_default_downloader()
+                if downloader:
+                    # 按RSS源的画质设置过滤，同一发布的重复链接和旧版本只下载一次
+                    download_links = link_service.select_auto_download_links(
+                        rss_source_id,
+                        [link["id"] for link in added_links],
+                        quality=rss_source.quality
+                    )
+                    for link in download_links:
+                        # 创建下载任务
+                        task = download_service.create_download_task(
+                            link_id=link.id,
+                            rss_source_id=rss_source_id,
+                            downloader_id=downloader.id
+                        )
+                        if task:
+                            download_task_ids.append(task.id)
+
+            self._save_validators(rss_source, validators)
+            if latest_entry_id:
+                rss_source.last_entry_id = latest_entry_id
+            db.commit()
+
+            new_links_count = len(added_links)
+            if new_links_count == 0:
+                message = "检查完成，未发现新链接"
+            else:
+                message = f"检查完成，发现 {new_links_count} 个新链接"
+
+            return {
+                "success": True,
+                "message": message,
+                "rss_source_id": rss_source_id,
+                "new_links_count": new_links_count,
+                "new_links": added_links,
+                "download_task_ids": download_task_ids,
+                "checked_at": datetime.utcnow().isoformat()
+            }
+        except Exception as e:
+            db.rollback()
+            return {
+                "success": False,
+                "message": f"检查RSS源失败: {str(e)}"
+            }
+        finally:
+            db.close()
+
+    def _start_downloads(self, task_ids: List[int]):
+        """
+        开始下载（不能在持有写入并发时调用）
+
+        接入后台任务队列时加入队列由工作线程开始下载，否则（或入队失败时）在当前线程中访问下载器
+        """
+        if not task_ids:
+            return
+        pending = []
+        for task_id in task_ids:
+            queued = None
+            if self.job_queue is not None:
+                queued = self.job_queue.enqueue(
+                    self.JOB_TYPE_DOWNLOAD_START,
+                    {"task_id": task_id},
+                    priority=self.PRIORITY_DOWNLOAD_START,
+                    dedup_key=f"download_start:{task_id}"
+                )
+            if queued is None:
+                pending.append(task_id)
+        if not pending:
+            return
+
+        db = next(self.db_factory())
+        try:
+            download_service = DownloadService(db)
+            for task_id in pending:
+                try:
+                    download_service.start_download(task_id)
+                except Exception as e:
+                    db.rollback()
+                    print(f"开始下载任务 {task_id} 失败: {e}")
+        finally:
+            db.close()
+
+    def _save_validators(
+        self,
+        rss_source: RSSSource,
+        validators: Optional[Dict[str, Optional[str]]]
+    ):
+        """记录RSS源的缓存校验信息（由调用方提交）"""
+        if not validators:
+            return
+        rss_source.etag = validators.get('etag')
+        rss_source.last_modified = validators.get('last_modified')
+        rss_source.content_hash = validators.get('content_hash')
+
+    def check_all_rss_sources(self, auto_download: bool = False) -> Dict[str, Any]:
+        """
+        并发检查所有激活的RSS源
+
+        使用独立的有界线程池执行检查，同一时间只允许一轮全量检查运行。
+        多个RSS源使用同一地址（规范化后相同）时，本轮只抓取解析一次，解析结果分发给每个RSS源写入。
+        绑定到激活的聚合RSS源的RSS源不单独抓取，由聚合RSS源一次抓取后按索引分发
+
+        Args:
+            auto_download: 是否自动下载新链接
+
+        Returns:
+            本轮检查的汇总信息
+        """
+        if not self._sweep_lock.acquire(blocking=False):
+            return {
+                "success": False,
+                "message": "已有全量检查正在进行"
+            }
+
+        started_at = datetime.utcnow()
+        started = time.monotonic()
+        try:
+            db = next(self.db_factory())
+            try:
+                aggregate_feed_service = AggregateFeedService(db)
+                covered_ids = aggregate_feed_service.get_covered_source_ids()
+                feed_ids = [feed.id for feed in aggregate_feed_service.get_feeds(is_active=True)]
+                rss_sources = [
+                    (rss_source.id, normalize_url(rss_source.url))
+                    for rss_source in RSSService(db).get_active_rss_sources()
+                    if rss_source.id not in covered_ids
+                ]
+            finally:
+                db.close()
+
+            # 按规范化地址分组，只有被多个RSS源共用的地址才共享抓取结果
+            subscribers: Dict[str, int] = {}
+            for _, feed_url in rss_sources:
+                subscribers[feed_url] = subscribers.get(feed_url, 0) + 1
+            shared_feeds = SingleFlight(remember=True)
+
+            results = []
+            with ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="rss-check"
+            ) as executor:
+                futures = {
+                    executor.submit(
+                        self.check_rss_source,
+                        rss_source_id,
+                        auto_download,
+                        "sweep",
+                        shared_feeds if subscribers[feed_url] > 1 else None
+                    ): rss_source_id
+                    for rss_source_id, feed_url in rss_sources
+                }
+                feed_futures = {
+                    executor.submit(self.check_aggregate_feed, feed_id, auto_download): feed_id
+                    for feed_id in feed_ids
+                }
+                for future in as_completed(futures):
+                    rss_source_id = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = {
+                            "success": False,
+                            "message": f"检查RSS源失败: {str(e)}"
+                        }
+                    results.append({
+                        "rss_source_id": rss_source_id,
+                        "success": result.get("success", False),
+                        "message": result.get("message", ""),
+                        "new_links_count": result.get("new_links_count", 0),
+                        "duration": result.get("duration"),
+                        "fetch_duration": result.get("fetch_duration"),
+                        "write_duration": result.get("write_duration"),
+                        "coalesced": result.get("coalesced", False)
+                    })
+
+                aggregate_results = [
+                    self._summarize_aggregate_check(feed_futures[future], future)
+                    for future in as_completed(feed_futures)
+                ]
+
+            results.sort(key=lambda item: item["rss_source_id"])
+            succeeded = sum(1 for item in results if item["success"])
+            failed = len(results) - succeeded
+            aggregate_results.sort(key=lambda item: item["feed_id"])
+            new_links_count = sum(item["new_links_count"] for item in results + aggregate_results)
+            coalesced = sum(1 for item in results if item["coalesced"])
+
+            return {
+                "success": True,
+                "message": f"检查完成，共 {len(results)} 个RSS源，失败 {failed} 个，发现 {new_links_count} 个新链接",
+                "started_at": started_at.isoformat(),
+                "finished_at": datetime.utcnow().isoformat(),
+                "duration": time.monotonic() - started,
+                "total_sources": len(results),
+                "succeeded": succeeded,
+                "failed": failed,
+                "new_links_count": new_links_count,
+                "distinct_feeds": len(subscribers),
+                "coalesced": coalesced,
+                "results": results,
+                "aggregate_feeds": aggregate_results
+            }
+        finally:
+            self._sweep_lock.release()
+
+    def _summarize_aggregate_check(self, feed_id: int, future) -> Dict[str, Any]:
+        """汇总一个聚合RSS源的检查结果"""
+        try:
+            result = future.result()
+        except Exception as e:
+            result = {
+                "success": False,
+                "message": f"检查聚合RSS源失败: {str(e)}"
+            }
+        return {
+            "feed_id": feed_id,
+            "success": result.get("success", False),
+            "message": result.get("message", ""),
+            "new_links_count": result.get("new_links_count", 0),
+            "routed_sources": len(result.get("sources", [])),
+            "unmatched_count": result.get("unmatched_count", 0)
+        }
+
+    def check_aggregate_feeds(self, auto_download: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        检查所有激活的聚合RSS源（定期聚合RSS源检查任务）
+
+        Args:
+            auto_download: 是否自动下载新链接，为空时按各RSS源定时检查任务的设置
+
+        Returns:
+            各聚合RSS源的检查结果
+        """
+        db = next(self.db_factory())
+        try:
+            feed_ids = [feed.id for feed in AggregateFeedService(db).get_feeds(is_active=True)]
+        finally:
+            db.close()
+
+        aggregate_results = []
+        if feed_ids:
+            with ThreadPoolExecutor(
+                max_workers=min(self.max_workers, len(feed_ids)),
+                thread_name_prefix="aggregate-check"
+            ) as executor:
+                feed_futures = {
+                    executor.submit(self.check_aggregate_feed, feed_id, auto_download): feed_id
+                    for feed_id in feed_ids
+                }
+                aggregate_results = [
+                    self._summarize_aggregate_check(feed_futures[future], future)
+                    for future in as_completed(feed_futures)
+                ]
+        aggregate_results.sort(key=lambda item: item["feed_id"])
+        failed = sum(1 for item in aggregate_results if not item["success"])
+        new_links_count = sum(item["new_links_count"] for item in aggregate_results)
+        return {
+            "success": True,
+            "message": f"检查完成，共 {len(aggregate_results)} 个聚合RSS源，失败 {failed} 个，发现 {new_links_count} 个新链接",
+            "new_links_count": new_links_count,
+            "aggregate_feeds": aggregate_results
+        }
+
+    def check_aggregate_feed(self, feed_id: int, auto_download: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        检查聚合RSS源
+
+        抓取解析一次，按绑定RSS源构建的标题/bangumiId索引把链接分发到各RSS源写入，
+        记录未匹配到RSS源的条目。每次内容变化都解析全部条目，已存在的链接由唯一索引去重。
+        自动下载与单独检查一致：RSS源本身开启自动下载时才下载，并按RSS源的画质设置过滤
+
+        Args:
+            feed_id: 聚合RSS源ID
+            auto_download: 是否自动下载新链接，为空时按各RSS源定时检查任务的设置（没有任务时不下载）
+
+        Returns:
+            检查结果，包含各RSS源的新链接数和未匹配的条目标题
+        """
+        started = time.monotonic()
+        db = next(self.db_factory())
+        try:
+            aggregate_feed_service = AggregateFeedService(db)
+            feed = aggregate_feed_service.get_feed(feed_id)
+            if not feed:
+                return {
+                    "success": False,
+                    "message": f"聚合RSS源 {feed_id} 不存在",
+                    "not_found": True
+                }
+            if not feed.is_active:
+                return {
+                    "success": False,
+                    "message": f"聚合RSS源 {feed_id} 未激活"
+                }
+            feed_url = feed.url
+            validators = {
+                'etag': feed.etag,
+                'last_modified': feed.last_modified,
+                'content_hash': feed.content_hash
+            }
+            index = aggregate_feed_service.build_index(feed_id)
+            # 各RSS源定时检查任务的自动下载设置
+            job_auto_download = dict(db.query(SchedulerJob.rss_source_id, SchedulerJob.auto_download).join(
+                RSSSource, SchedulerJob.rss_source_id == RSSSource.id
+            ).filter(RSSSource.aggregate_feed_id == feed_id).all())
+        except Exception as e:
+            return {
+                "success": False,
+                "message": f"检查聚合RSS源失败: {str(e)}"
+            }
+        finally:
+            db.close()
+
+        rss_parser = self._get_rss_parser(feed_url)
+        if not rss_parser:
+            return {
+                "success": False,
+                "message": f"不支持的RSS源: {feed_url}"
+            }
+
+        host = urlparse(feed_url).hostname or feed_url
+        if not self.circuit_breaker.allow_request(host):
+            return {
+                "success": False,
+                "message": f"主机 {host} 连续失败，已暂停检查",
+                "circuit_open": True,
+                "retry_at": self.circuit_breaker.get_retry_at(host) or time.time()
+            }
+
+        fetch_started = time.monotonic()
+        parse_result = self._fetch_feed(rss_parser, feed_url, host, validators, None)
+        fetch_duration = time.monotonic() - fetch_started
+        if not parse_result.get('success'):
+            return {
+                "success": False,
+                "message": f"RSS解析失败: {parse_result.get('error', '未知错误')}",
+                "feed_id": feed_id,
+                "fetch_duration": fetch_duration,
+                "duration": time.monotonic() - started
+            }
+
+        if parse_result.get('not_modified'):
+            self._record_aggregate_check(feed_id, parse_result.get('validators'))
+            return {
+                "success": True,
+                "message": "检查完成，聚合RSS源未更新",
+                "feed_id": feed_id,
+                "not_modified": True,
+                "new_links_count": 0,
+                "sources": [],
+                "unmatched_count": 0,
+                "unmatched": [],
+                "fetch_duration": fetch_duration,
+                "duration": time.monotonic() - started
+            }
+
+        routed, unmatched = index.route(parse_result.get('links', []))
+        sources = []
+        for rss_source_id, links in sorted(routed.items()):
+            if auto_download is None:
+                source_auto_download = bool(job_auto_download.get(rss_source_id, False))
+            else:
+                source_auto_download = auto_download
+            with self._write_semaphore:
+                result = self._save_new_links(rss_source_id, links, source_auto_download)
+            self._start_downloads(result.pop("download_task_ids", []))
+            sources.append({
+                "rss_source_id": rss_source_id,
+                "success": result.get("success", False),
+                "message": result.get("message", ""),
+                "links_count": len(links),
+                "new_links_count": result.get("new_links_count", 0)
+            })
+
+        unmatched_titles = [link.get('entry_title') or link.get('url', '') for link in unmatched]
+        failed = [item for item in sources if not item["success"]]
+        # 有RSS源写入失败时不保存校验信息，下次检查重新分发
+        self._record_aggregate_check(
+            feed_id,
+            None if failed else parse_result.get('validators'),
+            unmatched_titles
+        )
+
+        new_links_count = sum(item["new_links_count"] for item in sources)
+        message = f"检查完成，分发到 {len(sources)} 个RSS源，发现 {new_links_count} 个新链接"
+        if unmatched_titles:
+            message += f"，{len(unmatched_titles)} 个条目未匹配"
+        if failed:
+            message += f"，{len(failed)} 个RSS源写入失败"
+        return {
+            "success": not failed,
+            "message": message,
+            "feed_id": feed_id,
+            "not_modified": False,
+            "new_links_count": new_links_count,
+            "sources": sources,
+            "unmatched_count": len(unmatched_titles),
+            "unmatched": unmatched_titles,
+            "bytes_transferred": parse_result.get('bytes_transferred', 0),
+            "fetch_duration": fetch_duration,
+            "duration": time.monotonic() - started
+        }
+
+    def _record_aggregate_check(
+        self,
+        feed_id: int,
+        validators: Optional[Dict[str, Optional[str]]],
+        unmatched: Optional[List[str]] = None
+    ):
+        """记录聚合RSS源的检查结果，记录失败不影响检查结果"""
+        with self._write_semaphore:
+            db = next(self.db_factory())
+            try:
+                AggregateFeedService(db).record_check(feed_id, validators, unmatched)
+            except Exception as e:
+                db.rollback()
+                print(f"记录聚合RSS源检查失败: {e}")
+            finally:
+                db.close()
+
+    def add_check_all_job(self, interval: int = 3600, auto_download: bool = False) -> Optional[str]:
+        """
+        添加全量检查任务，定期并发检查所有激活的RSS源
+
+        Args:
+            interval: 检查间隔（秒）
+            auto_download: 是否自动下载新链接
+
+        Returns:
+            任务ID，失败返回None
+        """
+        if not self.is_running:
+            print("调度器未运行，无法添加任务")
+            return None
+
+        job_id = self.CHECK_ALL_JOB_ID
+
+        try:
+            self.scheduler.add_job(
+                self.check_all_rss_sources,
+                trigger=IntervalTrigger(seconds=interval),
+                id=job_id,
+                args=[auto_download],
+                name="检查所有RSS源",
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True
+            )
+
+            self.jobs[job_id] = {
+                "rss_source_id": None,
+                "interval": interval,
+                "auto_download": auto_download,
+                "created_at": datetime.utcnow()
+            }
+
+            return job_id
         except Exception as e:
-            print(f"暂停任务失败: {e}")
+            print(f"添加全量检查任务失败: {e}")
+            return None
+    
+    def add_aggregate_feed_job(self, interval: int = 1800, auto_download: Optional[bool] = None) -> Optional[str]:
+        """
+        添加聚合RSS源检查任务，定期检查所有激活的聚合RSS源
+
+        绑定到聚合RSS源的RSS源不再单独抓取，由该任务负责更新，与是否启用全量检查无关
+
+        Args:
+            interval: 检查间隔（秒）
+            auto_download: 是否自动下载新链接，为空时按各RSS源定时检查任务的设置
+
+        Returns:
+            任务ID，失败返回None
+        """
+        if not self.is_running:
+            print("调度器未运行，无法添加任务")
+            return None
+
+        job_id = self.AGGREGATE_FEED_JOB_ID
+
+        try:
+            self.scheduler.add_job(
+                self.check_aggregate_feeds,
+                trigger=IntervalTrigger(seconds=interval),
+                id=job_id,
+                args=[auto_download],
+                name="检查聚合RSS源",
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True
+            )
+
+            self.jobs[job_id] = {
+                "rss_source_id": None,
+                "interval": interval,
+                "auto_download": auto_download,
+                "created_at": datetime.utcnow()
+            }
+
+            return job_id
+        except Exception as e:
+            print(f"添加聚合RSS源检查任务失败: {e}")
+            return None
+
+    def add_lifecycle_job(self, interval: int = 86400) -> Optional[str]:
+        """
+        添加生命周期检查任务，定期停止已完结动画的RSS源检查
+
+        Args:
+            interval: 检查间隔（秒）
+
+        Returns:
+            任务ID，失败返回None
+        """
+        if not self.is_running:
+            print("调度器未运行，无法添加任务")
+            return None
+
+        job_id = self.LIFECYCLE_JOB_ID
+
+        try:
+            self.scheduler.add_job(
+                self.run_lifecycle_pass,
+                trigger=IntervalTrigger(seconds=interval),
+                id=job_id,
+                name="检查已完结的动画",
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True
+            )
+
+            self.jobs[job_id] = {
+                "rss_source_id": None,
+                "interval": interval,
+                "auto_download": False,
+                "created_at": datetime.utcnow()
+            }
+
+            return job_id
+        except Exception as e:
+            print(f"添加生命周期检查任务失败: {e}")
+            return None
+
+    def add_download_sync_job(self, interval: int = 300) -> Optional[str]:
+        """
+        添加下载状态同步任务，定期把下载器中的状态同步到本地
+
+        接入后台任务队列时每次触发只加入一个同步任务，上一次未执行完时不重复添加
+
+        Args:
+            interval: 同步间隔（秒）
+
+        Returns:
+            任务ID，失败返回None
+        """
+        if not self.is_running:
+            print("调度器未运行，无法添加任务")
+            return None
+
+        job_id = self.DOWNLOAD_SYNC_JOB_ID
+
+        try:
+            self.scheduler.add_job(
+                self._dispatch_download_sync,
+                trigger=IntervalTrigger(seconds=interval),
+                id=job_id,
+                name="同步下载状态",
+                replace_existing=True,
+                max_instances=1,
+                coalesce=True
+            )
+
+            self.jobs[job_id] = {
+                "rss_source_id": None,
+                "interval": interval,
+                "auto_download": False,
+                "created_at": datetime.utcnow()
+            }
+
+            return job_id
+        except Exception as e:
+            print(f"添加下载状态同步任务失败: {e}")
+            return None
+
+    def _dispatch_download_sync(self):
+        """定时触发下载状态同步：加入后台任务队列，未接入队列时直接同步"""
+        if self.job_queue is not None:
+            queued = self.job_queue.enqueue(
+                self.JOB_TYPE_DOWNLOAD_SYNC,
+                priority=self.PRIORITY_DOWNLOAD_SYNC,
+                dedup_key=self.JOB_TYPE_DOWNLOAD_SYNC
+            )
+            if queued is not None:
+                return
+        self.sync_downloads()
+
+    def sync_downloads(self) -> Dict[str, Any]:
+        """
+        同步所有活跃下载任务的状态
+
+        Returns:
+            同步结果
+        """
+        db = next(self.db_factory())
+        try:
+            download_service = DownloadService(db)
+            synced = 0
+            failed = 0
+            for task in download_service.get_active_downloads():
+                try:
+                    download_service.sync_download_status(task.id)
+                    synced += 1
+                except Exception as e:
+                    db.rollback()
+                    failed += 1
+                    print(f"同步下载任务 {task.id} 状态失败: {e}")
+            return {
+                "success": failed == 0,
+                "message": f"同步了 {synced} 个下载任务" + (f"，{failed} 个失败" if failed else ""),
+                "synced": synced,
+                "failed": failed
+            }
+        finally:
+            db.close()
+
+    def run_lifecycle_pass(self) -> Dict[str, Any]:
+        """
+        检查已完结的动画，按 lifecycle.action 停用其RSS源或放慢检查
+
+        Returns:
+            检查结果，stopped 为本次停止检查的动画列表
+        """
+        db = next(self.db_factory())
+        try:
+            stopped = LifecycleService(db).run_pass(
+                idle_days=self.lifecycle_idle_days,
+                action=self.lifecycle_action
+            )
+        except Exception as e:
+            db.rollback()
+            return {
+                "success": False,
+                "message": f"生命周期检查失败: {str(e)}",
+                "stopped": []
+            }
+        finally:
+            db.close()
+
+        now = time.time()
+        for item in stopped:
+            for rss_source_id in item["rss_source_ids"]:
+                job_id = f"rss_check_{rss_source_id}"
+                info = self.jobs.get(job_id)
+                if info is None:
+                    continue
+                if self.lifecycle_action == LifecycleService.ACTION_DEACTIVATE:
+                    # RSS源已停用，保留任务记录以便恢复
+                    self.jobs.pop(job_id, None)
+                    self.timer.cancel(job_id)
+                else:
+                    info["slowed"] = True
+                    if job_id in self.timer:
+                        self.timer.schedule(job_id, self._next_run_time(
+                            rss_source_id,
+                            self._effective_interval(info["interval"], True),
+                            now
+                        ))
+
+        return {
+            "success": True,
+            "message": f"已停止 {len(stopped)} 部动画的RSS源检查",
+            "stopped": stopped
+        }
+
+    def resume_anime_polling(self, anime_id: int) -> Dict[str, Any]:
+        """
+        手动恢复动画的RSS源检查，恢复的任务立即检查一次
+
+        Args:
+            anime_id: 动画ID
+
+        Returns:
+            恢复结果
+        """
+        db = next(self.db_factory())
+        try:
+            rss_source_ids = LifecycleService(db).resume_polling(anime_id)
+            if rss_source_ids is None:
+                return {
+                    "success": False,
+                    "message": f"动画ID {anime_id} 不存在",
+                    "not_found": True
+                }
+            jobs = db.query(SchedulerJob).filter(SchedulerJob.rss_source_id.in_(rss_source_ids)).all()
+        except Exception as e:
+            db.rollback()
+            return {
+                "success": False,
+                "message": f"恢复检查失败: {str(e)}"
+            }
+        finally:
+            db.close()
+
+        if self.is_running:
+            now = time.time()
+            for job in jobs:
+                self._schedule_check_job(
+                    job.rss_source_id,
+                    job.interval,
+                    job.auto_download,
+                    due=now,
+                    paused=job.is_paused,
+                    consecutive_failures=job.consecutive_failures or 0,
+                    backoff_until=job.backoff_until
+                )
+
+        return {
+            "success": True,
+            "message": f"已恢复 {len(rss_source_ids)} 个RSS源的检查",
+            "rss_source_ids": rss_source_ids
+        }
+
+    def _check_rss_source(self, rss_source_id: int, auto_download: bool = False) -> Dict[str, Any]:
+        """内部方法：检查RSS源（用于定时任务）"""
+        return self.check_rss_source(rss_source_id, auto_download, trigger="scheduled")
+    
+    def get_jobs(self) -> Dict[str, Dict[str, Any]]:
+        """获取所有任务信息"""
+        return self.jobs.copy()
+    
+    def get_job_status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """获取任务状态"""
+        if job_id not in self.jobs:
+            return None
+        
+        if job_id in self.PERIODIC_JOB_IDS:
+            job = self.scheduler.get_job(job_id)
+            if not job:
+                return None
+            return {
+                "job_id": job_id,
+                "name": job.name,
+                "next_run_time": job.next_run_time.isoformat() if job.next_run_time else None,
+                "info": self.jobs[job_id]
+            }
+
+        info = self.jobs[job_id]
+        due = self.timer.get_due_time(job_id)
+        return {
+            "job_id": job_id,
+            "name": f"检查RSS源 {info['rss_source_id']}",
+            "next_run_time": datetime.utcfromtimestamp(due).isoformat() if due else None,
+            "info": info,
+            "circuit_breaker": self._get_source_circuit_state(info["rss_source_id"])
+        }
+
+    def _get_source_circuit_state(self, rss_source_id: int) -> Optional[Dict[str, Any]]:
+        """获取RSS源所在主机的熔断状态"""
+        db = next(self.db_factory())
+        try:
+            rss_source = RSSService(db).get_rss_source(rss_source_id)
+            if not rss_source:
+                return None
+            host = urlparse(rss_source.url).hostname or rss_source.url
+        finally:
+            db.close()
+        state = self.circuit_breaker.get_state(host)
+        for key in ("retry_at", "opened_at"):
+            if state[key] is not None:
+                state[key] = datetime.utcfromtimestamp(state[key]).isoformat()
+        return state
+    
+    def pause_job(self, job_id: str) -> bool:
+        """暂停任务"""
+        if job_id in self.PERIODIC_JOB_IDS:
+            try:
+                self.scheduler.pause_job(job_id)
+                return True
+            except Exception as e:
+                print(f"暂停任务失败: {e}")
+                return False
+
+        info = self.jobs.get(job_id)
+        if info is None:
+            print(f"暂停任务失败: 任务 {job_id} 不存在")
             return False
+        info["paused"] = True
+        self.timer.cancel(job_id)
+        self._save_job(info["rss_source_id"], is_paused=True)
+        return True
     
     def resume_job(self, job_id: str) -> bool:
         """恢复任务"""
-        try:
-            self.scheduler.resume_job(job_id)
-            return True
-        except Exception as e:
-            print(f"恢复任务失败: {e}")
-            return False
\ No newline at end of file
+        if job_id in self.PERIODIC_JOB_IDS:
+            try:
+                self.scheduler.resume_job(job_id)
+                return True
+            except Exception as e:
+                print(f"恢复任务失败: {e}")
+                return False
+
+        info = self.jobs.get(job_id)
+        if info is None:
+            print(f"恢复任务失败: 任务 {job_id} 不存在")
+            return False
+        if info.get("paused"):
+            info["paused"] = False
+            self._save_job(info["rss_source_id"], is_paused=False)
+            self.timer.schedule(
+                job_id,
+                self._next_run_time(
+                    info["rss_source_id"],
+                    self._effective_interval(info["interval"], info.get("slowed")),
+                    time.time()
+                )
+            )
+        return True
@@ -0,0 +1,113 @@
+"""
+季度番组目录服务模块
+解析网站的季度番组列表得到该季度的全部番组，并发解析各番组页面，生成可以批量订阅的目录
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Optional
+
+from server.services.smart_parser_service import SmartParserService
+from server.utils.config import get_config_value
+
+
+class SeasonCatalogService:
+    """
+    季度番组目录服务
+
+    番组列表和各番组页面的解析结果都由智能解析缓存（SmartParseCache）按URL缓存，
+    有效期内再次获取同一季度的目录不访问网络。番组页面在线程池中并发解析，
+    对同一网站的请求数和速率仍受全局限速器约束。
+    """
+
+    def __init__(
+        self,
+        smart_parser_service: Optional[SmartParserService] = None,
+        max_concurrency: Optional[int] = None
+    ):
+        """
+        初始化季度番组目录服务
+
+        Args:
+            smart_parser_service: 智能解析服务，默认使用共享注册表和全局缓存
+            max_concurrency: 最大并发解析数，为空时使用配置 smart_parser.batch_concurrency
+        """
+        self.smart_parser_service = smart_parser_service or SmartParserService()
+        if max_concurrency is None:
+            max_concurrency = int(get_config_value('smart_parser.batch_concurrency', 4))
+        self.max_concurrency = max(1, max_concurrency)
+
+    def get_season_url(self, year: int, season: str, site_url: str = "https://mikanani.me/") -> str:
+        """
+        获取季度番组列表页面URL
+
+        Args:
+            year: 年份
+            season: 季度（春、夏、秋、冬）
+            site_url: 网站地址，用于选择解析器
+
+        Returns:
+            季度番组列表页面URL
+        """
+        parser = self.smart_parser_service.get_parser(site_url)
+        if parser is None or not hasattr(parser, 'get_season_url'):
+            raise ValueError(f"该网站不支持季度番组列表: {site_url}")
+        return parser.get_season_url(year, season)
+
+    def get_catalog(self, url: str, refresh: bool = False) -> Dict[str, Any]:
+        """
+        获取季度番组目录
+
+        Args:
+            url: 季度番组列表页面URL
+            refresh: 是否忽略缓存，重新解析番组列表和各番组页面
+
+        Returns:
+            目录，包含:
+                - url: 季度番组列表页面URL
+                - site_name: 网站名称
+                - total: 番组数
+                - parsed: 番组页面解析成功的番组数
+                - items: 番组列表，每项为番组列表中的条目（bangumi_id、title、url、cover_url、day_of_week）
+                  加上 anime（番组页面解析出的动画信息，含RSS源）和 error（解析失败的原因）
+        """
+        parser = self.smart_parser_service.get_parser(url)
+        if parser is None or not hasattr(parser, 'parse_season'):
+            raise ValueError(f"不支持的季度番组列表: {url}")
+        site_name = parser.get_site_name()
+
+        items, _ = self.smart_parser_service.cache.get_or_parse(
+            url,
+            lambda: parser.parse_season(url),
+            site_name=site_name,
+            refresh=refresh
+        )
+        if not items:
+            raise ValueError("未能解析到番组")
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_concurrency, len(items)),
+            thread_name_prefix="season-catalog"
+        ) as executor:
+            futures = {
+                executor.submit(self.smart_parser_service.parse_anime, item['url'], refresh): item
+                for item in items
+            }
+            for future in as_completed(futures):
+                item = futures[future]
+                item['anime'] = None
+                item['error'] = None
+                try:
+                    results = future.result()
+                    if results:
+                        item['anime'] = results[0]
+                    else:
+                        item['error'] = "未能解析到动画信息"
+                except Exception as e:
+                    item['error'] = str(e)
+
+        return {
+            'url': url,
+            'site_name': site_name,
+            'total': len(items),
+            'parsed': sum(1 for item in items if item['anime'] is not None),
+            'items': items
+        }
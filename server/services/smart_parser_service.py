@@ -1,9 +1,13 @@
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterator, List, Optional
 from sqlalchemy.orm import Session
 
+from server.database import get_session_local
 from server.site_parsers.base_site_parser import BaseSiteParser
-from server.site_parsers.mikan_parser import MikanParser
-from server.utils.config import config
+from server.site_parsers.registry import ParserRegistry, get_site_parser_registry
+from server.services.parse_cache_service import SmartParseCache, get_smart_parse_cache
+from server.utils.config import config, get_config_value
+from server.utils.url import normalize_url
 from server.services.anime_service import AnimeService
 from server.services.rss_service import RSSService
 
@@ -11,24 +15,27 @@ from server.services.rss_service import RSSService
 class SmartParserService:
     """智能解析服务"""
     
-    def __init__(self):
-        self.parsers: List[BaseSiteParser] = []
-        self._register_default_parsers()
+    # 后台任务类型及优先级（与手动检查RSS源相同）
+    JOB_TYPE_SMART_ADD = "smart_add"
+    PRIORITY_SMART_ADD = 20
     
-    def _register_default_parsers(self):
-        """注册默认的网站解析器"""
-        self.register_site_parser(MikanParser())
+    def __init__(self, registry: Optional[ParserRegistry] = None, cache: Optional[SmartParseCache] = None):
+        # 网站解析器注册表，默认使用按配置 site_parsers.site 登记的共享注册表（解析器首次使用时导入）
+        self.registry = registry or get_site_parser_registry()
+        # 解析结果缓存，默认使用全局缓存（进程内 + 数据库，按配置 smart_parser.cache_ttl 过期）
+        self.cache = cache or get_smart_parse_cache()
     
-    def register_site_parser(self, parser: BaseSiteParser):
+    def register_site_parser(self, parser: BaseSiteParser, hosts: Optional[List[str]] = None):
         """注册新的网站解析器
         
         Args:
             parser: 网站解析器实例
+            hosts: 解析器负责的主机名，为空时按 can_parse 判断
         """
-        self.parsers.append(parser)
+        self.registry.register(parser, hosts)
     
     def get_parser(self, url: str) -> Optional[BaseSiteParser]:
-        """根据URL获取对应的解析器
+        """根据URL获取对应的解析器（按主机名分发）
         
         Args:
             url: 要解析的URL
@@ -36,16 +43,16 @@ class SmartParserService:
         Returns:
             Optional[BaseSiteParser]: 对应的解析器，如果没有则返回None
         """
-        for parser in self.parsers:
-            if parser.can_parse(url):
-                return parser
-        return None
+        return self.registry.get_parser(url)
     
-    def parse_anime(self, url: str) -> List[Dict]:
+    def parse_anime(self, url: str, refresh: bool = False) -> List[Dict]:
         """解析动画链接，返回可能的动画信息列表
         
+        结果按规范化URL缓存，同一URL的并发解析只抓取一次
+        
         Args:
             url: 动画页面URL
+            refresh: 是否忽略缓存重新解析
             
         Returns:
             List[Dict]: 动画信息列表
@@ -54,7 +61,13 @@ class SmartParserService:
         if not parser:
             raise ValueError(f"不支持的网站: {url}")
         
-        return parser.parse_anime(url)
+        results, _ = self.cache.get_or_parse(
+            url,
+            lambda: parser.parse_anime(url),
+            site_name=parser.get_site_name(),
+            refresh=refresh
+        )
+        return results
     
     def parse_rss(self, url: str, anime_id: int) -> List[Dict]:
         """解析RSS链接，返回可能的RSS源信息列表
@@ -98,6 +111,63 @@ class SmartParserService:
         if not anime_list:
             raise ValueError("未能解析到动画信息")
         
+        # 创建动画记录
+        if db is None:
+            raise ValueError("数据库会话不能为空")
+        
+        return self._create_anime(anime_list, auto_add_rss, anime_index, rss_indices, db)
+    
+    def handle_smart_add_job(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """后台任务：智能添加动画，网络错误时抛出异常由队列重试
+        
+        Args:
+            payload: 任务参数，包含 url、auto_add_rss、anime_index、rss_indices
+            
+        Returns:
+            Dict: 执行结果，包含:
+                - success: 是否添加成功
+                - message: 失败原因
+                - anime: 创建的动画（id、title、title_en、status、total_episodes）
+                - rss_sources: 添加的RSS源列表
+        """
+        db = get_session_local()()
+        try:
+            try:
+                result = self.parse_anime_with_rss(
+                    url=payload['url'],
+                    auto_add_rss=payload.get('auto_add_rss', True),
+                    anime_index=payload.get('anime_index'),
+                    rss_indices=payload.get('rss_indices'),
+                    db=db
+                )
+            except ValueError as e:
+                # 解析不到动画或索引超出范围，重试也不会成功
+                return {'success': False, 'message': str(e), 'anime': None, 'rss_sources': []}
+            anime = result['anime']
+            return {
+                'success': True,
+                'message': None,
+                'anime': {
+                    'id': anime.id,
+                    'title': anime.title,
+                    'title_en': anime.title_en,
+                    'status': anime.status,
+                    'total_episodes': anime.total_episodes
+                },
+                'rss_sources': result['rss_sources']
+            }
+        finally:
+            db.close()
+    
+    def _create_anime(
+        self,
+        anime_list: List[Dict],
+        auto_add_rss: bool,
+        anime_index: Optional[int],
+        rss_indices: Optional[List[int]],
+        db: Session
+    ) -> Dict:
+        """按索引选择动画和RSS源，在同一事务中创建动画及其RSS源记录"""
         # 选择动画
         if anime_index is not None:
             if anime_index < 1 or anime_index > len(anime_list):
@@ -107,60 +177,127 @@ class SmartParserService:
             # 默认选择第一个
             anime_info = anime_list[0]
         
-        # 创建动画记录
-        if db is None:
-            raise ValueError("数据库会话不能为空")
-        
-        anime_service = AnimeService(db)
-        anime = anime_service.create_anime(
-            title=anime_info.get('title', ''),
-            title_en=anime_info.get('title_en'),
-            description=anime_info.get('description'),
-            cover_url=anime_info.get('cover_url'),
-            status=anime_info.get('status', 'ongoing'),
-            total_episodes=anime_info.get('total_episodes')
-        )
-        
-        result = {
-            'anime': anime,
-            'rss_sources': []
-        }
-        
-        # 处理RSS源
+        # 选择RSS源
+        rss_sources_to_add = []
         if auto_add_rss and 'rss_sources' in anime_info:
-            rss_sources_list = anime_info['rss_sources']
-            
-            # 选择RSS源
+            rss_sources_list = anime_info['rss_sources'] or []
             if rss_indices:
-                selected_rss = []
                 for idx in rss_indices:
                     if idx < 1 or idx > len(rss_sources_list):
                         raise ValueError(f"RSS源索引 {idx} 超出范围 (1-{len(rss_sources_list)})")
-                    selected_rss.append(rss_sources_list[idx - 1])
-                rss_sources_to_add = selected_rss
+                    rss_sources_to_add.append(rss_sources_list[idx - 1])
             else:
                 rss_sources_to_add = rss_sources_list
-            
-            # 添加RSS源到数据库
-            rss_service = RSSService(db)
-            for rss_info in rss_sources_to_add:
-                rss_source = rss_service.create_rss_source(
-                    anime_id=anime.id,
-                    name=rss_info.get('name', ''),
-                    url=rss_info.get('url', ''),
-                    quality=rss_info.get('quality'),
-                    is_active=True,
-                    auto_download=rss_info.get('auto_download', True)
-                )
-                result['rss_sources'].append({
+        
+        # 动画和RSS源一次提交
+        anime, rss_sources = AnimeService(db).create_anime_with_rss_sources(anime_info, rss_sources_to_add)
+        
+        return {
+            'anime': anime,
+            'rss_sources': [
+                {
                     'id': rss_source.id,
                     'name': rss_source.name,
                     'url': rss_source.url,
                     'quality': rss_source.quality,
                     'auto_download': rss_source.auto_download
-                })
+                }
+                for rss_source in rss_sources
+            ]
+        }
+    
+    def smart_add_batch(
+        self,
+        urls: List[str],
+        auto_add_rss: bool = True,
+        refresh: bool = False,
+        max_concurrency: Optional[int] = None,
+        session_factory: Optional[Callable[[], Session]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """批量智能添加动画，按完成顺序逐个返回每个链接的结果
         
-        return result
+        页面在线程池中并发解析（同一网站仍受限流器约束），解析完成后在调用方线程中创建记录，
+        每个动画及其RSS源一个事务；写法不同的重复链接只添加一次
+        
+        Args:
+            urls: 动画页面URL列表
+            auto_add_rss: 是否添加解析到的全部RSS源
+            refresh: 是否忽略缓存重新解析
+            max_concurrency: 最大并发解析数，为空时使用配置 smart_parser.batch_concurrency
+            session_factory: 数据库会话工厂，默认使用全局会话工厂
+            
+        Yields:
+            Dict: 每个链接的结果，包含:
+                - index: 链接在输入列表中的位置（从0开始）
+                - url: 链接
+                - success: 是否添加成功
+                - message: 失败原因
+                - anime: 创建的动画对象（失败时为None）
+                - rss_sources: 添加的RSS源列表
+        """
+        if max_concurrency is None:
+            max_concurrency = int(get_config_value('smart_parser.batch_concurrency', 4))
+        session_factory = session_factory or get_session_local()
+        
+        # 重复的链接直接返回失败
+        first_index: Dict[str, int] = {}
+        pending = []
+        for index, url in enumerate(urls):
+            key = normalize_url(url)
+            if key in first_index:
+                yield self._batch_result(index, url, message=f"与第 {first_index[key] + 1} 个链接重复")
+                continue
+            first_index[key] = index
+            pending.append((index, url))
+        if not pending:
+            return
+        
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, min(max_concurrency, len(pending))),
+            thread_name_prefix="smart-add"
+        )
+        db = session_factory()
+        try:
+            futures = {
+                executor.submit(self.parse_anime, url, refresh): (index, url)
+                for index, url in pending
+            }
+            for future in as_completed(futures):
+                index, url = futures[future]
+                try:
+                    anime_list = future.result()
+                    if not anime_list:
+                        raise ValueError("未能解析到动画信息")
+                    result = self._create_anime(anime_list, auto_add_rss, None, None, db)
+                    # 与会话分离，之后的提交不会使已返回的动画过期
+                    db.expunge(result['anime'])
+                except Exception as e:
+                    print(f"批量智能添加失败: {url}, {e}")
+                    yield self._batch_result(index, url, message=str(e))
+                    continue
+                yield self._batch_result(index, url, success=True, **result)
+        finally:
+            # 调用方提前结束（如客户端断开）时取消尚未开始的解析
+            executor.shutdown(wait=False, cancel_futures=True)
+            db.close()
+    
+    @staticmethod
+    def _batch_result(
+        index: int,
+        url: str,
+        success: bool = False,
+        message: Optional[str] = None,
+        anime=None,
+        rss_sources: Optional[List[Dict]] = None
+    ) -> Dict[str, Any]:
+        return {
+            'index': index,
+            'url': url,
+            'success': success,
+            'message': message,
+            'anime': anime,
+            'rss_sources': rss_sources or []
+        }
     
     def get_supported_sites(self) -> List[str]:
         """获取支持的动画网站列表
@@ -168,7 +305,7 @@ class SmartParserService:
         Returns:
             List[str]: 支持的网站名称列表
         """
-        return [parser.get_site_name() for parser in self.parsers]
+        return self.registry.get_site_names()
     
     def get_site_name_from_url(self, url: str) -> str:
         """根据URL获取网站名称
@@ -1,15 +1,33 @@
 # 网站解析器模块
+# 解析器在首次访问时才导入（见 registry.py），导入本包不会加载各网站的解析器及其依赖
+
+import importlib
+
+_EXPORTS = {
+    'BaseSiteParser': '.base_site_parser',
+    'MikanParser': '.mikan_parser',
+    'BaseRSSParser': '.base_rss_parser',
+    'MikanRSSParser': '.mikan_rss_parser',
+    'ExampleRSSParser': '.example_rss_parser',
+    'ParserRegistry': '.registry',
+    'get_site_parser_registry': '.registry',
+}
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
 
-from .base_site_parser import BaseSiteParser
-from .mikan_parser import MikanParser
-from .base_rss_parser import BaseRSSParser
-from .mikan_rss_parser import MikanRSSParser
-from .example_rss_parser import ExampleRSSParser
 
 __all__ = [
     'BaseSiteParser',
     'MikanParser',
     'BaseRSSParser',
     'MikanRSSParser',
-    'ExampleRSSParser'
-]
\ No newline at end of file
+    'ExampleRSSParser',
+    'ParserRegistry',
+    'get_site_parser_registry'
+]
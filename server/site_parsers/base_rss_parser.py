@@ -2,10 +2,16 @@
 RSS解析器基类
 定义RSS解析器的通用接口
 """
+import hashlib
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 
+from server.utils.config import get_config_value
+from server.utils.http_client import get_http_client, is_transport_error
+from server.utils.title_parser import ParsedTitle, parse_title, parse_titles
+from server.utils.release_parser import ReleaseInfo, parse_release
+
 
 class BaseRSSParser(ABC):
     """RSS解析器基类"""
@@ -24,25 +30,44 @@ class BaseRSSParser(ABC):
         pass
     
     @abstractmethod
-    def parse_rss(self, rss_url: str, existing_urls: Optional[List[str]] = None) -> Dict[str, Any]:
+    def parse_rss(
+        self,
+        rss_url: str,
+        existing_urls: Optional[List[str]] = None,
+        validators: Optional[Dict[str, Optional[str]]] = None,
+        last_entry_id: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         解析RSS源
 
         Args:
             rss_url: RSS源URL
             existing_urls: 已存在的链接URL列表，用于过滤新链接
+            validators: 上次抓取保存的缓存校验信息（etag、last_modified、content_hash），
+                用于条件请求，内容未变化时不再解析
+            last_entry_id: 上次解析到的最新条目标记（GUID或URL）。RSS条目按时间倒序排列，
+                提供时只解析该标记之前的条目（增量模式）；为空时完整解析
 
         Returns:
             Dict[str, Any]: 解析结果，包含：
                 - success: 是否成功
+                - not_modified: RSS源内容是否未变化（为True时不包含链接）
+                - validators: 本次抓取的缓存校验信息
                 - feed_title: Feed标题
                 - feed_description: Feed描述
                 - feed_link: Feed链接
                 - total_entries: 总条目数
+                - entries_parsed: 实际解析的条目数
+                - bytes_transferred: 抓取传输的字节数
+                - rate_limit_wait: 请求在按主机限速器中等待的秒数
+                - latest_entry_id: 本次最新条目的标记，供下次增量解析使用
+                - stopped_early: 是否在遇到上次的标记后提前停止
                 - links: 所有链接列表
                 - new_links: 新链接列表（如果提供了existing_urls）
                 - new_links_count: 新链接数量
                 - error: 错误信息（如果失败）
+                - transport_error: 失败是否由网络传输错误引起（连接失败、超时、429/5xx），
+                  调度器只据此累计主机熔断
         """
         pass
     
@@ -56,76 +81,219 @@ class BaseRSSParser(ABC):
         """
         pass
     
+    def fetch_feed(
+        self,
+        rss_url: str,
+        validators: Optional[Dict[str, Optional[str]]] = None
+    ) -> Dict[str, Any]:
+        """
+        抓取RSS源内容（支持 ETag / Last-Modified 条件请求）
+
+        请求通过共用的HTTP客户端发出（连接复用、压缩、失败重试），访问网络时经过全局的按主机限速器；服务端返回304，或内容哈希与上次相同时，not_modified 为True
+
+        Args:
+            rss_url: RSS源URL
+            validators: 上次抓取保存的缓存校验信息
+
+        Returns:
+            Dict[str, Any]: 抓取结果，包含：
+                - not_modified: 内容是否未变化
+                - content: 响应内容（未变化时为None）
+                - headers: 响应头（键为小写）
+                - bytes_transferred: 响应内容的字节数（由磁盘缓存返回时为0）
+                - rate_limit_wait: 在限速器中等待的秒数
+                - validators: 新的缓存校验信息
+        """
+        validators = validators or {}
+        headers = {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+
+        # 缓存命中时不经过限速器
+        response = get_http_client().get(
+            rss_url,
+            headers=headers,
+            timeout=get_config_value('rss.timeout', 30),
+            cache_ttl=get_config_value('http_cache.feed_ttl', 0),
+            rate_limit=True
+        )
+        rate_limit_wait = response.rate_limit_wait
+
+        if response.status_code == 304:
+            return {
+                'not_modified': True,
+                'content': None,
+                'headers': {key.lower(): value for key, value in response.headers.items()},
+                'bytes_transferred': 0,
+                'rate_limit_wait': rate_limit_wait,
+                'validators': {
+                    'etag': response.headers.get('ETag') or validators.get('etag'),
+                    'last_modified': response.headers.get('Last-Modified') or validators.get('last_modified'),
+                    'content_hash': validators.get('content_hash')
+                }
+            }
+
+        response.raise_for_status()
+        content = response.content
+        content_hash = hashlib.sha256(content).hexdigest()
+
+        return {
+            'not_modified': content_hash == validators.get('content_hash'),
+            'content': content,
+            'headers': {key.lower(): value for key, value in response.headers.items()},
+            'bytes_transferred': 0 if getattr(response, 'from_cache', False) else len(content),
+            'rate_limit_wait': rate_limit_wait,
+            'validators': {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'content_hash': content_hash
+            }
+        }
+
+    def error_result(self, error: Exception) -> Dict[str, Any]:
+        """
+        构造抓取或解析抛出异常时的解析结果
+
+        Args:
+            error: 异常
+
+        Returns:
+            失败的解析结果，transport_error 标记是否为网络传输错误
+        """
+        return {
+            'success': False,
+            'error': f'RSS解析异常: {str(error)}',
+            'transport_error': is_transport_error(error)
+        }
+
+    def get_entry_marker(self, entry: Any) -> Optional[str]:
+        """
+        获取RSS条目的标记，优先使用GUID，其次使用条目链接
+
+        Args:
+            entry: RSS条目
+
+        Returns:
+            条目标记，都不存在时返回None
+        """
+        return entry.get('id') or entry.get('link') or None
+
+    def select_new_entries(
+        self,
+        entries: List[Any],
+        last_entry_id: Optional[str] = None
+    ) -> Tuple[List[Any], bool]:
+        """
+        增量模式下选出上次标记之前的条目
+
+        条目按时间倒序排列，遇到上次的标记即停止；标记为空或不在当前RSS中时返回全部条目
+
+        Args:
+            entries: RSS条目列表
+            last_entry_id: 上次解析到的最新条目标记
+
+        Returns:
+            (需要解析的条目, 是否提前停止)
+        """
+        if not last_entry_id:
+            return entries, False
+        for index, entry in enumerate(entries):
+            if self.get_entry_marker(entry) == last_entry_id:
+                return entries[:index], True
+        return entries, False
+
+    def not_modified_result(
+        self,
+        validators: Dict[str, Optional[str]],
+        bytes_transferred: int = 0,
+        rate_limit_wait: float = 0.0
+    ) -> Dict[str, Any]:
+        """
+        构造RSS源内容未变化时的解析结果
+
+        Args:
+            validators: 缓存校验信息
+            bytes_transferred: 本次抓取传输的字节数
+            rate_limit_wait: 本次请求在限速器中等待的秒数
+
+        Returns:
+            解析结果
+        """
+        return {
+            'success': True,
+            'not_modified': True,
+            'validators': validators,
+            'bytes_transferred': bytes_transferred,
+            'rate_limit_wait': rate_limit_wait,
+            'entries_parsed': 0,
+            'total_entries': 0,
+            'links': [],
+            'new_links': [],
+            'new_links_count': 0
+        }
+    
+    def parse_title(self, title: str) -> ParsedTitle:
+        """
+        一次解析标题中的集数、集标题和版本号（结果按原始标题缓存）
+
+        Args:
+            title: 标题
+
+        Returns:
+            解析结果
+        """
+        return parse_title(title or '')
+
+    def parse_titles(self, titles: List[str]) -> List[ParsedTitle]:
+        """
+        批量解析标题
+
+        Args:
+            titles: 标题列表
+
+        Returns:
+            与输入顺序一致的解析结果
+        """
+        return parse_titles(titles)
+
+    def parse_release(self, title: str) -> ReleaseInfo:
+        """
+        解析发布标题中的字幕组、分辨率、视频编码、字幕语言和版本号（结果按原始标题缓存）
+
+        Args:
+            title: 标题
+
+        Returns:
+            解析结果，保存到链接的同名字段
+        """
+        return parse_release(title or '')
+
     def extract_episode_number(self, title: str) -> Optional[int]:
         """
         从标题中提取集数（通用方法）
 
+        依次尝试 "第X集"、"EP.X"、"[X]"、"【X】"、" - X" 格式，方括号和分隔符格式可带版本号（如 [01v2]）
+
         Args:
             title: 标题
 
         Returns:
             集数，提取失败返回None
         """
-        import re
-
-        # 尝试匹配 "第X集" 格式
-        match = re.search(r'第(\d+)集', title)
-        if match:
-            return int(match.group(1))
-
-        # 尝试匹配 "EP.X" 或 "EPX" 格式
-        match = re.search(r'EP\.?(\d+)', title, re.IGNORECASE)
-        if match:
-            return int(match.group(1))
-
-        # 尝试匹配 "[X]" 格式
-        match = re.search(r'\[(\d+)\]', title)
-        if match:
-            return int(match.group(1))
-
-        # 尝试匹配 "【X】" 格式（全角方括号）
-        match = re.search(r'【(\d+)】', title)
-        if match:
-            return int(match.group(1))
-
-        # 尝试匹配 " - X" 或 " X " 格式
-        match = re.search(r'[\s\-_](\d+)(?:[\s\-_]|$)', title)
-        if match:
-            num = int(match.group(1))
-            # 只返回合理的集数（1-999）
-            if 1 <= num <= 999:
-                return num
-
-        return None
+        return self.parse_title(title).episode_number
     
     def extract_episode_title(self, title: str) -> str:
         """
         从标题中提取集标题（通用方法）
 
+        移除文件扩展名、方括号和圆括号内的内容（通常包含字幕组、分辨率等信息）以及集数标记
+
         Args:
             title: 标题
 
         Returns:
             集标题
         """
-        import re
-
-        # 移除常见的标签和格式
-        # 移除文件扩展名
-        title = re.sub(r'\.(mkv|mp4|avi|rmvb|wmv|flv|ts|m2ts)$', '', title, flags=re.IGNORECASE)
-
-        # 移除方括号内的内容（通常包含字幕组、分辨率等信息）
-        title = re.sub(r'\[[^\]]+\]', '', title)
-
-        # 移除圆括号内的内容
-        title = re.sub(r'\([^)]+\)', '', title)
-
-        # 移除集数标记
-        title = re.sub(r'第\d+集', '', title)
-        title = re.sub(r'EP\.?\d+', '', title, flags=re.IGNORECASE)
-
-        # 清理多余空格和符号
-        title = re.sub(r'[\s\-_]+', ' ', title)
-        title = title.strip()
-
-        return title
\ No newline at end of file
+        return self.parse_title(title).episode_title
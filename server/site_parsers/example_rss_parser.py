@@ -29,20 +29,37 @@ class ExampleRSSParser(BaseRSSParser):
         # 检查URL是否包含网站的域名
         return 'example.com' in url
     
-    def parse_rss(self, rss_url: str, existing_urls: Optional[List[str]] = None) -> Dict[str, Any]:
+    def parse_rss(
+        self,
+        rss_url: str,
+        existing_urls: Optional[List[str]] = None,
+        validators: Optional[Dict[str, Optional[str]]] = None,
+        last_entry_id: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         解析RSS源
 
         Args:
             rss_url: RSS源URL
             existing_urls: 已存在的链接URL列表
+            validators: 上次抓取保存的缓存校验信息
+            last_entry_id: 上次解析到的最新条目标记，提供时只解析更新的条目
 
         Returns:
             解析结果
         """
         try:
+            # 抓取RSS，内容未变化时直接返回
+            fetched = self.fetch_feed(rss_url, validators)
+            if fetched['not_modified']:
+                return self.not_modified_result(
+                    fetched['validators'],
+                    fetched['bytes_transferred'],
+                    fetched['rate_limit_wait']
+                )
+
             # 解析RSS
-            feed = feedparser.parse(rss_url)
+            feed = feedparser.parse(fetched['content'], response_headers=fetched['headers'])
             
             if feed.bozo:
                 return {
@@ -50,9 +67,12 @@ class ExampleRSSParser(BaseRSSParser):
                     'error': f'RSS解析失败: {feed.bozo_exception}'
                 }
             
+            # 增量模式：只解析上次最新条目之前的条目
+            entries, stopped_early = self.select_new_entries(feed.entries, last_entry_id)
+            
             # 提取链接
             links = []
-            for entry in feed.entries:
+            for entry in entries:
                 link_info = self._parse_entry(entry, rss_url)
                 if link_info:
                     links.append(link_info)
@@ -63,9 +83,16 @@ class ExampleRSSParser(BaseRSSParser):
                 'feed_description': feed.feed.get('description', ''),
                 'feed_link': feed.feed.get('link', ''),
                 'total_entries': len(feed.entries),
+                'latest_entry_id': self.get_entry_marker(feed.entries[0]) if feed.entries else last_entry_id,
+                'stopped_early': stopped_early,
+                'entries_parsed': len(entries),
+                'bytes_transferred': fetched['bytes_transferred'],
+                'rate_limit_wait': fetched['rate_limit_wait'],
                 'links': links,
                 'new_links': [],
-                'new_links_count': 0
+                'new_links_count': 0,
+                'not_modified': False,
+                'validators': fetched['validators']
             }
             
             # 如果提供了已存在的链接，过滤出新链接
@@ -81,10 +108,7 @@ class ExampleRSSParser(BaseRSSParser):
             return result
             
         except Exception as e:
-            return {
-                'success': False,
-                'error': f'RSS解析异常: {str(e)}'
-            }
+            return self.error_result(e)
     
     def _parse_entry(self, entry: Any, rss_url: str) -> Optional[Dict[str, Any]]:
         """
@@ -110,11 +134,13 @@ class ExampleRSSParser(BaseRSSParser):
         # 获取描述
         description = entry.get('description', '') or entry.get('summary', '')
         
-        # 从标题中提取集数
-        episode_number = self.extract_episode_number(title)
+        # 从标题中提取集数和集标题
+        parsed_title = self.parse_title(title)
+        episode_number = parsed_title.episode_number
+        episode_title = parsed_title.episode_title
         
-        # 从标题中提取集标题
-        episode_title = self.extract_episode_title(title)
+        # 从标题中解析字幕组、分辨率、视频编码、字幕语言和版本号
+        release = self.parse_release(title)
         
         # 从entry中提取下载链接
         download_links = self._extract_download_links(entry)
@@ -127,6 +153,7 @@ class ExampleRSSParser(BaseRSSParser):
             link_info.update({
                 'episode_number': episode_number,
                 'episode_title': episode_title,
+                **release._asdict(),
                 'publish_date': publish_date,
                 'entry_title': title,
                 'entry_description': description
@@ -234,4 +261,14 @@ class ExampleRSSParser(BaseRSSParser):
 #    from server.site_parsers.example_rss_parser import ExampleRSSParser
 #
 #    parser = ExampleRSSParser()
-#    result = parser.parse_rss('https://example.com/rss')
\ No newline at end of file
+#    result = parser.parse_rss('https://example.com/rss')
+#
+# 7. 注册到调度器：在 server_config.yaml 的 site_parsers.rss 中按模块路径登记（首次检查该网站的RSS源时才导入），
+#    或调用 scheduler_service.register_rss_parser(parser, hosts=['example.com'])
+#
+#    site_parsers:
+#      rss:
+#        example:
+#          class: "server.site_parsers.example_rss_parser.ExampleRSSParser"
+#          name: "示例网站"
+#          hosts: ["example.com"]
\ No newline at end of file
@@ -1,7 +1,35 @@
-from typing import List, Dict
-import requests
-from bs4 import BeautifulSoup
+import re
+from typing import List, Dict, Optional
+from urllib.parse import quote, urljoin
+from bs4 import BeautifulSoup, SoupStrainer
 from .base_site_parser import BaseSiteParser
+from server.utils.config import get_config_value
+from server.utils.http_client import get_http_client
+
+
+# 智能解析用到的页面元素的 class：番组海报、标题、信息、RSS链接，以及字幕组列表（subgroup-<ID>）
+PAGE_CLASSES = {'bangumi-poster', 'bangumi-title', 'bangumi-info', 'mikan-rss'}
+SUBGROUP_CLASS_PATTERN = re.compile(r'^subgroup-\d+$')
+
+
+def _is_page_element_class(value) -> bool:
+    """判断元素的 class 是否是智能解析用到的元素（解析时 class 为未拆分的字符串）"""
+    if not value:
+        return False
+    classes = value.split() if isinstance(value, str) else value
+    return any(cls in PAGE_CLASSES or SUBGROUP_CLASS_PATTERN.match(cls) for cls in classes)
+
+
+# 只构建上述元素（及其子元素），跳过导航、简介和各字幕组的剧集列表等页面其余部分
+PAGE_STRAINER = SoupStrainer(['p', 'div', 'a'], class_=_is_page_element_class)
+
+# 季度番组列表（首页和 BangumiCoverFlowByDayOfWeek）只构建按放送日分组的番组块
+SEASON_STRAINER = SoupStrainer('div', class_='sk-bangumi')
+
+# 季度番组列表的季度名称
+SEASONS = ('春', '夏', '秋', '冬')
+
+BANGUMI_PATH_PATTERN = re.compile(r'/Home/Bangumi/(\d+)')
 
 
 class MikanParser(BaseSiteParser):
@@ -25,103 +53,199 @@ class MikanParser(BaseSiteParser):
             List[Dict]: 动画信息列表
         """
         try:
-            response = requests.get(url, timeout=30)
+            response = get_http_client().get(
+                url,
+                timeout=get_config_value('smart_parser.timeout', 30),
+                rate_limit=True
+            )
             response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
+            return self.parse_anime_page(response.text, url)
             
-            # 解析动画信息
-            anime_info = {
-                'title': '',
-                'title_en': '',
-                'description': '',
-                'cover_url': '',
-                'status': 'ongoing',
-                'total_episodes': 0,
-                'rss_sources': []
-            }
+        except Exception as e:
+            print(f"解析蜜柑计划动画信息失败: {e}")
+            return []
+    
+    def parse_anime_page(self, html: str, url: str) -> List[Dict]:
+        """从番组页面HTML中解析动画信息
+        
+        只构建番组信息、海报、RSS链接和字幕组列表元素（PAGE_STRAINER），不构建整个页面
+        
+        Args:
+            html: 番组页面HTML
+            url: 动画页面URL（用于生成字幕组RSS链接）
             
-            # 提取所有RSS源（在修改DOM之前）
-            # 首先添加默认RSS（没有subgroupid的）
-            rss_links = soup.find_all('a', class_='mikan-rss')
-            default_rss = None
-            for rss_link in rss_links:
-                rss_url = rss_link.get('href', '')
-                # 检查是否是默认RSS（不包含subgroupid参数）
-                if rss_url and 'subgroupid=' not in rss_url:
-                    if not rss_url.startswith('http'):
-                        rss_url = f"{self.base_url}{rss_url}"
-                    default_rss = rss_url
+        Returns:
+            List[Dict]: 动画信息列表
+        """
+        soup = BeautifulSoup(html, 'html.parser', parse_only=PAGE_STRAINER)
+        
+        # 解析动画信息
+        anime_info = {
+            'title': '',
+            'title_en': '',
+            'description': '',
+            'cover_url': '',
+            'status': 'ongoing',
+            'total_episodes': 0,
+            'rss_sources': []
+        }
+        
+        # 提取所有RSS源（在修改DOM之前）
+        # 首先添加默认RSS（没有subgroupid的）
+        rss_links = soup.find_all('a', class_='mikan-rss')
+        default_rss = None
+        for rss_link in rss_links:
+            rss_url = rss_link.get('href', '')
+            # 检查是否是默认RSS（不包含subgroupid参数）
+            if rss_url and 'subgroupid=' not in rss_url:
+                if not rss_url.startswith('http'):
+                    rss_url = f"{self.base_url}{rss_url}"
+                default_rss = rss_url
+                break
+        
+        if default_rss:
+            anime_info['rss_sources'].append({
+                'name': f'{self.site_name} 默认',
+                'url': default_rss,
+                'quality': 'default',
+                'auto_download': True
+            })
+        
+        # 提取标题
+        title_element = soup.find('p', class_='bangumi-title')
+        if title_element:
+            # 移除RSS链接图标
+            rss_link = title_element.find('a', class_='mikan-rss')
+            if rss_link:
+                rss_link.decompose()
+            anime_info['title'] = title_element.get_text(strip=True)
+        
+        # 提取封面
+        cover_element = soup.find('div', class_='bangumi-poster')
+        if cover_element:
+            style = cover_element.get('style', '')
+            # 从background-image中提取URL
+            if 'background-image' in style:
+                start = style.find('url(') + 4
+                end = style.find(')', start)
+                cover_url = style[start:end].strip("'\"")
+                if cover_url and not cover_url.startswith('http'):
+                    cover_url = f"{self.base_url}{cover_url}"
+                anime_info['cover_url'] = cover_url
+        
+        # 提取描述和其他信息
+        info_elements = soup.find_all('p', class_='bangumi-info')
+        description_parts = []
+        for info_element in info_elements:
+            text = info_element.get_text(strip=True)
+            if text and not text.startswith('官方网站') and not text.startswith('Bangumi'):
+                if '放送日期' in text or '放送开始' in text:
+                    description_parts.append(text)
+        
+        anime_info['description'] = '\n'.join(description_parts)
+        
+        # 提取字幕组RSS源
+        subgroup_links = soup.find_all('a', class_=SUBGROUP_CLASS_PATTERN)
+        for link in subgroup_links:
+            classes = link.get('class', [])
+            subgroup_id = None
+            for cls in classes:
+                if cls.startswith('subgroup-') and cls != 'subgroup-name':
+                    subgroup_id = cls.replace('subgroup-', '')
                     break
             
-            if default_rss:
+            if subgroup_id:
+                name = link.get_text(strip=True)
+                rss_url = f"{self.base_url}/RSS/Bangumi?bangumiId={url.split('/')[-1]}&subgroupid={subgroup_id}"
+                
                 anime_info['rss_sources'].append({
-                    'name': f'{self.site_name} 默认',
-                    'url': default_rss,
+                    'name': f'{name}',
+                    'url': rss_url,
                     'quality': 'default',
                     'auto_download': True
                 })
+        
+        return [anime_info]
+    
+    def get_season_url(self, year: int, season: str) -> str:
+        """获取季度番组列表页面URL
+        
+        Args:
+            year: 年份
+            season: 季度（春、夏、秋、冬）
             
-            # 提取标题
-            title_element = soup.find('p', class_='bangumi-title')
-            if title_element:
-                # 移除RSS链接图标
-                rss_link = title_element.find('a', class_='mikan-rss')
-                if rss_link:
-                    rss_link.decompose()
-                anime_info['title'] = title_element.get_text(strip=True)
-            
-            # 提取封面
-            cover_element = soup.find('div', class_='bangumi-poster')
-            if cover_element:
-                style = cover_element.get('style', '')
-                # 从background-image中提取URL
-                if 'background-image' in style:
-                    start = style.find('url(') + 4
-                    end = style.find(')', start)
-                    cover_url = style[start:end].strip("'\"")
-                    if cover_url and not cover_url.startswith('http'):
-                        cover_url = f"{self.base_url}{cover_url}"
-                    anime_info['cover_url'] = cover_url
-            
-            # 提取描述和其他信息
-            info_elements = soup.find_all('p', class_='bangumi-info')
-            description_parts = []
-            for info_element in info_elements:
-                text = info_element.get_text(strip=True)
-                if text and not text.startswith('官方网站') and not text.startswith('Bangumi'):
-                    if '放送日期' in text or '放送开始' in text:
-                        description_parts.append(text)
-            
-            anime_info['description'] = '\n'.join(description_parts)
-            
-            # 提取字幕组RSS源
-            import re
-            subgroup_links = soup.find_all('a', class_=re.compile(r'subgroup-\d+'))
-            for link in subgroup_links:
-                classes = link.get('class', [])
-                subgroup_id = None
-                for cls in classes:
-                    if cls.startswith('subgroup-') and cls != 'subgroup-name':
-                        subgroup_id = cls.replace('subgroup-', '')
-                        break
-                
-                if subgroup_id:
-                    name = link.get_text(strip=True)
-                    rss_url = f"{self.base_url}/RSS/Bangumi?bangumiId={url.split('/')[-1]}&subgroupid={subgroup_id}"
-                    
-                    anime_info['rss_sources'].append({
-                        'name': f'{name}',
-                        'url': rss_url,
-                        'quality': 'default',
-                        'auto_download': True
-                    })
+        Returns:
+            str: 季度番组列表页面URL
+        """
+        if season not in SEASONS:
+            raise ValueError(f"季度应为 {'、'.join(SEASONS)} 之一: {season}")
+        return f"{self.base_url}/Home/BangumiCoverFlowByDayOfWeek?year={int(year)}&seasonStr={quote(season)}"
+    
+    def parse_season(self, url: str) -> List[Dict]:
+        """解析季度番组列表，返回番组条目列表
+        
+        Args:
+            url: 季度番组列表页面URL（首页或 get_season_url 返回的URL）
             
-            return [anime_info]
+        Returns:
+            List[Dict]: 番组条目列表
+        """
+        try:
+            response = get_http_client().get(
+                url,
+                timeout=get_config_value('smart_parser.timeout', 30),
+                rate_limit=True
+            )
+            response.raise_for_status()
+            return self.parse_season_page(response.text, url)
             
         except Exception as e:
-            print(f"解析蜜柑计划动画信息失败: {e}")
+            print(f"解析蜜柑计划季度番组列表失败: {e}")
             return []
     
+    def parse_season_page(self, html: str, url: str) -> List[Dict]:
+        """从季度番组列表HTML中解析番组条目
+        
+        Args:
+            html: 季度番组列表HTML
+            url: 页面URL（番组页面链接相对于它生成）
+            
+        Returns:
+            List[Dict]: 番组条目列表，每项包含 bangumi_id、title、url、cover_url、day_of_week
+                （0-6 为星期日到星期六，其余为剧场版、OVA等分组），同一番组只保留第一次出现
+        """
+        soup = BeautifulSoup(html, 'html.parser', parse_only=SEASON_STRAINER)
+        
+        entries = []
+        seen = set()
+        for day_element in soup.find_all('div', class_='sk-bangumi'):
+            day_of_week = self._parse_day_of_week(day_element.get('data-dayofweek'))
+            for link in day_element.find_all('a', href=BANGUMI_PATH_PATTERN):
+                bangumi_id = BANGUMI_PATH_PATTERN.search(link['href']).group(1)
+                if bangumi_id in seen:
+                    continue
+                seen.add(bangumi_id)
+                
+                item = link.find_parent('li')
+                cover_element = item.find('span', attrs={'data-bangumiid': bangumi_id}) if item else None
+                cover_url = cover_element.get('data-src', '') if cover_element else ''
+                entries.append({
+                    'bangumi_id': bangumi_id,
+                    'title': link.get('title') or link.get_text(strip=True),
+                    'url': urljoin(url, f'/Home/Bangumi/{bangumi_id}'),
+                    'cover_url': urljoin(self.base_url, cover_url) if cover_url else '',
+                    'day_of_week': day_of_week
+                })
+        
+        return entries
+    
+    @staticmethod
+    def _parse_day_of_week(value) -> Optional[int]:
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+    
     def parse_rss(self, url: str, anime_id: int) -> List[Dict]:
         """解析RSS源信息，返回可能的RSS源列表
         
@@ -133,7 +257,11 @@ class MikanParser(BaseSiteParser):
             List[Dict]: RSS源信息列表
         """
         try:
-            response = requests.get(url, timeout=30)
+            response = get_http_client().get(
+                url,
+                timeout=get_config_value('smart_parser.timeout', 30),
+                rate_limit=True
+            )
             response.raise_for_status()
             
             # 蜜柑计划的RSS链接本身就是RSS源
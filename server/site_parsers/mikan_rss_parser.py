@@ -4,16 +4,35 @@
 """
 import feedparser
 import re
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+import time
+from io import BytesIO
+from typing import List, Dict, Any, Iterable, Iterator, Optional
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from urllib.parse import urljoin, urlparse
+from xml.etree import ElementTree
 
 from .base_rss_parser import BaseRSSParser
 
 
+# 蜜柑计划在 item 中附带的 torrent 元素（发布时间在其中）
+TORRENT_NAMESPACE = 'https://mikanani.me/0.1/'
+TORRENT_TAG = f'{{{TORRENT_NAMESPACE}}}torrent'
+TORRENT_PUBDATE_TAG = f'{{{TORRENT_NAMESPACE}}}pubDate'
+# 流式解析时读取的频道字段
+CHANNEL_FIELDS = ('title', 'link', 'description')
+
+
+class MikanFeedMismatch(ValueError):
+    """文档不符合蜜柑计划RSS的结构，需要改用 feedparser 解析"""
+
+
 class MikanRSSParser(BaseRSSParser):
     """蜜柑计划RSS解析器"""
     
+    # 是否优先使用流式解析（关闭时始终使用 feedparser）
+    fast_path = True
+    
     def __init__(self):
         self.site_name = "蜜柑计划"
         self.base_url = "https://mikanani.me"
@@ -22,44 +41,54 @@ class MikanRSSParser(BaseRSSParser):
         """判断是否可以解析该RSS源URL"""
         return 'mikanani.me' in url or 'mikanani.org' in url
     
-    def parse_rss(self, rss_url: str, existing_urls: Optional[List[str]] = None) -> Dict[str, Any]:
+    def parse_rss(
+        self,
+        rss_url: str,
+        existing_urls: Optional[List[str]] = None,
+        validators: Optional[Dict[str, Optional[str]]] = None,
+        last_entry_id: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         解析蜜柑计划RSS源
 
         Args:
             rss_url: RSS源URL
             existing_urls: 已存在的链接URL列表
+            validators: 上次抓取保存的缓存校验信息
+            last_entry_id: 上次解析到的最新条目标记，提供时只解析更新的条目
 
         Returns:
             解析结果
         """
         try:
+            # 抓取RSS，内容未变化时直接返回
+            fetched = self.fetch_feed(rss_url, validators)
+            if fetched['not_modified']:
+                return self.not_modified_result(
+                    fetched['validators'],
+                    fetched['bytes_transferred'],
+                    fetched['rate_limit_wait']
+                )
+
             # 解析RSS
-            feed = feedparser.parse(rss_url)
+            result = self.parse_feed(
+                fetched['content'],
+                rss_url,
+                last_entry_id=last_entry_id,
+                headers=fetched['headers']
+            )
+            if not result['success']:
+                return result
             
-            if feed.bozo:
-                return {
-                    'success': False,
-                    'error': f'RSS解析失败: {feed.bozo_exception}'
-                }
-            
-            # 提取链接
-            links = []
-            for entry in feed.entries:
-                link_info = self._parse_entry(entry, rss_url)
-                if link_info:
-                    links.append(link_info)
-            
-            result = {
-                'success': True,
-                'feed_title': feed.feed.get('title', ''),
-                'feed_description': feed.feed.get('description', ''),
-                'feed_link': feed.feed.get('link', ''),
-                'total_entries': len(feed.entries),
-                'links': links,
+            links = result['links']
+            result.update({
+                'bytes_transferred': fetched['bytes_transferred'],
+                'rate_limit_wait': fetched['rate_limit_wait'],
                 'new_links': [],
-                'new_links_count': 0
-            }
+                'new_links_count': 0,
+                'not_modified': False,
+                'validators': fetched['validators']
+            })
             
             # 如果提供了已存在的链接，过滤出新链接
             if existing_urls:
@@ -74,10 +103,191 @@ class MikanRSSParser(BaseRSSParser):
             return result
             
         except Exception as e:
+            return self.error_result(e)
+    
+    def parse_feed(
+        self,
+        content: bytes,
+        rss_url: str,
+        last_entry_id: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        解析RSS内容
+
+        优先使用蜜柑计划RSS的流式解析，文档结构不符时改用 feedparser 解析
+
+        Args:
+            content: RSS内容
+            rss_url: RSS源URL
+            last_entry_id: 上次解析到的最新条目标记，提供时只解析更新的条目
+            headers: 响应头（feedparser 用于判断编码）
+
+        Returns:
+            解析结果（success、feed_title、feed_description、feed_link、total_entries、
+            latest_entry_id、stopped_early、entries_parsed、links）
+        """
+        if self.fast_path:
+            channel = {}
+            try:
+                return self._collect_links(self.iter_feed_entries(content, channel), channel, rss_url, last_entry_id)
+            except MikanFeedMismatch:
+                pass
+
+        feed = feedparser.parse(content, response_headers=headers or {})
+        if feed.bozo:
             return {
                 'success': False,
-                'error': f'RSS解析异常: {str(e)}'
+                'error': f'RSS解析失败: {feed.bozo_exception}'
             }
+        return self._collect_links(feed.entries, feed.feed, rss_url, last_entry_id)
+
+    def iter_feed_entries(self, content: bytes, channel: Dict[str, str]) -> Iterator[Dict[str, Any]]:
+        """
+        流式解析蜜柑计划RSS，逐个生成条目
+
+        使用增量XML解析器，只读取蜜柑计划RSS用到的元素，每个条目处理完即释放。
+        生成的条目与 feedparser 的条目使用相同的键（id、link、title、summary、published_parsed、
+        enclosures、links），可直接交给 _parse_entry
+
+        Args:
+            content: RSS内容
+            channel: 用于接收频道的 title、link、description
+
+        Yields:
+            RSS条目
+
+        Raises:
+            MikanFeedMismatch: 文档不是RSS 2.0结构或XML格式错误
+        """
+        try:
+            events = ElementTree.iterparse(BytesIO(content), events=('start', 'end'))
+            _, root = next(events)
+            if root.tag != 'rss':
+                raise MikanFeedMismatch(f'根元素为 {root.tag}')
+
+            depth = 1
+            parent = root
+            for event, element in events:
+                if event == 'start':
+                    depth += 1
+                    if depth == 2 and element.tag == 'channel':
+                        parent = element
+                    continue
+                depth -= 1
+                if element.tag == 'item':
+                    yield self._build_entry(element)
+                    # 处理完的条目从树中移除，内存占用与条目数无关
+                    element.clear()
+                    if depth == 2:
+                        parent.remove(element)
+                elif depth == 2 and element.tag in CHANNEL_FIELDS:
+                    # channel 的直接子元素
+                    channel[element.tag] = (element.text or '').strip()
+                elif depth == 1 and element.tag != 'channel':
+                    raise MikanFeedMismatch(f'不支持的元素 {element.tag}')
+        except ElementTree.ParseError as e:
+            raise MikanFeedMismatch(str(e))
+
+    def _build_entry(self, item: ElementTree.Element) -> Dict[str, Any]:
+        """把 item 元素转换为与 feedparser 相同键的条目"""
+        entry: Dict[str, Any] = {}
+        links = []
+        enclosures = []
+        for child in item:
+            tag = child.tag
+            text = (child.text or '').strip()
+            if tag == 'title':
+                entry['title'] = text
+            elif tag == 'link':
+                entry['link'] = text
+                links.append({'rel': 'alternate', 'type': 'text/html', 'href': text})
+            elif tag == 'guid':
+                entry['id'] = text
+            elif tag == 'description':
+                entry['summary'] = text
+            elif tag == 'enclosure':
+                enclosure = {
+                    'type': child.get('type', ''),
+                    'length': child.get('length', ''),
+                    'href': child.get('url', '')
+                }
+                enclosures.append(enclosure)
+                links.append({**enclosure, 'rel': 'enclosure'})
+            elif tag == 'pubDate' and 'published_parsed' not in entry:
+                entry['published_parsed'] = self._parse_date(text, rfc822=True)
+            elif tag == TORRENT_TAG:
+                published = child.findtext(TORRENT_PUBDATE_TAG)
+                if published:
+                    entry['published_parsed'] = self._parse_date(published.strip())
+
+        if 'published_parsed' in entry and entry['published_parsed'] is None:
+            del entry['published_parsed']
+        entry['links'] = links
+        entry['enclosures'] = enclosures
+        return entry
+
+    def _parse_date(self, value: str, rfc822: bool = False) -> Optional[time.struct_time]:
+        """解析发布时间，与 feedparser 一致转换为UTC；无法解析时返回None"""
+        try:
+            published = parsedate_to_datetime(value) if rfc822 else datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            return None
+        if published.tzinfo is not None:
+            published = published.astimezone(timezone.utc)
+        return published.timetuple()
+
+    def _collect_links(
+        self,
+        entries: Iterable[Any],
+        feed_info: Dict[str, Any],
+        rss_url: str,
+        last_entry_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        从条目中提取链接
+
+        条目按时间倒序排列；提供 last_entry_id 时遇到该标记后不再解析链接（仍统计条目总数）
+
+        Args:
+            entries: RSS条目（列表或流式解析的生成器）
+            feed_info: 频道信息
+            rss_url: RSS源URL
+            last_entry_id: 上次解析到的最新条目标记
+
+        Returns:
+            解析结果
+        """
+        links = []
+        total_entries = 0
+        entries_parsed = 0
+        latest_entry_id = last_entry_id
+        stopped_early = False
+        for entry in entries:
+            total_entries += 1
+            if total_entries == 1:
+                latest_entry_id = self.get_entry_marker(entry)
+            if stopped_early:
+                continue
+            if last_entry_id and self.get_entry_marker(entry) == last_entry_id:
+                stopped_early = True
+                continue
+            entries_parsed += 1
+            link_info = self._parse_entry(entry, rss_url)
+            if link_info:
+                links.append(link_info)
+
+        return {
+            'success': True,
+            'feed_title': feed_info.get('title', ''),
+            'feed_description': feed_info.get('description', ''),
+            'feed_link': feed_info.get('link', ''),
+            'total_entries': total_entries,
+            'latest_entry_id': latest_entry_id,
+            'stopped_early': stopped_early,
+            'entries_parsed': entries_parsed,
+            'links': links
+        }
     
     def _parse_entry(self, entry: Any, rss_url: str) -> Optional[Dict[str, Any]]:
         """
@@ -96,18 +306,20 @@ class MikanRSSParser(BaseRSSParser):
         # 获取发布日期
         publish_date = None
         if 'published_parsed' in entry:
-            publish_date = datetime(*entry.published_parsed[:6])
+            publish_date = datetime(*entry['published_parsed'][:6])
         elif 'updated_parsed' in entry:
-            publish_date = datetime(*entry.updated_parsed[:6])
+            publish_date = datetime(*entry['updated_parsed'][:6])
         
         # 获取描述
         description = entry.get('description', '') or entry.get('summary', '')
         
-        # 从标题中提取集数
-        episode_number = self.extract_episode_number(title)
+        # 从标题中提取集数和集标题
+        parsed_title = self.parse_title(title)
+        episode_number = parsed_title.episode_number
+        episode_title = parsed_title.episode_title
         
-        # 从标题中提取集标题
-        episode_title = self.extract_episode_title(title)
+        # 从标题中解析字幕组、分辨率、视频编码、字幕语言和版本号
+        release = self.parse_release(title)
         
         # 从entry中提取下载链接
         download_links = self._extract_download_links(entry)
@@ -120,6 +332,7 @@ class MikanRSSParser(BaseRSSParser):
             link_info.update({
                 'episode_number': episode_number,
                 'episode_title': episode_title,
+                **release._asdict(),
                 'publish_date': publish_date,
                 'entry_title': title,
                 'entry_description': description
@@ -141,8 +354,8 @@ class MikanRSSParser(BaseRSSParser):
         links = []
         
         # 检查enclosures（蜜柑计划的种子文件在这里）
-        if hasattr(entry, 'enclosures'):
-            for enclosure in entry.enclosures:
+        if 'enclosures' in entry:
+            for enclosure in entry['enclosures']:
                 url = enclosure.get('href', '')
                 enclosure_type = enclosure.get('type', '')
                 length = enclosure.get('length', 0)
@@ -163,8 +376,8 @@ class MikanRSSParser(BaseRSSParser):
                         pass
         
         # 检查links字段
-        if hasattr(entry, 'links'):
-            for link in entry.links:
+        if 'links' in entry:
+            for link in entry['links']:
                 url = link.get('href', '')
                 
                 # 处理磁力链接
@@ -0,0 +1,220 @@
+"""
+解析器注册表
+按主机名索引网站解析器和RSS解析器。配置中的解析器以模块路径登记，首次分发到该解析器时才导入和创建，
+增加解析器不影响服务启动和分发速度
+"""
+import importlib
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+from server.utils.config import get_config_value
+
+
+# 配置中没有 site_parsers 时使用的默认解析器（键 -> 类的模块路径、网站名称、主机名）
+DEFAULT_SITE_PARSERS = {
+    'mikan': {
+        'class': 'server.site_parsers.mikan_parser.MikanParser',
+        'name': '蜜柑计划',
+        'hosts': ['mikanani.me', 'mikanani.org'],
+    },
+}
+DEFAULT_RSS_PARSERS = {
+    'mikan': {
+        'class': 'server.site_parsers.mikan_rss_parser.MikanRSSParser',
+        'name': '蜜柑计划',
+        'hosts': ['mikanani.me', 'mikanani.org'],
+    },
+}
+
+
+def get_hostname(url: str) -> str:
+    """获取URL的主机名（小写），无法解析时返回空字符串"""
+    try:
+        hostname = urlsplit((url or '').strip()).hostname
+    except ValueError:
+        return ''
+    return (hostname or '').rstrip('.')
+
+
+class _ParserEntry:
+    """注册表中的一个解析器，按模块路径登记的解析器在首次使用时创建"""
+
+    def __init__(
+        self,
+        key: str,
+        parser: Any = None,
+        class_path: Optional[str] = None,
+        name: Optional[str] = None,
+        hosts: Iterable[str] = ()
+    ):
+        self.key = key
+        self.parser = parser
+        self.class_path = class_path
+        self.name = name
+        self.hosts = [host.lower().strip().rstrip('.') for host in hosts if host]
+        self.failed = False
+
+    def get_site_name(self) -> str:
+        if self.name:
+            return self.name
+        if self.parser is not None:
+            return self.parser.get_site_name()
+        return self.key
+
+
+class ParserRegistry:
+    """
+    按主机名索引的解析器注册表
+
+    分发时依次查找主机名及其上级域名（如 www.mikanani.me -> mikanani.me），命中的解析器再用 can_parse 确认；
+    没有登记主机名的解析器（如测试中解析本地地址的解析器）在主机名未命中时按注册顺序用 can_parse 逐个判断
+    """
+
+    def __init__(self):
+        self._entries: List[_ParserEntry] = []
+        self._by_host: Dict[str, List[_ParserEntry]] = {}
+        self._unindexed: List[_ParserEntry] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, key: str, defaults: Dict[str, Dict[str, Any]]) -> 'ParserRegistry':
+        """
+        按配置登记解析器（不导入解析器模块）
+
+        Args:
+            key: 配置项，值为 键 -> {class, name, hosts}
+            defaults: 配置中没有该项时使用的默认值
+
+        Returns:
+            解析器注册表
+        """
+        registry = cls()
+        parsers = get_config_value(key, None) or defaults
+        for parser_key, options in parsers.items():
+            if isinstance(options, str):
+                options = {'class': options}
+            registry.register_path(
+                parser_key,
+                options['class'],
+                hosts=options.get('hosts') or [],
+                name=options.get('name')
+            )
+        return registry
+
+    def register(self, parser: Any, hosts: Optional[Iterable[str]] = None):
+        """
+        注册解析器实例
+
+        Args:
+            parser: 解析器实例
+            hosts: 解析器负责的主机名，为空时按 can_parse 判断
+        """
+        self._add(_ParserEntry(parser.get_site_name(), parser=parser, hosts=hosts or ()))
+
+    def register_path(
+        self,
+        key: str,
+        class_path: str,
+        hosts: Iterable[str] = (),
+        name: Optional[str] = None
+    ):
+        """
+        按模块路径登记解析器，首次分发到该解析器时才导入并创建
+
+        Args:
+            key: 解析器标识
+            class_path: 解析器类的模块路径（如 server.site_parsers.mikan_parser.MikanParser）
+            hosts: 解析器负责的主机名
+            name: 网站名称，未加载时用于列出支持的网站
+        """
+        self._add(_ParserEntry(key, class_path=class_path, name=name, hosts=hosts))
+
+    def _add(self, entry: _ParserEntry):
+        with self._lock:
+            self._entries.append(entry)
+            if not entry.hosts:
+                self._unindexed.append(entry)
+            for host in entry.hosts:
+                self._by_host.setdefault(host, []).append(entry)
+
+    def _load(self, entry: _ParserEntry) -> Any:
+        """返回解析器实例，按模块路径登记的解析器在这里导入和创建，失败时返回None"""
+        if entry.parser is not None or entry.failed:
+            return entry.parser
+        with self._lock:
+            if entry.parser is None and not entry.failed:
+                module_path, _, class_name = entry.class_path.rpartition('.')
+                try:
+                    parser_class = getattr(importlib.import_module(module_path), class_name)
+                    entry.parser = parser_class()
+                except Exception as e:
+                    entry.failed = True
+                    print(f"加载解析器 {entry.key} ({entry.class_path}) 失败: {e}")
+        return entry.parser
+
+    def get_parser(self, url: str) -> Optional[Any]:
+        """
+        获取能解析该URL的解析器
+
+        Args:
+            url: 要解析的URL
+
+        Returns:
+            解析器实例，没有找到返回None
+        """
+        hostname = get_hostname(url)
+        while hostname:
+            for entry in self._by_host.get(hostname, ()):
+                parser = self._load(entry)
+                if parser is not None and parser.can_parse(url):
+                    return parser
+            _, _, hostname = hostname.partition('.')
+
+        for entry in self._unindexed:
+            parser = self._load(entry)
+            if parser is not None and parser.can_parse(url):
+                return parser
+        return None
+
+    def get_site_names(self) -> List[str]:
+        """获取已登记的网站名称（去重，保持登记顺序，不加载解析器）"""
+        names = []
+        for entry in self._entries:
+            name = entry.get_site_name()
+            if name not in names:
+                names.append(name)
+        return names
+
+    def get_sites(self) -> List[Dict[str, Any]]:
+        """获取已登记的解析器信息（网站名称、主机名、模块路径、是否已加载）"""
+        return [
+            {
+                'key': entry.key,
+                'name': entry.get_site_name(),
+                'hosts': list(entry.hosts),
+                'class': entry.class_path or f'{type(entry.parser).__module__}.{type(entry.parser).__name__}',
+                'loaded': entry.parser is not None
+            }
+            for entry in self._entries
+        ]
+
+
+_site_parser_registry: Optional[ParserRegistry] = None
+_site_parser_registry_lock = threading.Lock()
+
+
+def get_site_parser_registry() -> ParserRegistry:
+    """获取共享的网站解析器注册表（首次调用时按配置 site_parsers.site 登记）"""
+    global _site_parser_registry
+    if _site_parser_registry is None:
+        with _site_parser_registry_lock:
+            if _site_parser_registry is None:
+                _site_parser_registry = ParserRegistry.from_config('site_parsers.site', DEFAULT_SITE_PARSERS)
+    return _site_parser_registry
+
+
+def set_site_parser_registry(registry: Optional[ParserRegistry]):
+    """设置共享的网站解析器注册表（为None时下次使用重新按配置登记）"""
+    global _site_parser_registry
+    _site_parser_registry = registry
@@ -1,5 +1,14 @@
 from server.utils.logger import setup_logger, get_logger
-from server.utils.config import Config, config, init_config
+from server.utils.config import Config, config, init_config, get_config_value
+from server.utils.timer_heap import TimerHeap
+from server.utils.circuit_breaker import CircuitBreaker
+from server.utils.rate_limiter import HostRateLimiter, get_rate_limiter, set_rate_limiter
+from server.utils.http_cache import HTTPCache, HTTPCacheMiss
+from server.utils.http_client import HTTPClient, RequestTiming, get_http_client, set_http_client, is_transport_error
+from server.utils.single_flight import SingleFlight
+from server.utils.url import normalize_url
+from server.utils.title_parser import ParsedTitle, parse_title, parse_titles
+from server.utils.release_parser import ReleaseInfo, parse_release
 
 __all__ = [
     'setup_logger',
@@ -7,4 +16,23 @@ __all__ = [
     'Config',
     'config',
     'init_config',
+    'get_config_value',
+    'TimerHeap',
+    'CircuitBreaker',
+    'HostRateLimiter',
+    'get_rate_limiter',
+    'set_rate_limiter',
+    'HTTPCache',
+    'HTTPCacheMiss',
+    'HTTPClient',
+    'RequestTiming',
+    'get_http_client',
+    'set_http_client',
+    'SingleFlight',
+    'normalize_url',
+    'ParsedTitle',
+    'parse_title',
+    'parse_titles',
+    'ReleaseInfo',
+    'parse_release',
 ]
\ No newline at end of file
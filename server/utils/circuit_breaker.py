@@ -0,0 +1,114 @@
+"""
+熔断器模块
+按主机统计连续失败次数，失败过多时暂停对该主机的请求，一段时间后放行一次探测请求
+"""
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class CircuitBreaker:
+    """按主机划分的熔断器
+
+    状态：
+    - closed: 正常放行
+    - open: 连续失败达到阈值后拒绝请求，直到 retry_at
+    - half_open: 到达 retry_at 后只放行一个探测请求，成功则关闭，失败则重新打开并加倍等待时间
+    """
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 300, max_recovery_timeout: float = 3600):
+        """
+        初始化熔断器
+
+        Args:
+            failure_threshold: 打开熔断器所需的连续失败次数
+            recovery_timeout: 打开后首次探测前的等待时间（秒）
+            max_recovery_timeout: 探测连续失败时等待时间的上限（秒）
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self.max_recovery_timeout = max(recovery_timeout, max_recovery_timeout)
+        self._hosts: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, host: str) -> Dict[str, Any]:
+        """获取主机状态（需持有锁）"""
+        state = self._hosts.get(host)
+        if state is None:
+            state = {
+                "state": "closed",
+                "consecutive_failures": 0,
+                "retry_at": None,
+                "timeout": self.recovery_timeout,
+                "probing": False,
+                "opened_at": None
+            }
+            self._hosts[host] = state
+        return state
+
+    def allow_request(self, host: str) -> bool:
+        """
+        判断是否允许向主机发起请求
+
+        半开状态下只放行一个探测请求，调用方必须随后调用 record_success 或 record_failure
+        """
+        with self._lock:
+            state = self._get(host)
+            if state["state"] == "closed":
+                return True
+            if state["state"] == "open":
+                if time.time() < state["retry_at"]:
+                    return False
+                state["state"] = "half_open"
+            if state["probing"]:
+                return False
+            state["probing"] = True
+            return True
+
+    def record_success(self, host: str):
+        """记录请求成功，关闭熔断器"""
+        with self._lock:
+            state = self._get(host)
+            state.update({
+                "state": "closed",
+                "consecutive_failures": 0,
+                "retry_at": None,
+                "timeout": self.recovery_timeout,
+                "probing": False,
+                "opened_at": None
+            })
+
+    def record_failure(self, host: str):
+        """记录请求失败，达到阈值或探测失败时打开熔断器"""
+        with self._lock:
+            state = self._get(host)
+            state["consecutive_failures"] += 1
+            now = time.time()
+            if state["state"] == "half_open":
+                # 探测失败，加倍等待时间
+                state["timeout"] = min(state["timeout"] * 2, self.max_recovery_timeout)
+                state.update({"state": "open", "retry_at": now + state["timeout"], "probing": False})
+            elif state["state"] == "closed" and state["consecutive_failures"] >= self.failure_threshold:
+                state.update({"state": "open", "retry_at": now + state["timeout"], "opened_at": now})
+
+    def get_retry_at(self, host: str) -> Optional[float]:
+        """获取熔断器允许下一次探测的时间，未打开时返回None"""
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None or state["state"] == "closed":
+                return None
+            return state["retry_at"]
+
+    def get_state(self, host: str) -> Dict[str, Any]:
+        """获取主机的熔断状态"""
+        with self._lock:
+            state = dict(self._get(host))
+        state["host"] = host
+        state.pop("timeout")
+        return state
+
+    def get_states(self) -> Dict[str, Dict[str, Any]]:
+        """获取所有主机的熔断状态"""
+        with self._lock:
+            hosts = list(self._hosts)
+        return {host: self.get_state(host) for host in hosts}
@@ -84,4 +84,11 @@ def init_config(config_path: Optional[str] = None) -> Config:
     """初始化全局配置"""
     global config
     config = Config(config_path)
-    return config
\ No newline at end of file
+    return config
+
+
+def get_config_value(key: str, default: Any = None) -> Any:
+    """读取全局配置项，配置未初始化时返回默认值"""
+    if config is None:
+        return default
+    return config.get(key, default)
\ No newline at end of file
@@ -0,0 +1,312 @@
+"""
+HTTP磁盘缓存模块
+缓存抓取的网页和RSS：响应内容按 SHA-256 存放（相同内容只存一份），索引按规范化URL记录状态码、响应头和缓存校验信息。
+支持有效期、按总大小的LRU淘汰，以及录制/回放模式（回放模式只使用已录制的响应，不访问网络）
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, NamedTuple, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from server.utils.config import get_config_value
+from server.utils.url import normalize_url
+
+
+# 缓存模式
+MODE_OFF = 'off'          # 不缓存
+MODE_NORMAL = 'normal'    # 有效期内直接使用缓存，过期后带缓存校验信息重新请求
+MODE_RECORD = 'record'    # 总是访问网络，并保存所有响应（用于录制）
+MODE_REPLAY = 'replay'    # 只使用已保存的响应，没有缓存时请求失败，不访问网络
+MODES = (MODE_OFF, MODE_NORMAL, MODE_RECORD, MODE_REPLAY)
+
+# 不保存的响应头（内容已解压，长度和传输方式不再适用）
+SKIPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection', 'set-cookie'}
+
+
+class HTTPCacheMiss(requests.ConnectionError):
+    """回放模式下请求的URL没有缓存（按网络错误处理）"""
+
+
+class CachedResponse(NamedTuple):
+    """一条缓存记录"""
+    key: str
+    url: str
+    status_code: int
+    headers: Dict[str, str]
+    body_hash: str
+    size: int
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+
+class HTTPCache:
+    """
+    HTTP磁盘缓存
+
+    目录结构：index.db（SQLite索引）和 bodies/<哈希前两位>/<哈希>（响应内容）。
+    只缓存GET请求的200响应；总大小超过上限时按最近使用时间淘汰，不再被引用的内容文件随之删除。
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        ttl: float = 600,
+        max_bytes: int = 200 * 1024 * 1024,
+        mode: str = MODE_NORMAL
+    ):
+        """
+        初始化HTTP缓存
+
+        Args:
+            directory: 缓存目录
+            ttl: 默认有效期（秒），请求可单独指定
+            max_bytes: 响应内容的总大小上限（字节）
+            mode: 缓存模式（normal / record / replay）
+        """
+        if mode not in MODES or mode == MODE_OFF:
+            raise ValueError(f"不支持的缓存模式: {mode}")
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.join(directory, 'bodies'), exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(directory, 'index.db'), check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status_code INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body_hash TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_entries_accessed_at ON entries (accessed_at);
+            CREATE INDEX IF NOT EXISTS idx_entries_body_hash ON entries (body_hash);
+        """)
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(method: str, url: str) -> str:
+        """按请求方法和规范化URL生成缓存键"""
+        return hashlib.sha256(f"{method.upper()} {normalize_url(url)}".encode('utf-8')).hexdigest()
+
+    def _body_path(self, body_hash: str) -> str:
+        return os.path.join(self.directory, 'bodies', body_hash[:2], body_hash)
+
+    def lookup(self, url: str, method: str = 'GET') -> Optional[CachedResponse]:
+        """
+        查找缓存记录（不更新使用时间和命中统计）
+
+        Args:
+            url: 请求URL
+            method: 请求方法
+
+        Returns:
+            缓存记录，没有时返回None
+        """
+        key = self.make_key(method, url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT key, url, status_code, headers, body_hash, size, etag, last_modified, stored_at "
+                "FROM entries WHERE key = ?",
+                (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        entry = CachedResponse(*row[:3], json.loads(row[3]), *row[4:])
+        if not os.path.exists(self._body_path(entry.body_hash)):
+            return None
+        return entry
+
+    def is_fresh(self, entry: CachedResponse, ttl: Optional[float] = None) -> bool:
+        """缓存记录是否仍在有效期内"""
+        ttl = self.ttl if ttl is None else ttl
+        return time.time() - entry.stored_at < ttl
+
+    def store(self, response: requests.Response, url: Optional[str] = None, method: str = 'GET') -> Optional[str]:
+        """
+        保存响应，超过总大小上限时按LRU淘汰
+
+        Args:
+            response: 已读完内容的200响应
+            url: 缓存使用的URL，默认为响应的URL
+            method: 请求方法
+
+        Returns:
+            内容的哈希值，响应不可缓存时返回None
+        """
+        if response.status_code != 200 or 'no-store' in response.headers.get('Cache-Control', ''):
+            return None
+        url = url or response.url
+        content = response.content
+        body_hash = hashlib.sha256(content).hexdigest()
+        body_path = self._body_path(body_hash)
+        if not os.path.exists(body_path):
+            os.makedirs(os.path.dirname(body_path), exist_ok=True)
+            temp_path = f"{body_path}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(content)
+            os.replace(temp_path, body_path)
+
+        headers = {
+            key: value for key, value in response.headers.items()
+            if key.lower() not in SKIPPED_HEADERS
+        }
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(key, url, status_code, headers, body_hash, size, etag, last_modified, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.make_key(method, url), normalize_url(url), response.status_code,
+                    json.dumps(headers, ensure_ascii=False), body_hash, len(content),
+                    response.headers.get('ETag'), response.headers.get('Last-Modified'), now, now
+                )
+            )
+            self._evict()
+            self._conn.commit()
+        return body_hash
+
+    def refresh(self, entry: CachedResponse):
+        """服务端确认内容未变化（304）后重新计算有效期"""
+        with self._lock:
+            self._conn.execute("UPDATE entries SET stored_at = ? WHERE key = ?", (time.time(), entry.key))
+            self._conn.commit()
+
+    def build_response(
+        self,
+        entry: CachedResponse,
+        request_headers: Optional[Dict[str, str]] = None
+    ) -> Optional[requests.Response]:
+        """
+        用缓存记录构造响应，更新使用时间和命中统计
+
+        请求带的 If-None-Match / If-Modified-Since 与缓存的校验信息一致时返回304（不含内容）
+
+        Args:
+            entry: 缓存记录
+            request_headers: 请求头
+
+        Returns:
+            响应对象，from_cache 为True；查找之后内容已被淘汰（读取失败）时返回None，按未命中处理
+        """
+        request_headers = CaseInsensitiveDict(request_headers or {})
+        not_modified = (
+            (entry.etag and request_headers.get('If-None-Match') == entry.etag)
+            or (entry.last_modified and request_headers.get('If-Modified-Since') == entry.last_modified)
+        )
+
+        response = requests.Response()
+        response.url = entry.url
+        response.headers = CaseInsensitiveDict(entry.headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        if not_modified:
+            response.status_code = 304
+            response.reason = 'Not Modified'
+            response._content = b''
+        else:
+            # 内容文件在锁外读取，可能已被并发的淘汰删除
+            try:
+                with open(self._body_path(entry.body_hash), 'rb') as f:
+                    response._content = f.read()
+            except OSError:
+                return None
+            response.status_code = entry.status_code
+            response.reason = 'OK'
+        response.from_cache = True
+
+        with self._lock:
+            self.hits += 1
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), entry.key))
+            self._conn.commit()
+        return response
+
+    def record_miss(self):
+        """记录一次未命中"""
+        with self._lock:
+            self.misses += 1
+
+    def _total_size(self) -> int:
+        """不同内容文件的总大小（需持有锁）"""
+        row = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT MAX(size) AS size FROM entries GROUP BY body_hash)"
+        ).fetchone()
+        return row[0]
+
+    def _evict(self):
+        """按最近使用时间淘汰，直到总大小不超过上限（需持有锁）"""
+        total = self._total_size()
+        while total > self.max_bytes:
+            row = self._conn.execute(
+                "SELECT key, body_hash FROM entries ORDER BY accessed_at, stored_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+            key, body_hash = row
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            if self._conn.execute("SELECT 1 FROM entries WHERE body_hash = ? LIMIT 1", (body_hash,)).fetchone() is None:
+                try:
+                    os.remove(self._body_path(body_hash))
+                except OSError:
+                    pass
+            total = self._total_size()
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            for (body_hash,) in self._conn.execute("SELECT DISTINCT body_hash FROM entries").fetchall():
+                try:
+                    os.remove(self._body_path(body_hash))
+                except OSError:
+                    pass
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            return {
+                'mode': self.mode,
+                'entries': entries,
+                'size': self._total_size(),
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+    def close(self):
+        """关闭索引数据库"""
+        with self._lock:
+            self._conn.close()
+
+
+def create_http_cache() -> Optional[HTTPCache]:
+    """按配置 http_cache 创建HTTP缓存，未配置或模式为 off 时返回None"""
+    mode = get_config_value('http_cache.mode', MODE_OFF)
+    if mode == MODE_OFF:
+        return None
+    directory = get_config_value('http_cache.directory', '~/.animeloader/cache/http')
+    return HTTPCache(
+        directory=os.path.expandvars(os.path.expanduser(directory)),
+        ttl=float(get_config_value('http_cache.ttl', 600)),
+        max_bytes=int(float(get_config_value('http_cache.max_size_mb', 200)) * 1024 * 1024),
+        mode=mode
+    )
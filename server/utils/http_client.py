@@ -0,0 +1,364 @@
+"""
+HTTP客户端模块
+所有对外请求（网站解析、RSS抓取、下载器接口）共用的HTTP客户端：
+保持连接的连接池、gzip/deflate 压缩、失败重试（指数退避）、统一的用户代理和超时、请求计时回调，
+以及可选的磁盘缓存（见 http_cache.py）和按主机限速（见 rate_limiter.py）
+"""
+import threading
+import time
+from typing import Callable, List, NamedTuple, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from server.utils.config import get_config_value
+from server.utils.http_cache import HTTPCache, HTTPCacheMiss, MODE_RECORD, MODE_REPLAY, create_http_cache
+from server.utils.rate_limiter import HostRateLimiter, get_rate_limiter
+
+
+# 未配置用户代理时使用的默认值
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+# 默认重试的状态码（限流和服务端临时错误）
+DEFAULT_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def is_transport_error(error: BaseException) -> bool:
+    """
+    是否为网络传输错误：连接失败、超时、传输中断，或服务端返回 429 / 5xx
+
+    其他状态码（如404）、内容格式错误和解析异常只与具体的地址有关，不属于传输错误
+    """
+    if isinstance(error, requests.HTTPError):
+        response = error.response
+        return response is None or response.status_code == 429 or response.status_code >= 500
+    return isinstance(error, (
+        requests.ConnectionError,
+        requests.Timeout,
+        requests.exceptions.ChunkedEncodingError
+    ))
+
+
+class RequestTiming(NamedTuple):
+    """一次请求的计时信息，传给计时回调"""
+    method: str
+    url: str
+    status_code: Optional[int]
+    elapsed: float                 # 从发起请求到读完响应内容的秒数（含重试）
+    bytes_received: int            # 实际传输的字节数（压缩后）
+    content_length: int            # 解压后的内容字节数
+    retries: int                   # 重试次数
+    error: Optional[str] = None    # 请求失败时的错误信息
+    from_cache: bool = False       # 是否由磁盘缓存返回
+
+
+class HTTPClient:
+    """
+    共用的HTTP客户端
+
+    基于 requests.Session：同一主机的连接在连接池中复用，请求默认带 gzip/deflate 的 Accept-Encoding；
+    连接失败、读取失败和 DEFAULT_RETRY_STATUSES 中的状态码按指数退避重试（遵守 Retry-After），
+    只重试 GET/HEAD 等幂等请求。每次请求结束后调用已注册的计时回调。
+    设置了磁盘缓存时，GET请求按缓存模式使用缓存（见 HTTPCache）。
+    限速的请求只在实际访问网络时经过按主机限速器，由缓存返回的响应不占用令牌和并发数。
+    """
+
+    def __init__(
+        self,
+        timeout: float = 30,
+        user_agent: str = DEFAULT_USER_AGENT,
+        retries: int = 2,
+        backoff_factor: float = 0.5,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        retry_statuses=DEFAULT_RETRY_STATUSES,
+        cache: Optional[HTTPCache] = None,
+        rate_limiter: Optional[HostRateLimiter] = None
+    ):
+        """
+        初始化HTTP客户端
+
+        Args:
+            timeout: 默认超时时间（秒）
+            user_agent: 用户代理
+            retries: 最大重试次数，0 表示不重试
+            backoff_factor: 退避系数，第 n 次重试前等待 backoff_factor * 2^(n-1) 秒
+            pool_connections: 连接池缓存的主机数
+            pool_maxsize: 每个主机保持的最大连接数
+            retry_statuses: 需要重试的状态码
+            cache: 磁盘缓存，为空时不缓存
+            rate_limiter: 限速请求使用的限速器，为空时使用全局限速器
+        """
+        self.timeout = timeout
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self._hooks: List[Callable[[RequestTiming], None]] = []
+        self._lock = threading.Lock()
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=retry_statuses,
+            allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry
+        )
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'User-Agent': user_agent,
+            'Accept-Encoding': 'gzip, deflate'
+        })
+
+    def add_hook(self, hook: Callable[[RequestTiming], None]):
+        """
+        注册计时回调，每次请求结束（成功或失败）后调用
+
+        Args:
+            hook: 回调函数，参数为 RequestTiming
+        """
+        with self._lock:
+            self._hooks.append(hook)
+
+    def remove_hook(self, hook: Callable[[RequestTiming], None]):
+        """移除计时回调"""
+        with self._lock:
+            if hook in self._hooks:
+                self._hooks.remove(hook)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        timeout: Optional[float] = None,
+        cache_ttl: Optional[float] = None,
+        rate_limit: bool = False,
+        **kwargs
+    ) -> requests.Response:
+        """
+        发起请求并读完响应内容
+
+        Args:
+            method: 请求方法
+            url: 请求URL
+            timeout: 超时时间（秒），为空时使用默认值
+            cache_ttl: 本次请求的缓存有效期（秒），为空时使用缓存的默认有效期
+            rate_limit: 访问网络时是否经过按主机限速器（缓存命中时不经过）
+            **kwargs: 传给 requests.Session.request 的其他参数（headers、params、data 等）
+
+        Returns:
+            响应对象（不检查状态码，需要时调用 raise_for_status）；由缓存返回时 from_cache 为True，
+            rate_limit_wait 为本次请求在限速器中等待的秒数
+
+        Raises:
+            HTTPCacheMiss: 回放模式下没有该URL的缓存
+        """
+        started = time.perf_counter()
+        response = None
+        error = None
+        timeout = timeout if timeout is not None else self.timeout
+        try:
+            if self.cache is not None and method.upper() == 'GET':
+                response = self._cached_get(url, timeout, cache_ttl, rate_limit, kwargs)
+            else:
+                response = self._send(method, url, timeout, rate_limit, kwargs)
+            if not hasattr(response, 'rate_limit_wait'):
+                # 由缓存返回，没有访问网络
+                response.rate_limit_wait = 0.0
+            return response
+        except requests.RequestException as e:
+            error = str(e)
+            raise
+        finally:
+            self._emit(method, url, response, time.perf_counter() - started, error)
+
+    def _send(self, method: str, url: str, timeout: float, rate_limit: bool, kwargs: dict) -> requests.Response:
+        """通过连接池发起请求，需要限速时在限速器内发起（重试也在限速器之内）"""
+        if not rate_limit:
+            response = self._request(method, url, timeout, kwargs)
+            response.rate_limit_wait = 0.0
+            return response
+        limiter = self.rate_limiter or get_rate_limiter()
+        with limiter.limit(url) as waited:
+            response = self._request(method, url, timeout, kwargs)
+        response.rate_limit_wait = waited
+        return response
+
+    def _request(self, method: str, url: str, timeout: float, kwargs: dict) -> requests.Response:
+        """发起请求并读完内容，计时包含传输时间，之后可以统计传输的字节数"""
+        response = self.session.request(method, url, timeout=timeout, **kwargs)
+        response.content
+        return response
+
+    def _cached_get(
+        self,
+        url: str,
+        timeout: float,
+        cache_ttl: Optional[float],
+        rate_limit: bool,
+        kwargs: dict
+    ) -> requests.Response:
+        """
+        按缓存模式发起GET请求
+
+        - 回放：只使用缓存，没有缓存时抛出 HTTPCacheMiss
+        - 正常：有效期内直接使用缓存；过期后带缓存的校验信息重新请求，服务端返回304时使用缓存的内容
+        - 录制：总是访问网络并保存响应
+        请求自带 If-None-Match / If-Modified-Since 且与缓存一致时，由缓存返回304。
+        缓存内容已被淘汰（读取失败）时按未命中处理
+        """
+        cache = self.cache
+        params = kwargs.get('params')
+        cache_url = requests.Request('GET', url, params=params).prepare().url if params else url
+        headers = dict(kwargs.get('headers') or {})
+        entry = cache.lookup(cache_url) if cache.mode != MODE_RECORD else None
+
+        if cache.mode == MODE_REPLAY:
+            response = cache.build_response(entry, headers) if entry is not None else None
+            if response is None:
+                cache.record_miss()
+                raise HTTPCacheMiss(f"回放模式下没有缓存: {url}")
+            return response
+
+        if entry is not None and cache.is_fresh(entry, cache_ttl):
+            response = cache.build_response(entry, headers)
+            if response is not None:
+                return response
+        cache.record_miss()
+
+        # 过期的缓存带校验信息重新请求（请求自带校验信息时由调用方处理304）
+        revalidate = (
+            entry is not None
+            and (entry.etag or entry.last_modified)
+            and not any(key.lower() in ('if-none-match', 'if-modified-since') for key in headers)
+        )
+        if revalidate:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+            request_kwargs = {**kwargs, 'headers': headers}
+        else:
+            request_kwargs = kwargs
+
+        response = self._send('GET', url, timeout, rate_limit, request_kwargs)
+        if response.status_code == 304 and revalidate:
+            cache.refresh(entry)
+            cached = cache.build_response(entry)
+            if cached is not None:
+                cached.rate_limit_wait = response.rate_limit_wait
+                return cached
+            # 重新验证期间缓存内容被淘汰，不带校验信息重新请求
+            waited = response.rate_limit_wait
+            response = self._send('GET', url, timeout, rate_limit, kwargs)
+            response.rate_limit_wait += waited
+        if response.status_code == 200:
+            cache.store(response, url=cache_url)
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """发起GET请求，参数同 request"""
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """发起POST请求，参数同 request"""
+        return self.request('POST', url, **kwargs)
+
+    def _emit(
+        self,
+        method: str,
+        url: str,
+        response: Optional[requests.Response],
+        elapsed: float,
+        error: Optional[str]
+    ):
+        """调用计时回调，回调的异常只输出不影响请求"""
+        with self._lock:
+            hooks = list(self._hooks)
+        if not hooks:
+            return
+
+        status_code = None
+        bytes_received = 0
+        content_length = 0
+        retries = 0
+        from_cache = False
+        if response is not None:
+            status_code = response.status_code
+            content_length = len(response.content)
+            from_cache = getattr(response, 'from_cache', False)
+            raw = response.raw
+            if not from_cache:
+                bytes_received = raw.tell() if hasattr(raw, 'tell') else content_length
+            history = getattr(getattr(raw, 'retries', None), 'history', None)
+            retries = len(history) if history else 0
+
+        timing = RequestTiming(
+            method=method.upper(),
+            url=url,
+            status_code=status_code,
+            elapsed=elapsed,
+            bytes_received=bytes_received,
+            content_length=content_length,
+            retries=retries,
+            error=error,
+            from_cache=from_cache
+        )
+        for hook in hooks:
+            try:
+                hook(timing)
+            except Exception as e:
+                print(f"HTTP计时回调出错: {e}")
+
+    def close(self):
+        """关闭连接池中的连接和磁盘缓存"""
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+
+def create_http_client() -> HTTPClient:
+    """按配置 http 和 http_cache 创建HTTP客户端（用户代理未配置时使用 smart_parser.user_agent）"""
+    return HTTPClient(
+        timeout=float(get_config_value('http.timeout', 30)),
+        user_agent=get_config_value('http.user_agent', None)
+        or get_config_value('smart_parser.user_agent', DEFAULT_USER_AGENT),
+        retries=int(get_config_value('http.retries', 2)),
+        backoff_factor=float(get_config_value('http.backoff_factor', 0.5)),
+        pool_connections=int(get_config_value('http.pool_connections', 10)),
+        pool_maxsize=int(get_config_value('http.pool_maxsize', 10)),
+        cache=create_http_cache()
+    )
+
+
+# 全局HTTP客户端实例，所有网站解析器、RSS解析器和下载器共用
+_http_client: Optional[HTTPClient] = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client() -> HTTPClient:
+    """获取全局HTTP客户端，首次调用时根据配置创建"""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = create_http_client()
+        return _http_client
+
+
+def set_http_client(client: Optional[HTTPClient]):
+    """替换全局HTTP客户端（为None时下次使用按配置重新创建）"""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is not None and _http_client is not client:
+            _http_client.close()
+        _http_client = client
@@ -0,0 +1,177 @@
+"""
+限速器模块
+按主机限制对外请求的速率（令牌桶）和同时进行的请求数，避免集中请求同一网站被限流
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+from urllib.parse import urlparse
+
+from server.utils.config import get_config_value
+
+
+class HostRateLimiter:
+    """按主机划分的令牌桶限速器
+
+    每个主机一个令牌桶，以 requests_per_second 的速度补充令牌，最多积累 burst 个；
+    同时进行的请求数不超过 max_in_flight。令牌不足时预占令牌并在锁外等待，
+    先到的请求先获得令牌。
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float = 1.0,
+        burst: int = 2,
+        max_in_flight: int = 2,
+        hosts: Optional[Dict[str, Dict[str, Any]]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        初始化限速器
+
+        Args:
+            requests_per_second: 每秒补充的令牌数，<=0 表示不限速
+            burst: 令牌桶容量（允许的突发请求数）
+            max_in_flight: 同一主机同时进行的最大请求数，<=0 表示不限制
+            hosts: 按主机覆盖的配置，如 {"mikanani.me": {"requests_per_second": 0.5}}
+            clock: 计时函数（秒），默认 time.monotonic
+            sleep: 等待函数，默认 time.sleep；测试时可与 clock 一起替换，不依赖实际时间
+        """
+        self.defaults = {
+            "requests_per_second": requests_per_second,
+            "burst": burst,
+            "max_in_flight": max_in_flight
+        }
+        self.host_overrides = hosts or {}
+        self._clock = clock
+        self._sleep = sleep
+        self._hosts: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, host: str) -> Dict[str, Any]:
+        """获取主机的令牌桶（需持有锁）"""
+        bucket = self._hosts.get(host)
+        if bucket is None:
+            settings = {**self.defaults, **(self.host_overrides.get(host) or {})}
+            rate = float(settings["requests_per_second"])
+            burst = max(1, int(settings["burst"]))
+            max_in_flight = int(settings["max_in_flight"])
+            bucket = {
+                "rate": rate,
+                "burst": burst,
+                "tokens": float(burst),
+                "updated_at": self._clock(),
+                "slots": threading.BoundedSemaphore(max_in_flight) if max_in_flight > 0 else None,
+                "max_in_flight": max_in_flight,
+                "in_flight": 0,
+                "requests": 0,
+                "waited_requests": 0,
+                "total_wait": 0.0,
+                "max_wait": 0.0
+            }
+            self._hosts[host] = bucket
+        return bucket
+
+    def _reserve(self, bucket: Dict[str, Any]) -> float:
+        """预占一个令牌，返回需要等待的秒数（需持有锁）"""
+        if bucket["rate"] <= 0:
+            return 0.0
+        now = self._clock()
+        elapsed = now - bucket["updated_at"]
+        bucket["tokens"] = min(bucket["burst"], bucket["tokens"] + elapsed * bucket["rate"])
+        bucket["updated_at"] = now
+        bucket["tokens"] -= 1
+        if bucket["tokens"] >= 0:
+            return 0.0
+        return -bucket["tokens"] / bucket["rate"]
+
+    @contextmanager
+    def limit(self, url: str) -> Iterator[float]:
+        """
+        在限速范围内发起请求
+
+        用法：
+            with limiter.limit(url) as waited:
+                response = session.get(url)
+
+        通过共用HTTP客户端的请求使用 get_http_client().get(url, rate_limit=True)，缓存命中时不经过限速器
+
+        Args:
+            url: 请求URL，按其主机限速
+
+        Yields:
+            本次请求在限速器中等待的秒数
+        """
+        host = urlparse(url).hostname or url
+        started = self._clock()
+        with self._lock:
+            bucket = self._get(host)
+        slots = bucket["slots"]
+        if slots is not None:
+            slots.acquire()
+        try:
+            with self._lock:
+                delay = self._reserve(bucket)
+            if delay > 0:
+                self._sleep(delay)
+            waited = self._clock() - started
+            with self._lock:
+                bucket["in_flight"] += 1
+                bucket["requests"] += 1
+                bucket["total_wait"] += waited
+                bucket["max_wait"] = max(bucket["max_wait"], waited)
+                if waited >= 0.001:
+                    bucket["waited_requests"] += 1
+            try:
+                yield waited
+            finally:
+                with self._lock:
+                    bucket["in_flight"] -= 1
+        finally:
+            if slots is not None:
+                slots.release()
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """获取各主机的限速统计"""
+        with self._lock:
+            return {
+                host: {
+                    "requests_per_second": bucket["rate"],
+                    "burst": bucket["burst"],
+                    "max_in_flight": bucket["max_in_flight"],
+                    "in_flight": bucket["in_flight"],
+                    "requests": bucket["requests"],
+                    "waited_requests": bucket["waited_requests"],
+                    "total_wait": bucket["total_wait"],
+                    "max_wait": bucket["max_wait"]
+                }
+                for host, bucket in self._hosts.items()
+            }
+
+
+# 全局限速器实例，所有网站解析器和RSS解析器共用
+_rate_limiter: Optional[HostRateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> HostRateLimiter:
+    """获取全局限速器，首次调用时根据配置创建"""
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = HostRateLimiter(
+                requests_per_second=float(get_config_value('rate_limit.requests_per_second', 1.0)),
+                burst=int(get_config_value('rate_limit.burst', 2)),
+                max_in_flight=int(get_config_value('rate_limit.max_in_flight', 2)),
+                hosts=get_config_value('rate_limit.hosts', None)
+            )
+        return _rate_limiter
+
+
+def set_rate_limiter(limiter: Optional[HostRateLimiter]):
+    """替换全局限速器（为None时下次使用按配置重新创建）"""
+    global _rate_limiter
+    with _rate_limiter_lock:
+        _rate_limiter = limiter
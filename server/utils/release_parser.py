@@ -0,0 +1,282 @@
+"""
+发布标题解析模块
+从字幕组的发布标题中提取字幕组、分辨率、视频编码、字幕语言和版本号。
+字幕组用已知字幕组名称的前缀树识别，其余字段用导入时预编译的正则提取，解析结果按原始标题缓存
+"""
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from server.utils.title_parser import TITLE_CACHE_SIZE, VIDEO_EXTENSIONS, parse_title
+
+
+# 已知字幕组：规范名称 -> 别名（匹配不区分大小写）
+KNOWN_SUBGROUPS: Dict[str, Tuple[str, ...]] = {
+    'LoliHouse': (),
+    '喵萌奶茶屋': ('Nekomoe kissaten',),
+    '喵萌Production': (),
+    'ANi': (),
+    'SweetSub': (),
+    '桜都字幕组': ('樱都字幕组', 'Sakurato'),
+    '北宇治字幕组': ('KitaujiSub',),
+    'Lilith-Raws': (),
+    'NC-Raws': (),
+    '爱恋字幕社': ('爱恋字幕組',),
+    '极影字幕社': (),
+    '幻樱字幕组': (),
+    'DBD-Raws': (),
+    'Skymoon-Raws': (),
+    '猎户手抄部': ('猎户压制部', '猎户发布组'),
+    'GM-Team': (),
+    '云光字幕组': (),
+    '悠哈璃羽字幕社': ('UHA-WINGS',),
+    'SubsPlease': (),
+    'Erai-raws': (),
+    'HorribleSubs': (),
+    'Ohys-Raws': (),
+    'Billion Meta Lab': (),
+    '拨雪寻春': (),
+    'MingY': (),
+    'Haruhana': (),
+    'Airota': ('千夏字幕组',),
+    'VCB-Studio': (),
+    'Kamigami': ('诸神字幕组',),
+    'ReinForce': (),
+    'Moozzi2': (),
+    'BeanSub': ('豌豆字幕组',),
+    '风之圣殿': ('FZSD',),
+    '动漫国字幕组': ('DMG',),
+    '银色子弹字幕组': ('银色子弹',),
+    'SBSUB': (),
+    '澄空学园': ('SumiSora',),
+    '华盟字幕社': (),
+    '天香字幕社': (),
+    '雪飘工作室': ('雪飄工作室', 'FLsnow'),
+    '织梦字幕组': (),
+    '星空字幕组': ('XKsub',),
+    '离谱Sub': (),
+    '黒ネズミたち': (),
+    'Feibanyama': (),
+}
+
+# 字幕组名称后允许出现的字符（名称必须完整匹配，不能只是更长名称的前缀）
+SUBGROUP_BOUNDARY = frozenset(']】&)')
+BRACKET_OPENINGS = frozenset('[【')
+
+# 开头方括号中的内容是这些标记时不视为字幕组
+NON_SUBGROUP_PATTERN = re.compile(r'^\d+$|新番|^[A-Za-z0-9_\- ]*\d{3,4}[pPiI]$')
+# 不带方括号的 scene 风格标题末尾的发布组（如 ...WEB H264-NanDesuKa.mkv）
+SCENE_GROUP_PATTERN = re.compile(r'-(?P<group>[A-Za-z][A-Za-z0-9]*)$')
+
+# 分辨率：1080p、1920x1080、4K
+RESOLUTION_PATTERN = re.compile(
+    r'(?<![0-9])(?:'
+    r'(?P<progressive>2160|1440|1080|720|576|480)[pPiI]'
+    r'|(?:3840|2560|1920|1440|1280|1024|960|854|848|720|640)[xX×](?P<height>2160|1440|1080|720|576|480)'
+    r'|(?P<uhd>4[kK])'
+    r')(?![0-9A-Za-z])'
+)
+
+# 视频编码，按出现的先后取第一个
+CODEC_PATTERN = re.compile(
+    r'(?<![A-Za-z0-9])(?:'
+    r'(?P<hevc>HEVC|[xXhH]\.?265)'
+    r'|(?P<avc>AVC|[xXhH]\.?264)'
+    r'|(?P<av1>AV1)'
+    r')(?![A-Za-z0-9])',
+    re.IGNORECASE
+)
+
+# 字幕语言标记
+CHS_PATTERN = re.compile(
+    r'简体|簡體|简中|簡中|简日|簡日|简繁|簡繁'
+    r'|(?<![A-Za-z0-9.])(?:CHS|SC|GB|JPSC)(?![A-Za-z])'
+)
+CHT_PATTERN = re.compile(
+    r'繁体|繁體|繁中|繁日|简繁|簡繁'
+    r'|(?<![A-Za-z0-9.])(?:CHT|TC|BIG5|JPTC)(?![A-Za-z])'
+)
+ENG_PATTERN = re.compile(r'(?<![A-Za-z])ENG(?![A-Za-z])')
+
+# 字幕语言取值
+LANGUAGE_CHS = 'chs'
+LANGUAGE_CHT = 'cht'
+LANGUAGE_CHS_CHT = 'chs_cht'
+LANGUAGE_ENG = 'eng'
+# 按字幕语言筛选时匹配的取值（简繁双语同时满足简体和繁体）
+LANGUAGE_MATCHES = {
+    LANGUAGE_CHS: (LANGUAGE_CHS, LANGUAGE_CHS_CHT),
+    LANGUAGE_CHT: (LANGUAGE_CHT, LANGUAGE_CHS_CHT),
+    LANGUAGE_CHS_CHT: (LANGUAGE_CHS_CHT,),
+    LANGUAGE_ENG: (LANGUAGE_ENG,),
+}
+
+
+class ReleaseInfo(NamedTuple):
+    """发布标题解析结果，无法识别的字段为None"""
+    subgroup: Optional[str]
+    resolution: Optional[str]
+    video_codec: Optional[str]
+    subtitle_language: Optional[str]
+    version: Optional[int]
+
+
+class SubgroupTrie:
+    """已知字幕组名称的前缀树（按字符，不区分大小写）"""
+
+    _TERMINAL = None
+
+    def __init__(self, subgroups: Optional[Dict[str, Iterable[str]]] = None):
+        self._root: Dict = {}
+        for name, aliases in (subgroups or {}).items():
+            self.add(name, name)
+            for alias in aliases:
+                self.add(alias, name)
+
+    def add(self, name: str, canonical: str):
+        """
+        添加字幕组名称
+
+        Args:
+            name: 标题中出现的名称
+            canonical: 规范名称
+        """
+        node = self._root
+        for char in name.lower():
+            node = node.setdefault(char, {})
+        node[self._TERMINAL] = canonical
+
+    def match(self, text: str, start: int) -> Optional[Tuple[str, int]]:
+        """
+        从 start 开始匹配最长的完整字幕组名称
+
+        Args:
+            text: 已转为小写的标题
+            start: 开始位置
+
+        Returns:
+            (规范名称, 结束位置)，没有匹配时返回None
+        """
+        node = self._root
+        found = None
+        position = start
+        length = len(text)
+        while position < length:
+            node = node.get(text[position])
+            if node is None:
+                break
+            position += 1
+            if self._TERMINAL in node and (position == length or text[position] in SUBGROUP_BOUNDARY):
+                found = (node[self._TERMINAL], position)
+        return found
+
+    def find(self, title: str) -> Optional[str]:
+        """
+        在标题的方括号开头（包括联合字幕组 & 之后）查找第一个已知字幕组
+
+        Args:
+            title: 标题
+
+        Returns:
+            规范名称，未找到返回None
+        """
+        text = title.lower()
+        for index, char in enumerate(text):
+            if char in BRACKET_OPENINGS or (char == '&' and index > 0):
+                found = self.match(text, index + 1)
+                if found:
+                    return found[0]
+        return None
+
+
+SUBGROUP_TRIE = SubgroupTrie(KNOWN_SUBGROUPS)
+
+
+def _strip_extension(title: str) -> str:
+    dot = title.rfind('.')
+    if dot != -1 and title[dot + 1:].lower() in VIDEO_EXTENSIONS:
+        return title[:dot]
+    return title
+
+
+def _find_subgroup(title: str) -> Optional[str]:
+    """已知字幕组优先，其次为开头方括号中的第一个名称，最后为 scene 风格标题末尾的发布组"""
+    subgroup = SUBGROUP_TRIE.find(title)
+    if subgroup:
+        return subgroup
+
+    if title[:1] in BRACKET_OPENINGS:
+        closing = ']' if title[0] == '[' else '】'
+        end = title.find(closing, 1)
+        if end > 1:
+            name = title[1:end].split('&')[0].strip()
+            if name and not NON_SUBGROUP_PATTERN.search(name):
+                return name
+        return None
+
+    match = SCENE_GROUP_PATTERN.search(_strip_extension(title))
+    return match.group('group') if match else None
+
+
+def _find_resolution(title: str) -> Optional[str]:
+    match = RESOLUTION_PATTERN.search(title)
+    if not match:
+        return None
+    if match.group('uhd'):
+        return '2160p'
+    return (match.group('progressive') or match.group('height')) + 'p'
+
+
+def _find_codec(title: str) -> Optional[str]:
+    match = CODEC_PATTERN.search(title)
+    return match.lastgroup if match else None
+
+
+def _find_language(title: str) -> Optional[str]:
+    has_chs = CHS_PATTERN.search(title) is not None
+    has_cht = CHT_PATTERN.search(title) is not None
+    if has_chs and has_cht:
+        return LANGUAGE_CHS_CHT
+    if has_chs:
+        return LANGUAGE_CHS
+    if has_cht:
+        return LANGUAGE_CHT
+    if ENG_PATTERN.search(title):
+        return LANGUAGE_ENG
+    return None
+
+
+def normalize_resolution(value: Optional[str]) -> Optional[str]:
+    """
+    规范化画质设置（如 1080P、1920x1080、4K），与解析结果中的分辨率格式一致
+
+    Args:
+        value: 画质设置
+
+    Returns:
+        规范化的分辨率（如 1080p），无法识别（包括 default）时返回None
+    """
+    value = (value or '').strip()
+    if value.isdigit():
+        value += 'p'
+    return _find_resolution(value)
+
+
+@lru_cache(maxsize=TITLE_CACHE_SIZE)
+def parse_release(title: str) -> ReleaseInfo:
+    """
+    解析发布标题
+
+    Args:
+        title: RSS条目标题
+
+    Returns:
+        字幕组、分辨率、视频编码（hevc/avc/av1）、字幕语言（chs/cht/chs_cht/eng）和版本号
+    """
+    return ReleaseInfo(
+        subgroup=_find_subgroup(title),
+        resolution=_find_resolution(title),
+        video_codec=_find_codec(title),
+        subtitle_language=_find_language(title),
+        version=parse_title(title).version
+    )
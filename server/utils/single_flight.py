@@ -0,0 +1,78 @@
+"""
+单飞调用模块
+同一 key 的并发调用只执行一次，其余调用方等待并共享结果
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Call:
+    """一次进行中的调用"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """单飞调用
+
+    同一 key 同时只有一个调用方执行 fn，其余调用方等待其完成后得到同一个结果。
+    remember 为True时成功的结果会一直保留，之后相同 key 的调用直接返回该结果，
+    适合在一轮检查内复用抓取结果；fn 抛出的异常会传给所有等待的调用方，但不会保留。
+    """
+
+    def __init__(self, remember: bool = False):
+        """
+        初始化单飞调用
+
+        Args:
+            remember: 是否保留已完成的结果
+        """
+        self.remember = remember
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        执行或等待 key 对应的调用
+
+        Args:
+            key: 调用的 key
+            fn: 实际执行的函数
+
+        Returns:
+            (结果, 是否复用了其他调用方的结果)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if not self.remember or call.error is not None:
+                    self._calls.pop(key, None)
+            call.done.set()
+        return call.result, False
+
+    def forget(self, key: Hashable):
+        """丢弃 key 对应的已保留结果"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None and call.done.is_set():
+                self._calls.pop(key, None)
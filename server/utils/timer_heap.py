@@ -0,0 +1,129 @@
+"""
+定时器堆模块
+基于最小堆维护每个任务的下次到期时间，只在最早的任务到期时唤醒
+"""
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class TimerHeap:
+    """最小堆定时器
+
+    每个 key 只保留一个有效的到期时间，重新调度或取消时旧的堆元素被惰性丢弃。
+    后台线程在最早的到期时间前休眠，到期后在锁外调用回调。
+    """
+
+    def __init__(self, callback: Callable[[Hashable], Any], name: str = "timer-heap"):
+        """
+        初始化定时器堆
+
+        Args:
+            callback: 任务到期时调用的函数，参数为任务 key
+            name: 后台线程名称
+        """
+        self.callback = callback
+        self.name = name
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._entries: Dict[Hashable, Tuple[float, int]] = {}
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def start(self):
+        """启动后台线程"""
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 5):
+        """停止后台线程并清空所有任务"""
+        with self._condition:
+            self._running = False
+            self._heap.clear()
+            self._entries.clear()
+            self._condition.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def schedule(self, key: Hashable, due: float):
+        """
+        设置任务的到期时间（已存在则覆盖）
+
+        Args:
+            key: 任务 key
+            due: 到期时间（time.time() 时间戳）
+        """
+        with self._condition:
+            seq = next(self._counter)
+            self._entries[key] = (due, seq)
+            heapq.heappush(self._heap, (due, seq, key))
+            # 只有新任务成为最早到期任务时才需要唤醒后台线程
+            if self._heap[0][1] == seq:
+                self._condition.notify()
+
+    def cancel(self, key: Hashable) -> bool:
+        """取消任务，返回任务是否存在"""
+        with self._condition:
+            return self._entries.pop(key, None) is not None
+
+    def get_due_time(self, key: Hashable) -> Optional[float]:
+        """获取任务的到期时间"""
+        with self._condition:
+            entry = self._entries.get(key)
+            return entry[0] if entry else None
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._condition:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._condition:
+            return len(self._entries)
+
+    def _pop_due(self, now: float) -> List[Hashable]:
+        """弹出所有已到期的有效任务（需持有锁）"""
+        due_keys = []
+        while self._heap and self._heap[0][0] <= now:
+            due, seq, key = heapq.heappop(self._heap)
+            if self._entries.get(key) == (due, seq):
+                del self._entries[key]
+                due_keys.append(key)
+        return due_keys
+
+    def _discard_stale(self):
+        """丢弃堆顶已失效的元素（需持有锁）"""
+        while self._heap:
+            due, seq, key = self._heap[0]
+            if self._entries.get(key) == (due, seq):
+                return
+            heapq.heappop(self._heap)
+
+    def _run(self):
+        """后台线程主循环"""
+        while True:
+            with self._condition:
+                if not self._running:
+                    return
+                self._discard_stale()
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+                delay = self._heap[0][0] - time.time()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                due_keys = self._pop_due(time.time())
+
+            for key in due_keys:
+                try:
+                    self.callback(key)
+                except Exception as e:
+                    print(f"定时任务回调失败 ({key}): {e}")
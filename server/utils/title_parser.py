@@ -0,0 +1,109 @@
+"""
+标题解析模块
+从RSS条目标题中一次提取集数、集标题和版本号，正则在导入时预编译，解析结果按原始标题缓存
+"""
+import re
+from functools import lru_cache
+from typing import Iterable, List, NamedTuple, Optional
+
+
+# 集数标记，按优先级排列：第X集、EPX、[X]、【X】、分隔符包围的数字。
+# 各分支的首字符互不相同，一次扫描即可找到每个分支的第一次出现，再按优先级选取；
+# 方括号和分隔符形式允许带版本号后缀（如 [01v2]、- 05v2）
+EPISODE_PATTERN = re.compile(
+    r'第(?P<cn>\d+)集'
+    r'|[Ee][Pp]\.?(?P<ep>\d+)'
+    r'|\[(?P<bracket>\d+)(?:[vV](?P<bracket_version>\d+))?\]'
+    r'|【(?P<fullwidth>\d+)(?:[vV](?P<fullwidth_version>\d+))?】'
+    r'|[\s\-_](?P<bare>\d+)(?:[vV](?P<bare_version>\d+))?(?=[\s\-_]|$)'
+)
+# 分支的优先级（数值越小越优先）及对应的版本号分组
+EPISODE_GROUPS = (
+    ('cn', None),
+    ('ep', None),
+    ('bracket', 'bracket_version'),
+    ('fullwidth', 'fullwidth_version'),
+    ('bare', 'bare_version'),
+)
+# 匹配结果的 lastgroup（带版本号时为版本分组）-> 分支优先级
+GROUP_PRIORITY = {
+    group: index
+    for index, groups in enumerate(EPISODE_GROUPS)
+    for group in groups if group
+}
+# 分隔符包围的数字只在该范围内视为集数
+BARE_EPISODE_RANGE = (1, 999)
+
+# 集标题中需要移除的内容：方括号、圆括号、第X集、EPX
+TITLE_NOISE_PATTERN = re.compile(r'\[[^\]]+\]|\([^)]+\)|第\d+集|[Ee][Pp]\.?\d+')
+SEPARATOR_PATTERN = re.compile(r'[\s\-_]+')
+VIDEO_EXTENSIONS = frozenset(('mkv', 'mp4', 'avi', 'rmvb', 'wmv', 'flv', 'ts', 'm2ts'))
+
+# 解析结果缓存的条目数，RSS源每次检查的标题大多与上次相同
+TITLE_CACHE_SIZE = 4096
+
+
+class ParsedTitle(NamedTuple):
+    """标题解析结果"""
+    episode_number: Optional[int]
+    episode_title: str
+    version: Optional[int]
+
+
+def _match_episode(title: str):
+    """返回 (集数, 版本号)，没有集数标记时返回 (None, None)"""
+    found = {}
+    for match in EPISODE_PATTERN.finditer(title):
+        index = GROUP_PRIORITY[match.lastgroup]
+        if index not in found:
+            found[index] = match
+            if index == 0:
+                break
+    if not found:
+        return None, None
+
+    index = min(found)
+    name, version_name = EPISODE_GROUPS[index]
+    match = found[index]
+    number = int(match.group(name))
+    if name == 'bare' and not (BARE_EPISODE_RANGE[0] <= number <= BARE_EPISODE_RANGE[1]):
+        return None, None
+    version = match.group(version_name) if version_name else None
+    return number, int(version) if version else None
+
+
+def _clean_title(title: str) -> str:
+    """移除扩展名、括号内容和集数标记，合并分隔符"""
+    dot = title.rfind('.')
+    if dot != -1 and title[dot + 1:].lower() in VIDEO_EXTENSIONS:
+        title = title[:dot]
+    title = TITLE_NOISE_PATTERN.sub('', title)
+    return SEPARATOR_PATTERN.sub(' ', title).strip()
+
+
+@lru_cache(maxsize=TITLE_CACHE_SIZE)
+def parse_title(title: str) -> ParsedTitle:
+    """
+    解析标题
+
+    Args:
+        title: RSS条目标题
+
+    Returns:
+        集数、集标题和版本号
+    """
+    episode_number, version = _match_episode(title)
+    return ParsedTitle(episode_number, _clean_title(title), version)
+
+
+def parse_titles(titles: Iterable[str]) -> List[ParsedTitle]:
+    """
+    批量解析标题
+
+    Args:
+        titles: RSS条目标题
+
+    Returns:
+        与输入顺序一致的解析结果
+    """
+    return [parse_title(title or '') for title in titles]
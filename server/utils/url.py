@@ -0,0 +1,56 @@
+"""
+URL工具模块
+将写法不同但指向同一资源的URL规范化为相同的字符串
+"""
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
+# 各协议的默认端口，规范化时省略
+DEFAULT_PORTS = {
+    'http': 80,
+    'https': 443,
+}
+
+
+def normalize_url(url: str) -> str:
+    """
+    规范化URL
+
+    - 协议和主机名转为小写，省略默认端口
+    - 路径为空时补为 /
+    - 查询参数按参数名和值排序（保留空值）
+    - 去掉片段（# 之后的部分）
+
+    无法解析的URL原样返回（去掉首尾空白）
+
+    Args:
+        url: 原始URL
+
+    Returns:
+        规范化后的URL
+    """
+    url = (url or '').strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    if not parts.scheme or not parts.hostname:
+        return url
+
+    scheme = parts.scheme.lower()
+    host = parts.hostname.lower()
+    if ':' in host:
+        # IPv6 地址
+        host = f"[{host}]"
+    netloc = host
+    if port is not None and port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{host}:{port}"
+    if parts.username is not None:
+        userinfo = parts.username
+        if parts.password is not None:
+            userinfo = f"{userinfo}:{parts.password}"
+        netloc = f"{userinfo}@{netloc}"
+
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, parts.path or '/', query, ''))
@@ -0,0 +1,85 @@
+"""
+蜜柑计划RSS解析基准测试
+对比流式解析与 feedparser 解析大型RSS的CPU时间和峰值内存
+
+大型RSS由录制的蜜柑计划RSS条目重复生成（每个条目的GUID和种子哈希不同）
+
+用法: python tests/bench_mikan_feed.py [--items N] [--repeat N]
+"""
+import sys
+import os
+import re
+import argparse
+import time
+import tracemalloc
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.site_parsers.mikan_rss_parser import MikanRSSParser
+from test_utils import load_fixture
+
+
+FEED_URL = "https://mikanani.me/RSS/Bangumi?bangumiId=3824&subgroupid=370"
+
+
+def build_large_feed(items: int) -> bytes:
+    """重复录制的条目生成包含 items 个条目的RSS"""
+    recorded = load_fixture("mikan_bangumi_rss.xml").decode("utf-8")
+    head, _, rest = recorded.partition("<item>")
+    body, _, tail = ("<item>" + rest).rpartition("</item>")
+    recorded_items = re.findall(r"<item>.*?</item>", body + "</item>", re.S)
+
+    generated = []
+    for index in range(items):
+        item = recorded_items[index % len(recorded_items)]
+        # 替换为唯一的GUID和种子哈希
+        item = re.sub(r"[0-9a-f]{40}", f"{index:040x}", item)
+        item = item.replace("</guid>", f" #{index}</guid>", 1)
+        generated.append(item)
+    return (head + "\n  ".join(generated) + tail).encode("utf-8")
+
+
+def bench(name: str, parser: MikanRSSParser, content: bytes, repeat: int):
+    """返回 (每次解析的CPU时间, 峰值内存, 解析结果)"""
+    started = time.process_time()
+    for _ in range(repeat):
+        result = parser.parse_feed(content, FEED_URL)
+    cpu_time = (time.process_time() - started) / repeat
+
+    tracemalloc.start()
+    parser.parse_feed(content, FEED_URL)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{name:<16} CPU {cpu_time * 1000:9.1f} ms  峰值内存 {peak / 1024 / 1024:7.1f} MB")
+    return cpu_time, peak, result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="蜜柑计划RSS解析基准测试")
+    arg_parser.add_argument("--items", type=int, default=5000, help="条目数（默认5000）")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="重复次数（默认3）")
+    args = arg_parser.parse_args()
+
+    content = build_large_feed(args.items)
+    print(f"RSS: {args.items} 个条目，{len(content) / 1024 / 1024:.1f} MB，重复 {args.repeat} 次")
+    print("=" * 60)
+
+    fast_parser = MikanRSSParser()
+    fallback_parser = MikanRSSParser()
+    fallback_parser.fast_path = False
+
+    fallback_cpu, fallback_peak, fallback_result = bench("feedparser", fallback_parser, content, args.repeat)
+    fast_cpu, fast_peak, fast_result = bench("流式解析", fast_parser, content, args.repeat)
+
+    # 两种解析方式的结果应完全一致
+    assert fast_result == fallback_result
+    assert fast_result["total_entries"] == args.items
+
+    print("=" * 60)
+    print(f"CPU时间: {fallback_cpu / fast_cpu:.1f}x，峰值内存: {fallback_peak / fast_peak:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
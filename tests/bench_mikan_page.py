@@ -0,0 +1,185 @@
+"""
+蜜柑计划番组页面解析基准测试
+对比原来构建整个页面（html.parser）后多次 find_all 的解析与只构建所需元素（SoupStrainer）的解析，
+统计每次智能解析的耗时和峰值内存
+
+页面为 tests/data/mikan_bangumi_page.html（8 个字幕组、每组 12 集），--subgroups 可按原页面结构增加字幕组数
+
+用法: python tests/bench_mikan_page.py [--subgroups N] [--repeat N]
+"""
+import sys
+import os
+import re
+import argparse
+import time
+import tracemalloc
+from typing import Dict, List
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+from server.site_parsers.mikan_parser import MikanParser
+from test_utils import load_fixture
+
+
+PAGE_URL = "https://mikanani.me/Home/Bangumi/3824"
+SITE_NAME = "蜜柑计划"
+BASE_URL = "https://mikanani.me"
+
+
+def legacy_parse_anime_page(html: str, url: str) -> List[Dict]:
+    """原 MikanParser.parse_anime 的解析部分（基准）"""
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    # 解析动画信息
+    anime_info = {
+        'title': '',
+        'title_en': '',
+        'description': '',
+        'cover_url': '',
+        'status': 'ongoing',
+        'total_episodes': 0,
+        'rss_sources': []
+    }
+    
+    # 提取所有RSS源（在修改DOM之前）
+    # 首先添加默认RSS（没有subgroupid的）
+    rss_links = soup.find_all('a', class_='mikan-rss')
+    default_rss = None
+    for rss_link in rss_links:
+        rss_url = rss_link.get('href', '')
+        # 检查是否是默认RSS（不包含subgroupid参数）
+        if rss_url and 'subgroupid=' not in rss_url:
+            if not rss_url.startswith('http'):
+                rss_url = f"{BASE_URL}{rss_url}"
+            default_rss = rss_url
+            break
+    
+    if default_rss:
+        anime_info['rss_sources'].append({
+            'name': f'{SITE_NAME} 默认',
+            'url': default_rss,
+            'quality': 'default',
+            'auto_download': True
+        })
+    
+    # 提取标题
+    title_element = soup.find('p', class_='bangumi-title')
+    if title_element:
+        # 移除RSS链接图标
+        rss_link = title_element.find('a', class_='mikan-rss')
+        if rss_link:
+            rss_link.decompose()
+        anime_info['title'] = title_element.get_text(strip=True)
+    
+    # 提取封面
+    cover_element = soup.find('div', class_='bangumi-poster')
+    if cover_element:
+        style = cover_element.get('style', '')
+        # 从background-image中提取URL
+        if 'background-image' in style:
+            start = style.find('url(') + 4
+            end = style.find(')', start)
+            cover_url = style[start:end].strip("'\"")
+            if cover_url and not cover_url.startswith('http'):
+                cover_url = f"{BASE_URL}{cover_url}"
+            anime_info['cover_url'] = cover_url
+    
+    # 提取描述和其他信息
+    info_elements = soup.find_all('p', class_='bangumi-info')
+    description_parts = []
+    for info_element in info_elements:
+        text = info_element.get_text(strip=True)
+        if text and not text.startswith('官方网站') and not text.startswith('Bangumi'):
+            if '放送日期' in text or '放送开始' in text:
+                description_parts.append(text)
+    
+    anime_info['description'] = '\n'.join(description_parts)
+    
+    # 提取字幕组RSS源
+    import re
+    subgroup_links = soup.find_all('a', class_=re.compile(r'subgroup-\d+'))
+    for link in subgroup_links:
+        classes = link.get('class', [])
+        subgroup_id = None
+        for cls in classes:
+            if cls.startswith('subgroup-') and cls != 'subgroup-name':
+                subgroup_id = cls.replace('subgroup-', '')
+                break
+        
+        if subgroup_id:
+            name = link.get_text(strip=True)
+            rss_url = f"{BASE_URL}/RSS/Bangumi?bangumiId={url.split('/')[-1]}&subgroupid={subgroup_id}"
+            
+            anime_info['rss_sources'].append({
+                'name': f'{name}',
+                'url': rss_url,
+                'quality': 'default',
+                'auto_download': True
+            })
+    
+    return [anime_info]
+
+
+def build_page(subgroups: int) -> str:
+    """按录制页面的结构生成包含 subgroups 个字幕组的页面（字幕组ID依次递增）"""
+    page = load_fixture("mikan_bangumi_page.html").decode("utf-8")
+    nav_items = re.findall(r'<li class="leftbar-item">.*?</li>', page)
+    sections = re.findall(r'<div class="subgroup-text" id="\d+">.*?</tbody>\n</table>\n</div>', page, re.S)
+    if subgroups <= len(nav_items):
+        return page
+
+    extra_nav = []
+    extra_sections = []
+    for index in range(len(nav_items), subgroups):
+        template = index % len(nav_items)
+        subgroup_id = 10000 + index
+        original_id = re.search(r'subgroup-(\d+)', nav_items[template]).group(1)
+        extra_nav.append(nav_items[template].replace(original_id, str(subgroup_id)))
+        extra_sections.append(sections[template].replace(f'"{original_id}"', f'"{subgroup_id}"').replace(
+            f"subgroupid={original_id}", f"subgroupid={subgroup_id}"))
+    page = page.replace(nav_items[-1], nav_items[-1] + "\n" + "\n".join(extra_nav), 1)
+    return page.replace(sections[-1], sections[-1] + "\n" + "\n".join(extra_sections), 1)
+
+
+def bench(name: str, parse, html: str, repeat: int):
+    """返回 (每次解析的耗时, 峰值内存, 解析结果)"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = parse(html, PAGE_URL)
+    elapsed = (time.perf_counter() - started) / repeat
+
+    tracemalloc.start()
+    parse(html, PAGE_URL)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{name:<16} 耗时 {elapsed * 1000:8.1f} ms  峰值内存 {peak / 1024 / 1024:7.2f} MB")
+    return elapsed, peak, result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="蜜柑计划番组页面解析基准测试")
+    arg_parser.add_argument("--subgroups", type=int, default=8, help="字幕组数（默认8，即录制的页面）")
+    arg_parser.add_argument("--repeat", type=int, default=20, help="重复次数（默认20）")
+    args = arg_parser.parse_args()
+
+    html = build_page(args.subgroups)
+    print(f"页面: {len(html.encode('utf-8')) / 1024:.0f} KB，{args.subgroups} 个字幕组，重复 {args.repeat} 次")
+    print("=" * 60)
+
+    legacy_time, legacy_peak, legacy_result = bench("构建整个页面", legacy_parse_anime_page, html, args.repeat)
+    fast_time, fast_peak, fast_result = bench("只构建所需元素", MikanParser().parse_anime_page, html, args.repeat)
+
+    # 两种解析方式的结果应完全一致
+    assert fast_result == legacy_result
+    assert len(fast_result[0]["rss_sources"]) == args.subgroups + 1
+
+    print("=" * 60)
+    print(f"耗时: {legacy_time / fast_time:.1f}x，峰值内存: {legacy_peak / fast_peak:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
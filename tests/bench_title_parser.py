@@ -0,0 +1,99 @@
+"""
+标题解析基准测试
+对比原来逐条 re.search / re.sub 的集数、集标题提取与预编译的标题解析引擎
+
+用法: python tests/bench_title_parser.py [--repeat N]
+"""
+import sys
+import os
+import re
+import argparse
+import time
+from typing import Optional
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.utils.title_parser import parse_title, parse_titles
+from test_utils import load_title_corpus
+
+
+def legacy_extract_episode_number(title: str) -> Optional[int]:
+    """原 BaseRSSParser.extract_episode_number 的实现（基准）"""
+    match = re.search(r'第(\d+)集', title)
+    if match:
+        return int(match.group(1))
+    match = re.search(r'EP\.?(\d+)', title, re.IGNORECASE)
+    if match:
+        return int(match.group(1))
+    match = re.search(r'\[(\d+)\]', title)
+    if match:
+        return int(match.group(1))
+    match = re.search(r'【(\d+)】', title)
+    if match:
+        return int(match.group(1))
+    match = re.search(r'[\s\-_](\d+)(?:[\s\-_]|$)', title)
+    if match:
+        num = int(match.group(1))
+        if 1 <= num <= 999:
+            return num
+    return None
+
+
+def legacy_extract_episode_title(title: str) -> str:
+    """原 BaseRSSParser.extract_episode_title 的实现（基准）"""
+    title = re.sub(r'\.(mkv|mp4|avi|rmvb|wmv|flv|ts|m2ts)$', '', title, flags=re.IGNORECASE)
+    title = re.sub(r'\[[^\]]+\]', '', title)
+    title = re.sub(r'\([^)]+\)', '', title)
+    title = re.sub(r'第\d+集', '', title)
+    title = re.sub(r'EP\.?\d+', '', title, flags=re.IGNORECASE)
+    title = re.sub(r'[\s\-_]+', ' ', title)
+    return title.strip()
+
+
+def bench(name: str, fn, titles, repeat: int) -> float:
+    """执行 repeat 轮，返回每个标题的平均耗时（微秒）"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(titles)
+    elapsed = time.perf_counter() - started
+    per_title = elapsed / (repeat * len(titles)) * 1e6
+    print(f"{name:<28} {elapsed * 1000:9.1f} ms  {per_title:7.2f} us/标题")
+    return per_title
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="标题解析基准测试")
+    arg_parser.add_argument("--repeat", type=int, default=200, help="重复轮数（默认200）")
+    args = arg_parser.parse_args()
+
+    titles = load_title_corpus()
+    print(f"语料: {len(titles)} 个字幕组发布标题，重复 {args.repeat} 轮")
+    print("=" * 60)
+
+    # 与原实现的结果对比（原实现不识别带版本号的集数，如 03v2）
+    differences = [
+        title for title in titles
+        if (legacy_extract_episode_number(title), legacy_extract_episode_title(title))
+        != parse_title(title)[:2] and parse_title(title).version is None
+    ]
+    assert not differences, differences
+
+    uncached = parse_title.__wrapped__
+    baseline = bench(
+        "原实现（逐条正则）",
+        lambda items: [(legacy_extract_episode_number(t), legacy_extract_episode_title(t)) for t in items],
+        titles,
+        args.repeat
+    )
+    single_pass = bench("解析引擎（无缓存）", lambda items: [uncached(t) for t in items], titles, args.repeat)
+    parse_title.cache_clear()
+    cached = bench("parse_titles（缓存命中）", parse_titles, titles, args.repeat)
+
+    print("=" * 60)
+    print(f"无缓存加速: {baseline / single_pass:.1f}x")
+    print(f"缓存命中加速: {baseline / cached:.1f}x（RSS源每次检查的标题大多与上次相同）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+自适应检查间隔测试
+根据历史链接的发布时间推算更新周期，不访问外网
+"""
+import sys
+import os
+import time
+from datetime import datetime, timedelta
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.database import init_database, get_db
+from server.services.cadence_service import estimate_cadence, compute_poll_interval, CadenceService
+from server.services.scheduler_service import SchedulerService
+from server.services.anime_service import AnimeService
+from server.services.rss_service import RSSService
+from server.services.link_service import LinkService
+from server.utils import init_config
+from test_utils import TestEnvironment
+
+
+WEEK = 7 * 86400
+# 每周六 13:30 (UTC) 更新，两个字幕组相隔几小时发布
+FIRST_RELEASE = datetime(2026, 7, 4, 13, 30)
+
+
+def weekly_publish_dates(weeks: int):
+    """生成每周更新的发布时间"""
+    dates = []
+    for week in range(weeks):
+        release = FIRST_RELEASE + timedelta(weeks=week)
+        dates.extend([release, release + timedelta(minutes=20), release + timedelta(hours=5)])
+    return dates
+
+
+def test_estimate_cadence():
+    """测试推算更新周期"""
+    dates = weekly_publish_dates(6)
+    last_release = FIRST_RELEASE + timedelta(weeks=5)
+
+    # 测试1: 识别每周更新
+    now = last_release + timedelta(days=2)
+    cadence = estimate_cadence(dates, now)
+    assert cadence is not None
+    assert cadence["period"] == WEEK
+    assert cadence["releases"] == 6
+    assert cadence["last_release"] == last_release
+    assert cadence["next_release"] == last_release + timedelta(weeks=1)
+    assert cadence["overdue_since"] is None
+    print(f"✓ 识别更新周期: {cadence['period'] / 86400:.0f} 天")
+
+    # 测试2: 更新次数太少或没有规律时不推算
+    assert estimate_cadence(dates[:6], now) is None
+    irregular = [FIRST_RELEASE + timedelta(days=day) for day in (0, 2, 9, 10, 25, 26, 40)]
+    assert estimate_cadence(irregular, now) is None
+    print("✓ 没有规律时不推算")
+
+    # 测试3: 窗口外等到窗口开始（不超过最长间隔），窗口内按最短间隔
+    delay = compute_poll_interval(cadence, now, 600, 43200, 3600)
+    assert delay == 43200
+    before_window = last_release + timedelta(weeks=1, hours=-3)
+    delay = compute_poll_interval(estimate_cadence(dates, before_window), before_window, 600, 43200, 3600)
+    assert delay == 2 * 3600
+    in_window = last_release + timedelta(weeks=1, minutes=-10)
+    delay = compute_poll_interval(estimate_cadence(dates, in_window), in_window, 600, 43200, 3600)
+    assert delay == 600
+    print("✓ 窗口内外的检查间隔")
+
+    # 测试4: 预计的更新没有出现时，间隔随延迟时间逐步拉长
+    late = last_release + timedelta(weeks=1, hours=1, minutes=5)
+    cadence = estimate_cadence(dates, late)
+    assert cadence["next_release"] == last_release + timedelta(weeks=2)
+    assert cadence["overdue_since"] == last_release + timedelta(weeks=1, hours=1)
+    assert compute_poll_interval(cadence, late, 600, 43200, 3600) == 600
+    later = late + timedelta(hours=3)
+    assert compute_poll_interval(estimate_cadence(dates, later), later, 600, 43200, 3600) == 3 * 3600 + 300
+    print("✓ 延迟更新时逐步拉长间隔")
+
+
+def simulate(dates, start, weeks, next_delay):
+    """模拟若干周的检查，返回检查次数和每次更新的发现延迟"""
+    now = start
+    end = start + timedelta(weeks=weeks)
+    releases = [FIRST_RELEASE + timedelta(weeks=week) for week in range(100)]
+    releases = [release for release in releases if start <= release < end]
+    known = [date for date in dates if date < start]
+    polls = 0
+    latencies = []
+    while now < end:
+        polls += 1
+        for release in releases:
+            if release <= now and release not in known:
+                known.append(release)
+                latencies.append((now - release).total_seconds())
+        now += timedelta(seconds=next_delay(known, now))
+    return polls, latencies
+
+
+def test_simulation():
+    """测试自适应检查减少的请求数和发现延迟"""
+    dates = weekly_publish_dates(6)
+    start = FIRST_RELEASE + timedelta(weeks=5, days=1, minutes=17)
+
+    fixed_polls, fixed_latencies = simulate(dates, start, 4, lambda known, now: 3600)
+
+    def adaptive(known, now):
+        cadence = estimate_cadence(known, now)
+        return compute_poll_interval(cadence, now, 600, 43200, 3600) if cadence else 3600
+
+    adaptive_polls, adaptive_latencies = simulate(dates, start, 4, adaptive)
+    assert len(adaptive_latencies) == len(fixed_latencies) == 4
+    assert adaptive_polls * 5 < fixed_polls
+    assert max(adaptive_latencies) <= 600 < max(fixed_latencies)
+    print(
+        f"✓ 4 周检查次数: 固定间隔 {fixed_polls} 次，自适应 {adaptive_polls} 次；"
+        f"最长发现延迟: {max(fixed_latencies) / 60:.0f} 分钟 -> {max(adaptive_latencies) / 60:.0f} 分钟"
+    )
+
+
+def test_adaptive_polling():
+    """测试自适应检查间隔"""
+    print("=" * 60)
+    print("测试自适应检查间隔")
+    print("=" * 60)
+
+    env = TestEnvironment()
+    scheduler_service = None
+
+    try:
+        env.setup()
+        init_config(env.get_config_path())
+        init_database()
+
+        test_estimate_cadence()
+        test_simulation()
+
+        # 测试: 调度服务根据链接的发布时间安排下一次检查
+        now = datetime.utcnow()
+        last_release = now - timedelta(days=1)
+        db = next(get_db())
+        anime = AnimeService(db).create_anime(title="自适应测试动画")
+        rss_service = RSSService(db)
+        weekly_id = rss_service.create_rss_source(
+            anime_id=anime.id,
+            name="每周更新",
+            url="https://unsupported.invalid/rss/weekly"
+        ).id
+        new_id = rss_service.create_rss_source(
+            anime_id=anime.id,
+            name="新番",
+            url="https://unsupported.invalid/rss/new"
+        ).id
+        LinkService(db).add_links_bulk(weekly_id, [
+            {
+                'url': f"magnet:?xt=urn:btih:{week:040d}",
+                'link_type': 'magnet',
+                'episode_number': 6 - week,
+                'publish_date': last_release - timedelta(weeks=week)
+            }
+            for week in range(6)
+        ])
+        assert len(CadenceService(db).get_publish_dates(weekly_id)) == 6
+        db.close()
+
+        scheduler_service = SchedulerService(get_db)
+        scheduler_service.start_scheduler()
+        weekly_job = scheduler_service.add_check_job(weekly_id, interval=3600)
+        new_job = scheduler_service.add_check_job(new_id, interval=3600)
+
+        info = scheduler_service.jobs[weekly_job]
+        due = scheduler_service._next_due(info, {"success": True})
+        assert abs(due - time.time() - scheduler_service.adaptive_max_interval) < 5
+        assert info["cadence"]["period"] == WEEK
+        assert info["cadence"]["poll_interval"] == scheduler_service.adaptive_max_interval
+        status = scheduler_service.get_job_status(weekly_job)
+        assert status["info"]["cadence"]["next_release"] > datetime.utcnow()
+        print(f"✓ 有规律的RSS源: {info['cadence']['poll_interval']:.0f}s 后检查")
+
+        # 没有历史链接时仍按检查间隔
+        info = scheduler_service.jobs[new_job]
+        due = scheduler_service._next_due(info, {"success": True})
+        assert due - time.time() <= 3600
+        assert info["cadence"] is None
+        print("✓ 没有规律的RSS源按检查间隔")
+
+        # 关闭自适应后按检查间隔
+        scheduler_service.adaptive_interval = False
+        due = scheduler_service._next_due(scheduler_service.jobs[weekly_job], {"success": True})
+        assert due - time.time() <= 3600
+        print("✓ 关闭自适应后按检查间隔")
+
+        print("\n" + "=" * 60)
+        print("[成功] 自适应检查间隔测试通过")
+        print("=" * 60)
+
+    finally:
+        if scheduler_service is not None and scheduler_service.is_running:
+            scheduler_service.stop_scheduler()
+        env.teardown()
+
+
+if __name__ == "__main__":
+    test_adaptive_polling()
@@ -0,0 +1,220 @@
+"""
+聚合RSS源测试
+蜜柑计划“我的番组”RSS一次抓取后按标题/bangumiId索引分发到各RSS源，不访问外网
+"""
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.database import init_database, get_db
+from server.services.scheduler_service import SchedulerService
+from server.services.aggregate_feed_service import (
+    AggregateFeedService,
+    normalize_title,
+    extract_subgroup,
+    extract_bangumi_id
+)
+from server.services.anime_service import AnimeService
+from server.services.rss_service import RSSService
+from server.services.link_service import LinkService
+from server.services.download_service import DownloadService
+from server.services.downloader_service import DownloaderService
+from server.api.schemas import RSSCheckAllResponse
+from server.site_parsers.mikan_rss_parser import MikanRSSParser
+from server.utils import init_config
+from test_utils import TestEnvironment, FixtureHTTPServer, load_fixture
+
+
+FEED_PATH = "/RSS/MyBangumi?token=fixture"
+MIKAN_RSS = "https://mikanani.me/RSS/Bangumi"
+
+
+class LocalMikanRSSParser(MikanRSSParser):
+    """解析本地回放的蜜柑计划RSS"""
+
+    def can_parse(self, url: str) -> bool:
+        return url.startswith("http://127.0.0.1")
+
+
+def test_helpers():
+    """测试标题规范化和字段提取"""
+    assert normalize_title("黄金神威 最终章 / Golden Kamuy") == "黄金神威最终章goldenkamuy"
+    assert normalize_title("ＧＯＬＤＥＮ　Kamuy") == "goldenkamuy"
+    assert extract_subgroup("【喵萌奶茶屋】★10月新番★[黄金神威]") == "喵萌奶茶屋"
+    assert extract_subgroup("[LoliHouse] 黄金神威 - 12") == "lolihouse"
+    assert extract_subgroup("黄金神威 - 12") is None
+    assert extract_bangumi_id(f"{MIKAN_RSS}?bangumiId=3824&subgroupid=370") == "3824"
+    assert extract_bangumi_id("https://mikanani.me/Home/Bangumi/3141") == "3141"
+    print("✓ 标题规范化和字段提取")
+
+
+def create_source(db, anime_id, name, url, **kwargs):
+    """创建RSS源并返回ID"""
+    return RSSService(db).create_rss_source(anime_id=anime_id, name=name, url=url, **kwargs).id
+
+
+def count_links(rss_source_id):
+    """统计RSS源的链接数"""
+    db = next(get_db())
+    try:
+        return LinkService(db).count_links(rss_source_id=rss_source_id)
+    finally:
+        db.close()
+
+
+def count_tasks(rss_source_id):
+    """统计RSS源的下载任务数"""
+    db = next(get_db())
+    try:
+        return len(DownloadService(db).get_download_tasks(rss_source_id=rss_source_id, size=100))
+    finally:
+        db.close()
+
+
+def test_aggregate_feed():
+    """测试聚合RSS源"""
+    print("=" * 60)
+    print("测试聚合RSS源")
+    print("=" * 60)
+
+    test_helpers()
+
+    env = TestEnvironment()
+    server = FixtureHTTPServer({FEED_PATH: load_fixture("mikan_mybangumi_rss.xml")})
+    scheduler_service = None
+
+    try:
+        env.setup()
+        init_config(env.get_config_path())
+        init_database()
+        server.start()
+
+        db = next(get_db())
+        anime_service = AnimeService(db)
+        final = anime_service.create_anime(title="黄金神威 最终章", title_en="Golden Kamuy Final Season")
+        first_season = anime_service.create_anime(title="黄金神威", title_en="Golden Kamuy")
+        frieren = anime_service.create_anime(title="葬送的芙莉莲", title_en="Sousou no Frieren")
+        loli_id = create_source(
+            db, final.id, "LoliHouse", f"{MIKAN_RSS}?bangumiId=3824&subgroupid=370", auto_download=True
+        )
+        nekomoe_id = create_source(db, final.id, "喵萌奶茶屋", f"{MIKAN_RSS}?bangumiId=3824&subgroupid=1")
+        first_season_id = create_source(db, first_season.id, "蜜柑计划 默认", f"{MIKAN_RSS}?bangumiId=2242")
+        frieren_id = create_source(
+            db, frieren.id, "蜜柑计划 默认", f"{MIKAN_RSS}?bangumiId=3141", quality="720p", auto_download=True
+        )
+        standalone_id = create_source(db, frieren.id, "单独检查", "https://unsupported.invalid/rss/frieren")
+
+        aggregate_feed_service = AggregateFeedService(db)
+        feed_id = aggregate_feed_service.create_feed("我的番组", server.get_url(FEED_PATH)).id
+        for rss_source_id in (loli_id, nekomoe_id, first_season_id, frieren_id):
+            assert aggregate_feed_service.bind_source(feed_id, rss_source_id) is not None
+        assert aggregate_feed_service.bind_source(feed_id, 99999) is None
+        assert aggregate_feed_service.get_covered_source_ids() == {loli_id, nekomoe_id, first_season_id, frieren_id}
+        DownloaderService(db).add_downloader(name="mock", is_default=True)
+        db.close()
+
+        scheduler_service = SchedulerService(get_db)
+        scheduler_service.register_rss_parser(LocalMikanRSSParser())
+        scheduler_service.start_scheduler()
+        check_job_ids = {
+            rss_source_id: scheduler_service.add_check_job(rss_source_id, interval=3600, auto_download=True)
+            for rss_source_id in (loli_id, nekomoe_id, frieren_id)
+        }
+
+        # 测试1: 一次抓取按动画和字幕组分发，续作的条目不会进入第一季的RSS源
+        assert scheduler_service.add_aggregate_feed_job(interval=1800) == SchedulerService.AGGREGATE_FEED_JOB_ID
+        result = scheduler_service.check_aggregate_feeds()
+        assert [item["feed_id"] for item in result["aggregate_feeds"]] == [feed_id]
+        assert result["aggregate_feeds"][0]["success"] is True, result["aggregate_feeds"][0]["message"]
+        assert result["new_links_count"] == 5
+        assert count_links(loli_id) == 2 and count_links(nekomoe_id) == 1 and count_links(frieren_id) == 2
+        assert count_links(first_season_id) == 0
+        assert len(server.requests) == 1
+        print(f"✓ 定期检查聚合RSS源: {result['message']}")
+
+        # 测试2: 自动下载按各RSS源的定时检查任务、自动下载开关和画质设置
+        assert count_tasks(loli_id) == 2
+        assert count_tasks(nekomoe_id) == 0  # RSS源未开启自动下载
+        assert count_tasks(frieren_id) == 0  # 画质不符
+        print("✓ 自动下载遵循各RSS源的设置")
+
+        # 测试3: 绑定的RSS源的定时检查到期时不单独抓取，任务保留并重新安排
+        server.requests.clear()
+        job_id = check_job_ids[frieren_id]
+        result = scheduler_service._run_check_job(job_id, scheduler_service.jobs[job_id])
+        assert result["skipped"] is True
+        scheduler_service.timer.cancel(job_id)
+        scheduler_service._on_job_due(job_id)
+        assert scheduler_service.timer.get_due_time(job_id) is not None
+        assert scheduler_service.rebuild_check_jobs() == 3
+        assert set(check_job_ids.values()) <= set(scheduler_service.get_jobs())
+        assert len(server.requests) == 0
+        print("✓ 绑定的RSS源跳过单独检查")
+
+        # 测试4: 未匹配的条目被记录
+        db = next(get_db())
+        aggregate_feed_service = AggregateFeedService(db)
+        feed = aggregate_feed_service.get_feed(feed_id)
+        unmatched = aggregate_feed_service.get_unmatched(feed)
+        assert feed.last_unmatched_count == 1
+        assert len(unmatched) == 1 and "药屋少女的呢喃" in unmatched[0]
+        assert feed.etag == server.etag
+        db.close()
+        print(f"✓ 未匹配条目: {unmatched[0]}")
+
+        # 测试5: 内容未变化时只请求一次，不重新分发
+        result = scheduler_service.check_aggregate_feed(feed_id)
+        assert result["not_modified"] is True
+        assert server.requests[-1].get('If-None-Match') == server.etag
+        print(f"✓ 再次检查: {result['message']}")
+
+        # 测试6: 全量检查只抓取聚合RSS源，已绑定的RSS源不单独抓取
+        server.requests.clear()
+        result = scheduler_service.check_all_rss_sources()
+        assert [item["rss_source_id"] for item in result["results"]] == [standalone_id]
+        assert [item["feed_id"] for item in result["aggregate_feeds"]] == [feed_id]
+        assert result["aggregate_feeds"][0]["success"] is True
+        assert len(RSSCheckAllResponse(**result).aggregate_feeds) == 1
+        assert len(server.requests) == 1
+        print(f"✓ 全量检查: {len(result['results'])} 个RSS源 + {len(result['aggregate_feeds'])} 个聚合RSS源")
+
+        # 测试7: 为未匹配的动画绑定RSS源后重新分发
+        db = next(get_db())
+        apothecary = AnimeService(db).create_anime(title="药屋少女的呢喃")
+        apothecary_id = create_source(db, apothecary.id, "SweetSub", f"{MIKAN_RSS}?bangumiId=3215&subgroupid=583")
+        AggregateFeedService(db).bind_source(feed_id, apothecary_id)
+        db.close()
+        result = scheduler_service.check_aggregate_feed(feed_id)
+        assert result["not_modified"] is False
+        assert result["unmatched_count"] == 0
+        assert result["new_links_count"] == 1
+        assert count_links(apothecary_id) == 1
+        assert count_links(frieren_id) == 2
+        print("✓ 绑定新RSS源后重新分发")
+
+        # 测试8: 停用聚合RSS源后RSS源恢复单独检查
+        db = next(get_db())
+        AggregateFeedService(db).update_feed(feed_id, is_active=False)
+        assert AggregateFeedService(db).get_covered_source_ids() == set()
+        assert AggregateFeedService(db).unbind_source(feed_id, loli_id) is True
+        assert AggregateFeedService(db).unbind_source(feed_id, loli_id) is False
+        db.close()
+        assert scheduler_service.check_aggregate_feed(feed_id)["success"] is False
+        assert scheduler_service.check_aggregate_feed(99999).get("not_found") is True
+        print("✓ 停用和解除绑定")
+
+        print("\n" + "=" * 60)
+        print("[成功] 聚合RSS源测试通过")
+        print("=" * 60)
+
+    finally:
+        if scheduler_service is not None:
+            scheduler_service.stop_scheduler()
+        server.stop()
+        env.teardown()
+
+
+if __name__ == "__main__":
+    test_aggregate_feed()
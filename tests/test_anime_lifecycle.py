@@ -0,0 +1,162 @@
+"""
+动画生命周期测试
+已完结的动画自动停止检查RSS源，手动恢复后重新检查，不访问外网
+"""
+import sys
+import os
+import time
+from datetime import datetime, timedelta
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.database import init_database, get_db
+from server.services.scheduler_service import SchedulerService
+from server.services.lifecycle_service import LifecycleService
+from server.services.anime_service import AnimeService
+from server.services.rss_service import RSSService
+from server.services.link_service import LinkService
+from server.utils import init_config
+from test_utils import TestEnvironment
+
+
+def create_anime_with_source(db, title, total_episodes=None, episodes=0):
+    """创建带一个RSS源的动画，并添加前 episodes 集的链接"""
+    anime = AnimeService(db).create_anime(title=title, total_episodes=total_episodes)
+    rss_source = RSSService(db).create_rss_source(
+        anime_id=anime.id,
+        name=f"{title} RSS",
+        url=f"https://unsupported.invalid/rss/{anime.id}"
+    )
+    LinkService(db).add_links_bulk(rss_source.id, [
+        {
+            'url': f"magnet:?xt=urn:btih:{anime.id:020d}{episode:020d}",
+            'link_type': 'magnet',
+            'episode_number': episode
+        }
+        for episode in range(1, episodes + 1)
+    ])
+    return anime.id, rss_source.id
+
+
+def test_anime_lifecycle():
+    """测试动画生命周期"""
+    print("=" * 60)
+    print("测试动画生命周期")
+    print("=" * 60)
+
+    env = TestEnvironment()
+    scheduler_service = None
+
+    try:
+        env.setup()
+        init_config(env.get_config_path())
+        init_database()
+
+        db = next(get_db())
+        complete_id, complete_source = create_anime_with_source(db, "已完结动画", total_episodes=3, episodes=3)
+        airing_id, airing_source = create_anime_with_source(db, "连载中动画", total_episodes=12, episodes=3)
+        idle_id, idle_source = create_anime_with_source(db, "停更动画", episodes=2)
+        db.close()
+
+        scheduler_service = SchedulerService(get_db)
+        scheduler_service.start_scheduler()
+        for rss_source_id in (complete_source, airing_source, idle_source):
+            assert scheduler_service.add_check_job(rss_source_id, interval=3600)
+
+        # 测试1: 判定停止原因
+        db = next(get_db())
+        lifecycle = LifecycleService(db)
+        anime_service = AnimeService(db)
+        now = datetime.utcnow()
+        assert lifecycle.get_stop_reason(anime_service.get_anime(complete_id), now, 30) == "episodes_complete"
+        assert lifecycle.get_stop_reason(anime_service.get_anime(airing_id), now, 30) is None
+        assert lifecycle.get_stop_reason(anime_service.get_anime(idle_id), now, 30) is None
+        later = now + timedelta(days=31)
+        assert lifecycle.get_stop_reason(anime_service.get_anime(idle_id), later, 30) == "idle"
+        assert lifecycle.get_stop_reason(anime_service.get_anime(idle_id), later, 0) is None
+        db.close()
+        print("✓ 判定停止原因")
+
+        # 测试2: 生命周期检查停用已完结动画的RSS源
+        result = scheduler_service.run_lifecycle_pass()
+        assert result["success"] is True
+        assert [item["anime_id"] for item in result["stopped"]] == [complete_id]
+        assert f"rss_check_{complete_source}" not in scheduler_service.get_jobs()
+        assert f"rss_check_{airing_source}" in scheduler_service.get_jobs()
+        db = next(get_db())
+        anime = AnimeService(db).get_anime(complete_id)
+        assert anime.status == "completed"
+        assert anime.polling_stop_reason == "episodes_complete"
+        rss_source = RSSService(db).get_rss_source(complete_source)
+        assert rss_source.is_active is False
+        assert rss_source.auto_deactivated is True
+        assert rss_source.scheduler_job is not None
+        db.close()
+        print(f"✓ 生命周期检查: {result['message']}")
+
+        # 测试3: 重启后不恢复已停用RSS源的任务，再次检查不会重复停止
+        scheduler_service.stop_scheduler()
+        scheduler_service.start_scheduler()
+        assert f"rss_check_{complete_source}" not in scheduler_service.get_jobs()
+        assert scheduler_service.run_lifecycle_pass()["stopped"] == []
+        print("✓ 重启后不恢复已停止的任务")
+
+        # 测试4: 手动恢复后重新检查，并不再按集数停止
+        result = scheduler_service.resume_anime_polling(complete_id)
+        assert result["success"] is True
+        assert result["rss_source_ids"] == [complete_source]
+        assert f"rss_check_{complete_source}" in scheduler_service.get_jobs()
+        db = next(get_db())
+        anime = AnimeService(db).get_anime(complete_id)
+        assert anime.status == "ongoing"
+        assert anime.polling_stopped_at is None
+        assert anime.polling_resumed_at is not None
+        assert RSSService(db).get_rss_source(complete_source).is_active is True
+        db.close()
+        assert scheduler_service.run_lifecycle_pass()["stopped"] == []
+        assert scheduler_service.resume_anime_polling(99999).get("not_found") is True
+        print("✓ 手动恢复检查")
+
+        # 测试5: 手动停用的RSS源不会被恢复
+        db = next(get_db())
+        RSSService(db).update_rss_source(airing_source, is_active=False)
+        anime_service = AnimeService(db)
+        anime_service.update_anime(airing_id, status="completed")
+        db.close()
+        scheduler_service.run_lifecycle_pass()
+        assert scheduler_service.resume_anime_polling(airing_id)["rss_source_ids"] == []
+        print("✓ 手动停用的RSS源不会被恢复")
+
+        # 测试6: slow 模式保留RSS源，按较长间隔检查
+        scheduler_service.lifecycle_action = LifecycleService.ACTION_SLOW
+        db = next(get_db())
+        AnimeService(db).update_anime(idle_id, status="completed")
+        db.close()
+        result = scheduler_service.run_lifecycle_pass()
+        assert [item["reason"] for item in result["stopped"]] == ["status_completed"]
+        info = scheduler_service.jobs[f"rss_check_{idle_source}"]
+        assert info["slowed"] is True
+        due = scheduler_service.timer.get_due_time(f"rss_check_{idle_source}")
+        assert due - time.time() <= scheduler_service.lifecycle_slow_interval
+        next_due = scheduler_service._next_due(info, {"success": True})
+        assert next_due - time.time() > 3600
+        scheduler_service.stop_scheduler()
+        scheduler_service.start_scheduler()
+        assert scheduler_service.jobs[f"rss_check_{idle_source}"]["slowed"] is True
+        scheduler_service.resume_anime_polling(idle_id)
+        assert scheduler_service.jobs[f"rss_check_{idle_source}"]["slowed"] is False
+        print("✓ slow 模式按较长间隔检查")
+
+        print("\n" + "=" * 60)
+        print("[成功] 动画生命周期测试通过")
+        print("=" * 60)
+
+    finally:
+        if scheduler_service is not None and scheduler_service.is_running:
+            scheduler_service.stop_scheduler()
+        env.teardown()
+
+
+if __name__ == "__main__":
+    test_anime_lifecycle()
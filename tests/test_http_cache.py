@@ -0,0 +1,213 @@
+"""
+HTTP磁盘缓存测试
+验证有效期、缓存校验、按内容存放、LRU淘汰，以及录制后离线回放完整的RSS检查，不访问外网
+"""
+import sys
+import os
+import shutil
+import tempfile
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.database import init_database, get_db
+from server.services.scheduler_service import SchedulerService
+from server.services.anime_service import AnimeService
+from server.services.rss_service import RSSService
+from server.site_parsers.mikan_rss_parser import MikanRSSParser
+from server.utils import (
+    init_config,
+    HTTPCache,
+    HTTPCacheMiss,
+    HTTPClient,
+    HostRateLimiter,
+    set_http_client,
+    set_rate_limiter
+)
+from test_utils import TestEnvironment, FixtureHTTPServer, load_fixture
+
+
+FEED_PATH = "/RSS/Bangumi?bangumiId=3824&subgroupid=370"
+FEED_BODY = load_fixture("mikan_bangumi_rss.xml")
+
+
+class LocalMikanRSSParser(MikanRSSParser):
+    """解析本地回放的蜜柑计划RSS"""
+
+    def can_parse(self, url: str) -> bool:
+        return url.startswith("http://127.0.0.1")
+
+
+def count_bodies(directory: str) -> int:
+    """缓存目录中的内容文件数"""
+    return sum(len(files) for _, _, files in os.walk(os.path.join(directory, "bodies")))
+
+
+def test_cache_modes(server: FixtureHTTPServer, cache_dir: str):
+    """测试正常模式下的缓存使用和淘汰"""
+    timings = []
+    limiter = HostRateLimiter(requests_per_second=0, max_in_flight=0)
+    client = HTTPClient(retries=0, cache=HTTPCache(os.path.join(cache_dir, "normal"), ttl=60), rate_limiter=limiter)
+    client.add_hook(timings.append)
+    feed_url = server.get_url(FEED_PATH)
+
+    # 测试1: 有效期内直接使用缓存，缓存命中时不经过限速器
+    first = client.get(feed_url, rate_limit=True)
+    second = client.get(feed_url, rate_limit=True)
+    assert first.status_code == second.status_code == 200
+    assert second.content == FEED_BODY and second.from_cache is True
+    assert second.headers["ETag"] == server.etag and "Content-Encoding" not in second.headers
+    assert len(server.requests) == 1
+    assert timings[-1].from_cache is True and timings[-1].bytes_received == 0
+    assert limiter.get_stats()["127.0.0.1"]["requests"] == 1
+    assert second.rate_limit_wait == 0.0
+    print("✓ 有效期内使用缓存，不占用限速令牌")
+
+    # 测试2: 过期后带校验信息重新请求，服务端返回304时使用缓存的内容
+    response = client.get(feed_url, cache_ttl=0)
+    assert response.status_code == 200 and response.content == FEED_BODY and response.from_cache
+    assert len(server.requests) == 2
+    assert server.requests[-1].get("If-None-Match") == server.etag
+    print("✓ 过期后按校验信息重新验证")
+
+    # 测试3: 请求自带的校验信息与缓存一致时返回304，不一致时返回缓存的内容
+    response = client.get(feed_url, headers={"If-None-Match": server.etag})
+    assert response.status_code == 304 and response.content == b""
+    response = client.get(feed_url, headers={"If-None-Match": '"old"'})
+    assert response.status_code == 200 and response.content == FEED_BODY
+    assert len(server.requests) == 2
+    print("✓ 条件请求由缓存返回304")
+
+    # 测试4: 相同内容只存一份，查询参数顺序不同的URL共用缓存
+    reordered_url = server.get_url("/RSS/Bangumi?subgroupid=370&bangumiId=3824")
+    assert client.get(reordered_url).from_cache
+    client.get(server.get_url("/copy"))
+    stats = client.cache.get_stats()
+    assert stats["entries"] == 2 and stats["size"] == len(FEED_BODY)
+    assert count_bodies(client.cache.directory) == 1
+    print("✓ 按内容存放，相同内容只存一份")
+
+    # 测试5: 只缓存200响应
+    assert client.get(server.get_url("/missing")).status_code == 404
+    assert client.cache.get_stats()["entries"] == 2
+    client.close()
+
+    # 测试6: 超过总大小时淘汰最久未使用的响应
+    cache = HTTPCache(os.path.join(cache_dir, "lru"), ttl=60, max_bytes=2 * len(FEED_BODY) + 10)
+    client = HTTPClient(retries=0, cache=cache)
+    client.get(server.get_url("/a"))
+    client.get(server.get_url("/b"))
+    client.get(server.get_url("/a"))
+    client.get(server.get_url("/c"))
+    assert cache.lookup(server.get_url("/a")) is not None
+    assert cache.lookup(server.get_url("/b")) is None
+    assert cache.lookup(server.get_url("/c")) is not None
+    assert count_bodies(cache.directory) == 2
+    assert cache.get_stats()["size"] <= cache.max_bytes
+
+    # 测试7: 查找之后内容被并发淘汰时按未命中处理，重新访问网络
+    entry = cache.lookup(server.get_url("/c"))
+    os.remove(cache._body_path(entry.body_hash))
+    assert cache.build_response(entry) is None
+    requests_before = len(server.requests)
+    response = client.get(server.get_url("/c"))
+    assert response.status_code == 200 and b"Mikan Project C" in response.content
+    assert not getattr(response, "from_cache", False)
+    assert len(server.requests) == requests_before + 1
+    client.close()
+    print("✓ LRU淘汰，内容被淘汰的缓存按未命中处理")
+
+
+def test_http_cache():
+    """测试HTTP磁盘缓存"""
+    print("=" * 60)
+    print("测试HTTP磁盘缓存")
+    print("=" * 60)
+
+    env = TestEnvironment()
+    cache_dir = tempfile.mkdtemp(prefix="animeloader_http_cache_")
+    body_a = FEED_BODY.replace(b"Mikan Project", b"Mikan Project A")
+    body_b = FEED_BODY.replace(b"Mikan Project", b"Mikan Project B")
+    body_c = FEED_BODY.replace(b"Mikan Project", b"Mikan Project C")
+    server = FixtureHTTPServer({
+        FEED_PATH: FEED_BODY,
+        "/RSS/Bangumi?subgroupid=370&bangumiId=3824": FEED_BODY,
+        "/copy": FEED_BODY,
+        "/a": body_a,
+        "/b": body_b,
+        "/c": body_c,
+    })
+
+    try:
+        env.setup()
+        init_config(env.get_config_path())
+        init_database()
+        server.start()
+        set_rate_limiter(HostRateLimiter(requests_per_second=0, max_in_flight=0))
+
+        test_cache_modes(server, cache_dir)
+
+        # 测试8: 录制模式总是访问网络并保存响应
+        rss_url = server.get_url(FEED_PATH)
+        db = next(get_db())
+        anime_service = AnimeService(db)
+        rss_service = RSSService(db)
+        recorded_id = rss_service.create_rss_source(
+            anime_id=anime_service.create_anime(title="录制测试动画").id, name="录制", url=rss_url
+        ).id
+        replayed_id = rss_service.create_rss_source(
+            anime_id=anime_service.create_anime(title="回放测试动画").id, name="回放", url=rss_url
+        ).id
+        db.close()
+
+        record_dir = os.path.join(cache_dir, "recorded")
+        set_http_client(HTTPClient(retries=0, cache=HTTPCache(record_dir, mode="record")))
+        scheduler_service = SchedulerService(get_db)
+        scheduler_service.register_rss_parser(LocalMikanRSSParser())
+        requests_before = len(server.requests)
+        result = scheduler_service.check_rss_source(recorded_id)
+        assert result["success"] is True and result["new_links_count"] == 12
+        LocalMikanRSSParser().parse_rss(rss_url)
+        assert len(server.requests) == requests_before + 2
+        print("✓ 录制模式保存响应")
+
+        # 测试9: 服务停止后，回放模式离线完成完整的检查流程
+        server.stop()
+        set_http_client(HTTPClient(retries=0, cache=HTTPCache(record_dir, mode="replay")))
+        replay_limiter = HostRateLimiter(requests_per_second=0, max_in_flight=0)
+        set_rate_limiter(replay_limiter)
+        result = scheduler_service.check_rss_source(replayed_id)
+        assert result["success"] is True, result.get("message")
+        assert result["new_links_count"] == 12
+        assert result["rate_limit_wait"] == 0.0
+        result = scheduler_service.check_rss_source(replayed_id)
+        assert result["success"] is True and result.get("not_modified") is True
+        assert replay_limiter.get_stats() == {}
+        print("✓ 回放模式离线检查RSS源，不经过限速器")
+
+        # 测试10: 回放模式下没有缓存的URL按网络错误处理
+        result = LocalMikanRSSParser().parse_rss(rss_url + "&v=2")
+        assert result["success"] is False
+        client = HTTPClient(retries=0, cache=HTTPCache(record_dir, mode="replay"))
+        try:
+            client.get(rss_url + "&v=2")
+            assert False, "应该抛出 HTTPCacheMiss"
+        except HTTPCacheMiss:
+            pass
+        assert client.cache.get_stats()["misses"] == 1
+        client.close()
+        print("✓ 回放模式下未录制的URL请求失败")
+
+        print("\n" + "=" * 60)
+        print("[成功] HTTP磁盘缓存测试通过")
+        print("=" * 60)
+    finally:
+        set_http_client(None)
+        set_rate_limiter(None)
+        server.stop()
+        env.teardown()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_http_cache()
@@ -0,0 +1,172 @@
+"""
+HTTP客户端测试
+验证连接复用、压缩、失败重试、用户代理和计时回调，以及解析器通过共用客户端发出请求，不访问外网
+"""
+import sys
+import os
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+from server.utils import HTTPClient, HostRateLimiter, get_http_client, set_http_client, set_rate_limiter
+from server.site_parsers.mikan_rss_parser import MikanRSSParser
+from test_utils import load_fixture
+
+
+FEED_BODY = load_fixture("mikan_bangumi_rss.xml")
+
+
+class KeepAliveServer:
+    """支持 HTTP/1.1 长连接的本地服务，/flaky 前几次返回503"""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.requests = []
+        self.ports = set()
+        self._lock = threading.Lock()
+
+    def start(self):
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                with fixture._lock:
+                    fixture.requests.append({'path': self.path, **dict(self.headers)})
+                    fixture.ports.add(self.client_address[1])
+                    failing = self.path == "/flaky" and fixture.failures > 0
+                    if failing:
+                        fixture.failures -= 1
+                if failing:
+                    self.send_response(503)
+                    self.send_header('Retry-After', '0')
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                body = FEED_BODY
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/xml; charset=utf-8')
+                if 'gzip' in self.headers.get('Accept-Encoding', ''):
+                    body = gzip.compress(body)
+                    self.send_header('Content-Encoding', 'gzip')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def get_url(self, path: str) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{path}"
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class LocalMikanRSSParser(MikanRSSParser):
+    """解析本地回放的蜜柑计划RSS"""
+
+    def can_parse(self, url: str) -> bool:
+        return url.startswith("http://127.0.0.1")
+
+
+def test_http_client():
+    """测试HTTP客户端"""
+    print("=" * 60)
+    print("测试HTTP客户端")
+    print("=" * 60)
+
+    server = KeepAliveServer(failures=2)
+    server.start()
+    timings = []
+    client = HTTPClient(timeout=5, user_agent="AnimeLoader-Test", retries=2, backoff_factor=0)
+    client.add_hook(timings.append)
+    try:
+        # 测试1: 同一主机的请求复用连接
+        for _ in range(5):
+            response = client.get(server.get_url("/feed"))
+            assert response.status_code == 200 and response.content == FEED_BODY
+        assert len(server.ports) == 1, server.ports
+        print("✓ 5次请求复用同一连接")
+
+        # 测试2: 请求带 gzip 和用户代理，响应自动解压，计时回调记录压缩前后的字节数
+        headers = server.requests[-1]
+        assert "gzip" in headers["Accept-Encoding"] and headers["User-Agent"] == "AnimeLoader-Test"
+        timing = timings[-1]
+        assert timing.method == "GET" and timing.status_code == 200 and timing.retries == 0
+        assert timing.content_length == len(FEED_BODY)
+        assert 0 < timing.bytes_received < timing.content_length
+        assert timing.elapsed > 0 and timing.error is None
+        print(f"✓ gzip 压缩传输（{timing.bytes_received} / {timing.content_length} 字节）")
+
+        # 测试3: 503 按退避重试，最终成功
+        response = client.get(server.get_url("/flaky"))
+        assert response.status_code == 200
+        assert timings[-1].retries == 2
+        assert [r["path"] for r in server.requests].count("/flaky") == 3
+        print("✓ 503 重试后成功")
+
+        # 测试4: 重试次数用完时返回最后的响应，由调用方检查状态码
+        server.failures = 5
+        response = client.get(server.get_url("/flaky"))
+        assert response.status_code == 503
+        try:
+            response.raise_for_status()
+            assert False, "应该抛出 HTTPError"
+        except requests.HTTPError:
+            pass
+        print("✓ 重试次数用完时返回最后的响应")
+
+        # 测试5: 连接失败时计时回调记录错误，回调本身出错不影响请求
+        def broken_hook(timing):
+            raise RuntimeError("回调出错")
+
+        client.add_hook(broken_hook)
+        try:
+            client.get("http://127.0.0.1:9/unreachable", timeout=1)
+            assert False, "应该抛出 ConnectionError"
+        except requests.ConnectionError:
+            pass
+        assert timings[-1].status_code is None and timings[-1].error
+        client.remove_hook(broken_hook)
+        print("✓ 请求失败时记录错误")
+
+        # 测试6: RSS解析器通过全局客户端抓取
+        set_rate_limiter(HostRateLimiter(requests_per_second=0, max_in_flight=0))
+        set_http_client(client)
+        assert get_http_client() is client
+        count = len(timings)
+        result = LocalMikanRSSParser().parse_rss(server.get_url("/feed"))
+        assert result["success"] is True and result["new_links_count"] == 12
+        assert len(timings) == count + 1 and timings[-1].url == server.get_url("/feed")
+        print("✓ RSS解析器使用共用的HTTP客户端")
+    finally:
+        set_http_client(None)
+        set_rate_limiter(None)
+        server.stop()
+
+    # 测试7: 未配置时使用默认设置创建全局客户端
+    default_client = get_http_client()
+    assert default_client.timeout == 30
+    assert default_client.session.headers["User-Agent"]
+    set_http_client(None)
+    print("✓ 按配置创建全局客户端")
+
+    print("\n" + "=" * 60)
+    print("[成功] HTTP客户端测试通过")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_http_client()
@@ -0,0 +1,432 @@
+"""
+后台任务队列测试
+验证原子领取、优先级、租约过期回收、失败重试、重启后继续执行，以及调度器通过队列检查和下载，不访问外网
+"""
+import sys
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.database import init_database, get_db
+from server.models.background_job import BackgroundJob
+from server.services.job_queue_service import JobQueueService
+from server.services.job_worker_service import JobWorkerService
+from server.services.scheduler_service import SchedulerService
+from server.services.anime_service import AnimeService
+from server.services.rss_service import RSSService
+from server.services.download_service import DownloadService
+from server.services.downloader_service import DownloaderService
+from server.site_parsers.mikan_rss_parser import MikanRSSParser
+from server.utils import init_config
+from server.api.auth import verify_api_key
+from server.api.routes import rss_extra as rss_extra_routes
+from fastapi import FastAPI
+from sqlalchemy.exc import IntegrityError
+from fastapi.testclient import TestClient
+from test_utils import TestEnvironment, FixtureHTTPServer, load_fixture
+
+
+FEED_PATH = "/RSS/Bangumi?bangumiId=3824&subgroupid=370"
+
+
+class LocalMikanRSSParser(MikanRSSParser):
+    """解析本地回放的蜜柑计划RSS"""
+
+    def can_parse(self, url: str) -> bool:
+        return url.startswith("http://127.0.0.1")
+
+
+def wait_until(condition, timeout: float = 10.0) -> bool:
+    """等待条件成立"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return condition()
+
+
+def count_status(status: str) -> int:
+    """统计指定状态的任务数量"""
+    db = next(get_db())
+    try:
+        return JobQueueService(db).count_jobs(status=status)
+    finally:
+        db.close()
+
+
+def test_queue_basics():
+    """测试入队、优先级和去重"""
+    db = next(get_db())
+    try:
+        queue = JobQueueService(db)
+        low = queue.enqueue("demo", {"name": "low"}, priority=0)
+        high = queue.enqueue("demo", {"name": "high"}, priority=10)
+        dedup = queue.enqueue("demo", {"name": "dedup"}, dedup_key="demo:1")
+        assert queue.enqueue("demo", {"name": "again"}, dedup_key="demo:1").id == dedup.id
+        later = queue.enqueue("demo", {"name": "later"}, run_after=datetime.utcnow() + timedelta(hours=1))
+
+        claimed = [queue.claim("worker", 60) for _ in range(4)]
+        assert [job.id for job in claimed[:3]] == [high.id, low.id, dedup.id]
+        assert claimed[3] is None
+        assert claimed[0].status == "running" and claimed[0].attempts == 1
+        assert JobQueueService.get_payload(claimed[0]) == {"name": "high"}
+
+        # 已结束的任务不再参与去重
+        assert queue.complete(dedup.id, "worker", {"ok": True}) is True
+        assert queue.complete(dedup.id, "worker") is False
+        assert queue.enqueue("demo", dedup_key="demo:1").id != dedup.id
+        assert JobQueueService.get_result(queue.get_job(dedup.id)) == {"ok": True}
+
+        # 取消等待中的任务，执行中的任务不受影响
+        assert queue.cancel_job(later.id).status == "cancelled"
+        assert queue.cancel_job(low.id).status == "running"
+        for job in queue.get_jobs(status="running"):
+            queue.complete(job.id, "worker")
+        for job in queue.get_jobs(status="pending"):
+            queue.cancel_job(job.id)
+        assert queue.count_by_status()["running"] == 0
+    finally:
+        db.close()
+    print("✓ 入队、优先级和去重")
+
+
+def test_atomic_claim():
+    """测试多个线程（各自的数据库连接）同时领取，每个任务只被领取一次"""
+    db = next(get_db())
+    try:
+        job_ids = {JobQueueService(db).enqueue("atomic", {"index": i}).id for i in range(40)}
+    finally:
+        db.close()
+
+    claimed = []
+    lock = threading.Lock()
+
+    def worker(worker_id):
+        session = next(get_db())
+        try:
+            queue = JobQueueService(session)
+            while True:
+                job = queue.claim(worker_id, 60, job_types=["atomic"])
+                if job is None:
+                    return
+                with lock:
+                    claimed.append(job.id)
+                queue.complete(job.id, worker_id)
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=worker, args=(f"worker-{i}",)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(claimed) == sorted(job_ids), f"重复或遗漏: {len(claimed)} / {len(job_ids)}"
+    print(f"✓ {len(threads)} 个线程领取 {len(job_ids)} 个任务，无重复")
+
+
+def test_atomic_dedup():
+    """测试多个线程（各自的数据库连接）同时以相同去重键入队，只产生一个未结束的任务"""
+    job_ids = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(6)
+
+    def enqueue():
+        session = next(get_db())
+        try:
+            barrier.wait()
+            job = JobQueueService(session).enqueue("dedup", {}, dedup_key="dedup:race")
+            with lock:
+                job_ids.append(job.id)
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=enqueue) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(job_ids) == 6 and len(set(job_ids)) == 1, job_ids
+
+    db = next(get_db())
+    try:
+        queue = JobQueueService(db)
+        assert queue.count_jobs(job_type="dedup") == 1
+        # 部分唯一索引直接拒绝重复的未结束任务
+        try:
+            db.add(BackgroundJob(job_type="dedup", payload="{}", status="pending", dedup_key="dedup:race"))
+            db.commit()
+            raise AssertionError("重复的未结束任务应被唯一索引拒绝")
+        except IntegrityError:
+            db.rollback()
+        # 任务结束后可以再次入队；重试已结束的任务时返回未结束的同键任务
+        queue.cancel_job(job_ids[0])
+        again = queue.enqueue("dedup", {}, dedup_key="dedup:race")
+        assert again.id != job_ids[0]
+        assert queue.retry_job(job_ids[0]).id == again.id
+        assert queue.get_job(job_ids[0]).status == "cancelled"
+        queue.cancel_job(again.id)
+    finally:
+        db.close()
+    print("✓ 并发入队的去重键只产生一个任务")
+
+
+def test_lease_and_retry():
+    """测试租约过期回收和失败重试退避"""
+    db = next(get_db())
+    try:
+        queue = JobQueueService(db)
+
+        # 租约过期后被其他工作线程重新领取，原工作线程的结果被忽略
+        job = queue.enqueue("lease", max_attempts=2)
+        now = datetime.utcnow()
+        assert queue.claim("worker-a", 10, job_types=["lease"], now=now).id == job.id
+        assert queue.claim("worker-b", 10, job_types=["lease"], now=now + timedelta(seconds=5)) is None
+        reclaimed = queue.claim("worker-b", 10, job_types=["lease"], now=now + timedelta(seconds=11))
+        assert reclaimed.id == job.id and reclaimed.attempts == 2 and reclaimed.locked_by == "worker-b"
+        assert queue.complete(job.id, "worker-a") is False
+        assert queue.heartbeat(job.id, "worker-b", 10) is True
+
+        # 用完执行次数后租约过期，标记为失败
+        assert queue.reap_expired(datetime.utcnow() + timedelta(seconds=60)) == 1
+        failed = queue.get_job(job.id)
+        assert failed.status == "failed" and "租约" in failed.error
+
+        # 失败后按退避时间重新排队，用完次数后标记为失败
+        job = queue.enqueue("retry", max_attempts=2)
+        assert queue.claim("worker", 60, job_types=["retry"]).id == job.id
+        assert queue.fail(job.id, "worker", "boom", retry_delay=30) == "pending"
+        assert queue.claim("worker", 60, job_types=["retry"]) is None
+        later = datetime.utcnow() + timedelta(seconds=31)
+        assert queue.claim("worker", 60, job_types=["retry"], now=later).id == job.id
+        assert queue.fail(job.id, "worker", "boom again", retry_delay=30) == "failed"
+        assert queue.get_job(job.id).error == "boom again"
+
+        # 手动重试后执行次数清零
+        retried = queue.retry_job(job.id)
+        assert retried.status == "pending" and retried.attempts == 0
+        queue.cancel_job(job.id)
+    finally:
+        db.close()
+    print("✓ 租约过期回收和失败重试")
+
+
+def test_workers():
+    """测试工作线程执行任务、失败重试和重启后回收未完成的任务"""
+    # 上次进程领取后未完成的任务
+    db = next(get_db())
+    try:
+        queue = JobQueueService(db)
+        orphan = queue.enqueue("echo", {"value": "orphan"})
+        workers = JobWorkerService(get_db, workers=3, lease_seconds=30, poll_interval=0.05, retry_delay=0)
+        queue.claim(f"{workers.host_prefix}999999:0", 30, job_types=["echo"])
+    finally:
+        db.close()
+
+    calls = {"flaky": 0}
+
+    def flaky(payload):
+        calls["flaky"] += 1
+        if calls["flaky"] == 1:
+            raise RuntimeError("下载器暂时不可用")
+        return {"value": payload["value"]}
+
+    workers.register_handler("echo", lambda payload: {"value": payload["value"]})
+    workers.register_handler("flaky", flaky)
+    succeeded = count_status("succeeded")
+    try:
+        workers.start()
+        job_ids = [workers.enqueue("echo", {"value": i}) for i in range(10)]
+        flaky_id = workers.enqueue("flaky", {"value": "ok"})
+        assert wait_until(lambda: count_status("succeeded") == succeeded + 12), workers.get_stats()
+
+        db = next(get_db())
+        try:
+            queue = JobQueueService(db)
+            assert [JobQueueService.get_result(queue.get_job(job_id))["value"] for job_id in job_ids] == list(range(10))
+            assert JobQueueService.get_result(queue.get_job(orphan.id)) == {"value": "orphan"}
+            flaky_job = queue.get_job(flaky_id)
+            assert flaky_job.attempts == 2 and flaky_job.status == "succeeded"
+        finally:
+            db.close()
+        stats = workers.get_stats()
+        assert stats["in_flight"] == 0 and stats["counts"]["pending"] == 0
+    finally:
+        workers.stop()
+    print("✓ 工作线程执行任务，失败后重试，重启后回收未完成的任务")
+
+
+def test_worker_pools():
+    """测试单独线程池的任务类型不受共用线程中耗时任务的影响"""
+    release = threading.Event()
+    workers = JobWorkerService(get_db, workers=1, lease_seconds=30, poll_interval=0.05, retry_delay=0)
+    workers.register_handler("slow", lambda payload: release.wait(10))
+    workers.register_handler("check", lambda payload: {"value": payload["value"]}, workers=1)
+    assert workers.pools == {"check": 1}
+    try:
+        workers.start()
+        slow_id = workers.enqueue("slow", {})
+        check_ids = [workers.enqueue("check", {"value": i}) for i in range(3)]
+
+        def finished(job_ids):
+            db = next(get_db())
+            try:
+                return all(JobQueueService(db).get_job(job_id).status == "succeeded" for job_id in job_ids)
+            finally:
+                db.close()
+
+        # 共用线程被耗时任务占住时，单独线程池的任务照常执行
+        assert wait_until(lambda: finished(check_ids)), workers.get_stats()
+        assert not finished([slow_id])
+        assert workers.get_stats()["pools"] == {"check": 1}
+        release.set()
+        assert wait_until(lambda: finished([slow_id]))
+    finally:
+        release.set()
+        workers.stop()
+    print("✓ 单独线程池的任务不受共用线程中耗时任务的影响")
+
+
+def test_scheduler_integration(server: FixtureHTTPServer):
+    """测试调度器的检查、自动下载和状态同步通过队列执行"""
+    db = next(get_db())
+    anime = AnimeService(db).create_anime(title="后台任务测试动画")
+    rss_source_id = RSSService(db).create_rss_source(
+        anime_id=anime.id,
+        name="LoliHouse",
+        url=server.get_url(FEED_PATH),
+        auto_download=True
+    ).id
+    DownloaderService(db).add_downloader(name="mock", is_default=True)
+    db.close()
+
+    workers = JobWorkerService(get_db, retry_delay=0)
+    scheduler_service = SchedulerService(get_db)
+    scheduler_service.register_rss_parser(LocalMikanRSSParser())
+    scheduler_service.attach_job_queue(workers)
+    scheduler_service.start_scheduler()
+    try:
+        # 测试1: 手动后台检查，新链接的下载通过队列开始
+        job_id = scheduler_service.enqueue_check(rss_source_id, auto_download=True)
+        assert scheduler_service.enqueue_check(rss_source_id, auto_download=True) == job_id
+        executed = workers.run_pending()
+        db = next(get_db())
+        try:
+            result = JobQueueService.get_result(JobQueueService(db).get_job(job_id))
+            assert result["success"] is True and result["new_links_count"] > 0
+            tasks = DownloadService(db).get_download_tasks(rss_source_id=rss_source_id, size=100)
+            assert len(tasks) == result["new_links_count"]
+            assert all(task.status == "downloading" for task in tasks)
+            assert JobQueueService(db).count_jobs(job_type="download_start", status="succeeded") == len(tasks)
+        finally:
+            db.close()
+        print(f"✓ 后台检查: 执行 {executed} 个任务，开始 {len(tasks)} 个下载")
+
+        # 测试2: 定时检查到期时加入队列，执行后安排下一次检查
+        check_job_id = scheduler_service.add_check_job(rss_source_id, interval=3600)
+        scheduler_service.timer.cancel(check_job_id)
+        scheduler_service._on_job_due(check_job_id)
+        scheduler_service._on_job_due(check_job_id)
+        assert count_status("pending") == 1
+        assert scheduler_service.timer.get_due_time(check_job_id) is None
+        assert workers.run_pending() == 1
+        assert scheduler_service.timer.get_due_time(check_job_id) is not None
+        print("✓ 定时检查通过队列执行并重新安排")
+
+        # 测试3: 暂停后排队中的定时检查被跳过
+        scheduler_service._on_job_due(check_job_id)
+        scheduler_service.pause_job(check_job_id)
+        workers.run_pending()
+        db = next(get_db())
+        try:
+            job = JobQueueService(db).get_jobs(job_type="rss_check", limit=1)[0]
+            assert JobQueueService.get_result(job)["skipped"] is True
+        finally:
+            db.close()
+        print("✓ 暂停后跳过排队中的定时检查")
+
+        # 测试4: 下载状态同步通过队列执行
+        assert scheduler_service.add_download_sync_job(interval=300) == SchedulerService.DOWNLOAD_SYNC_JOB_ID
+        scheduler_service._dispatch_download_sync()
+        scheduler_service._dispatch_download_sync()
+        assert workers.run_pending() == 1
+        db = next(get_db())
+        try:
+            tasks = DownloadService(db).get_download_tasks(rss_source_id=rss_source_id, size=100)
+            assert all(task.progress == 10.0 for task in tasks)
+        finally:
+            db.close()
+        print("✓ 下载状态同步通过队列执行")
+
+        # 测试5: 手动检查接口默认同步返回检查结果，background=true 时加入队列
+        app = FastAPI()
+        app.include_router(rss_extra_routes.router, prefix="/api")
+        app.dependency_overrides[verify_api_key] = lambda: "test"
+        app.dependency_overrides[rss_extra_routes.get_scheduler_service] = lambda: scheduler_service
+        client = TestClient(app)
+        response = client.post(f"/api/rss-sources/{rss_source_id}/check")
+        assert response.status_code == 200 and response.json()["job_id"] is None
+        assert response.json()["success"] is True
+        assert count_status("pending") == 0
+        response = client.post(f"/api/rss-sources/{rss_source_id}/check?background=true")
+        assert response.status_code == 200 and response.json()["job_id"]
+        assert workers.run_pending() == 1
+        print("✓ 手动检查默认同步执行，background=true 时通过队列执行")
+
+        # 测试6: 调度器未运行时领取的定时检查重新排队，不记为成功
+        scheduler_service.stop_scheduler()
+        workers.retry_delay = 60
+        job_id = workers.enqueue(
+            SchedulerService.JOB_TYPE_RSS_CHECK,
+            {"rss_source_id": rss_source_id, "trigger": "scheduled"}
+        )
+        assert workers.run_pending() == 1
+        db = next(get_db())
+        try:
+            job = JobQueueService(db).get_job(job_id)
+            assert job.status == "pending" and "调度器未运行" in job.error
+        finally:
+            db.close()
+        print("✓ 调度器未运行时定时检查重新排队")
+    finally:
+        scheduler_service.stop_scheduler()
+
+
+def test_job_queue():
+    """测试后台任务队列"""
+    print("=" * 60)
+    print("测试后台任务队列")
+    print("=" * 60)
+
+    env = TestEnvironment()
+    server = FixtureHTTPServer({FEED_PATH: load_fixture("mikan_bangumi_rss.xml")})
+
+    try:
+        env.setup()
+        init_config(env.get_config_path())
+        init_database()
+        server.start()
+
+        test_queue_basics()
+        test_atomic_claim()
+        test_atomic_dedup()
+        test_lease_and_retry()
+        test_workers()
+        test_worker_pools()
+        test_scheduler_integration(server)
+
+        print("\n" + "=" * 60)
+        print("[成功] 后台任务队列测试通过")
+        print("=" * 60)
+
+    finally:
+        server.stop()
+        env.teardown()
+
+
+if __name__ == "__main__":
+    test_job_queue()
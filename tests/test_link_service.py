@@ -68,6 +68,33 @@ def test_link_service():
         )
         print(f"✓ 添加链接: {link2.episode_title} (ID: {link2.id})")
         
+        # 测试2.1: 同一RSS源下重复URL被唯一索引忽略
+        duplicate = link_service.add_link(
+            rss_source_id=rss_source.id,
+            episode_number=2,
+            episode_title="第2集",
+            link_type="magnet",
+            url="magnet:?xt=urn:btih:test456"
+        )
+        assert duplicate is None
+        assert link_service.count_links(rss_source_id=rss_source.id) == 2
+        assert link2.url_hash is not None
+        print(f"✓ 重复链接被忽略")
+        
+        # 测试2.2: 批量添加链接，已存在和批次内重复的URL被忽略
+        link_ids = link_service.add_links_bulk(rss_source.id, [
+            {"episode_number": 2, "url": "magnet:?xt=urn:btih:test456"},
+            {"episode_number": 3, "url": "magnet:?xt=urn:btih:test789"},
+            {"episode_number": 3, "url": "magnet:?xt=urn:btih:test789"},
+        ])
+        assert link_ids[0] is None
+        assert link_ids[1] is not None
+        assert link_ids[2] is None
+        bulk_links = link_service.get_links_by_ids([link_ids[1]])
+        assert bulk_links[0].episode_number == 3
+        print(f"✓ 批量添加链接: 新增 {len([i for i in link_ids if i])} 个")
+        link_service.delete_link(link_ids[1])
+        
         # 测试3: 获取链接
         link = link_service.get_link(link1.id)
         assert link is not None
@@ -78,7 +105,12 @@ def test_link_service():
         links = link_service.get_links(rss_source.id)
         assert len(links) == 2
         print(f"✓ 获取RSS源的所有链接: 共 {len(links)} 个")
-        
+
+        # 按跳过的记录数分页（skip 不是 limit 的整数倍）
+        skipped = link_service.get_links(rss_source.id, skip=1, limit=2)
+        assert [l.id for l in skipped] == [links[1].id]
+        print(f"✓ 按跳过的记录数分页: skip=1 返回 {len(skipped)} 个")
+
         # 测试5: 统计链接数量
         count = link_service.count_links(rss_source_id=rss_source.id)
         assert count == 2
@@ -0,0 +1,123 @@
+"""
+蜜柑计划RSS流式解析测试
+验证流式解析与 feedparser 的结果一致、增量解析、结构不符时回退到 feedparser，不访问外网
+"""
+import sys
+import os
+import types
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.site_parsers.mikan_rss_parser import MikanRSSParser, MikanFeedMismatch
+from test_utils import FixtureHTTPServer, load_fixture
+
+
+FEED_PATH = "/RSS/Bangumi?bangumiId=3824&subgroupid=370"
+FEED_URL = "https://mikanani.me" + FEED_PATH
+
+GENERIC_RSS = """<?xml version="1.0" encoding="utf-8"?>
+<rss version="2.0"><channel><title>T &amp; X</title><link>http://example.com</link>
+<item><title>[ANi] A &amp; B - 01 [1080P][CHT]</title><link>magnet:?xt=urn:btih:abc&amp;dn=x</link>
+<guid>g1</guid><pubDate>Sat, 21 Dec 2024 23:31:00 +0800</pubDate><description><![CDATA[<b>hi</b>]]></description></item>
+<item><title>[ANi] A - 02 [1080P][CHT]</title><link>magnet:?xt=urn:btih:def</link>
+<enclosure url="https://example.com/y.torrent" type="application/x-bittorrent" length="12"/></item>
+</channel></rss>""".encode("utf-8")
+
+ATOM_FEED = b"""<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom"><title>t</title>
+<entry><title>[ANi] A - 03</title><id>e1</id>
+<link href="https://example.com/z.torrent" rel="enclosure" type="application/x-bittorrent"/></entry></feed>"""
+
+BROKEN_FEED = b"""<?xml version="1.0"?><rss><channel><item><title>x</title></channel></rss>"""
+
+
+class LocalMikanRSSParser(MikanRSSParser):
+    """解析本地回放的蜜柑计划RSS"""
+
+    def can_parse(self, url: str) -> bool:
+        return url.startswith("http://127.0.0.1")
+
+
+def parse_both(content: bytes, last_entry_id=None):
+    """分别用流式解析和 feedparser 解析"""
+    fast_parser = MikanRSSParser()
+    fallback_parser = MikanRSSParser()
+    fallback_parser.fast_path = False
+    return (
+        fast_parser.parse_feed(content, FEED_URL, last_entry_id=last_entry_id),
+        fallback_parser.parse_feed(content, FEED_URL, last_entry_id=last_entry_id)
+    )
+
+
+def test_mikan_feed():
+    """测试蜜柑计划RSS流式解析"""
+    print("=" * 60)
+    print("测试蜜柑计划RSS流式解析")
+    print("=" * 60)
+
+    # 测试1: 录制的RSS与 feedparser 的解析结果完全一致
+    for name in ("mikan_bangumi_rss.xml", "mikan_mybangumi_rss.xml"):
+        fast, fallback = parse_both(load_fixture(name))
+        assert fast["success"] is True and fast["links"]
+        assert fast == fallback, name
+    fast, _ = parse_both(load_fixture("mikan_bangumi_rss.xml"))
+    first = fast["links"][0]
+    assert first["link_type"] == "torrent" and first["file_size"] == 1288490188
+    assert first["publish_date"].isoformat() == "2024-12-21T23:31:00"
+    assert first["subgroup"] == "LoliHouse" and first["episode_number"] == 12
+    print(f"✓ 录制的RSS解析结果与 feedparser 一致（{fast['total_entries']} 个条目）")
+
+    # 测试2: 条目逐个生成
+    channel = {}
+    entries = MikanRSSParser().iter_feed_entries(load_fixture("mikan_bangumi_rss.xml"), channel)
+    assert isinstance(entries, types.GeneratorType)
+    entry = next(entries)
+    assert entry["id"].startswith("[LoliHouse]") and entry["enclosures"][0]["href"].endswith(".torrent")
+    assert channel["title"] == "Mikan Project - 黄金神威 最终章"
+    assert len(list(entries)) == 11
+    print("✓ 流式逐个生成条目")
+
+    # 测试3: 增量解析遇到上次的标记后停止解析，仍统计条目总数
+    fast, fallback = parse_both(load_fixture("mikan_bangumi_rss.xml"), last_entry_id=fast["latest_entry_id"])
+    assert fast == fallback
+    assert fast["stopped_early"] is True and fast["entries_parsed"] == 0 and fast["total_entries"] == 12
+    print("✓ 增量解析与 feedparser 一致")
+
+    # 测试4: 通用RSS 2.0（RFC 822 时间、磁力链接、实体）同样一致
+    fast, fallback = parse_both(GENERIC_RSS)
+    assert fast == fallback
+    assert [link["link_type"] for link in fast["links"]] == ["magnet", "torrent"]
+    assert fast["links"][0]["publish_date"].isoformat() == "2024-12-21T15:31:00"
+    assert fast["feed_title"] == "T & X"
+    print("✓ 通用RSS 2.0 解析结果一致")
+
+    # 测试5: 结构不符（Atom）时回退到 feedparser，XML格式错误时返回失败
+    try:
+        list(MikanRSSParser().iter_feed_entries(ATOM_FEED, {}))
+        assert False, "Atom 应该被识别为结构不符"
+    except MikanFeedMismatch:
+        pass
+    fast, fallback = parse_both(ATOM_FEED)
+    assert fast == fallback and fast["total_entries"] == 1
+    fast, fallback = parse_both(BROKEN_FEED)
+    assert fast["success"] is False and fast == fallback
+    print("✓ 结构不符时回退到 feedparser")
+
+    # 测试6: parse_rss 使用流式解析
+    server = FixtureHTTPServer({FEED_PATH: load_fixture("mikan_bangumi_rss.xml")})
+    try:
+        server.start()
+        result = LocalMikanRSSParser().parse_rss(server.get_url(FEED_PATH))
+        assert result["success"] is True and result["new_links_count"] == 12
+        assert result["validators"]["content_hash"]
+    finally:
+        server.stop()
+    print("✓ 抓取并解析本地回放的RSS")
+
+    print("\n" + "=" * 60)
+    print("[成功] 蜜柑计划RSS流式解析测试通过")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_mikan_feed()
@@ -0,0 +1,122 @@
+"""
+蜜柑计划番组页面解析测试
+验证只构建所需元素的页面解析结果，以及通过本地服务抓取录制的页面完成智能解析，不访问外网
+"""
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+from server.site_parsers.mikan_parser import MikanParser, PAGE_STRAINER
+from server.utils import HTTPClient, HostRateLimiter, set_http_client, set_rate_limiter
+from test_utils import FixtureHTTPServer, load_fixture
+
+
+PAGE_URL = "https://mikanani.me/Home/Bangumi/3824"
+PAGE_BODY = load_fixture("mikan_bangumi_page.html")
+
+SUBGROUPS = [
+    ("370", "LoliHouse"),
+    ("382", "喵萌奶茶屋"),
+    ("583", "ANi"),
+    ("1", "桜都字幕组"),
+    ("562", "北宇治字幕组"),
+    ("615", "拨雪寻春"),
+    ("1207", "Skymoon-Raws"),
+    ("1234", "黒ネズミたち"),
+]
+
+
+class LocalMikanParser(MikanParser):
+    """解析本地回放的蜜柑计划页面"""
+
+    def can_parse(self, url: str) -> bool:
+        return url.startswith("http://127.0.0.1")
+
+
+def check_anime_info(results, bangumi_id: str = "3824"):
+    """检查录制页面的解析结果"""
+    assert len(results) == 1
+    anime_info = results[0]
+    assert anime_info["title"] == "黄金神威 最终章"
+    assert anime_info["cover_url"] == (
+        "https://mikanani.me/images/Bangumi/202410/9cfbc35f.jpg?width=400&height=560&format=webp"
+    )
+    assert anime_info["description"] == "放送开始：10/7/2024\n放送日期：星期一"
+
+    rss_sources = anime_info["rss_sources"]
+    assert rss_sources[0] == {
+        "name": "蜜柑计划 默认",
+        "url": "https://mikanani.me/RSS/Bangumi?bangumiId=3824",
+        "quality": "default",
+        "auto_download": True
+    }
+    assert [(source["url"].split("subgroupid=")[-1], source["name"]) for source in rss_sources[1:]] == SUBGROUPS
+    assert all(
+        source["url"].startswith(f"https://mikanani.me/RSS/Bangumi?bangumiId={bangumi_id}&subgroupid=")
+        for source in rss_sources[1:]
+    )
+
+
+def test_mikan_page():
+    """测试蜜柑计划番组页面解析"""
+    print("=" * 60)
+    print("测试蜜柑计划番组页面解析")
+    print("=" * 60)
+
+    html = PAGE_BODY.decode("utf-8")
+
+    # 测试1: 录制的番组页面解析出完整的动画信息
+    check_anime_info(MikanParser().parse_anime_page(html, PAGE_URL))
+    print("✓ 解析标题、封面、放送信息和 9 个RSS源")
+
+    # 测试2: 只构建所需元素，剧集列表和导航等不构建
+    soup = BeautifulSoup(html, "html.parser", parse_only=PAGE_STRAINER)
+    full = BeautifulSoup(html, "html.parser")
+    assert soup.find("table") is None and soup.find("tr") is None
+    assert full.find("table") is not None
+    assert len(soup.find_all(True)) * 10 < len(full.find_all(True))
+    print(f"✓ 只构建 {len(soup.find_all(True))} / {len(full.find_all(True))} 个元素")
+
+    # 测试3: 多个 class 的元素也能匹配，相似的 class 不匹配
+    snippet = (
+        '<a class="subgroup-name subgroup-42" href="#">测试组</a>'
+        '<a class="subgroup-name" href="#">无ID</a>'
+        '<a class="subgroup-scroll-end subgroup-42x" href="#">不匹配</a>'
+        '<p class="bangumi-title">测试动画<a class="mikan-rss" href="/RSS/Bangumi?bangumiId=42"></a></p>'
+    )
+    result = MikanParser().parse_anime_page(snippet, "https://mikanani.me/Home/Bangumi/42")[0]
+    assert result["title"] == "测试动画"
+    assert [source["name"] for source in result["rss_sources"]] == ["蜜柑计划 默认", "测试组"]
+    assert result["rss_sources"][1]["url"] == "https://mikanani.me/RSS/Bangumi?bangumiId=42&subgroupid=42"
+    print("✓ 按 class 匹配字幕组")
+
+    # 测试4: 通过共用的HTTP客户端抓取本地服务的页面
+    server = FixtureHTTPServer({"/Home/Bangumi/3824": PAGE_BODY}, content_type="text/html; charset=utf-8")
+    try:
+        server.start()
+        set_rate_limiter(HostRateLimiter(requests_per_second=0, max_in_flight=0))
+        set_http_client(HTTPClient(retries=0))
+        parser = LocalMikanParser()
+        check_anime_info(parser.parse_anime(server.get_url("/Home/Bangumi/3824")))
+        assert len(server.requests) == 1
+        print("✓ 抓取页面完成智能解析")
+
+        # 测试5: 页面不存在时返回空列表
+        assert parser.parse_anime(server.get_url("/Home/Bangumi/404")) == []
+        print("✓ 请求失败时返回空列表")
+    finally:
+        set_http_client(None)
+        set_rate_limiter(None)
+        server.stop()
+
+    print("\n" + "=" * 60)
+    print("[成功] 蜜柑计划番组页面解析测试通过")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_mikan_page()
@@ -0,0 +1,160 @@
+"""
+智能解析结果缓存测试
+验证进程内缓存、数据库持久化、有效期、并发解析合并和URL规范化，不访问外网
+"""
+import sys
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.database import init_database, get_db, get_session_local
+from server.models import SmartParseResult
+from server.services.parse_cache_service import SmartParseCache, ParseCacheService
+from server.services.smart_parser_service import SmartParserService
+from server.site_parsers.registry import ParserRegistry
+from server.utils import init_config
+from test_utils import TestEnvironment
+
+
+class CountingParser:
+    """记录解析次数的网站解析器，每次解析耗时 delay 秒"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def get_site_name(self) -> str:
+        return "测试网站"
+
+    def can_parse(self, url: str) -> bool:
+        return True
+
+    def parse_anime(self, url: str):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if url.endswith("/empty"):
+            return []
+        return [{
+            'title': '测试动画',
+            'rss_sources': [{'name': '默认', 'url': url + '/rss', 'quality': 'default', 'auto_download': True}]
+        }]
+
+
+def create_service(parser: CountingParser, ttl: float = 3600) -> SmartParserService:
+    """创建使用独立注册表和缓存的智能解析服务"""
+    registry = ParserRegistry()
+    registry.register(parser, hosts=["anime.example"])
+    session_local = get_session_local()
+    cache = SmartParseCache(ttl=ttl, max_entries=2, session_factory=lambda: session_local())
+    return SmartParserService(registry=registry, cache=cache)
+
+
+def test_parse_cache():
+    """测试智能解析结果缓存"""
+    print("=" * 60)
+    print("测试智能解析结果缓存")
+    print("=" * 60)
+
+    env = TestEnvironment()
+    try:
+        env.setup()
+        init_config(env.get_config_path())
+        init_database()
+        url = "https://anime.example/Home/Bangumi/1?b=2&a=1"
+
+        # 测试1: 同一URL（写法不同）只解析一次，返回的是副本
+        parser = CountingParser()
+        service = create_service(parser)
+        first = service.parse_anime(url)
+        first[0]['title'] = '被修改'
+        second = service.parse_anime("HTTPS://Anime.Example/Home/Bangumi/1?a=1&b=2#top")
+        assert parser.calls == 1
+        assert second[0]['title'] == '测试动画'
+        assert service.cache.get_stats()['hits'] == 1
+        print("✓ 规范化URL命中进程内缓存")
+
+        # 测试2: 新的缓存实例（模拟服务重启）从数据库读取
+        restarted = create_service(parser)
+        assert restarted.parse_anime(url)[0]['rss_sources'][0]['url'] == url + '/rss'
+        assert parser.calls == 1
+        db = next(get_db())
+        record = db.query(SmartParseResult).one()
+        assert record.url == "https://anime.example/Home/Bangumi/1?a=1&b=2"
+        assert record.site_name == "测试网站"
+        db.close()
+        print("✓ 重启后从数据库读取")
+
+        # 测试3: refresh 忽略缓存重新解析；空结果不缓存
+        service.parse_anime(url, refresh=True)
+        assert parser.calls == 2
+        service.parse_anime("https://anime.example/empty")
+        service.parse_anime("https://anime.example/empty")
+        assert parser.calls == 4
+        print("✓ 强制刷新和空结果不缓存")
+
+        # 测试4: 过期的结果重新解析，并清理数据库中过期的记录
+        db = next(get_db())
+        db.query(SmartParseResult).update({SmartParseResult.parsed_at: datetime.utcnow() - timedelta(hours=2)})
+        db.commit()
+        db.close()
+        expired = create_service(parser, ttl=3600)
+        expired.parse_anime(url)
+        assert parser.calls == 5
+        expired.parse_anime("https://anime.example/Home/Bangumi/2")
+        db = next(get_db())
+        assert db.query(SmartParseResult).count() == 2
+        assert ParseCacheService(db).purge_expired(0) == 2
+        db.close()
+        print("✓ 过期后重新解析")
+
+        # 测试5: 同一URL的并发解析合并为一次
+        slow_parser = CountingParser(delay=0.3)
+        service = create_service(slow_parser)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(service.parse_anime("https://anime.example/Home/Bangumi/3")))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert slow_parser.calls == 1
+        assert len(results) == 8 and all(result == results[0] for result in results)
+        print("✓ 8 个并发请求只解析一次")
+
+        # 测试6: 进程内缓存按LRU淘汰，数据库仍保留
+        cache = service.cache
+        service.parse_anime("https://anime.example/Home/Bangumi/4")
+        service.parse_anime("https://anime.example/Home/Bangumi/5")
+        assert cache.get_stats()['entries'] == 2
+        service.parse_anime("https://anime.example/Home/Bangumi/3")
+        assert slow_parser.calls == 3
+        print("✓ 进程内LRU淘汰后从数据库读取")
+
+        # 测试7: 缓存失效和不支持的网站
+        cache.invalidate("https://anime.example/Home/Bangumi/3")
+        service.parse_anime("https://anime.example/Home/Bangumi/3")
+        assert slow_parser.calls == 4
+        try:
+            SmartParserService(registry=ParserRegistry(), cache=cache).parse_anime("https://other.example/1")
+            assert False, "应该抛出 ValueError"
+        except ValueError:
+            pass
+        print("✓ 缓存失效")
+
+        print("\n" + "=" * 60)
+        print("[成功] 智能解析结果缓存测试通过")
+        print("=" * 60)
+    finally:
+        env.teardown()
+
+
+if __name__ == "__main__":
+    test_parse_cache()
@@ -0,0 +1,131 @@
+"""
+解析器注册表测试
+验证按主机名分发、按模块路径延迟加载、can_parse 回退和支持网站列表，不访问外网
+"""
+import sys
+import os
+import io
+import contextlib
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.site_parsers.registry import (
+    ParserRegistry,
+    DEFAULT_SITE_PARSERS,
+    DEFAULT_RSS_PARSERS,
+    get_hostname
+)
+
+
+class LocalParser:
+    """解析本地地址的解析器（不登记主机名）"""
+
+    def get_site_name(self) -> str:
+        return "本地"
+
+    def can_parse(self, url: str) -> bool:
+        return url.startswith("http://127.0.0.1")
+
+
+def test_parser_registry():
+    """测试解析器注册表"""
+    print("=" * 60)
+    print("测试解析器注册表")
+    print("=" * 60)
+
+    # 测试1: 主机名解析
+    assert get_hostname("https://Mikanani.ME./Home/Bangumi/1") == "mikanani.me"
+    assert get_hostname("not a url") == ""
+    assert get_hostname("http://[::1") == ""
+    print("✓ 主机名解析")
+
+    # 测试2: 登记时不导入解析器模块，首次分发时才导入
+    for module in ("server.site_parsers.mikan_parser", "server.site_parsers.mikan_rss_parser"):
+        sys.modules.pop(module, None)
+    site_registry = ParserRegistry.from_config("site_parsers.site", DEFAULT_SITE_PARSERS)
+    rss_registry = ParserRegistry.from_config("site_parsers.rss", DEFAULT_RSS_PARSERS)
+    assert site_registry.get_site_names() == ["蜜柑计划"]
+    assert "server.site_parsers.mikan_parser" not in sys.modules
+    assert "server.site_parsers.mikan_rss_parser" not in sys.modules
+    assert site_registry.get_sites()[0]["loaded"] is False
+
+    parser = site_registry.get_parser("https://mikanani.me/Home/Bangumi/3824")
+    assert type(parser).__name__ == "MikanParser"
+    assert "server.site_parsers.mikan_parser" in sys.modules
+    assert "server.site_parsers.mikan_rss_parser" not in sys.modules
+    assert site_registry.get_parser("https://mikanani.me/Home/Bangumi/1") is parser
+    assert site_registry.get_sites()[0]["loaded"] is True
+    print("✓ 按模块路径延迟加载")
+
+    # 测试3: 子域名按上级域名分发，其他网站不匹配
+    rss_parser = rss_registry.get_parser("https://www.mikanani.me/RSS/Bangumi?bangumiId=1")
+    assert type(rss_parser).__name__ == "MikanRSSParser"
+    assert rss_registry.get_parser("https://mikanani.me.example.com/RSS/Bangumi") is None
+    assert rss_registry.get_parser("https://example.com/?u=https://mikanani.me/RSS") is None
+    assert rss_registry.get_parser("") is None
+    print("✓ 按主机名和上级域名分发")
+
+    # 测试4: 未登记主机名的解析器按 can_parse 判断
+    local = LocalParser()
+    rss_registry.register(local)
+    assert rss_registry.get_parser("http://127.0.0.1:8000/rss") is local
+    assert rss_registry.get_parser("http://localhost:8000/rss") is None
+    assert rss_registry.get_site_names() == ["蜜柑计划", "本地"]
+    print("✓ 未登记主机名的解析器按 can_parse 判断")
+
+    # 测试5: 实例按主机名注册，同一主机名上先注册的优先
+    registry = ParserRegistry()
+    other = LocalParser()
+    registry.register(local, hosts=["Example.com"])
+    registry.register(other, hosts=["example.com"])
+    assert registry.get_parser("http://127.0.0.1/x") is None
+    local_on_host = LocalParser()
+    local_on_host.can_parse = lambda url: "example.com" in url
+    registry.register(local_on_host, hosts=["cdn.example.com"])
+    assert registry.get_parser("https://cdn.example.com/a") is local_on_host
+    sites = registry.get_sites()
+    assert sites[0]["hosts"] == ["example.com"] and sites[0]["loaded"] is True
+    assert sites[0]["class"].endswith("LocalParser")
+    print("✓ 按主机名注册解析器实例")
+
+    # 测试6: 模块路径无法导入时输出错误并跳过，不重复导入
+    registry = ParserRegistry.from_config("site_parsers.missing", {
+        "broken": {"class": "server.site_parsers.no_such_parser.NoSuchParser", "hosts": ["broken.example"]},
+        "plain": "server.site_parsers.mikan_parser.MikanParser",
+    })
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        assert registry.get_parser("https://broken.example/a") is None
+        assert registry.get_parser("https://broken.example/b") is None
+    assert output.getvalue().count("加载解析器 broken") == 1
+    # 没有登记主机名的模块路径解析器在主机名未命中时加载，按 can_parse 判断
+    assert registry.get_site_names() == ["broken", "蜜柑计划"]
+    assert type(registry.get_parser("https://mikanani.me/Home/Bangumi/1")).__name__ == "MikanParser"
+    print("✓ 加载失败时输出错误并跳过")
+
+    # 测试7: 调度服务和智能解析服务通过注册表分发
+    from server.services.scheduler_service import SchedulerService
+    from server.services.smart_parser_service import SmartParserService
+    from server.database import get_db
+
+    scheduler_service = SchedulerService(get_db)
+    assert scheduler_service.get_supported_rss_sites() == ["蜜柑计划"]
+    scheduler_service.register_rss_parser(local)
+    assert scheduler_service._get_rss_parser("http://127.0.0.1/rss") is local
+    assert type(scheduler_service._get_rss_parser("https://mikanani.me/RSS/MyBangumi")).__name__ == "MikanRSSParser"
+
+    smart_parser_service = SmartParserService(registry=ParserRegistry())
+    assert smart_parser_service.get_supported_sites() == []
+    smart_parser_service.register_site_parser(local, hosts=["127.0.0.1"])
+    assert smart_parser_service.get_parser("http://127.0.0.1:8000/x") is local
+    assert "蜜柑计划" in SmartParserService().get_supported_sites()
+    print("✓ 调度服务和智能解析服务使用注册表")
+
+    print("\n" + "=" * 60)
+    print("[成功] 解析器注册表测试通过")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_parser_registry()
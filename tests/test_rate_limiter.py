@@ -0,0 +1,196 @@
+"""
+按主机限速测试
+使用本地 HTTP 服务回放录制的蜜柑计划RSS，不访问外网
+"""
+import sys
+import os
+import threading
+import time
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.database import init_database, get_db
+from server.services.scheduler_service import SchedulerService
+from server.services.scheduler_run_service import SchedulerRunService
+from server.services.anime_service import AnimeService
+from server.services.rss_service import RSSService
+from server.site_parsers.mikan_rss_parser import MikanRSSParser
+from server.utils import HostRateLimiter, get_rate_limiter, set_rate_limiter, init_config
+from test_utils import TestEnvironment, FixtureHTTPServer, load_fixture
+
+
+FEED_PATH = "/RSS/Bangumi?bangumiId=3824"
+
+
+class LocalMikanRSSParser(MikanRSSParser):
+    """解析本地回放的蜜柑计划RSS"""
+
+    def can_parse(self, url: str) -> bool:
+        return url.startswith("http://127.0.0.1")
+
+
+class FakeClock:
+    """只在等待时前进的时钟，限速器的等待时间不受实际耗时和线程调度影响"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_token_bucket():
+    """测试令牌桶速率和突发"""
+    clock = FakeClock()
+    limiter = HostRateLimiter(requests_per_second=10, burst=2, max_in_flight=0, clock=clock, sleep=clock.sleep)
+    waits = []
+    for _ in range(5):
+        with limiter.limit("https://mikanani.me/RSS/Bangumi?bangumiId=1") as waited:
+            waits.append(waited)
+    # 前2个请求使用突发令牌，之后每0.1秒一个
+    assert waits[:2] == [0.0, 0.0]
+    assert all(abs(wait - 0.1) < 1e-9 for wait in waits[2:]), waits
+    assert abs(clock.now - 1000.3) < 1e-9
+    stats = limiter.get_stats()["mikanani.me"]
+    assert stats["requests"] == 5
+    assert stats["waited_requests"] == 3
+    assert abs(stats["total_wait"] - 0.3) < 1e-9
+    print(f"✓ 令牌桶限速: 5 个请求等待 {stats['total_wait']:.2f}s")
+
+    # 时钟前进后令牌补充，不再等待
+    clock.now += 1
+    with limiter.limit("https://mikanani.me/RSS/Bangumi?bangumiId=1") as waited:
+        assert waited == 0.0
+    print("✓ 令牌按时间补充")
+
+    # 不同主机使用各自的令牌桶
+    with limiter.limit("https://example.org/rss") as waited:
+        assert waited == 0.0
+    print("✓ 不同主机互不影响")
+
+    # 按主机覆盖配置
+    clock = FakeClock()
+    limiter = HostRateLimiter(
+        requests_per_second=0,
+        hosts={"slow.example": {"requests_per_second": 5, "burst": 1}},
+        clock=clock,
+        sleep=clock.sleep
+    )
+    with limiter.limit("http://slow.example/a"):
+        pass
+    with limiter.limit("http://slow.example/b") as waited:
+        assert abs(waited - 0.2) < 1e-9
+    with limiter.limit("http://fast.example/a"):
+        pass
+    with limiter.limit("http://fast.example/b") as waited:
+        assert waited == 0.0
+    print("✓ 按主机覆盖配置")
+
+
+def test_max_in_flight():
+    """测试同一主机的并发上限"""
+    limiter = HostRateLimiter(requests_per_second=0, max_in_flight=2)
+    lock = threading.Lock()
+    state = {"current": 0, "peak": 0}
+
+    def fetch():
+        with limiter.limit("https://mikanani.me/Home"):
+            with lock:
+                state["current"] += 1
+                state["peak"] = max(state["peak"], state["current"])
+            time.sleep(0.05)
+            with lock:
+                state["current"] -= 1
+
+    threads = [threading.Thread(target=fetch) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert state["peak"] == 2
+    stats = limiter.get_stats()["mikanani.me"]
+    assert stats["in_flight"] == 0
+    assert stats["max_wait"] >= 0.05
+    print(f"✓ 并发上限: 最多同时 {state['peak']} 个请求")
+
+
+def test_rate_limiter():
+    """测试按主机限速"""
+    print("=" * 60)
+    print("测试按主机限速")
+    print("=" * 60)
+
+    env = TestEnvironment()
+    server = FixtureHTTPServer({FEED_PATH: load_fixture("mikan_bangumi_rss.xml")})
+
+    try:
+        env.setup()
+        init_config(env.get_config_path())
+        init_database()
+        server.start()
+
+        test_token_bucket()
+        test_max_in_flight()
+
+        # 测试: RSS解析器和调度服务共用全局限速器，等待时间写入运行记录
+        # 时钟只在等待时前进，第二次请求的等待时间固定为 1/4 秒
+        clock = FakeClock()
+        set_rate_limiter(HostRateLimiter(
+            requests_per_second=4, burst=1, max_in_flight=1, clock=clock, sleep=clock.sleep
+        ))
+        rss_url = server.get_url(FEED_PATH)
+        parser = LocalMikanRSSParser()
+        result = parser.parse_rss(rss_url)
+        assert result['success'] is True, result.get('error')
+        assert result['rate_limit_wait'] == 0.0
+
+        db = next(get_db())
+        anime = AnimeService(db).create_anime(title="限速测试动画")
+        rss_source_id = RSSService(db).create_rss_source(
+            anime_id=anime.id,
+            name="本地RSS",
+            url=rss_url
+        ).id
+        db.close()
+
+        scheduler_service = SchedulerService(get_db)
+        scheduler_service.register_rss_parser(LocalMikanRSSParser())
+        result = scheduler_service.check_rss_source(rss_source_id)
+        assert result['success'] is True, result.get('message')
+        assert abs(result['rate_limit_wait'] - 0.25) < 1e-9
+        assert clock.sleeps == [0.25]
+        print(f"✓ 检查等待限速: {result['rate_limit_wait']:.2f}s")
+
+        db = next(get_db())
+        run_service = SchedulerRunService(db)
+        run = run_service.get_runs(rss_source_id=rss_source_id)[0]
+        assert abs(run.rate_limit_wait - 0.25) < 1e-9
+        metrics = run_service.get_metrics(hours=1)
+        source = metrics['sources'][0]
+        assert abs(source['rate_limit_wait_total'] - 0.25) < 1e-9
+        assert source['rate_limit_wait_p50'] is not None
+        db.close()
+        stats = get_rate_limiter().get_stats()["127.0.0.1"]
+        assert stats["requests"] == 2
+        assert stats["waited_requests"] == 1
+        assert abs(stats["total_wait"] - 0.25) < 1e-9
+        print("✓ 运行记录和指标包含限速等待时间")
+
+        print("\n" + "=" * 60)
+        print("[成功] 按主机限速测试通过")
+        print("=" * 60)
+
+    finally:
+        set_rate_limiter(None)
+        server.stop()
+        env.teardown()
+
+
+if __name__ == "__main__":
+    test_rate_limiter()
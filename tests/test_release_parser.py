@@ -0,0 +1,298 @@
+"""
+发布标题解析测试
+验证字幕组前缀树、分辨率/编码/字幕语言/版本号解析，解析结果写入链接并作为SQL条件过滤和去重，不访问外网
+"""
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.database import init_database, get_db
+from server.services.anime_service import AnimeService
+from server.services.rss_service import RSSService
+from server.services.link_service import LinkService
+from server.services.download_service import DownloadService
+from server.services.downloader_service import DownloaderService
+from server.services.scheduler_service import SchedulerService
+from server.site_parsers.mikan_rss_parser import MikanRSSParser
+from server.utils import init_config
+from server.utils.release_parser import ReleaseInfo, SubgroupTrie, normalize_resolution, parse_release
+from test_utils import TestEnvironment, FixtureHTTPServer, load_fixture, load_title_corpus
+
+
+FEED_PATH = "/RSS/Bangumi?bangumiId=3824&subgroupid=370"
+
+
+class LocalMikanRSSParser(MikanRSSParser):
+    """解析本地回放的蜜柑计划RSS"""
+
+    def can_parse(self, url: str) -> bool:
+        return url.startswith("http://127.0.0.1")
+
+
+def test_parse_release():
+    """测试发布标题解析"""
+    cases = [
+        ("[LoliHouse] 黄金神威 最终章 / Golden Kamuy - 12 [WebRip 1080p HEVC-10bit AAC][简繁内封字幕]",
+         ReleaseInfo("LoliHouse", "1080p", "hevc", "chs_cht", None)),
+        ("【喵萌奶茶屋】★10月新番★[黄金神威 最终章 / Golden Kamuy][11][720p][简日双语][招募翻译]",
+         ReleaseInfo("喵萌奶茶屋", "720p", None, "chs", None)),
+        # 别名映射到规范名称
+        ("[Nekomoe kissaten][Sousou no Frieren][10][720p][JPTC]",
+         ReleaseInfo("喵萌奶茶屋", "720p", None, "cht", None)),
+        ("[Sakurato] Jujutsu Kaisen (2023) [23v2][HEVC-10bit 1080p AAC][CHT]",
+         ReleaseInfo("桜都字幕组", "1080p", "hevc", "cht", 2)),
+        # 联合字幕组取第一个已知字幕组，1920x1080 规范为 1080p
+        ("[Kamigami&VCB-Studio] Steins;Gate [25][Ma10p_1080p][x265_flac_aac].mkv",
+         ReleaseInfo("Kamigami", "1080p", "hevc", None, None)),
+        ("[NC-Raws] 药屋少女的呢喃 / Kusuriya no Hitorigoto - 06 (CR 1920x1080 AVC AAC MKV)",
+         ReleaseInfo("NC-Raws", "1080p", "avc", None, None)),
+        ("【幻樱字幕组】【10月新番】【间谍过家家 第二季 SPY×FAMILY Season 2】【37】【BIG5_MP4】【1280X720】",
+         ReleaseInfo("幻樱字幕组", "720p", None, "cht", None)),
+        ("[KitaujiSub] Oshi no Ko S2 [04][WebRip][HEVC_AAC][CHS_JP&CHT_JP]",
+         ReleaseInfo("北宇治字幕组", None, "hevc", "chs_cht", None)),
+        ("[Erai-raws] Kusuriya no Hitorigoto - 08 [1080p][Multiple Subtitle][ENG][POR-BR][SPA-LA].mkv",
+         ReleaseInfo("Erai-raws", "1080p", None, "eng", None)),
+        # 未知字幕组取开头方括号中的第一个名称
+        ("[夜莺家族&YYQ字幕组]New Doraemon 哆啦A梦新番[783][2024.01.13][AVC][1080P][GB_JP]",
+         ReleaseInfo("夜莺家族", "1080p", "avc", "chs", None)),
+        # scene 风格标题末尾的发布组
+        ("Sousou.no.Frieren.S01E05.1080p.WEB.H264-NanDesuKa.mkv",
+         ReleaseInfo("NanDesuKa", "1080p", "avc", None, None)),
+        ("[1080p][简体] 某动画 - 01", ReleaseInfo(None, "1080p", None, "chs", None)),
+        ("黄金神威 最终章 第1集", ReleaseInfo(None, None, None, None, None)),
+        ("", ReleaseInfo(None, None, None, None, None)),
+    ]
+    for title, expected in cases:
+        assert parse_release(title) == expected, f"{title} -> {parse_release(title)}"
+
+    # 只匹配完整的字幕组名称
+    trie = SubgroupTrie({"ANi": (), "ANiMOE": ()})
+    assert trie.find("[ANi] test") == "ANi"
+    assert trie.find("[ANiMOE] test") == "ANiMOE"
+    assert trie.find("[ANim] test") is None
+    assert trie.find("[animoe&ANi] test") == "ANiMOE"
+
+    assert normalize_resolution("1080P") == "1080p"
+    assert normalize_resolution("1080") == "1080p"
+    assert normalize_resolution("1920x1080") == "1080p"
+    assert normalize_resolution("4K") == "2160p"
+    assert normalize_resolution("default") is None
+    assert normalize_resolution(None) is None
+
+    corpus = load_title_corpus()
+    releases = [parse_release(title) for title in corpus]
+    assert sum(1 for release in releases if release.subgroup) >= len(corpus) - 6
+    assert sum(1 for release in releases if release.resolution) >= len(corpus) - 12
+    print(f"✓ {len(cases)} 个发布标题解析正确，语料中 {sum(1 for r in releases if r.subgroup)}/{len(corpus)} 个识别出字幕组")
+
+
+def test_link_columns(rss_source_id: int):
+    """测试解析结果写入链接，并按字段过滤"""
+    db = next(get_db())
+    try:
+        link_service = LinkService(db)
+        titles = [
+            "[LoliHouse] 测试动画 - 01 [WebRip 1080p HEVC-10bit AAC][简繁内封字幕]",
+            "[LoliHouse] 测试动画 - 01 [WebRip 720p HEVC-10bit AAC][简繁内封字幕]",
+            "[ANi] 测试动画 - 01 [1080P][Baha][WEB-DL][AAC AVC][CHT][MP4]",
+            "[SweetSub] 测试动画 - 01 [WebRip][1080P][AVC 8bit][简日双语]",
+        ]
+        parser = MikanRSSParser()
+        links_info = [
+            {
+                "episode_number": 1,
+                "url": f"magnet:?xt=urn:btih:columns{index}",
+                **parser.parse_release(title)._asdict()
+            }
+            for index, title in enumerate(titles)
+        ]
+        link_ids = link_service.add_links_bulk(rss_source_id, links_info)
+        assert all(link_ids)
+
+        link = link_service.get_link(link_ids[0])
+        assert (link.subgroup, link.resolution, link.video_codec, link.subtitle_language) == \
+            ("LoliHouse", "1080p", "hevc", "chs_cht")
+
+        def count(**filters):
+            return link_service.count_links(rss_source_id=rss_source_id, **filters)
+
+        assert count(resolution="1080P") == 3
+        assert count(subgroup="LoliHouse") == 2
+        assert count(video_codec="AVC") == 2
+        # 简繁双语同时满足简体和繁体
+        assert count(subtitle_language="chs") == 3
+        assert count(subtitle_language="cht") == 3
+        assert count(subtitle_language="chs_cht") == 2
+        assert count(resolution="1080p", subtitle_language="chs") == 2
+        assert len(link_service.get_links(rss_source_id, subgroup="ANi")) == 1
+
+        # 手动添加的链接可以指定字段
+        manual = link_service.add_link(
+            rss_source_id=rss_source_id,
+            episode_number=2,
+            url="magnet:?xt=urn:btih:manual",
+            resolution="1920x1080",
+            subgroup="LoliHouse"
+        )
+        assert manual.resolution == "1080p"
+
+        # 过滤条件使用索引
+        plan = db.connection().exec_driver_sql(
+            "EXPLAIN QUERY PLAN SELECT id FROM links WHERE subgroup = 'LoliHouse'"
+        ).fetchall()
+        assert any("idx_link_subgroup" in str(row) for row in plan), plan
+    finally:
+        db.close()
+    print("✓ 解析结果写入链接，按字幕组、分辨率、编码和字幕语言过滤")
+
+
+def test_auto_download_selection(rss_source_id: int):
+    """测试自动下载按画质过滤并按发布去重"""
+    db = next(get_db())
+    try:
+        link_service = LinkService(db)
+        download_service = DownloadService(db)
+
+        def add(title, url, episode_number):
+            return link_service.add_links_bulk(rss_source_id, [{
+                "episode_number": episode_number,
+                "url": url,
+                **parse_release(title)._asdict()
+            }])[0]
+
+        batch = [
+            add("[LoliHouse] 测试动画 - 05 [1080p][简繁内封字幕]", "magnet:?xt=urn:btih:e5a", 5),
+            add("[LoliHouse] 测试动画 - 05v2 [1080p][简繁内封字幕]", "magnet:?xt=urn:btih:e5b", 5),
+            add("[LoliHouse] 测试动画 - 05 [720p][简繁内封字幕]", "magnet:?xt=urn:btih:e5c", 5),
+            add("[ANi] 测试动画 - 05 [1080P][CHT]", "magnet:?xt=urn:btih:e5d", 5),
+            add("[ANi] 测试动画 - 05 [1080P][CHT]", "magnet:?xt=urn:btih:e5e", 5),
+            add("[ANi] 测试动画 - 06 [CHT]", "magnet:?xt=urn:btih:e6a", 6),
+            add("[ANi] 测试动画 合集 [1080P][CHT]", "magnet:?xt=urn:btih:batch", None),
+        ]
+
+        # 不设置画质时：同一发布只下载最高版本，同版本重复的只下载一条
+        selected = [link.id for link in link_service.select_auto_download_links(rss_source_id, batch)]
+        assert selected == [batch[1], batch[2], batch[3], batch[5], batch[6]], selected
+
+        # 设置 1080P 时过滤掉 720p，未识别出分辨率的链接保留
+        selected = [link.id for link in link_service.select_auto_download_links(rss_source_id, batch, quality="1080P")]
+        assert selected == [batch[1], batch[3], batch[5], batch[6]], selected
+        assert [link.id for link in link_service.select_auto_download_links(rss_source_id, batch, quality="default")] \
+            == [batch[1], batch[2], batch[3], batch[5], batch[6]]
+
+        # 已有下载任务的发布，之后出现的同版本重复链接不再下载，更高版本仍然下载
+        downloader = DownloaderService(db).get_default_downloader()
+        download_service.create_download_task(link_id=batch[3], rss_source_id=rss_source_id, downloader_id=downloader.id)
+        repost = add("[ANi] 测试动画 - 05 [1080P][CHT]", "magnet:?xt=urn:btih:e5f", 5)
+        fixed = add("[ANi] 测试动画 - 05v2 [1080P][CHT]", "magnet:?xt=urn:btih:e5g", 5)
+        assert link_service.select_auto_download_links(rss_source_id, [repost]) == []
+        assert [link.id for link in link_service.select_auto_download_links(rss_source_id, [fixed])] == [fixed]
+    finally:
+        db.close()
+    print("✓ 自动下载按画质过滤，同一发布的重复链接和旧版本只下载一次")
+
+
+def test_scheduler_quality(server: FixtureHTTPServer):
+    """测试检查RSS源时写入解析结果，并按RSS源的画质自动下载"""
+    db = next(get_db())
+    anime_id = AnimeService(db).create_anime(title="画质过滤测试动画").id
+    rss_source_id = RSSService(db).create_rss_source(
+        anime_id=anime_id,
+        name="蜜柑计划",
+        url=server.get_url(FEED_PATH),
+        quality="720p",
+        auto_download=True
+    ).id
+    db.close()
+
+    scheduler_service = SchedulerService(get_db)
+    scheduler_service.register_rss_parser(LocalMikanRSSParser())
+    result = scheduler_service.check_rss_source(rss_source_id, auto_download=True)
+    assert result["success"] is True and result["new_links_count"] > 0, result
+    assert all(link["resolution"] == "1080p" for link in result["new_links"])
+    assert {link["subgroup"] for link in result["new_links"]} == {"LoliHouse", "喵萌奶茶屋"}
+
+    db = next(get_db())
+    try:
+        # 录制的RSS全部是1080p，画质设置为720p时不自动下载
+        assert DownloadService(db).get_download_tasks(rss_source_id=rss_source_id, size=100) == []
+        link_service = LinkService(db)
+        assert link_service.count_links(rss_source_id=rss_source_id, subgroup="LoliHouse", video_codec="hevc") > 0
+        any_quality_id = RSSService(db).create_rss_source(
+            anime_id=anime_id,
+            name="蜜柑计划 不限画质",
+            url=server.get_url(FEED_PATH),
+            auto_download=True
+        ).id
+    finally:
+        db.close()
+    print(f"✓ 检查RSS源写入 {result['new_links_count']} 个链接的发布信息，画质不符时不自动下载")
+
+    # 释放写入并发后才访问下载器
+    started = []
+    start_downloads = scheduler_service._start_downloads
+
+    def record_start_downloads(task_ids):
+        assert scheduler_service._write_semaphore.acquire(blocking=False), "开始下载时仍持有写入并发"
+        scheduler_service._write_semaphore.release()
+        started.extend(task_ids)
+        start_downloads(task_ids)
+
+    scheduler_service._start_downloads = record_start_downloads
+    result = scheduler_service.check_rss_source(any_quality_id, auto_download=True)
+    assert result["success"] is True and "download_task_ids" not in result
+    db = next(get_db())
+    try:
+        tasks = DownloadService(db).get_download_tasks(rss_source_id=any_quality_id, size=100)
+        assert started and sorted(task.id for task in tasks) == sorted(started)
+        assert all(task.status == "downloading" for task in tasks)
+    finally:
+        db.close()
+    print(f"✓ 释放写入并发后开始 {len(started)} 个下载")
+
+
+def test_release_parser():
+    """测试发布标题解析"""
+    print("=" * 60)
+    print("测试发布标题解析")
+    print("=" * 60)
+
+    env = TestEnvironment()
+    server = FixtureHTTPServer({FEED_PATH: load_fixture("mikan_bangumi_rss.xml")})
+
+    try:
+        env.setup()
+        init_config(env.get_config_path())
+        init_database()
+        server.start()
+
+        test_parse_release()
+
+        db = next(get_db())
+        anime = AnimeService(db).create_anime(title="发布信息测试动画")
+        rss_source_id = RSSService(db).create_rss_source(
+            anime_id=anime.id,
+            name="测试RSS源",
+            url="https://example.com/release-rss",
+            auto_download=True
+        ).id
+        DownloaderService(db).add_downloader(name="mock", is_default=True)
+        db.close()
+
+        test_link_columns(rss_source_id)
+        test_auto_download_selection(rss_source_id)
+        test_scheduler_quality(server)
+
+        print("\n" + "=" * 60)
+        print("[成功] 发布标题解析测试通过")
+        print("=" * 60)
+
+    finally:
+        server.stop()
+        env.teardown()
+
+
+if __name__ == "__main__":
+    test_release_parser()
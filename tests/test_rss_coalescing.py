@@ -0,0 +1,207 @@
+"""
+RSS合并抓取测试
+多个RSS源使用同一地址时，全量检查只抓取解析一次，不访问外网
+"""
+import sys
+import os
+import threading
+import time
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.database import init_database, get_db
+from server.services.scheduler_service import SchedulerService
+from server.services.anime_service import AnimeService
+from server.services.rss_service import RSSService
+from server.services.link_service import LinkService
+from server.site_parsers.mikan_rss_parser import MikanRSSParser
+from server.utils import init_config, normalize_url, SingleFlight
+from test_utils import TestEnvironment, FixtureHTTPServer, load_fixture
+
+
+FEED_PATH = "/RSS/Bangumi?bangumiId=3824&subgroupid=370"
+# 同一地址，查询参数顺序不同
+REORDERED_PATH = "/RSS/Bangumi?subgroupid=370&bangumiId=3824"
+OTHER_PATH = "/RSS/Bangumi?bangumiId=3825"
+
+
+class LocalMikanRSSParser(MikanRSSParser):
+    """解析本地回放的蜜柑计划RSS"""
+
+    def can_parse(self, url: str) -> bool:
+        return url.startswith("http://127.0.0.1")
+
+
+def test_normalize_url():
+    """测试URL规范化"""
+    assert normalize_url("HTTPS://Mikanani.ME:443/RSS/Bangumi?subgroupid=370&bangumiId=3824#top") == \
+        "https://mikanani.me/RSS/Bangumi?bangumiId=3824&subgroupid=370"
+    assert normalize_url(" http://example.com ") == "http://example.com/"
+    assert normalize_url("http://example.com:8080/rss?a=&b=1") == "http://example.com:8080/rss?a=&b=1"
+    assert normalize_url("http://example.com/RSS") != normalize_url("http://example.com/rss")
+    assert normalize_url("not a url") == "not a url"
+    print("✓ URL规范化")
+
+
+def test_single_flight():
+    """测试单飞调用"""
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return "feed"
+
+    flight = SingleFlight()
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(flight.do("key", slow)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert all(result == "feed" for result, _ in results)
+    # 不保留结果时，调用完成后再次执行
+    assert flight.do("key", slow) == ("feed", False)
+    assert len(calls) == 2
+
+    # 保留结果，异常不保留
+    flight = SingleFlight(remember=True)
+    assert flight.do("key", lambda: 1) == (1, False)
+    assert flight.do("key", lambda: 2) == (1, True)
+    flight.forget("key")
+    assert flight.do("key", lambda: 3) == (3, False)
+
+    def fail():
+        raise RuntimeError("boom")
+
+    try:
+        flight.do("error", fail)
+        assert False, "应抛出异常"
+    except RuntimeError:
+        pass
+    assert flight.do("error", lambda: 4) == (4, False)
+    print("✓ 单飞调用")
+
+
+def test_rss_coalescing():
+    """测试RSS合并抓取"""
+    print("=" * 60)
+    print("测试RSS合并抓取")
+    print("=" * 60)
+
+    test_normalize_url()
+    test_single_flight()
+
+    env = TestEnvironment()
+    feed = load_fixture("mikan_bangumi_rss.xml")
+    server = FixtureHTTPServer({FEED_PATH: feed, REORDERED_PATH: feed, OTHER_PATH: feed})
+
+    try:
+        env.setup()
+        init_config(env.get_config_path())
+        init_database()
+        server.start()
+
+        # 两部动画的三个RSS源共用同一地址，另一个RSS源单独使用一个地址
+        db = next(get_db())
+        anime_service = AnimeService(db)
+        rss_service = RSSService(db)
+        first = anime_service.create_anime(title="合并抓取动画1")
+        second = anime_service.create_anime(title="合并抓取动画2")
+        shared_ids = [
+            rss_service.create_rss_source(anime_id=first.id, name="源1", url=server.get_url(FEED_PATH)).id,
+            rss_service.create_rss_source(anime_id=second.id, name="源2", url=server.get_url(REORDERED_PATH)).id,
+            rss_service.create_rss_source(anime_id=second.id, name="源3", url=server.get_url(FEED_PATH) + "#latest").id,
+        ]
+        other_id = rss_service.create_rss_source(anime_id=first.id, name="源4", url=server.get_url(OTHER_PATH)).id
+        db.close()
+
+        scheduler_service = SchedulerService(get_db)
+        scheduler_service.register_rss_parser(LocalMikanRSSParser())
+
+        def shared_requests():
+            return sum(1 for request in server.requests if request['path'] != OTHER_PATH)
+
+        # 测试1: 共用地址只请求一次，每个RSS源都写入全部链接
+        result = scheduler_service.check_all_rss_sources()
+        assert result["success"] is True
+        assert result["failed"] == 0, result["results"]
+        assert result["distinct_feeds"] == 2
+        assert result["coalesced"] == 2
+        assert shared_requests() == 1
+        assert len(server.requests) == 2
+        db = next(get_db())
+        link_service = LinkService(db)
+        for rss_source_id in shared_ids + [other_id]:
+            assert len(link_service.get_links(rss_source_id, limit=100)) == 12
+        validators = {
+            (source.etag, source.last_modified, source.content_hash)
+            for source in (rss_service.get_rss_source(rss_source_id) for rss_source_id in shared_ids)
+        }
+        db.close()
+        assert len(validators) == 1
+        print(f"✓ 首次全量检查: {result['total_sources']} 个RSS源，请求 {len(server.requests)} 次")
+
+        # 测试2: 校验信息相同，共用地址的条件请求返回304，所有RSS源都未更新
+        server.requests.clear()
+        result = scheduler_service.check_all_rss_sources()
+        assert shared_requests() == 1
+        assert server.requests[0].get('If-None-Match') == server.etag
+        assert all(item["success"] for item in result["results"])
+        assert result["new_links_count"] == 0
+        print("✓ 304 结果分发给所有RSS源")
+
+        # 测试3: 服务端忽略条件请求时，按内容哈希判断未变化
+        server.honor_validators = False
+        server.requests.clear()
+        result = scheduler_service.check_all_rss_sources()
+        assert shared_requests() == 1
+        assert result["new_links_count"] == 0
+        assert result["failed"] == 0
+        server.honor_validators = True
+        print("✓ 内容哈希相同时所有RSS源都未更新")
+
+        # 测试4: 某个RSS源的校验信息不同时仍能正确检查，之后校验信息重新一致
+        db = next(get_db())
+        rss_source = RSSService(db).get_rss_source(shared_ids[1])
+        rss_source.etag = None
+        rss_source.last_modified = None
+        rss_source.content_hash = None
+        rss_source.last_entry_id = None
+        db.commit()
+        db.close()
+        server.requests.clear()
+        result = scheduler_service.check_all_rss_sources()
+        assert result["failed"] == 0
+        assert result["new_links_count"] == 0
+        assert shared_requests() <= 2
+        server.requests.clear()
+        scheduler_service.check_all_rss_sources()
+        assert shared_requests() == 1
+        print("✓ 校验信息不同的RSS源自行判断")
+
+        # 测试5: 单独检查不使用共享结果
+        server.requests.clear()
+        result = scheduler_service.check_rss_source(shared_ids[0])
+        assert result["success"] is True
+        assert result["coalesced"] is False
+        assert shared_requests() == 1
+        print("✓ 单独检查RSS源")
+
+        print("\n" + "=" * 60)
+        print("[成功] RSS合并抓取测试通过")
+        print("=" * 60)
+
+    finally:
+        server.stop()
+        env.teardown()
+
+
+if __name__ == "__main__":
+    test_rss_coalescing()
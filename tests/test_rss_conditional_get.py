@@ -0,0 +1,147 @@
+"""
+RSS条件请求测试
+使用本地 HTTP 服务回放录制的蜜柑计划RSS，不访问外网
+"""
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.database import init_database, get_db
+from server.services.scheduler_service import SchedulerService
+from server.services.anime_service import AnimeService
+from server.services.rss_service import RSSService
+from server.site_parsers.mikan_rss_parser import MikanRSSParser
+from server.utils import init_config
+from test_utils import TestEnvironment, FixtureHTTPServer, load_fixture
+
+
+FEED_PATH = "/RSS/Bangumi?bangumiId=3824"
+
+
+class LocalMikanRSSParser(MikanRSSParser):
+    """解析本地回放的蜜柑计划RSS"""
+
+    def can_parse(self, url: str) -> bool:
+        return url.startswith("http://127.0.0.1")
+
+
+def test_rss_conditional_get():
+    """测试RSS条件请求"""
+    print("=" * 60)
+    print("测试RSS条件请求")
+    print("=" * 60)
+
+    env = TestEnvironment()
+    server = FixtureHTTPServer({FEED_PATH: load_fixture("mikan_bangumi_rss.xml")})
+
+    try:
+        env.setup()
+        init_config(env.get_config_path())
+        init_database()
+        server.start()
+        rss_url = server.get_url(FEED_PATH)
+        parser = LocalMikanRSSParser()
+
+        # 测试1: 首次抓取返回完整内容和校验信息
+        result = parser.parse_rss(rss_url)
+        assert result['success'] is True, result.get('error')
+        assert result['not_modified'] is False
+        assert result['total_entries'] == 12
+        validators = result['validators']
+        assert validators['etag'] == server.etag
+        assert validators['last_modified'] == server.last_modified
+        assert validators['content_hash']
+        print(f"✓ 首次抓取: {result['total_entries']} 个条目")
+
+        # 测试2: 带校验信息抓取，服务端返回304
+        result = parser.parse_rss(rss_url, validators=validators)
+        assert result['success'] is True
+        assert result['not_modified'] is True
+        assert result['links'] == []
+        assert server.requests[-1].get('If-None-Match') == server.etag
+        assert server.requests[-1].get('If-Modified-Since') == server.last_modified
+        print("✓ 304 响应跳过解析")
+
+        # 测试3: 服务端忽略条件请求时，通过内容哈希判断未变化
+        server.honor_validators = False
+        result = parser.parse_rss(rss_url, validators=validators)
+        assert result['not_modified'] is True
+        assert result['validators']['content_hash'] == validators['content_hash']
+        print("✓ 内容哈希相同跳过解析")
+        server.honor_validators = True
+
+        # 测试4: 调度服务保存校验信息，第二次检查不写入新链接
+        db = next(get_db())
+        anime = AnimeService(db).create_anime(title="条件请求测试动画")
+        rss_source = RSSService(db).create_rss_source(
+            anime_id=anime.id,
+            name="本地RSS",
+            url=rss_url
+        )
+        rss_source_id = rss_source.id
+        db.close()
+
+        scheduler_service = SchedulerService(get_db)
+        scheduler_service.register_rss_parser(LocalMikanRSSParser())
+
+        result = scheduler_service.check_rss_source(rss_source_id)
+        assert result['success'] is True, result.get('message')
+        assert result['new_links_count'] == 12
+        print(f"✓ 首次检查: 新增 {result['new_links_count']} 个链接")
+
+        db = next(get_db())
+        rss_source = RSSService(db).get_rss_source(rss_source_id)
+        assert rss_source.etag == server.etag
+        assert rss_source.last_modified == server.last_modified
+        assert rss_source.content_hash == validators['content_hash']
+        assert rss_source.last_entry_id
+        first_checked_at = rss_source.last_checked_at
+        db.close()
+        print("✓ 校验信息已保存")
+
+        result = scheduler_service.check_rss_source(rss_source_id)
+        assert result['success'] is True
+        assert result.get('not_modified') is True
+        assert result['new_links_count'] == 0
+        db = next(get_db())
+        rss_source = RSSService(db).get_rss_source(rss_source_id)
+        assert rss_source.last_checked_at >= first_checked_at
+        db.close()
+        print(f"✓ 再次检查: {result['message']}")
+
+        # 测试5: 校验信息失效后重新解析，已有链接由唯一索引去重
+        db = next(get_db())
+        rss_source = RSSService(db).get_rss_source(rss_source_id)
+        rss_source.etag = None
+        rss_source.last_modified = None
+        rss_source.content_hash = None
+        rss_source.last_entry_id = None
+        db.commit()
+        db.close()
+        result = scheduler_service.check_rss_source(rss_source_id)
+        assert result['success'] is True
+        assert not result.get('not_modified')
+        assert result['new_links_count'] == 0
+        print(f"✓ 重新解析: {result['message']}")
+
+        # 测试6: 修改URL后清除校验信息
+        db = next(get_db())
+        rss_source = RSSService(db).update_rss_source(rss_source_id, url=rss_url + "&v=2")
+        assert rss_source.etag is None
+        assert rss_source.content_hash is None
+        db.close()
+        print("✓ 修改URL清除校验信息")
+
+        print("\n" + "=" * 60)
+        print("[成功] RSS条件请求测试通过")
+        print("=" * 60)
+
+    finally:
+        server.stop()
+        env.teardown()
+
+
+if __name__ == "__main__":
+    test_rss_conditional_get()
@@ -0,0 +1,65 @@
+"""
+RSS增量解析测试
+使用本地 HTTP 服务回放录制的蜜柑计划RSS，不访问外网
+"""
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.site_parsers.mikan_rss_parser import MikanRSSParser
+from test_utils import FixtureHTTPServer, load_fixture
+
+
+FEED_PATH = "/RSS/Bangumi?bangumiId=3824"
+NEWEST_GUID = "[LoliHouse] 黄金神威 最终章 / Golden Kamuy - 12 [WebRip 1080p HEVC-10bit AAC][简繁内封字幕]"
+EP10_GUID = "[LoliHouse] 黄金神威 最终章 / Golden Kamuy - 10 [WebRip 1080p HEVC-10bit AAC][简繁内封字幕]"
+
+
+def test_rss_incremental():
+    """测试RSS增量解析"""
+    print("=" * 60)
+    print("测试RSS增量解析")
+    print("=" * 60)
+
+    parser = MikanRSSParser()
+
+    with FixtureHTTPServer({FEED_PATH: load_fixture("mikan_bangumi_rss.xml")}) as server:
+        rss_url = server.get_url(FEED_PATH)
+
+        # 测试1: 没有标记时完整解析
+        result = parser.parse_rss(rss_url)
+        assert result['success'] is True, result.get('error')
+        assert len(result['links']) == 12
+        assert result['stopped_early'] is False
+        assert result['latest_entry_id'] == NEWEST_GUID
+        print(f"✓ 完整解析: {len(result['links'])} 个链接")
+
+        # 测试2: 遇到上次的标记后停止
+        result = parser.parse_rss(rss_url, last_entry_id=EP10_GUID)
+        assert result['stopped_early'] is True
+        assert len(result['links']) == 4
+        assert {link['episode_number'] for link in result['links']} == {11, 12}
+        assert result['latest_entry_id'] == NEWEST_GUID
+        print(f"✓ 增量解析: {len(result['links'])} 个新链接")
+
+        # 测试3: 最新条目就是标记时没有新链接
+        result = parser.parse_rss(rss_url, last_entry_id=NEWEST_GUID)
+        assert result['stopped_early'] is True
+        assert result['links'] == []
+        print("✓ 没有新条目")
+
+        # 测试4: 标记已不在RSS中时回退为完整解析
+        result = parser.parse_rss(rss_url, last_entry_id="已经滚出RSS的旧条目")
+        assert result['stopped_early'] is False
+        assert len(result['links']) == 12
+        print("✓ 标记缺失时完整解析")
+
+    print("\n" + "=" * 60)
+    print("[成功] RSS增量解析测试通过")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_rss_incremental()
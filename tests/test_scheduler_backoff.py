@@ -0,0 +1,213 @@
+"""
+检查失败退避与主机熔断测试
+使用本地 HTTP 服务回放录制的蜜柑计划RSS，不访问外网
+"""
+import sys
+import os
+import time
+from datetime import datetime
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.database import init_database, get_db
+from server.models import SchedulerJob
+from server.services.scheduler_service import SchedulerService
+from server.services.anime_service import AnimeService
+from server.services.rss_service import RSSService
+from server.site_parsers.mikan_rss_parser import MikanRSSParser
+from server.utils import CircuitBreaker, HTTPClient, init_config, set_http_client
+from test_utils import TestEnvironment, FixtureHTTPServer, load_fixture
+
+
+FEED_PATH = "/RSS/Bangumi?bangumiId=3824"
+MISSING_PATH = "/RSS/Bangumi?bangumiId=404"
+UNAVAILABLE_PATH = "/RSS/Bangumi?bangumiId=503"
+MALFORMED_PATH = "/RSS/Bangumi?bangumiId=500"
+
+
+class LocalMikanRSSParser(MikanRSSParser):
+    """解析本地回放的蜜柑计划RSS"""
+
+    def can_parse(self, url: str) -> bool:
+        return url.startswith("http://127.0.0.1")
+
+
+def test_circuit_breaker():
+    """测试熔断器状态转换"""
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=0.2, max_recovery_timeout=0.3)
+    host = "example.org"
+
+    # 未达到阈值时继续放行
+    assert breaker.allow_request(host) is True
+    breaker.record_failure(host)
+    assert breaker.get_state(host)["state"] == "closed"
+    breaker.record_failure(host)
+    assert breaker.get_state(host)["state"] == "open"
+    assert breaker.allow_request(host) is False
+    assert breaker.get_retry_at(host) > time.time()
+    print("✓ 连续失败达到阈值后熔断")
+
+    # 等待结束后只放行一个探测请求，探测失败时加倍等待时间（不超过上限）
+    time.sleep(0.25)
+    assert breaker.allow_request(host) is True
+    assert breaker.get_state(host)["state"] == "half_open"
+    assert breaker.allow_request(host) is False
+    breaker.record_failure(host)
+    assert breaker.get_state(host)["state"] == "open"
+    assert breaker.get_retry_at(host) - time.time() > 0.2
+    print("✓ 半开状态只放行一个探测请求")
+
+    # 探测成功后恢复
+    time.sleep(0.35)
+    assert breaker.allow_request(host) is True
+    breaker.record_success(host)
+    state = breaker.get_state(host)
+    assert state["state"] == "closed"
+    assert state["consecutive_failures"] == 0
+    assert breaker.get_retry_at(host) is None
+    print("✓ 探测成功后关闭熔断器")
+
+
+def test_scheduler_backoff():
+    """测试检查失败退避与主机熔断"""
+    print("=" * 60)
+    print("测试检查失败退避与主机熔断")
+    print("=" * 60)
+
+    env = TestEnvironment()
+    server = FixtureHTTPServer({
+        FEED_PATH: load_fixture("mikan_bangumi_rss.xml"),
+        MALFORMED_PATH: b"<rss><channel><item><title>broken"
+    })
+    server.error_statuses[UNAVAILABLE_PATH] = 503
+    scheduler_service = None
+
+    try:
+        env.setup()
+        init_config(env.get_config_path())
+        init_database()
+        server.start()
+        # 不重试，503 立即返回
+        set_http_client(HTTPClient(retries=0))
+
+        test_circuit_breaker()
+
+        db = next(get_db())
+        anime = AnimeService(db).create_anime(title="退避测试动画")
+        rss_service = RSSService(db)
+        broken_id = rss_service.create_rss_source(
+            anime_id=anime.id,
+            name="失效RSS",
+            url=server.get_url(UNAVAILABLE_PATH)
+        ).id
+        malformed_ids = [
+            rss_service.create_rss_source(
+                anime_id=anime.id,
+                name=f"格式错误RSS {i}",
+                url=server.get_url(path)
+            ).id
+            for i, path in enumerate((MALFORMED_PATH, MISSING_PATH))
+        ]
+        healthy_id = rss_service.create_rss_source(
+            anime_id=anime.id,
+            name="正常RSS",
+            url=server.get_url(FEED_PATH)
+        ).id
+        db.close()
+
+        scheduler_service = SchedulerService(get_db)
+        scheduler_service.register_rss_parser(LocalMikanRSSParser())
+        scheduler_service.circuit_breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=60)
+        scheduler_service.start_scheduler()
+        job_id = scheduler_service.add_check_job(broken_id, interval=600)
+
+        # 测试1: 连续失败时退避时间按检查间隔翻倍
+        delays = []
+        for _ in range(2):
+            result = scheduler_service.check_rss_source(broken_id)
+            assert result["success"] is False
+            info = scheduler_service.jobs[job_id]
+            delays.append((info["backoff_until"] - datetime.utcnow()).total_seconds())
+        assert scheduler_service.jobs[job_id]["consecutive_failures"] == 2
+        assert 1150 < delays[0] <= 1200
+        assert 2350 < delays[1] <= 2400
+        due = scheduler_service._next_due(scheduler_service.jobs[job_id], result)
+        assert due > time.time() + 2350
+        print(f"✓ 失败退避: {', '.join(f'{delay:.0f}s' for delay in delays)}")
+
+        # 测试2: 退避状态持久化，重启调度器后仍然生效
+        db = next(get_db())
+        job = db.query(SchedulerJob).filter(SchedulerJob.rss_source_id == broken_id).first()
+        assert job.consecutive_failures == 2
+        assert job.backoff_until is not None
+        db.close()
+        scheduler_service.stop_scheduler()
+        scheduler_service.start_scheduler()
+        assert scheduler_service.jobs[job_id]["consecutive_failures"] == 2
+        assert scheduler_service.timer.get_due_time(job_id) > time.time() + 2300
+        print("✓ 重启后保留退避状态")
+
+        # 测试3: 同一主机连续失败达到阈值后熔断，其他RSS源也暂停检查
+        result = scheduler_service.check_rss_source(broken_id)
+        assert result["success"] is False
+        requests_before = len(server.requests)
+        result = scheduler_service.check_rss_source(healthy_id)
+        assert result["success"] is False
+        assert result["circuit_open"] is True
+        assert len(server.requests) == requests_before
+        assert scheduler_service.jobs[job_id]["consecutive_failures"] == 3
+        print(f"✓ 主机熔断: {result['message']}")
+
+        # 测试4: 任务状态包含退避信息和熔断状态
+        status = scheduler_service.get_job_status(job_id)
+        assert status["info"]["consecutive_failures"] == 3
+        assert status["circuit_breaker"]["state"] == "open"
+        assert status["circuit_breaker"]["host"] == "127.0.0.1"
+        assert status["circuit_breaker"]["retry_at"]
+        print("✓ 任务状态包含熔断信息")
+
+        # 测试5: 熔断恢复后检查成功，连续失败次数清零
+        scheduler_service.circuit_breaker.record_success("127.0.0.1")
+        db = next(get_db())
+        RSSService(db).update_rss_source(broken_id, url=server.get_url(FEED_PATH))
+        db.close()
+        result = scheduler_service.check_rss_source(broken_id)
+        assert result["success"] is True, result.get("message")
+        info = scheduler_service.jobs[job_id]
+        assert info["consecutive_failures"] == 0
+        assert info["backoff_until"] is None
+        db = next(get_db())
+        job = db.query(SchedulerJob).filter(SchedulerJob.rss_source_id == broken_id).first()
+        assert job.consecutive_failures == 0
+        assert job.backoff_until is None
+        db.close()
+        print("✓ 检查成功后清除退避状态")
+
+        # 测试6: 格式错误或不存在（404）的RSS源只计入自己的退避，不触发主机熔断
+        malformed_job_ids = [scheduler_service.add_check_job(i, interval=600) for i in malformed_ids]
+        for _ in range(3):
+            for rss_source_id in malformed_ids:
+                result = scheduler_service.check_rss_source(rss_source_id)
+                assert result["success"] is False
+                assert not result.get("circuit_open")
+        assert all(scheduler_service.jobs[i]["consecutive_failures"] == 3 for i in malformed_job_ids)
+        assert scheduler_service.circuit_breaker.get_state("127.0.0.1")["state"] == "closed"
+        result = scheduler_service.check_rss_source(healthy_id)
+        assert result["success"] is True, result.get("message")
+        print("✓ 格式错误的RSS源只退避自身，不影响同一主机的其他RSS源")
+
+        print("\n" + "=" * 60)
+        print("[成功] 检查失败退避与主机熔断测试通过")
+        print("=" * 60)
+
+    finally:
+        if scheduler_service is not None and scheduler_service.is_running:
+            scheduler_service.stop_scheduler()
+        set_http_client(None)
+        server.stop()
+        env.teardown()
+
+
+if __name__ == "__main__":
+    test_scheduler_backoff()
@@ -0,0 +1,248 @@
+"""
+调度任务持久化测试
+验证重启后从数据库恢复定时检查任务，不访问外网
+"""
+import sys
+import os
+import threading
+import time
+from concurrent.futures import wait
+from sqlalchemy import event, inspect, text
+from datetime import datetime, timedelta, timezone
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.database import init_database, get_db
+from server.services.scheduler_service import SchedulerService
+from server.services.anime_service import AnimeService
+from server.services.rss_service import RSSService
+from server.services.scheduler_run_service import SchedulerRunService
+from server.site_parsers.mikan_rss_parser import MikanRSSParser
+from server.models import SchedulerJob
+from server.utils import init_config
+from test_utils import TestEnvironment
+
+
+class BlockingRSSParser(MikanRSSParser):
+    """抓取时阻塞到 release 被设置，模拟停止调度器时仍在执行的检查"""
+
+    def __init__(self):
+        super().__init__()
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def can_parse(self, url: str) -> bool:
+        return url.startswith("https://blocking.invalid")
+
+    def parse_rss(self, rss_url, existing_urls=None, validators=None, last_entry_id=None):
+        self.started.set()
+        self.release.wait(10)
+        return {'success': True, 'links': []}
+
+
+def test_scheduler_persistence():
+    """测试调度任务持久化"""
+    print("=" * 60)
+    print("测试调度任务持久化")
+    print("=" * 60)
+
+    env = TestEnvironment()
+    scheduler_service = None
+
+    try:
+        env.setup()
+        init_config(env.get_config_path())
+        init_database()
+
+        # 使用没有对应解析器的URL，到期的检查会直接失败而不访问网络
+        db = next(get_db())
+        anime_id = AnimeService(db).create_anime(title="持久化测试动画").id
+        rss_service = RSSService(db)
+        source_ids = []
+        for i in range(4):
+            rss_source = rss_service.create_rss_source(
+                anime_id=anime_id,
+                name=f"RSS {i}",
+                url=f"https://unsupported.invalid/rss/{i}"
+            )
+            source_ids.append(rss_source.id)
+        db.close()
+
+        # 测试1: 添加任务并暂停其中一个
+        scheduler_service = SchedulerService(get_db)
+        scheduler_service.start_scheduler()
+        for rss_source_id in source_ids:
+            assert scheduler_service.add_check_job(rss_source_id, interval=3600, auto_download=True)
+        assert scheduler_service.pause_job(f"rss_check_{source_ids[0]}")
+        scheduler_service.stop_scheduler()
+        assert len(scheduler_service.get_jobs()) == 0
+        print(f"✓ 添加 {len(source_ids)} 个任务后停止调度器")
+
+        # 停机期间：一个RSS源刚检查过，一个RSS源被停用
+        db = next(get_db())
+        rss_service = RSSService(db)
+        last_checked_at = datetime.utcnow()
+        rss_service.get_rss_source(source_ids[1]).last_checked_at = last_checked_at
+        db.commit()
+        rss_service.update_rss_source(source_ids[3], is_active=False)
+        assert rss_service.get_rss_source(source_ids[2]).check_interval == 3600
+        db.close()
+
+        # 测试2: 重启后恢复激活RSS源的任务
+        scheduler_service = SchedulerService(get_db)
+        scheduler_service.startup_stagger = 600
+        started = time.time()
+        scheduler_service.start_scheduler()
+        jobs = scheduler_service.get_jobs()
+        assert set(jobs) == {f"rss_check_{i}" for i in source_ids[:3]}
+        assert jobs[f"rss_check_{source_ids[2]}"]["auto_download"] is True
+        print(f"✓ 重启后恢复任务: {len(jobs)} 个（跳过停用的RSS源）")
+
+        # 测试3: 暂停状态被保留
+        status = scheduler_service.get_job_status(f"rss_check_{source_ids[0]}")
+        assert status["info"]["paused"] is True
+        assert status["next_run_time"] is None
+        print("✓ 暂停状态被保留")
+
+        # 测试4: 刚检查过的任务沿用原检查时间点，不会立即执行
+        due = scheduler_service.timer.get_due_time(f"rss_check_{source_ids[1]}")
+        expected = scheduler_service._next_run_time(
+            source_ids[1],
+            3600,
+            last_checked_at.replace(tzinfo=timezone.utc).timestamp()
+        )
+        assert due is not None and due > started
+        assert abs(due - expected) < 1e-6
+        print("✓ 未错过的任务沿用原检查时间")
+
+        # 测试5: 恢复与移除同样会持久化
+        assert scheduler_service.resume_job(f"rss_check_{source_ids[0]}")
+        assert scheduler_service.remove_check_job(f"rss_check_{source_ids[2]}")
+        scheduler_service.stop_scheduler()
+
+        scheduler_service = SchedulerService(get_db)
+        scheduler_service.start_scheduler()
+        jobs = scheduler_service.get_jobs()
+        assert set(jobs) == {f"rss_check_{i}" for i in source_ids[:2]}
+        assert jobs[f"rss_check_{source_ids[0]}"]["paused"] is False
+        print("✓ 恢复、移除操作已持久化")
+
+        # 测试6: 错过检查时间的多个任务在启动窗口内依次错开
+        assert scheduler_service.add_check_job(source_ids[2], interval=3600)
+        scheduler_service.stop_scheduler()
+        # 固定恢复时的当前时间：RSS源1刚好在此时检查过，其余从未检查过（都已错过检查时间）
+        now = float(int(time.time()))
+        db = next(get_db())
+        rss_service = RSSService(db)
+        rss_service.update_rss_source(source_ids[3], is_active=True)
+        for rss_source_id in source_ids:
+            rss_service.get_rss_source(rss_source_id).last_checked_at = None
+        rss_service.get_rss_source(source_ids[1]).last_checked_at = datetime.utcfromtimestamp(now)
+        # 之前立即执行的检查失败后进入了退避，这里只测试错开执行
+        db.query(SchedulerJob).update({SchedulerJob.consecutive_failures: 0, SchedulerJob.backoff_until: None})
+        db.commit()
+        db.close()
+
+        # 不启动调度器，只恢复任务，到期的任务不会被执行，检查时间只由 now 和 startup_stagger 决定
+        scheduler_service = SchedulerService(get_db)
+        scheduler_service.startup_stagger = 600
+        assert scheduler_service.rebuild_check_jobs(now=now) == 4
+        overdue_ids = sorted((source_ids[0], source_ids[2], source_ids[3]))
+        step = scheduler_service.startup_stagger / len(overdue_ids)
+        dues = [scheduler_service.timer.get_due_time(f"rss_check_{i}") for i in overdue_ids]
+        assert dues == [now + index * step for index in range(len(overdue_ids))], dues
+        due = scheduler_service.timer.get_due_time(f"rss_check_{source_ids[1]}")
+        assert due == scheduler_service._next_run_time(source_ids[1], 3600, now)
+        print(f"✓ 错过的任务错开执行: {', '.join(f'{d - now:.0f}s' for d in dues)}")
+
+        # 测试7: 停止调度器时至多等待 stop_timeout 秒，仍在执行的定时检查不再写入数据库
+        db = next(get_db())
+        blocking_id = RSSService(db).create_rss_source(
+            anime_id=anime_id,
+            name="阻塞的RSS",
+            url="https://blocking.invalid/rss"
+        ).id
+        db.close()
+        parser = BlockingRSSParser()
+        scheduler_service = SchedulerService(get_db)
+        scheduler_service.register_rss_parser(parser)
+        scheduler_service.stop_timeout = 0.2
+        scheduler_service.start_scheduler()
+        blocking_job_id = scheduler_service.add_check_job(blocking_id, interval=3600)
+        scheduler_service.timer.cancel(blocking_job_id)
+        scheduler_service._on_job_due(blocking_job_id)
+        assert parser.started.wait(5)
+        futures = list(scheduler_service._check_futures)
+        stop_started = time.monotonic()
+        scheduler_service.stop_scheduler()
+        assert time.monotonic() - stop_started < 5
+        parser.release.set()
+        wait(futures, timeout=5)
+        db = next(get_db())
+        try:
+            assert RSSService(db).get_rss_source(blocking_id).last_checked_at is None
+            assert SchedulerRunService(db).get_runs(rss_source_id=blocking_id) == []
+        finally:
+            db.close()
+        print("✓ 停止调度器后执行中的定时检查放弃写入")
+
+        # 测试8: RSS源列表预加载调度任务，读取 check_interval 不再逐个查询
+        db = next(get_db())
+        statements = []
+
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = db.get_bind()
+        event.listen(engine, "before_cursor_execute", count_statement)
+        try:
+            rss_sources = RSSService(db).get_rss_sources(anime_id)
+            queries = len(statements)
+            intervals = [rss_source.check_interval for rss_source in rss_sources]
+            assert len(statements) == queries == 2, statements
+        finally:
+            event.remove(engine, "before_cursor_execute", count_statement)
+            db.close()
+        assert intervals and all(interval == 3600 for interval in intervals), intervals
+        print(f"✓ RSS源列表预加载调度任务: {len(rss_sources)} 个RSS源共 {queries} 次查询")
+
+        # 测试9: 旧版本数据库的 rss_sources.check_interval 列迁移到调度任务后删除
+        db = next(get_db())
+        legacy_id = RSSService(db).create_rss_source(
+            anime_id=anime_id,
+            name="旧版本RSS",
+            url="https://unsupported.invalid/rss/legacy",
+            auto_download=True
+        ).id
+        db.execute(text("ALTER TABLE rss_sources ADD COLUMN check_interval INTEGER"))
+        db.execute(text("UPDATE rss_sources SET check_interval = 1800 WHERE id = :id"), {"id": legacy_id})
+        db.execute(text("UPDATE rss_sources SET check_interval = 60 WHERE id = :id"), {"id": source_ids[1]})
+        db.commit()
+        db.close()
+        init_database()
+        db = next(get_db())
+        try:
+            columns = {column['name'] for column in inspect(db.get_bind()).get_columns('rss_sources')}
+            assert 'check_interval' not in columns
+            legacy = RSSService(db).get_rss_source(legacy_id)
+            assert legacy.check_interval == 1800
+            assert legacy.scheduler_job.auto_download is True
+            # 已有调度任务的RSS源保留原来的检查间隔
+            assert RSSService(db).get_rss_source(source_ids[1]).check_interval == 3600
+        finally:
+            db.close()
+        print("✓ 旧版本的 check_interval 列迁移到调度任务后删除")
+
+        print("\n" + "=" * 60)
+        print("[成功] 调度任务持久化测试通过")
+        print("=" * 60)
+
+    finally:
+        if scheduler_service is not None and scheduler_service.is_running:
+            scheduler_service.stop_scheduler()
+        env.teardown()
+
+
+if __name__ == "__main__":
+    test_scheduler_persistence()
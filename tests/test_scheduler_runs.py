@@ -0,0 +1,129 @@
+"""
+检查运行记录测试
+使用本地 HTTP 服务回放录制的蜜柑计划RSS，不访问外网
+"""
+import sys
+import os
+from datetime import datetime, timedelta
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.database import init_database, get_db
+from server.models.scheduler_run import SchedulerRun
+from server.services.scheduler_service import SchedulerService
+from server.services.scheduler_run_service import SchedulerRunService, percentile
+from server.services.anime_service import AnimeService
+from server.services.rss_service import RSSService
+from server.site_parsers.mikan_rss_parser import MikanRSSParser
+from server.utils import init_config
+from test_utils import TestEnvironment, FixtureHTTPServer, load_fixture
+
+
+FEED_PATH = "/RSS/Bangumi?bangumiId=3824"
+
+
+class LocalMikanRSSParser(MikanRSSParser):
+    """解析本地回放的蜜柑计划RSS"""
+
+    def can_parse(self, url: str) -> bool:
+        return url.startswith("http://127.0.0.1")
+
+
+def test_scheduler_runs():
+    """测试检查运行记录"""
+    print("=" * 60)
+    print("测试检查运行记录")
+    print("=" * 60)
+
+    env = TestEnvironment()
+    server = FixtureHTTPServer({FEED_PATH: load_fixture("mikan_bangumi_rss.xml")})
+
+    try:
+        env.setup()
+        init_config(env.get_config_path())
+        init_database()
+        server.start()
+
+        # 测试1: 百分位数计算
+        values = [float(i) for i in range(1, 101)]
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 90) == 90.0
+        assert percentile(values, 99) == 99.0
+        assert percentile([], 50) is None
+        print("✓ 百分位数计算")
+
+        db = next(get_db())
+        anime = AnimeService(db).create_anime(title="运行记录测试动画")
+        rss_service = RSSService(db)
+        good_source = rss_service.create_rss_source(
+            anime_id=anime.id, name="正常RSS", url=server.get_url(FEED_PATH)
+        )
+        bad_source = rss_service.create_rss_source(
+            anime_id=anime.id, name="失效RSS", url=server.get_url("/RSS/Bangumi?bangumiId=404")
+        )
+        good_id, bad_id = good_source.id, bad_source.id
+        db.close()
+
+        scheduler_service = SchedulerService(get_db)
+        scheduler_service.register_rss_parser(LocalMikanRSSParser())
+
+        # 测试2: 每次检查都记录运行
+        scheduler_service.check_rss_source(good_id)
+        scheduler_service.check_rss_source(good_id, trigger="scheduled")
+        result = scheduler_service.check_rss_source(bad_id)
+        assert result["success"] is False
+        scheduler_service.check_rss_source(99999)
+
+        db = next(get_db())
+        run_service = SchedulerRunService(db)
+        runs = run_service.get_runs(rss_source_id=good_id)
+        assert len(runs) == 2
+        first, second = runs[1], runs[0]
+        assert first.success is True and first.trigger == "manual"
+        assert first.bytes_transferred > 0
+        assert first.entries_parsed == 12
+        assert first.new_links_count == 12
+        assert second.not_modified is True and second.trigger == "scheduled"
+        assert second.bytes_transferred == 0
+        assert len(run_service.get_runs()) == 3
+        print(f"✓ 记录运行: {len(run_service.get_runs())} 条（不存在的RSS源不记录）")
+
+        # 测试3: 按RSS源汇总指标
+        metrics = run_service.get_metrics(hours=1)
+        assert metrics["total_runs"] == 3
+        by_source = {source["rss_source_id"]: source for source in metrics["sources"]}
+        good = by_source[good_id]
+        assert good["runs"] == 2 and good["failures"] == 0
+        assert good["not_modified"] == 1
+        assert good["duration_p50"] is not None and good["duration_p99"] >= good["duration_p50"]
+        bad = by_source[bad_id]
+        assert bad["failure_rate"] == 1.0
+        assert "404" in bad["last_error"]
+        print(f"✓ 汇总指标: 正常RSS P50 {good['duration_p50']:.3f}s，失效RSS失败率 {bad['failure_rate']:.0%}")
+
+        # 测试4: 清理过期记录
+        db.add(SchedulerRun(
+            rss_source_id=good_id,
+            trigger="manual",
+            started_at=datetime.utcnow() - timedelta(days=40),
+            finished_at=datetime.utcnow() - timedelta(days=40),
+            success=True
+        ))
+        db.commit()
+        assert run_service.prune_runs(30) == 1
+        assert len(run_service.get_runs()) == 3
+        db.close()
+        print("✓ 清理过期记录")
+
+        print("\n" + "=" * 60)
+        print("[成功] 检查运行记录测试通过")
+        print("=" * 60)
+
+    finally:
+        server.stop()
+        env.teardown()
+
+
+if __name__ == "__main__":
+    test_scheduler_runs()
@@ -149,10 +149,17 @@ def test_scheduler_service():
         assert result["success"] is True
         print(f"✓ 手动检查RSS源（自动下载）: {result['message']}")
         
+        # 测试14: 全量检查所有激活的RSS源
+        summary = scheduler_service.check_all_rss_sources(auto_download=False)
+        assert summary["success"] is True
+        assert summary["total_sources"] == 1
+        assert summary["succeeded"] + summary["failed"] == summary["total_sources"]
+        print(f"✓ 全量检查RSS源: {summary['message']}")
+
         # 等待一小段时间让调度器运行
         time.sleep(2)
         
-        # 测试14: 停止调度器
+        # 测试15: 停止调度器
         success = scheduler_service.stop_scheduler()
         assert success is True
         assert scheduler_service.is_running is False
@@ -0,0 +1,165 @@
+"""
+季度番组目录测试
+验证蜜柑计划季度番组列表的解析、并发解析番组页面生成目录、目录缓存，以及从目录批量添加，不访问外网
+"""
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from server.api.auth import verify_api_key
+from server.api.routes import smart_parser as smart_parser_routes
+from server.database import init_database, get_session_local
+from server.services.parse_cache_service import SmartParseCache
+from server.services.season_catalog_service import SeasonCatalogService
+from server.services.smart_parser_service import SmartParserService
+from server.site_parsers.mikan_parser import MikanParser
+from server.site_parsers.registry import ParserRegistry
+from server.utils import init_config, HTTPClient, HostRateLimiter, set_http_client, set_rate_limiter
+from test_utils import TestEnvironment, FixtureHTTPServer, load_fixture
+
+
+SEASON_PATH = "/Home/BangumiCoverFlowByDayOfWeek?year=2024&seasonStr=%E7%A7%8B"
+SEASON_BODY = load_fixture("mikan_season_page.html")
+PAGE_BODY = load_fixture("mikan_bangumi_page.html")
+BANGUMI_IDS = ["3824", "3825", "3826", "3827", "3830", "3828", "3829"]
+
+
+class LocalMikanParser(MikanParser):
+    """解析本地回放的蜜柑计划页面"""
+
+    def can_parse(self, url: str) -> bool:
+        return url.startswith("http://127.0.0.1")
+
+
+def create_service() -> SeasonCatalogService:
+    """创建使用独立注册表和缓存（进程内 + 数据库）的季度番组目录服务"""
+    registry = ParserRegistry()
+    registry.register(LocalMikanParser(), hosts=["127.0.0.1"])
+    session_local = get_session_local()
+    cache = SmartParseCache(ttl=3600, session_factory=lambda: session_local())
+    return SeasonCatalogService(SmartParserService(registry=registry, cache=cache), max_concurrency=3)
+
+
+def test_season_catalog():
+    """测试季度番组目录"""
+    print("=" * 60)
+    print("测试季度番组目录")
+    print("=" * 60)
+
+    # 测试1: 解析录制的季度番组列表
+    parser = MikanParser()
+    season_url = parser.get_season_url(2024, "秋")
+    assert season_url == "https://mikanani.me" + SEASON_PATH
+    entries = parser.parse_season_page(SEASON_BODY.decode("utf-8"), season_url)
+    assert [entry["bangumi_id"] for entry in entries] == BANGUMI_IDS
+    assert entries[0] == {
+        "bangumi_id": "3824",
+        "title": "黄金神威 最终章",
+        "url": "https://mikanani.me/Home/Bangumi/3824",
+        "cover_url": "https://mikanani.me/images/Bangumi/202410/9cfbc35f.jpg?width=400&height=400&format=webp",
+        "day_of_week": 1
+    }
+    assert [entry["day_of_week"] for entry in entries] == [1, 1, 2, 3, 3, 0, 7]
+    duplicated = SEASON_BODY.decode("utf-8") * 2
+    assert len(parser.parse_season_page(duplicated, season_url)) == len(BANGUMI_IDS)
+    try:
+        parser.get_season_url(2024, "秋季")
+        assert False, "应该抛出 ValueError"
+    except ValueError:
+        pass
+    print("✓ 解析季度番组列表（7 个番组，同一番组只保留一次）")
+
+    env = TestEnvironment()
+    routes = {SEASON_PATH: SEASON_BODY}
+    for bangumi_id in BANGUMI_IDS:
+        if bangumi_id != "3830":
+            routes[f"/Home/Bangumi/{bangumi_id}"] = PAGE_BODY.replace(
+                b"bangumiId=3824", f"bangumiId={bangumi_id}".encode()
+            )
+    server = FixtureHTTPServer(routes, content_type="text/html; charset=utf-8")
+    limiter = HostRateLimiter(requests_per_second=0, max_in_flight=2)
+
+    try:
+        env.setup()
+        init_config(env.get_config_path())
+        init_database()
+        server.start()
+        set_rate_limiter(limiter)
+        set_http_client(HTTPClient(retries=0))
+        url = server.get_url(SEASON_PATH)
+
+        # 测试2: 并发解析各番组页面生成目录，番组页面链接相对于列表页面生成
+        service = create_service()
+        catalog = service.get_catalog(url)
+        assert catalog["total"] == 7 and catalog["parsed"] == 6
+        assert catalog["site_name"] == "蜜柑计划"
+        items = {item["bangumi_id"]: item for item in catalog["items"]}
+        assert items["3825"]["url"] == server.get_url("/Home/Bangumi/3825")
+        assert items["3825"]["anime"]["title"] == "黄金神威 最终章"
+        rss_sources = items["3825"]["anime"]["rss_sources"]
+        assert len(rss_sources) == 9
+        assert rss_sources[0]["url"] == "https://mikanani.me/RSS/Bangumi?bangumiId=3825"
+        assert items["3830"]["anime"] is None and items["3830"]["error"]
+        assert len(server.requests) == 8
+        assert limiter.get_stats()["127.0.0.1"]["requests"] == 8
+        print("✓ 并发解析 7 个番组页面，失败的番组返回原因")
+
+        # 测试3: 目录缓存，重启后从数据库读取，只重新解析失败的番组
+        requests_before = len(server.requests)
+        assert service.get_catalog(url)["parsed"] == 6
+        assert len(server.requests) == requests_before + 1
+        restarted = create_service()
+        assert restarted.get_catalog(url)["parsed"] == 6
+        assert len(server.requests) == requests_before + 2
+        assert server.requests[-1]["path"] == "/Home/Bangumi/3830"
+        print("✓ 缓存的目录不再访问网络")
+
+        # 测试4: refresh 重新解析列表和全部番组页面
+        requests_before = len(server.requests)
+        restarted.get_catalog(url, refresh=True)
+        assert len(server.requests) == requests_before + 8
+        print("✓ 强制刷新")
+
+        # 测试5: 从目录批量添加，番组页面使用缓存
+        requests_before = len(server.requests)
+        smart_parser_service = restarted.smart_parser_service
+        urls = [item["url"] for item in catalog["items"] if item["anime"]]
+        results = list(smart_parser_service.smart_add_batch(urls))
+        assert len(results) == 6 and all(result["success"] for result in results)
+        assert len(server.requests) == requests_before
+        print("✓ 从目录批量添加 6 个番组")
+
+        # 测试6: 季度番组目录接口
+        app = FastAPI()
+        app.include_router(smart_parser_routes.router, prefix="/api")
+        app.dependency_overrides[verify_api_key] = lambda: "test"
+        app.dependency_overrides[smart_parser_routes.get_smart_parser_service] = lambda: smart_parser_service
+        client = TestClient(app)
+        response = client.post("/api/smart-parser/season-catalog", json={"url": url})
+        assert response.status_code == 200
+        body = response.json()
+        assert body["total"] == 7 and body["parsed"] == 6
+        assert body["items"][0]["anime"]["rss_sources"][0]["name"] == "蜜柑计划 默认"
+        response = client.post("/api/smart-parser/season-catalog", json={"year": 2024})
+        assert response.status_code == 400
+        response = client.post("/api/smart-parser/season-catalog", json={"url": "https://unknown.example/season"})
+        assert response.status_code == 400
+        print("✓ 接口返回季度番组目录")
+
+        print("\n" + "=" * 60)
+        print("[成功] 季度番组目录测试通过")
+        print("=" * 60)
+    finally:
+        set_http_client(None)
+        set_rate_limiter(None)
+        server.stop()
+        env.teardown()
+
+
+if __name__ == "__main__":
+    test_season_catalog()
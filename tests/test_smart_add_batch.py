@@ -0,0 +1,221 @@
+"""
+批量智能添加测试
+验证并发解析的并发上限、结果按完成顺序返回、每个动画一个事务、批量添加接口的流式响应，
+以及单个智能添加默认通过后台任务队列执行，不访问外网
+"""
+import sys
+import os
+import json
+import threading
+import time
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from server.api.auth import verify_api_key
+from server.api.routes import anime as anime_routes
+from server.api.routes.background_job import set_job_worker_service
+from server.database import init_database, get_db
+from server.models import Anime, RSSSource
+from server.services.anime_service import AnimeService
+from server.services.job_queue_service import JobQueueService
+from server.services.job_worker_service import JobWorkerService
+from server.services.parse_cache_service import SmartParseCache
+from server.services.smart_parser_service import SmartParserService
+from server.site_parsers.mikan_parser import MikanParser
+from server.site_parsers.registry import ParserRegistry
+from server.utils import init_config, HTTPClient, HostRateLimiter, set_http_client, set_rate_limiter
+from test_utils import TestEnvironment, FixtureHTTPServer, load_fixture
+
+
+PAGE_BODY = load_fixture("mikan_bangumi_page.html")
+BANGUMI_IDS = ["3824", "3825", "3826", "3827", "3828"]
+
+
+class SlowMikanParser(MikanParser):
+    """解析本地回放的蜜柑计划页面，记录同时进行的解析数；URL 带 slow 时解析更慢"""
+
+    def __init__(self, delay: float = 0.1):
+        super().__init__()
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def can_parse(self, url: str) -> bool:
+        return url.startswith("http://127.0.0.1")
+
+    def parse_anime(self, url: str):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay * (10 if "slow" in url else 1))
+            return super().parse_anime(url)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def create_service(parser: MikanParser) -> SmartParserService:
+    """创建使用独立注册表和进程内缓存的智能解析服务"""
+    registry = ParserRegistry()
+    registry.register(parser, hosts=["127.0.0.1"])
+    return SmartParserService(registry=registry, cache=SmartParseCache(ttl=3600))
+
+
+def count_rows():
+    db = next(get_db())
+    try:
+        return db.query(Anime).count(), db.query(RSSSource).count()
+    finally:
+        db.close()
+
+
+def test_smart_add_batch():
+    """测试批量智能添加"""
+    print("=" * 60)
+    print("测试批量智能添加")
+    print("=" * 60)
+
+    env = TestEnvironment()
+    routes = {
+        f"/Home/Bangumi/{bangumi_id}": PAGE_BODY.replace(b"bangumiId=3824", f"bangumiId={bangumi_id}".encode())
+        for bangumi_id in BANGUMI_IDS
+    }
+    routes["/Home/Bangumi/slow/3829"] = PAGE_BODY
+    server = FixtureHTTPServer(routes, content_type="text/html; charset=utf-8")
+
+    try:
+        env.setup()
+        init_config(env.get_config_path())
+        init_database()
+        server.start()
+        set_rate_limiter(HostRateLimiter(requests_per_second=0, max_in_flight=0))
+        set_http_client(HTTPClient(retries=0))
+
+        # 测试1: 按上限并发解析，结果按完成顺序返回
+        parser = SlowMikanParser()
+        service = create_service(parser)
+        urls = [server.get_url("/Home/Bangumi/slow/3829")] + [
+            server.get_url(f"/Home/Bangumi/{bangumi_id}") for bangumi_id in BANGUMI_IDS
+        ]
+        results = list(service.smart_add_batch(urls, max_concurrency=3))
+        assert len(results) == 6 and all(result["success"] for result in results)
+        assert 1 < parser.peak <= 3, parser.peak
+        assert results[-1]["index"] == 0
+        assert sorted(result["index"] for result in results) == list(range(6))
+        print(f"✓ 6 个链接最多同时解析 {parser.peak} 个，慢的链接最后返回")
+
+        # 测试2: 每个动画创建全部RSS源
+        result = next(result for result in results if result["url"].endswith("/3825"))
+        assert result["anime"].title == "黄金神威 最终章"
+        assert len(result["rss_sources"]) == 9
+        assert result["rss_sources"][0]["url"] == "https://mikanani.me/RSS/Bangumi?bangumiId=3825"
+        assert count_rows() == (6, 54)
+        print("✓ 创建 6 个动画和 54 个RSS源")
+
+        # 测试3: 重复、不支持和解析失败的链接返回各自的原因，不影响其他链接
+        urls = [
+            server.get_url("/Home/Bangumi/3824"),
+            server.get_url("/Home/Bangumi/3824#top"),
+            "https://unknown.example/Home/Bangumi/1",
+            server.get_url("/Home/Bangumi/404"),
+        ]
+        results = {result["index"]: result for result in service.smart_add_batch(urls, auto_add_rss=False)}
+        assert results[0]["success"] is True and results[0]["rss_sources"] == []
+        assert results[1]["success"] is False and "重复" in results[1]["message"]
+        assert results[2]["success"] is False and "不支持的网站" in results[2]["message"]
+        assert results[3]["success"] is False and results[3]["anime"] is None
+        assert count_rows() == (7, 54)
+        print("✓ 失败的链接返回原因")
+
+        # 测试4: 动画和RSS源在同一事务中创建，RSS源失败时动画也回滚
+        db = next(get_db())
+        try:
+            AnimeService(db).create_anime_with_rss_sources(
+                {"title": "不完整的动画"},
+                [{"name": "正常", "url": "https://mikanani.me/RSS/1"}, {"name": "缺少地址", "url": None}]
+            )
+            assert False, "应该抛出异常"
+        except Exception:
+            pass
+        assert db.query(Anime).filter(Anime.title == "不完整的动画").count() == 0
+        db.close()
+        assert count_rows() == (7, 54)
+        print("✓ RSS源创建失败时整个动画回滚")
+
+        # 测试5: 批量添加接口逐行返回结果
+        app = FastAPI()
+        app.include_router(anime_routes.router, prefix="/api")
+        app.dependency_overrides[verify_api_key] = lambda: "test"
+        app.dependency_overrides[anime_routes.get_smart_parser_service] = lambda: service
+        client = TestClient(app)
+        with client.stream("POST", "/api/anime/smart-add/batch", json={
+            "urls": [server.get_url("/Home/Bangumi/3826"), "https://unknown.example/1"],
+            "max_concurrency": 2
+        }) as response:
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("application/x-ndjson")
+            lines = [json.loads(line) for line in response.iter_lines() if line]
+        assert len(lines) == 2
+        added = next(line for line in lines if line["success"])
+        assert added["anime"]["title"] == "黄金神威 最终章" and added["anime"]["id"]
+        assert len(added["rss_sources"]) == 9
+        assert client.post("/api/anime/smart-add/batch", json={"urls": []}).status_code == 422
+        print("✓ 接口按 NDJSON 流式返回")
+
+        # 测试6: 后台任务队列已启动时，智能添加默认加入队列，由工作线程解析和创建
+        workers = JobWorkerService(get_db, retry_delay=0)
+        workers.register_handler(SmartParserService.JOB_TYPE_SMART_ADD, service.handle_smart_add_job)
+        set_job_worker_service(workers)
+        response = client.post("/api/anime/smart-add", json={
+            "url": server.get_url("/Home/Bangumi/3827"),
+            "auto_add_rss": False
+        })
+        assert response.status_code == 200
+        job_id = response.json()["job_id"]
+        assert job_id and response.json()["anime"] is None
+        failed_job_id = client.post("/api/anime/smart-add", json={"url": "https://unknown.example/1"}).json()["job_id"]
+        assert workers.run_pending() == 2
+        db = next(get_db())
+        try:
+            queue = JobQueueService(db)
+            job = queue.get_job(job_id)
+            result = JobQueueService.get_result(job)
+            assert job.status == "succeeded" and result["success"] is True
+            assert result["anime"]["title"] == "黄金神威 最终章" and result["rss_sources"] == []
+            # 解析失败不重试
+            failed_job = queue.get_job(failed_job_id)
+            assert failed_job.status == "succeeded" and failed_job.attempts == 1
+            assert JobQueueService.get_result(failed_job)["success"] is False
+        finally:
+            db.close()
+        response = client.post("/api/anime/smart-add?background=false", json={
+            "url": server.get_url("/Home/Bangumi/3828"),
+            "auto_add_rss": False
+        })
+        assert response.status_code == 200 and response.json()["anime"]["id"]
+        assert response.json()["job_id"] is None
+        set_job_worker_service(None)
+        assert client.post("/api/anime/smart-add?background=true", json={
+            "url": server.get_url("/Home/Bangumi/3828")
+        }).status_code == 503
+        print("✓ 智能添加默认通过后台任务队列执行")
+
+        print("\n" + "=" * 60)
+        print("[成功] 批量智能添加测试通过")
+        print("=" * 60)
+    finally:
+        set_job_worker_service(None)
+        set_http_client(None)
+        set_rate_limiter(None)
+        server.stop()
+        env.teardown()
+
+
+if __name__ == "__main__":
+    test_smart_add_batch()
@@ -0,0 +1,86 @@
+"""
+标题解析测试
+验证预编译的标题解析引擎一次提取集数、集标题和版本号，以及批量解析和缓存，不访问外网
+"""
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.site_parsers.mikan_rss_parser import MikanRSSParser
+from server.utils import ParsedTitle, parse_title, parse_titles
+from test_utils import load_title_corpus
+
+
+def test_title_parser():
+    """测试标题解析"""
+    print("=" * 60)
+    print("测试标题解析")
+    print("=" * 60)
+
+    # 测试1: 各种集数格式，按 第X集 > EP > [X] > 【X】 > 分隔符 的优先级
+    cases = [
+        ("黄金神威 最终章 第1集", 1, "黄金神威 最终章", None),
+        ("黄金神威 最终章 EP.2", 2, "黄金神威 最终章", None),
+        ("[LoliHouse] 黄金神威 最终章 [03]", 3, "黄金神威 最终章", None),
+        ("黄金神威 最终章 - 4", 4, "黄金神威 最终章 4", None),
+        ("黄金神威 最终章 05", 5, "黄金神威 最终章 05", None),
+        ("[LoliHouse] 黄金神威 最终章 [01].mkv", 1, "黄金神威 最终章", None),
+        ("黄金神威 最终章 第2集 (1080P)", 2, "黄金神威 最终章", None),
+        ("黄金神威 最终章 EP.3 - 剧情介绍", 3, "黄金神威 最终章 剧情介绍", None),
+        ("【喵萌奶茶屋】★10月新番★[黄金神威 最终章 / Golden Kamuy][12][1080p][简日双语]", 12, "【喵萌奶茶屋】★10月新番★", None),
+        ("[SubsPlease] Jujutsu Kaisen - 47 (1080p) [9B5DA8E8].mkv", 47, "Jujutsu Kaisen 47", None),
+        ("[银色子弹字幕组][名侦探柯南][第1112集 谜之灯谜][简日双语MP4][1080P]", 1112, "", None),
+        ("【极影字幕社】★10月新番 【药屋少女的呢喃】【Kusuriya no Hitorigoto】【08】GB MP4 1080P", 8, None, None),
+        ("[VCB-Studio] Kimetsu no Yaiba [Ma10p_1080p]", None, "Kimetsu no Yaiba", None),
+        # 分隔符包围的数字超出范围时不视为集数
+        ("Some Show - 2024 - Special", None, "Some Show 2024 Special", None),
+        # 版本号
+        ("[SweetSub] 药屋少女的呢喃 - 03v2 [WebRip][1080P]", 3, "药屋少女的呢喃 03v2", 2),
+        ("[MingY] 迷宫饭 / Dungeon Meshi [05v2][1080p][CHT&JPN]", 5, "迷宫饭 / Dungeon Meshi", 2),
+        ("【字幕组】【迷宫饭】【07V3】【1080P】", 7, "【字幕组】【迷宫饭】【07V3】【1080P】", 3),
+        ("", None, "", None),
+    ]
+    for title, number, episode_title, version in cases:
+        parsed = parse_title(title)
+        assert parsed.episode_number == number, f"集数提取失败: {title} -> {parsed}"
+        if episode_title is not None:
+            assert parsed.episode_title == episode_title, f"集标题提取失败: {title} -> {parsed}"
+        assert parsed.version == version, f"版本号提取失败: {title} -> {parsed}"
+    print(f"✓ {len(cases)} 个标题解析正确")
+
+    # 测试2: 解析器方法与解析引擎一致
+    parser = MikanRSSParser()
+    for title, number, _, _ in cases:
+        assert parser.extract_episode_number(title) == number
+        assert parser.extract_episode_title(title) == parse_title(title).episode_title
+    print("✓ RSS解析器使用解析引擎")
+
+    # 测试3: 批量解析保持顺序，真实标题大多能提取集数（合集、电影、超过999集和 SxxEyy 格式除外）
+    corpus = load_title_corpus()
+    results = parser.parse_titles(corpus)
+    assert results == [parse_title(title) for title in corpus]
+    assert all(isinstance(result, ParsedTitle) for result in results)
+    missing = [title for title, result in zip(corpus, results) if result.episode_number is None]
+    assert len(missing) <= 9, missing
+    versions = [result.version for result in results if result.version]
+    assert versions == [2, 2, 2, 2]
+    print(f"✓ 批量解析 {len(corpus)} 个标题，{len(corpus) - len(missing)} 个提取到集数")
+
+    # 测试4: 相同标题命中缓存
+    parse_title.cache_clear()
+    parse_titles(corpus)
+    parse_titles(corpus)
+    info = parse_title.cache_info()
+    assert info.misses == len(set(corpus))
+    assert info.hits == len(corpus) * 2 - len(set(corpus))
+    print(f"✓ 缓存命中 {info.hits} 次，未命中 {info.misses} 次")
+
+    print("\n" + "=" * 60)
+    print("[成功] 标题解析测试通过")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    test_title_parser()
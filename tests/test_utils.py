@@ -9,8 +9,10 @@ import shutil
 import subprocess
 import time
 import signal
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import Optional, Callable
+from typing import Optional, Callable, Dict, List
 
 
 class TestEnvironment:
@@ -282,6 +284,102 @@ smart_parser:
         self.teardown()
 
 
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+
+def load_fixture(name: str) -> bytes:
+    """读取 tests/data 下的测试数据文件"""
+    with open(os.path.join(DATA_DIR, name), 'rb') as f:
+        return f.read()
+
+
+def load_title_corpus() -> List[str]:
+    """读取 tests/data/fansub_titles.txt 中的字幕组发布标题（忽略空行和注释）"""
+    lines = load_fixture("fansub_titles.txt").decode("utf-8").splitlines()
+    return [line for line in lines if line.strip() and not line.startswith("#")]
+
+
+class FixtureHTTPServer:
+    """本地 HTTP 服务，用录制的页面代替真实网站，让测试可以离线运行"""
+
+    def __init__(self, routes: Dict[str, bytes], content_type: str = "application/xml; charset=utf-8"):
+        """
+        初始化本地 HTTP 服务
+
+        Args:
+            routes: 路径（含查询参数）到响应内容的映射
+            content_type: 响应的 Content-Type
+        """
+        self.routes = routes
+        self.content_type = content_type
+        self.etag: Optional[str] = '"fixture-v1"'
+        self.last_modified: Optional[str] = "Sat, 03 Oct 2026 12:00:00 GMT"
+        self.honor_validators = True
+        # 路径到错误状态码的映射，模拟服务端错误（如503）
+        self.error_statuses: Dict[str, int] = {}
+        self.requests: List[Dict[str, str]] = []
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> str:
+        """启动服务并返回基础 URL"""
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                fixture.requests.append({'path': self.path, **dict(self.headers)})
+                if self.path in fixture.error_statuses:
+                    self.send_error(fixture.error_statuses[self.path])
+                    return
+                body = fixture.routes.get(self.path)
+                if body is None:
+                    self.send_error(404)
+                    return
+                if fixture.honor_validators and (
+                    (fixture.etag and self.headers.get('If-None-Match') == fixture.etag)
+                    or (fixture.last_modified and self.headers.get('If-Modified-Since') == fixture.last_modified)
+                ):
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', fixture.content_type)
+                self.send_header('Content-Length', str(len(body)))
+                if fixture.etag:
+                    self.send_header('ETag', fixture.etag)
+                if fixture.last_modified:
+                    self.send_header('Last-Modified', fixture.last_modified)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.get_url()
+
+    def get_url(self, path: str = "") -> str:
+        """获取服务地址"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{path}"
+
+    def stop(self):
+        """停止服务"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
 def run_in_test_environment(test_func: Callable) -> Callable:
     """
     装饰器：在测试环境中运行测试函数